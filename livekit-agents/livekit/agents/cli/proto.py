@@ -1,6 +1,5 @@
 from __future__ import annotations  # noqa: I001
 
-import io
 import socket
 from dataclasses import dataclass, field
 from typing import ClassVar
@@ -48,7 +47,7 @@ class ActiveJobsResponse:
     jobs: list[RunningJobInfo] = field(default_factory=list)
     reload_count: int = 0
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         channel.write_int(b, len(self.jobs))
         for running_job in self.jobs:
             accept_args = running_job.accept_arguments
@@ -62,7 +61,7 @@ class ActiveJobsResponse:
 
         channel.write_int(b, self.reload_count)
 
-    def read(self, b: io.BytesIO) -> None:
+    def read(self, b: channel.FrameReader) -> None:
         for _ in range(channel.read_int(b)):
             job = agent.Job()
             job.ParseFromString(channel.read_bytes(b))
@@ -1,9 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
+import weakref
+
+import aiohttp
 
 from livekit import api
 
+from .._exceptions import APIConnectionError, APIStatusError
+from ..utils import WebSocketMultiplexer
+
+# gateway connections are refreshed before their access token expires
+MULTIPLEXED_SESSION_DURATION = 300
+
+
+class _LoopMultiplexers:
+    """The multiplexers of an event loop, with the http session opening their connections"""
+
+    def __init__(self) -> None:
+        self.session: aiohttp.ClientSession | None = None
+        self.multiplexers: dict[tuple[str, str], WebSocketMultiplexer] = {}
+
+    def ensure_session(self) -> aiohttp.ClientSession:
+        # not the http session of a job, the multiplexers outlive the jobs of the loop
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+
+_loop_multiplexers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopMultiplexers] = (
+    weakref.WeakKeyDictionary()
+)
+
 
 def create_access_token(api_key: str | None, api_secret: str | None, ttl: float = 600) -> str:
     grant = api.access_token.InferenceGrants(perform=True)
@@ -14,3 +43,50 @@ def create_access_token(api_key: str | None, api_secret: str | None, ttl: float
         .with_ttl(datetime.timedelta(seconds=ttl))
         .to_jwt()
     )
+
+
+def shared_multiplexer(*, url: str, api_key: str, api_secret: str) -> WebSocketMultiplexer:
+    """Return the multiplexer shared by every stream of the event loop using the same gateway url.
+
+    The connections are bound to the loop they were opened on, so they're shared by the agent
+    sessions running on the same loop. The jobs of a thread-executor worker each run their own
+    loop and use their own connections.
+    """
+    loop = asyncio.get_running_loop()
+    loop_mux = _loop_multiplexers.get(loop)
+    if loop_mux is None:
+        loop_mux = _loop_multiplexers[loop] = _LoopMultiplexers()
+
+    if (mux := loop_mux.multiplexers.get((url, api_key))) is not None:
+        return mux
+
+    async def _connect(timeout: float) -> aiohttp.ClientWebSocketResponse:
+        session = loop_mux.ensure_session()
+        headers = {"Authorization": f"Bearer {create_access_token(api_key, api_secret)}"}
+        try:
+            return await asyncio.wait_for(session.ws_connect(url, headers=headers), timeout)
+        except aiohttp.WSServerHandshakeError as e:
+            if e.status == 429:
+                raise APIStatusError(
+                    "LiveKit Inference quota exceeded", status_code=e.status
+                ) from e
+            raise APIConnectionError(f"failed to connect to {url}") from e
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise APIConnectionError(f"failed to connect to {url}") from e
+
+    mux = loop_mux.multiplexers[(url, api_key)] = WebSocketMultiplexer(
+        connect_cb=_connect, max_session_duration=MULTIPLEXED_SESSION_DURATION
+    )
+    return mux
+
+
+async def close_shared_multiplexers() -> None:
+    """Close the multiplexers of the running loop and their http session"""
+    loop_mux = _loop_multiplexers.pop(asyncio.get_running_loop(), None)
+    if loop_mux is None:
+        return
+
+    for mux in loop_mux.multiplexers.values():
+        await mux.aclose()
+    if loop_mux.session is not None:
+        await loop_mux.session.close()
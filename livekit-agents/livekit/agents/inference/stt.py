@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import contextlib
 import json
 import os
 import weakref
+from collections.abc import Awaitable
 from dataclasses import dataclass, replace
-from typing import Any, Literal, TypedDict, Union, overload
+from typing import Any, Callable, Literal, TypedDict, Union, overload
 
 import aiohttp
 
@@ -17,7 +19,7 @@ from .._exceptions import APIConnectionError, APIError, APIStatusError
 from ..log import logger
 from ..types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
 from ..utils import is_given
-from ._utils import create_access_token
+from ._utils import create_access_token, shared_multiplexer
 
 DeepgramModels = Literal[
     "deepgram",
@@ -108,6 +110,7 @@ class STT(stt.STT):
         api_secret: NotGivenOr[str] = NOT_GIVEN,
         http_session: aiohttp.ClientSession | None = None,
         extra_kwargs: NotGivenOr[CartesiaOptions] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None: ...
 
     @overload
@@ -123,6 +126,7 @@ class STT(stt.STT):
         api_secret: NotGivenOr[str] = NOT_GIVEN,
         http_session: aiohttp.ClientSession | None = None,
         extra_kwargs: NotGivenOr[DeepgramOptions] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None: ...
 
     @overload
@@ -138,6 +142,7 @@ class STT(stt.STT):
         api_secret: NotGivenOr[str] = NOT_GIVEN,
         http_session: aiohttp.ClientSession | None = None,
         extra_kwargs: NotGivenOr[AssemblyaiOptions] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None: ...
 
     @overload
@@ -153,6 +158,7 @@ class STT(stt.STT):
         api_secret: NotGivenOr[str] = NOT_GIVEN,
         http_session: aiohttp.ClientSession | None = None,
         extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None: ...
 
     def __init__(
@@ -169,6 +175,7 @@ class STT(stt.STT):
         extra_kwargs: NotGivenOr[
             dict[str, Any] | CartesiaOptions | DeepgramOptions | AssemblyaiOptions
         ] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None:
         """Livekit Cloud Inference STT
 
@@ -182,6 +189,9 @@ class STT(stt.STT):
             api_secret (str, optional): LIVEKIT_API_SECRET, if not provided, read from environment variable.
             http_session (aiohttp.ClientSession, optional): HTTP session to use.
             extra_kwargs (dict, optional): Extra kwargs to pass to the STT model.
+            multiplexed (bool, optional): Share the WebSocket connections between the streams of
+                all the STT instances running on the same event loop. Each stream is a context
+                identified by `context_id` in the gateway messages. Defaults to False.
         """
         super().__init__(
             capabilities=stt.STTCapabilities(streaming=True, interim_results=True),
@@ -225,6 +235,7 @@ class STT(stt.STT):
         )
 
         self._session = http_session
+        self._multiplexed = multiplexed
         self._streams = weakref.WeakSet[SpeechStream]()
 
     @classmethod
@@ -257,6 +268,21 @@ class STT(stt.STT):
             self._session = utils.http_context.http_session()
         return self._session
 
+    def _multiplexer(self) -> utils.WebSocketMultiplexer:
+        base_url = self._opts.base_url
+        if base_url.startswith(("http://", "https://")):
+            base_url = base_url.replace("http", "ws", 1)
+
+        return shared_multiplexer(
+            url=f"{base_url}/stt",
+            api_key=self._opts.api_key,
+            api_secret=self._opts.api_secret,
+        )
+
+    def prewarm(self) -> None:
+        if self._multiplexed:
+            self._multiplexer().prewarm()
+
     async def _recognize_impl(
         self,
         buffer: utils.AudioBuffer,
@@ -307,6 +333,11 @@ class STT(stt.STT):
         return options
 
 
+_SendFn = Callable[[dict[str, Any]], Awaitable[None]]
+_RecvFn = Callable[[], Awaitable[Union[dict[str, Any], None]]]
+_RunSession = Callable[[_SendFn, _RecvFn], Awaitable[bool]]
+
+
 class SpeechStream(stt.SpeechStream):
     def __init__(
         self,
@@ -316,6 +347,7 @@ class SpeechStream(stt.SpeechStream):
         conn_options: APIConnectOptions,
     ) -> None:
         super().__init__(stt=stt, conn_options=conn_options, sample_rate=opts.sample_rate)
+        self._stt: STT = stt
         self._opts = opts
         self._session = stt._ensure_session()
         self._request_id = str(utils.shortuuid("stt_request_"))
@@ -342,7 +374,7 @@ class SpeechStream(stt.SpeechStream):
         closing_ws = False
 
         @utils.log_exceptions(logger=logger)
-        async def send_task(ws: aiohttp.ClientWebSocketResponse) -> None:
+        async def send_task(send: _SendFn) -> None:
             nonlocal closing_ws
 
             audio_bstream = utils.audio.AudioByteStream(
@@ -366,33 +398,24 @@ class SpeechStream(stt.SpeechStream):
                         "type": "input_audio",
                         "audio": base64_audio,
                     }
-                    await ws.send_str(json.dumps(audio_msg))
+                    await send(audio_msg)
 
             closing_ws = True
             finalize_msg = {
                 "type": "session.finalize",
             }
-            await ws.send_str(json.dumps(finalize_msg))
+            await send(finalize_msg)
 
         @utils.log_exceptions(logger=logger)
-        async def recv_task(ws: aiohttp.ClientWebSocketResponse) -> None:
+        async def recv_task(recv: _RecvFn) -> None:
             nonlocal closing_ws
             while True:
-                msg = await ws.receive()
-                if msg.type in (
-                    aiohttp.WSMsgType.CLOSED,
-                    aiohttp.WSMsgType.CLOSE,
-                    aiohttp.WSMsgType.CLOSING,
-                ):
+                data = await recv()
+                if data is None:
                     if closing_ws or self._session.closed:
                         return
                     raise APIStatusError(message="LiveKit STT connection closed unexpectedly")
 
-                if msg.type != aiohttp.WSMsgType.TEXT:
-                    logger.warning("unexpected LiveKit STT message type %s", msg.type)
-                    continue
-
-                data = json.loads(msg.data)
                 msg_type = data.get("type")
                 if msg_type == "session.created":
                     pass
@@ -400,65 +423,109 @@ class SpeechStream(stt.SpeechStream):
                     self._process_transcript(data, is_final=False)
                 elif msg_type == "final_transcript":
                     self._process_transcript(data, is_final=True)
-                elif msg_type == "session.finalized":
-                    pass
-                elif msg_type == "session.closed":
-                    pass
+                elif msg_type in ("session.finalized", "session.closed"):
+                    # a multiplexed connection isn't closed by the gateway once finalized
+                    if closing_ws and self._stt._multiplexed:
+                        return
                 elif msg_type == "error":
-                    raise APIError(f"LiveKit STT returned error: {msg.data}")
+                    raise APIError(f"LiveKit STT returned error: {json.dumps(data)}")
                 else:
                     logger.warning("received unexpected message from LiveKit STT: %s", data)
 
-        ws: aiohttp.ClientWebSocketResponse | None = None
+        async def run_session(send: _SendFn, recv: _RecvFn) -> bool:
+            """Run a gateway session, return True when it must be restarted with new options"""
+            tasks = [
+                asyncio.create_task(send_task(send)),
+                asyncio.create_task(recv_task(recv)),
+            ]
+            tasks_group = asyncio.gather(*tasks)
+            wait_reconnect_task = asyncio.create_task(self._reconnect_event.wait())
 
-        while True:
             try:
-                ws = await self._connect_ws()
-                tasks = [
-                    asyncio.create_task(send_task(ws)),
-                    asyncio.create_task(recv_task(ws)),
-                ]
-                tasks_group = asyncio.gather(*tasks)
-                wait_reconnect_task = asyncio.create_task(self._reconnect_event.wait())
-
-                try:
-                    done, _ = await asyncio.wait(
-                        (tasks_group, wait_reconnect_task),
-                        return_when=asyncio.FIRST_COMPLETED,
-                    )
+                done, _ = await asyncio.wait(
+                    (tasks_group, wait_reconnect_task),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
 
-                    for task in done:
-                        if task != wait_reconnect_task:
-                            task.result()
+                for task in done:
+                    if task != wait_reconnect_task:
+                        task.result()
 
-                    if wait_reconnect_task not in done:
-                        break
+                if wait_reconnect_task not in done:
+                    return False
 
-                    self._reconnect_event.clear()
-                finally:
-                    await utils.aio.gracefully_cancel(*tasks, wait_reconnect_task)
-                    tasks_group.cancel()
-                    tasks_group.exception()  # retrieve the exception
+                self._reconnect_event.clear()
+                return True
             finally:
-                if ws is not None:
-                    await ws.close()
+                await utils.aio.gracefully_cancel(*tasks, wait_reconnect_task)
+                tasks_group.cancel()
+                tasks_group.exception()  # retrieve the exception
 
-    async def _connect_ws(self) -> aiohttp.ClientWebSocketResponse:
-        """Connect to the LiveKit STT WebSocket."""
-        params: dict[str, Any] = {
-            "settings": {
-                "sample_rate": str(self._opts.sample_rate),
-                "encoding": self._opts.encoding,
-                "extra": self._opts.extra_kwargs,
-            },
-        }
+        while True:
+            if self._stt._multiplexed:
+                restart = await self._run_multiplexed(run_session)
+            else:
+                restart = await self._run_ws(run_session)
+
+            if not restart:
+                break
 
-        if self._opts.model and self._opts.model != "auto":
-            params["model"] = self._opts.model
+    async def _run_ws(self, run_session: _RunSession) -> bool:
+        ws: aiohttp.ClientWebSocketResponse | None = None
+        try:
+            ws = await self._connect_ws()
+
+            async def _send_ws(msg: dict[str, Any]) -> None:
+                assert ws is not None
+                await ws.send_str(json.dumps(msg))
+
+            async def _recv_ws() -> dict[str, Any] | None:
+                assert ws is not None
+                while True:
+                    msg = await ws.receive()
+                    if msg.type in (
+                        aiohttp.WSMsgType.CLOSED,
+                        aiohttp.WSMsgType.CLOSE,
+                        aiohttp.WSMsgType.CLOSING,
+                    ):
+                        return None
+
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        logger.warning("unexpected LiveKit STT message type %s", msg.type)
+                        continue
+
+                    data: dict[str, Any] = json.loads(msg.data)
+                    return data
+
+            return await run_session(_send_ws, _recv_ws)
+        finally:
+            if ws is not None:
+                await ws.close()
+
+    async def _run_multiplexed(self, run_session: _RunSession) -> bool:
+        mux = self._stt._multiplexer()
+        async with mux.context(timeout=self._conn_options.timeout) as ctx:
+            # the session is created again if the connection is lost before any audio is sent
+            await ctx.send(_session_create_params(self._opts), replay=True)
+
+            async def _send_ctx(msg: dict[str, Any]) -> None:
+                if msg.get("type") == "input_audio":
+                    # the audio isn't replayed, a new gateway session would miss the audio sent
+                    # on the lost connection, fail the context instead
+                    ctx.stop_replay()
+                await ctx.send(msg)
+
+            async def _recv_ctx() -> dict[str, Any] | None:
+                return await ctx.recv()
 
-        if self._opts.language:
-            params["settings"]["language"] = self._opts.language
+            try:
+                return await run_session(_send_ctx, _recv_ctx)
+            finally:
+                with contextlib.suppress(APIConnectionError):
+                    await ctx.send({"type": "session.close"})
 
+    async def _connect_ws(self) -> aiohttp.ClientWebSocketResponse:
+        """Connect to the LiveKit STT WebSocket."""
         base_url = self._opts.base_url
         if base_url.startswith(("http://", "https://")):
             base_url = base_url.replace("http", "ws", 1)
@@ -470,8 +537,7 @@ class SpeechStream(stt.SpeechStream):
                 self._session.ws_connect(f"{base_url}/stt", headers=headers),
                 self._conn_options.timeout,
             )
-            params["type"] = "session.create"
-            await ws.send_str(json.dumps(params))
+            await ws.send_str(json.dumps(_session_create_params(self._opts)))
         except (aiohttp.ClientConnectorError, asyncio.TimeoutError) as e:
             if isinstance(e, aiohttp.ClientResponseError) and e.status == 429:
                 raise APIStatusError("LiveKit STT quota exceeded", status_code=e.status) from e
@@ -530,3 +596,21 @@ class SpeechStream(stt.SpeechStream):
                 alternatives=[speech_data],
             )
             self._event_ch.send_nowait(event)
+
+
+def _session_create_params(opts: STTOptions) -> dict[str, Any]:
+    params: dict[str, Any] = {
+        "type": "session.create",
+        "settings": {
+            "sample_rate": str(opts.sample_rate),
+            "encoding": opts.encoding,
+            "extra": opts.extra_kwargs,
+        },
+    }
+
+    if opts.model and opts.model != "auto":
+        params["model"] = opts.model
+
+    if opts.language:
+        params["settings"]["language"] = opts.language
+    return params
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import contextlib
 import json
 import os
+import time
 import weakref
+from collections.abc import Awaitable
 from dataclasses import dataclass, replace
-from typing import Any, Literal, TypedDict, Union, overload
+from typing import Any, Callable, Literal, TypedDict, Union, overload
 
 import aiohttp
 
@@ -15,7 +18,7 @@ from .._exceptions import APIConnectionError, APIError, APIStatusError, APITimeo
 from ..log import logger
 from ..types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
 from ..utils import is_given
-from ._utils import create_access_token
+from ._utils import create_access_token, shared_multiplexer
 
 CartesiaModels = Literal[
     "cartesia",
@@ -69,6 +72,9 @@ DEFAULT_ENCODING: TTSEncoding = "pcm_s16le"
 DEFAULT_SAMPLE_RATE: int = 16000
 DEFAULT_BASE_URL = "https://agent-gateway.livekit.cloud/v1"
 
+# the idle pooled connections are removed when the gateway doesn't answer a ping in time
+PING_TIMEOUT = 5.0
+
 
 @dataclass
 class _TTSOptions:
@@ -98,6 +104,7 @@ class TTS(tts.TTS):
         api_secret: NotGivenOr[str] = NOT_GIVEN,
         http_session: aiohttp.ClientSession | None = None,
         extra_kwargs: NotGivenOr[CartesiaOptions] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None:
         pass
 
@@ -115,6 +122,7 @@ class TTS(tts.TTS):
         api_secret: NotGivenOr[str] = NOT_GIVEN,
         http_session: aiohttp.ClientSession | None = None,
         extra_kwargs: NotGivenOr[ElevenlabsOptions] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None:
         pass
 
@@ -132,6 +140,7 @@ class TTS(tts.TTS):
         api_secret: NotGivenOr[str] = NOT_GIVEN,
         http_session: aiohttp.ClientSession | None = None,
         extra_kwargs: NotGivenOr[RimeOptions] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None:
         pass
 
@@ -149,6 +158,7 @@ class TTS(tts.TTS):
         api_secret: NotGivenOr[str] = NOT_GIVEN,
         http_session: aiohttp.ClientSession | None = None,
         extra_kwargs: NotGivenOr[InworldOptions] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None:
         pass
 
@@ -166,6 +176,7 @@ class TTS(tts.TTS):
         api_secret: NotGivenOr[str] = NOT_GIVEN,
         http_session: aiohttp.ClientSession | None = None,
         extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None:
         pass
 
@@ -184,6 +195,7 @@ class TTS(tts.TTS):
         extra_kwargs: NotGivenOr[
             dict[str, Any] | CartesiaOptions | ElevenlabsOptions | RimeOptions | InworldOptions
         ] = NOT_GIVEN,
+        multiplexed: bool = False,
     ) -> None:
         """Livekit Cloud Inference TTS
 
@@ -198,6 +210,9 @@ class TTS(tts.TTS):
             api_secret (str, optional): LIVEKIT_API_SECRET, if not provided, read from environment variable.
             http_session (aiohttp.ClientSession, optional): HTTP session to use.
             extra_kwargs (dict, optional): Extra kwargs to pass to the TTS model.
+            multiplexed (bool, optional): Share the WebSocket connections between the streams of
+                all the TTS instances running on the same event loop. Each stream is a context
+                identified by `context_id` in the gateway messages. Defaults to False.
         """
         sample_rate = sample_rate if is_given(sample_rate) else DEFAULT_SAMPLE_RATE
         super().__init__(
@@ -244,11 +259,14 @@ class TTS(tts.TTS):
             extra_kwargs=dict(extra_kwargs) if is_given(extra_kwargs) else {},
         )
         self._session = http_session
+        self._multiplexed = multiplexed
         self._pool = utils.ConnectionPool[aiohttp.ClientWebSocketResponse](
             connect_cb=self._connect_ws,
             close_cb=self._close_ws,
             max_session_duration=300,
             mark_refreshed_on_get=True,
+            health_check_cb=self._check_ws,
+            label="inference_tts",
         )
         self._streams = weakref.WeakSet[SynthesizeStream]()
 
@@ -288,29 +306,17 @@ class TTS(tts.TTS):
         ws = None
         try:
             ws = await asyncio.wait_for(
-                session.ws_connect(f"{base_url}/tts", headers=headers), timeout
+                # the pongs are awaited by _check_ws, the streams answer the pings themselves
+                session.ws_connect(f"{base_url}/tts", headers=headers, autoping=False),
+                timeout,
             )
         except (aiohttp.ClientConnectorError, asyncio.TimeoutError) as e:
             if isinstance(e, aiohttp.ClientResponseError) and e.status == 429:
                 raise APIStatusError("LiveKit TTS quota exceeded", status_code=e.status) from e
             raise APIConnectionError("failed to connect to LiveKit TTS") from e
 
-        params = {
-            "type": "session.create",
-            "sample_rate": str(self._opts.sample_rate),
-            "encoding": self._opts.encoding,
-            "extra": self._opts.extra_kwargs,
-        }
-
-        if self._opts.voice:
-            params["voice"] = self._opts.voice
-        if self._opts.model:
-            params["model"] = self._opts.model
-        if self._opts.language:
-            params["language"] = self._opts.language
-
         try:
-            await ws.send_str(json.dumps(params))
+            await ws.send_str(json.dumps(_session_create_params(self._opts)))
         except Exception as e:
             await ws.close()
             raise APIConnectionError("failed to send session.create message to LiveKit TTS") from e
@@ -320,6 +326,36 @@ class TTS(tts.TTS):
     async def _close_ws(self, ws: aiohttp.ClientWebSocketResponse) -> None:
         await ws.close()
 
+    async def _check_ws(self, ws: aiohttp.ClientWebSocketResponse) -> bool:
+        # the connection is idle, nothing else reads it while it's being probed
+        if ws.closed:
+            return False
+
+        await ws.ping()
+        deadline = time.monotonic() + PING_TIMEOUT
+        while (remaining := deadline - time.monotonic()) > 0:
+            msg = await ws.receive(timeout=remaining)
+            if msg.type == aiohttp.WSMsgType.PONG:
+                return True
+            if msg.type == aiohttp.WSMsgType.PING:
+                await ws.pong(msg.data)
+            elif msg.type != aiohttp.WSMsgType.TEXT:
+                return False  # closed by the gateway
+            # the text messages of an idle session (session.created) are ignored by the streams
+
+        return False
+
+    def _multiplexer(self) -> utils.WebSocketMultiplexer:
+        base_url = self._opts.base_url
+        if base_url.startswith(("http://", "https://")):
+            base_url = base_url.replace("http", "ws", 1)
+
+        return shared_multiplexer(
+            url=f"{base_url}/tts",
+            api_key=self._opts.api_key,
+            api_secret=self._opts.api_secret,
+        )
+
     def _ensure_session(self) -> aiohttp.ClientSession:
         if not self._session:
             self._session = utils.http_context.http_session()
@@ -327,7 +363,10 @@ class TTS(tts.TTS):
         return self._session
 
     def prewarm(self) -> None:
-        self._pool.prewarm()
+        if self._multiplexed:
+            self._multiplexer().prewarm()
+        else:
+            self._pool.prewarm()
 
     def update_options(
         self,
@@ -369,6 +408,11 @@ class TTS(tts.TTS):
         await self._pool.aclose()
 
 
+_SendFn = Callable[[dict[str, Any]], Awaitable[None]]
+_RecvFn = Callable[[], Awaitable[dict[str, Any]]]
+_RunSession = Callable[[_SendFn, _RecvFn], Awaitable[None]]
+
+
 class SynthesizeStream(tts.SynthesizeStream):
     """Streamed API using websockets"""
 
@@ -400,7 +444,7 @@ class SynthesizeStream(tts.SynthesizeStream):
 
             sent_tokenizer_stream.end_input()
 
-        async def _sentence_stream_task(ws: aiohttp.ClientWebSocketResponse) -> None:
+        async def _sentence_stream_task(send: _SendFn) -> None:
             base_pkt = {
                 "type": "input_transcript",
             }
@@ -408,36 +452,22 @@ class SynthesizeStream(tts.SynthesizeStream):
                 token_pkt = base_pkt.copy()
                 token_pkt["transcript"] = ev.token + " "
                 self._mark_started()
-                await ws.send_str(json.dumps(token_pkt))
+                await send(token_pkt)
                 input_sent_event.set()
 
             end_pkt = {
                 "type": "session.flush",
             }
-            await ws.send_str(json.dumps(end_pkt))
+            await send(end_pkt)
             # needed in case empty input is sent
             input_sent_event.set()
 
-        async def _recv_task(ws: aiohttp.ClientWebSocketResponse) -> None:
+        async def _recv_task(recv: _RecvFn) -> None:
             current_session_id: str | None = None
             await input_sent_event.wait()
 
             while True:
-                msg = await ws.receive(timeout=self._conn_options.timeout)
-                if msg.type in (
-                    aiohttp.WSMsgType.CLOSED,
-                    aiohttp.WSMsgType.CLOSE,
-                    aiohttp.WSMsgType.CLOSING,
-                ):
-                    raise APIStatusError(
-                        "Gateway connection closed unexpectedly", request_id=request_id
-                    )
-
-                if msg.type != aiohttp.WSMsgType.TEXT:
-                    logger.warning("unexpected Gateway message type %s", msg.type)
-                    continue
-
-                data: dict[str, Any] = json.loads(msg.data)
+                data = await recv()
                 session_id = data.get("session_id")
                 if current_session_id is None and session_id is not None:
                     current_session_id = session_id
@@ -452,24 +482,29 @@ class SynthesizeStream(tts.SynthesizeStream):
                     output_emitter.end_input()
                     break
                 elif data.get("type") == "error":
-                    raise APIError(f"LiveKit TTS returned error: {msg.data}")
+                    raise APIError(f"LiveKit TTS returned error: {json.dumps(data)}")
                 else:
                     logger.warning("unexpected message %s", data)
 
+        async def _run_session(send: _SendFn, recv: _RecvFn) -> None:
+            tasks = [
+                asyncio.create_task(_input_task()),
+                asyncio.create_task(_sentence_stream_task(send)),
+                asyncio.create_task(_recv_task(recv)),
+            ]
+
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                input_sent_event.set()
+                await sent_tokenizer_stream.aclose()
+                await utils.aio.gracefully_cancel(*tasks)
+
         try:
-            async with self._tts._pool.connection(timeout=self._conn_options.timeout) as ws:
-                tasks = [
-                    asyncio.create_task(_input_task()),
-                    asyncio.create_task(_sentence_stream_task(ws)),
-                    asyncio.create_task(_recv_task(ws)),
-                ]
-
-                try:
-                    await asyncio.gather(*tasks)
-                finally:
-                    input_sent_event.set()
-                    await sent_tokenizer_stream.aclose()
-                    await utils.aio.gracefully_cancel(*tasks)
+            if self._tts._multiplexed:
+                await self._run_multiplexed(_run_session)
+            else:
+                await self._run_pooled(_run_session, request_id=request_id)
 
         except asyncio.TimeoutError:
             raise APITimeoutError() from None
@@ -481,3 +516,74 @@ class SynthesizeStream(tts.SynthesizeStream):
 
         except Exception as e:
             raise APIConnectionError() from e
+
+    async def _run_pooled(self, run_session: _RunSession, *, request_id: str) -> None:
+        async with self._tts._pool.connection(timeout=self._conn_options.timeout) as ws:
+
+            async def _send_ws(pkt: dict[str, Any]) -> None:
+                await ws.send_str(json.dumps(pkt))
+
+            async def _recv_ws() -> dict[str, Any]:
+                while True:
+                    msg = await ws.receive(timeout=self._conn_options.timeout)
+                    if msg.type in (
+                        aiohttp.WSMsgType.CLOSED,
+                        aiohttp.WSMsgType.CLOSE,
+                        aiohttp.WSMsgType.CLOSING,
+                    ):
+                        raise APIStatusError(
+                            "Gateway connection closed unexpectedly", request_id=request_id
+                        )
+
+                    if msg.type == aiohttp.WSMsgType.PING:
+                        await ws.pong(msg.data)  # the pooled connections don't autoping
+                        continue
+
+                    if msg.type == aiohttp.WSMsgType.PONG:
+                        continue
+
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        logger.warning("unexpected Gateway message type %s", msg.type)
+                        continue
+
+                    data: dict[str, Any] = json.loads(msg.data)
+                    return data
+
+            await run_session(_send_ws, _recv_ws)
+
+    async def _run_multiplexed(self, run_session: _RunSession) -> None:
+        async with self._tts._multiplexer().context(timeout=self._conn_options.timeout) as ctx:
+            # the session is created again if the connection is lost before any audio is received
+            await ctx.send(_session_create_params(self._opts), replay=True)
+
+            async def _send_ctx(pkt: dict[str, Any]) -> None:
+                await ctx.send(pkt, replay=True)
+
+            async def _recv_ctx() -> dict[str, Any]:
+                data = await ctx.recv(timeout=self._conn_options.timeout)
+                if data.get("type") == "output_audio":
+                    ctx.stop_replay()
+                return data
+
+            try:
+                await run_session(_send_ctx, _recv_ctx)
+            finally:
+                with contextlib.suppress(APIConnectionError):
+                    await ctx.send({"type": "session.close"})
+
+
+def _session_create_params(opts: _TTSOptions) -> dict[str, Any]:
+    params: dict[str, Any] = {
+        "type": "session.create",
+        "sample_rate": str(opts.sample_rate),
+        "encoding": opts.encoding,
+        "extra": opts.extra_kwargs,
+    }
+
+    if opts.voice:
+        params["voice"] = opts.voice
+    if opts.model:
+        params["model"] = opts.model
+    if opts.language:
+        params["language"] = opts.language
+    return params
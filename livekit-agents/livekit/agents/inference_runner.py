@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import threading
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 from typing import ClassVar, Protocol
 
 
 class _RunnerMeta(Protocol):
     INFERENCE_METHOD: ClassVar[str]
+    SUPPORTS_BATCHING: ClassVar[bool]
+    BATCH_MAX_SIZE: ClassVar[int]
+    BATCH_WINDOW: ClassVar[float]
 
 
 _RunnersDict = dict[str, type["_InferenceRunner"]]
@@ -16,6 +20,13 @@ _RunnersDict = dict[str, type["_InferenceRunner"]]
 class _InferenceRunner(ABC, _RunnerMeta):
     registered_runners: _RunnersDict = {}
 
+    SUPPORTS_BATCHING: ClassVar[bool] = False
+    """When True, the inference process groups concurrent requests and calls `run_batch`"""
+    BATCH_MAX_SIZE: ClassVar[int] = 8
+    """Maximum number of requests grouped into a single `run_batch` call"""
+    BATCH_WINDOW: ClassVar[float] = 0.005
+    """Maximum time (in seconds) to hold a request while waiting for the batch to fill up"""
+
     @classmethod
     def register_runner(cls, runner_class: type[_InferenceRunner]) -> None:
         if threading.current_thread() != threading.main_thread():
@@ -35,3 +46,19 @@ class _InferenceRunner(ABC, _RunnerMeta):
     def run(self, data: bytes) -> bytes | None:
         """Run inference on the given data."""
         ...
+
+    def run_batch(self, data: list[bytes]) -> Sequence[bytes | None | Exception]:
+        """Run inference on several requests at once.
+
+        Only called when `SUPPORTS_BATCHING` is set. The returned list must have the same
+        length and order as `data`. A result can be an exception, it's returned as the error of
+        its request without failing the rest of the batch. The default implementation calls
+        `run` sequentially.
+        """
+        results: list[bytes | None | Exception] = []
+        for d in data:
+            try:
+                results.append(self.run(d))
+            except Exception as e:
+                results.append(e)
+        return results
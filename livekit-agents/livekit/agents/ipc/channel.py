@@ -1,11 +1,86 @@
 from __future__ import annotations
 
-import io
 import struct
-from typing import ClassVar, Protocol, cast, runtime_checkable
+import threading
+from typing import Any, ClassVar, Protocol, cast, runtime_checkable
 
 from .. import utils
 
+_FRAME_HEADER = struct.Struct("!I")
+_INT = struct.Struct("!I")
+_BOOL = struct.Struct("?")
+_FLOAT = struct.Struct("f")
+_DOUBLE = struct.Struct("d")
+_LONG = struct.Struct("!Q")
+
+# FrameWriter buffers bigger than this are released after a message instead of being reused
+_MAX_RETAINED_CAPACITY = 1 << 20
+
+
+class _Writable(Protocol):
+    def write(self, data: bytes, /) -> int: ...
+
+
+class _Readable(Protocol):
+    def read(self, size: int = -1, /) -> bytes: ...
+
+
+class FrameWriter:
+    """Serializes messages into a reusable buffer, prefixed by their length"""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._buf = bytearray(capacity)
+        self._pos = 0
+
+    def begin(self) -> None:
+        if len(self._buf) > _MAX_RETAINED_CAPACITY:
+            self._buf = bytearray(1024)
+
+        self._pos = _FRAME_HEADER.size
+
+    def end(self) -> memoryview:
+        """Write the length header and return a view of the frame.
+
+        The view must be released before the next call to `begin`."""
+        _FRAME_HEADER.pack_into(self._buf, 0, self._pos - _FRAME_HEADER.size)
+        return memoryview(self._buf)[: self._pos]
+
+    def write(self, data: bytes | bytearray | memoryview, /) -> int:
+        if isinstance(data, memoryview):
+            data = data.cast("B")
+
+        end = self._pos + len(data)
+        if end > len(self._buf):
+            self._buf.extend(bytes(max(end - len(self._buf), len(self._buf))))
+
+        self._buf[self._pos : end] = data
+        self._pos = end
+        return len(data)
+
+
+class FrameReader:
+    """Reads the fields of a received message without copying the frame"""
+
+    __slots__ = ("_view", "_pos")
+
+    def __init__(self, data: bytes | bytearray | memoryview) -> None:
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def read(self, size: int = -1, /) -> bytes:
+        return bytes(self.read_view(size))
+
+    def read_view(self, size: int = -1) -> memoryview:
+        end = len(self._view) if size < 0 else min(self._pos + size, len(self._view))
+        view = self._view[self._pos : end]
+        self._pos = end
+        return view
+
+    def unpack(self, st: struct.Struct) -> tuple[Any, ...]:
+        values = st.unpack_from(self._view, self._pos)
+        self._pos += st.size
+        return values
+
 
 class Message(Protocol):
     MSG_ID: ClassVar[int]
@@ -13,32 +88,53 @@ class Message(Protocol):
 
 @runtime_checkable
 class DataMessage(Message, Protocol):
-    def write(self, b: io.BytesIO) -> None: ...
+    def write(self, b: FrameWriter) -> None: ...
 
-    def read(self, b: io.BytesIO) -> None: ...
+    def read(self, b: FrameReader) -> None: ...
 
 
 MessagesDict = dict[int, type[Message]]
 
+_local = threading.local()
+
+# isinstance checks against runtime protocols are slow, only do them once per message type
+_data_message_types: dict[type[Message], bool] = {}
+
+
+def _is_data_message(msg: Message) -> bool:
+    is_data = _data_message_types.get(type(msg))
+    if is_data is None:
+        is_data = _data_message_types[type(msg)] = isinstance(msg, DataMessage)
+    return is_data
 
-def _read_message(data: bytes, messages: MessagesDict) -> Message:
-    bio = io.BytesIO(data)
-    msg_id = read_int(bio)
+
+def _frame_writer() -> FrameWriter:
+    # frames are handed to the duplex before the next message is written on this thread,
+    # so a single writer per thread can be reused
+    writer: FrameWriter | None = getattr(_local, "writer", None)
+    if writer is None:
+        writer = _local.writer = FrameWriter()
+    return writer
+
+
+def _read_message(data: bytes | bytearray | memoryview, messages: MessagesDict) -> Message:
+    reader = FrameReader(data)
+    msg_id = read_int(reader)
     msg = messages[msg_id]()
-    if isinstance(msg, DataMessage):
-        msg.read(bio)
+    if _is_data_message(msg):
+        cast(DataMessage, msg).read(reader)
 
     return msg
 
 
-def _write_message(msg: Message) -> bytes:
-    bio = io.BytesIO()
-    write_int(bio, msg.MSG_ID)
+def _write_message(writer: FrameWriter, msg: Message) -> memoryview:
+    writer.begin()
+    write_int(writer, msg.MSG_ID)
 
-    if isinstance(msg, DataMessage):
-        msg.write(bio)
+    if _is_data_message(msg):
+        cast(DataMessage, msg).write(writer)
 
-    return bio.getvalue()
+    return writer.end()
 
 
 async def arecv_message(
@@ -48,7 +144,10 @@ async def arecv_message(
 
 
 async def asend_message(dplx: utils.aio.duplex_unix._AsyncDuplex, msg: Message) -> None:
-    await dplx.send_bytes(_write_message(msg))
+    with _write_message(_frame_writer(), msg) as frame:
+        dplx.write_frame(frame)
+
+    await dplx.drain()
 
 
 def recv_message(dplx: utils.aio.duplex_unix._Duplex, messages: MessagesDict) -> Message:
@@ -56,65 +155,76 @@ def recv_message(dplx: utils.aio.duplex_unix._Duplex, messages: MessagesDict) ->
 
 
 def send_message(dplx: utils.aio.duplex_unix._Duplex, msg: Message) -> None:
-    dplx.send_bytes(_write_message(msg))
+    with _write_message(_frame_writer(), msg) as frame:
+        dplx.send_frame(frame)
 
 
-def write_bytes(b: io.BytesIO, buf: bytes) -> None:
+def _unpack(b: _Readable, st: struct.Struct) -> tuple[Any, ...]:
+    if isinstance(b, FrameReader):
+        return b.unpack(st)
+
+    return st.unpack(b.read(st.size))
+
+
+def write_bytes(b: _Writable, buf: bytes) -> None:
     b.write(len(buf).to_bytes(4, "big"))
     b.write(buf)
 
 
-def read_bytes(b: io.BytesIO) -> bytes:
-    length = int.from_bytes(b.read(4), "big")
+def read_bytes(b: _Readable) -> bytes:
+    length = read_int(b)
     return b.read(length)
 
 
-def write_string(b: io.BytesIO, s: str) -> None:
+def write_string(b: _Writable, s: str) -> None:
     encoded = s.encode("utf-8")
     b.write(len(encoded).to_bytes(4, "big"))
     b.write(encoded)
 
 
-def read_string(b: io.BytesIO) -> str:
-    length = int.from_bytes(b.read(4), "big")
+def read_string(b: _Readable) -> str:
+    length = read_int(b)
+    if isinstance(b, FrameReader):
+        return str(b.read_view(length), "utf-8")
+
     return b.read(length).decode("utf-8")
 
 
-def write_int(b: io.BytesIO, i: int) -> None:
+def write_int(b: _Writable, i: int) -> None:
     b.write(i.to_bytes(4, "big"))
 
 
-def read_int(b: io.BytesIO) -> int:
-    return int.from_bytes(b.read(4), "big")
+def read_int(b: _Readable) -> int:
+    return cast(int, _unpack(b, _INT)[0])
 
 
-def write_bool(b: io.BytesIO, bi: bool) -> None:
+def write_bool(b: _Writable, bi: bool) -> None:
     b.write(bi.to_bytes(1, "big"))
 
 
-def read_bool(b: io.BytesIO) -> bool:
-    return bool.from_bytes(b.read(1), "big")
+def read_bool(b: _Readable) -> bool:
+    return cast(bool, _unpack(b, _BOOL)[0])
 
 
-def write_float(b: io.BytesIO, f: float) -> None:
-    b.write(struct.pack("f", f))
+def write_float(b: _Writable, f: float) -> None:
+    b.write(_FLOAT.pack(f))
 
 
-def read_float(b: io.BytesIO) -> float:
-    return cast(float, struct.unpack("f", b.read(4))[0])
+def read_float(b: _Readable) -> float:
+    return cast(float, _unpack(b, _FLOAT)[0])
 
 
-def write_double(b: io.BytesIO, d: float) -> None:
-    b.write(struct.pack("d", d))
+def write_double(b: _Writable, d: float) -> None:
+    b.write(_DOUBLE.pack(d))
 
 
-def read_double(b: io.BytesIO) -> float:
-    return cast(float, struct.unpack("d", b.read(8))[0])
+def read_double(b: _Readable) -> float:
+    return cast(float, _unpack(b, _DOUBLE)[0])
 
 
-def write_long(b: io.BytesIO, long: int) -> None:
+def write_long(b: _Writable, long: int) -> None:
     b.write(long.to_bytes(8, "big"))
 
 
-def read_long(b: io.BytesIO) -> int:
-    return int.from_bytes(b.read(8), "big")
+def read_long(b: _Readable) -> int:
+    return cast(int, _unpack(b, _LONG)[0])
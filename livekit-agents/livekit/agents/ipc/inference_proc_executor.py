@@ -76,6 +76,15 @@ class InferenceProcExecutor(SupervisedProc):
                     fut.set_result(msg)
 
     async def do_inference(self, method: str, data: bytes) -> bytes | None:
+        inf_resp = await self.forward_inference(proto.InferenceRequest(method=method, data=data))
+        if inf_resp.error:
+            raise RuntimeError(f"inference of {method} failed: {inf_resp.error}")
+
+        return inf_resp.data
+
+    async def forward_inference(self, req: proto.InferenceRequest) -> proto.InferenceResponse:
+        """Send an InferenceRequest as-is (e.g. with its payload in a shared memory slot) and
+        return the raw response"""
         if not self.started:
             raise RuntimeError("process not started")
 
@@ -84,16 +93,17 @@ class InferenceProcExecutor(SupervisedProc):
 
         await channel.asend_message(
             self._pch,
-            proto.InferenceRequest(request_id=request_id, method=method, data=data),
+            proto.InferenceRequest(
+                request_id=request_id,
+                method=req.method,
+                data=req.data,
+                slab_slot=req.slab_slot,
+                slab_length=req.slab_length,
+            ),
         )
 
         self._active_requests[request_id] = fut
-
-        inf_resp = await fut
-        if inf_resp.error:
-            raise RuntimeError(f"inference of {method} failed: {inf_resp.error}")
-
-        return inf_resp.data
+        return await fut
 
     def logging_extra(self) -> dict[str, Any]:
         extra = super().logging_extra()
@@ -28,10 +28,10 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
-from ..inference_runner import _RunnersDict
+from ..inference_runner import _InferenceRunner, _RunnersDict
 from ..log import logger
 from ..utils import aio, hw, log_exceptions
-from . import proto
+from . import proto, slab
 from .channel import Message
 from .proc_client import _ProcClient
 
@@ -63,11 +63,119 @@ def proc_main(args: ProcStartArgs) -> None:
     client.run()
 
 
+def _inference_response(
+    msg: proto.InferenceRequest, data: bytes | None, slabs: slab.SlabAttachments | None
+) -> proto.InferenceResponse:
+    # reuse the shared memory slot of the request for big results
+    if (
+        slabs is not None
+        and msg.slab_slot is not None
+        and data is not None
+        and slab.MIN_PAYLOAD_SIZE <= len(data) <= msg.slab_slot.capacity
+    ):
+        slabs.write(msg.slab_slot, data)
+        return proto.InferenceResponse(
+            request_id=msg.request_id, in_slab=True, slab_length=len(data)
+        )
+
+    return proto.InferenceResponse(request_id=msg.request_id, data=data)
+
+
+class _BatchScheduler:
+    """Groups concurrent InferenceRequests of a batch-aware runner into a single `run_batch`.
+
+    A batch is flushed once `BATCH_MAX_SIZE` requests are pending, or `BATCH_WINDOW` seconds
+    after the first request of the batch was received, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        runner: _InferenceRunner,
+        *,
+        executor: ThreadPoolExecutor,
+        client: _ProcClient,
+        loop: asyncio.AbstractEventLoop,
+        slabs: slab.SlabAttachments | None = None,
+    ) -> None:
+        self._runner = runner
+        self._executor = executor
+        self._client = client
+        self._loop = loop
+        self._slabs = slabs
+        self._max_size = max(1, runner.BATCH_MAX_SIZE)
+        self._window = max(0.0, runner.BATCH_WINDOW)
+        self._pending: list[proto.InferenceRequest] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks = aio.TaskSet(loop=loop)
+
+    def push(self, msg: proto.InferenceRequest) -> None:
+        self._pending.append(msg)
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self._window, self._flush)
+
+    async def aclose(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        self._pending.clear()
+        await aio.cancel_and_wait(*self._tasks.tasks)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        self._tasks.create_task(self._run_batch(batch))
+
+    @log_exceptions(logger=logger)
+    async def _run_batch(self, batch: list[proto.InferenceRequest]) -> None:
+        try:
+            results = await self._loop.run_in_executor(
+                self._executor, self._runner.run_batch, [msg.data for msg in batch]
+            )
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"run_batch returned {len(results)} results for {len(batch)} requests"
+                )
+        except Exception as e:
+            logger.exception(
+                "error running batched inference",
+                extra={"runner": self._runner.INFERENCE_METHOD, "batch_size": len(batch)},
+            )
+            for msg in batch:
+                await self._client.send(
+                    proto.InferenceResponse(request_id=msg.request_id, error=str(e))
+                )
+            return
+
+        for msg, data in zip(batch, results):
+            if isinstance(data, Exception):
+                logger.error(
+                    "error running inference",
+                    exc_info=data,
+                    extra={"runner": self._runner.INFERENCE_METHOD},
+                )
+                await self._client.send(
+                    proto.InferenceResponse(request_id=msg.request_id, error=str(data))
+                )
+            else:
+                await self._client.send(_inference_response(msg, data, self._slabs))
+
+
 class _InferenceProc:
     def __init__(self, runners: _RunnersDict) -> None:
         # create an instance of each runner (the ctor must not requires any argument)
         self._runners = {name: runner() for name, runner in runners.items()}
         self._executor = ThreadPoolExecutor(max_workers=math.ceil(hw.get_cpu_monitor().cpu_count()))
+        self._schedulers: dict[str, _BatchScheduler] = {}
+        self._slabs = slab.SlabAttachments()
 
     def initialize(self, init_req: proto.InitializeRequest, client: _ProcClient) -> None:
         self._client = client
@@ -95,13 +203,41 @@ class _InferenceProc:
 
     @log_exceptions(logger=logger)
     async def entrypoint(self, cch: aio.ChanReceiver[Message]) -> None:
-        async for msg in cch:
-            if isinstance(msg, proto.InferenceRequest):
-                await self._handle_inference_request(msg)
+        loop = asyncio.get_running_loop()
+        for name, runner in self._runners.items():
+            if runner.SUPPORTS_BATCHING:
+                self._schedulers[name] = _BatchScheduler(
+                    runner,
+                    executor=self._executor,
+                    client=self._client,
+                    loop=loop,
+                    slabs=self._slabs,
+                )
+
+        try:
+            async for msg in cch:
+                if isinstance(msg, proto.InferenceRequest):
+                    if msg.slab_slot is not None:
+                        try:
+                            msg.data = self._slabs.read(msg.slab_slot, msg.slab_length)
+                        except Exception as e:
+                            logger.exception("failed to read the inference request payload")
+                            await self._client.send(
+                                proto.InferenceResponse(request_id=msg.request_id, error=str(e))
+                            )
+                            continue
 
-            if isinstance(msg, proto.ShutdownRequest):
-                await self._client.send(proto.Exiting(reason=msg.reason))
-                break
+                    if (scheduler := self._schedulers.get(msg.method)) is not None:
+                        scheduler.push(msg)
+                    else:
+                        await self._handle_inference_request(msg)
+
+                if isinstance(msg, proto.ShutdownRequest):
+                    await self._client.send(proto.Exiting(reason=msg.reason))
+                    break
+        finally:
+            await asyncio.gather(*(s.aclose() for s in self._schedulers.values()))
+            self._slabs.close()
 
     async def _handle_inference_request(self, msg: proto.InferenceRequest) -> None:
         loop = asyncio.get_running_loop()
@@ -113,12 +249,7 @@ class _InferenceProc:
             data = await loop.run_in_executor(
                 self._executor, self._runners[msg.method].run, msg.data
             )
-            await self._client.send(
-                proto.InferenceResponse(
-                    request_id=msg.request_id,
-                    data=data,
-                )
-            )
+            await self._client.send(_inference_response(msg, data, self._slabs))
 
         except Exception as e:
             logger.exception("error running inference")
@@ -11,8 +11,9 @@ from ..job import JobContext, JobProcess, RunningJobInfo
 from ..log import logger
 from ..telemetry import metrics
 from ..utils import aio, log_exceptions, shortuuid
-from . import channel, proto
+from . import channel, proto, slab
 from .inference_executor import InferenceExecutor
+from .inference_proc_executor import InferenceProcExecutor
 from .job_executor import JobStatus
 from .job_proc_lazy_main import ProcStartArgs, proc_main
 from .supervised_proc import SupervisedProc
@@ -35,6 +36,7 @@ class ProcJobExecutor(SupervisedProc):
         http_proxy: str | None,
         mp_ctx: BaseContext,
         loop: asyncio.AbstractEventLoop,
+        inference_shared_memory: bool = False,
     ) -> None:
         super().__init__(
             initialize_timeout=initialize_timeout,
@@ -55,6 +57,8 @@ class ProcJobExecutor(SupervisedProc):
         self._initialize_process_fnc = initialize_process_fnc
         self._job_entrypoint_fnc = job_entrypoint_fnc
         self._inference_executor = inference_executor
+        self._inference_shared_memory = inference_shared_memory
+        self._slab_name: str | None = None
         self._inference_tasks: list[asyncio.Task[None]] = []
         self._id = shortuuid("PCEXEC_")
 
@@ -82,12 +86,16 @@ class ProcJobExecutor(SupervisedProc):
         return self._running_job
 
     def _create_process(self, cch: socket.socket, log_cch: socket.socket) -> mp.Process:
+        if self._inference_shared_memory:
+            self._slab_name = slab.new_name()
+
         proc_args = ProcStartArgs(
             initialize_process_fnc=self._initialize_process_fnc,
             job_entrypoint_fnc=self._job_entrypoint_fnc,
             log_cch=log_cch,
             mp_cch=cch,
             user_arguments=self._user_args,
+            inference_slab_name=self._slab_name,
         )
 
         return self._mp_ctx.Process(  # type: ignore
@@ -108,6 +116,10 @@ class ProcJobExecutor(SupervisedProc):
         try:
             await super()._supervise_task()
         finally:
+            if self._slab_name is not None:
+                # the process doesn't unlink its segment when it's killed (e.g. memory limit)
+                slab.unlink(self._slab_name)
+
             if self._running_job:
                 metrics.job_ended()
                 self._job_status = JobStatus.SUCCESS if self.exitcode == 0 else JobStatus.FAILED
@@ -124,6 +136,16 @@ class ProcJobExecutor(SupervisedProc):
             return
 
         try:
+            if inf_req.slab_slot is not None:
+                if not isinstance(self._inference_executor, InferenceProcExecutor):
+                    raise RuntimeError("shared memory payloads require the inference process")
+
+                # the payload stays in shared memory, the inference process reads it directly
+                inf_resp = await self._inference_executor.forward_inference(inf_req)
+                inf_resp.request_id = inf_req.request_id
+                await channel.asend_message(self._pch, inf_resp)
+                return
+
             inf_res = await self._inference_executor.do_inference(inf_req.method, inf_req.data)
             await channel.asend_message(
                 self._pch,
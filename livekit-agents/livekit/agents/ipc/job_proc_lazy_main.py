@@ -32,10 +32,12 @@ from opentelemetry import trace
 from livekit import rtc
 
 from ..cli import cli
+from ..inference._utils import close_shared_multiplexers
 from ..job import JobContext, JobExecutorType, JobProcess, _JobContextVar
 from ..log import logger
 from ..telemetry import trace_types, tracer
 from ..utils import aio, http_context, log_exceptions, shortuuid
+from . import slab
 from .channel import Message
 from .inference_executor import InferenceExecutor
 from .proc_client import _ProcClient
@@ -56,16 +58,25 @@ class ProcStartArgs:
     mp_cch: socket.socket
     log_cch: socket.socket
     user_arguments: Any | None = None
+    inference_slab_name: str | None = None
 
 
 def proc_main(args: ProcStartArgs) -> None:
+    import signal
+
     from .proc_client import _ProcClient
 
+    # when preloaded by the forkserver, this module was imported before the process was named
+    # "job_proc", so the signals must also be ignored here
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
     job_proc = _JobProc(
         args.initialize_process_fnc,
         args.job_entrypoint_fnc,
         JobExecutorType.PROCESS,
         args.user_arguments,
+        inference_slab_name=args.inference_slab_name,
     )
 
     client = _ProcClient(
@@ -84,25 +95,45 @@ def proc_main(args: ProcStartArgs) -> None:
 
 
 class _InfClient(InferenceExecutor):
-    def __init__(self, proc_client: _ProcClient) -> None:
+    def __init__(self, proc_client: _ProcClient, *, slabs: slab.SlabPool | None = None) -> None:
         self._client = proc_client
+        self._slabs = slabs
         self._active_requests: dict[str, asyncio.Future[InferenceResponse]] = {}
+        self._active_slots: dict[str, slab.SlabSlot] = {}
 
     async def do_inference(self, method: str, data: bytes) -> bytes | None:
         request_id = shortuuid("inference_job_")
         fut = asyncio.Future[InferenceResponse]()
+        req = InferenceRequest(request_id=request_id, method=method, data=data)
 
-        await self._client.send(
-            InferenceRequest(request_id=request_id, method=method, data=data),
-        )
+        if self._slabs is not None and len(data) >= slab.MIN_PAYLOAD_SIZE:
+            # fallback to inline bytes when the pool is exhausted
+            if (slot := self._slabs.acquire(len(data))) is not None:
+                self._slabs.write(slot, data)
+                req.data, req.slab_slot, req.slab_length = b"", slot, len(data)
+                self._active_slots[request_id] = slot
 
         self._active_requests[request_id] = fut
+        try:
+            await self._client.send(req)
+        except BaseException:
+            self._active_requests.pop(request_id, None)
+            self._release_slot(request_id)
+            raise
 
+        # if cancelled, the slot is released when the response is received
         inf_resp = await fut
-        if inf_resp.error:
-            raise RuntimeError(f"inference of {method} failed: {inf_resp.error}")
+        try:
+            if inf_resp.error:
+                raise RuntimeError(f"inference of {method} failed: {inf_resp.error}")
 
-        return inf_resp.data
+            if inf_resp.in_slab:
+                assert self._slabs is not None and req.slab_slot is not None
+                return self._slabs.read(req.slab_slot, inf_resp.slab_length)
+
+            return inf_resp.data
+        finally:
+            self._release_slot(request_id)
 
     def _on_inference_response(self, resp: InferenceResponse) -> None:
         fut = self._active_requests.pop(resp.request_id, None)
@@ -110,8 +141,22 @@ class _InfClient(InferenceExecutor):
             logger.warning("received unexpected inference response", extra={"resp": resp})
             return
 
-        with contextlib.suppress(asyncio.InvalidStateError):
-            fut.set_result(resp)
+        if fut.done():
+            # the request was cancelled, nothing will read the slot anymore
+            self._release_slot(resp.request_id)
+            return
+
+        fut.set_result(resp)
+
+    def _release_slot(self, request_id: str) -> None:
+        if (slot := self._active_slots.pop(request_id, None)) is not None:
+            assert self._slabs is not None
+            self._slabs.release(slot)
+
+    def close(self) -> None:
+        if self._slabs is not None:
+            self._slabs.close()
+            self._slabs = None
 
 
 @dataclass
@@ -127,8 +172,11 @@ class _JobProc:
         job_entrypoint_fnc: Callable[[JobContext], Any],
         executor_type: JobExecutorType,
         user_arguments: Any | None = None,
+        *,
+        inference_slab_name: str | None = None,
     ) -> None:
         self._executor_type = executor_type
+        self._inference_slab_name = inference_slab_name
         self._user_arguments = user_arguments
         self._initialize_process_fnc = initialize_process_fnc
         self._job_entrypoint_fnc = job_entrypoint_fnc
@@ -144,7 +192,16 @@ class _JobProc:
 
     def initialize(self, init_req: InitializeRequest, client: _ProcClient) -> None:
         self._client = client
-        self._inf_client = _InfClient(client)
+        slabs: slab.SlabPool | None = None
+        if self._inference_slab_name is not None:
+            try:
+                slabs = slab.SlabPool(name=self._inference_slab_name)
+            except OSError:
+                logger.warning(
+                    "failed to allocate shared memory for inference, using inline payloads",
+                    exc_info=True,
+                )
+        self._inf_client = _InfClient(client, slabs=slabs)
         self._job_proc = JobProcess(
             executor_type=self._executor_type,
             user_arguments=self._user_arguments,
@@ -183,6 +240,7 @@ class _JobProc:
 
         await self._exit_proc_flag.wait()
         await aio.cancel_and_wait(read_task)
+        self._inf_client.close()
 
     def _start_job(self, msg: StartJobRequest) -> None:
         if cli.CLI_ARGUMENTS is not None and cli.CLI_ARGUMENTS.console:
@@ -299,6 +357,7 @@ class _JobProc:
         except Exception:
             logger.exception("error while shutting down the job")
 
+        await close_shared_multiplexers()
         await http_context._close_http_ctx()
         _JobContextVar.reset(job_ctx_token)
 
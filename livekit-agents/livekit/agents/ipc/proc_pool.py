@@ -2,17 +2,24 @@ from __future__ import annotations
 
 import asyncio
 import math
+import time
 from collections.abc import Awaitable
+from dataclasses import dataclass
 from multiprocessing.context import BaseContext
 from typing import Any, Callable, Literal
 
+import psutil
+
 from .. import utils
 from ..job import JobContext, JobExecutorType, JobProcess, RunningJobInfo
 from ..log import logger
+from ..telemetry import metrics
 from ..utils import aio
 from ..utils.hw.cpu import get_cpu_monitor
 from . import inference_executor, job_proc_executor, job_thread_executor
 from .job_executor import JobExecutor
+from .scaling import ScalingPolicy, StaticScalingPolicy
+from .supervised_proc import SupervisedProc
 
 EventTypes = Literal[
     "process_created",
@@ -22,7 +29,24 @@ EventTypes = Literal[
     "process_job_launched",
 ]
 
+
+@dataclass
+class ProcStartupTimings:
+    """Startup timings of a process, emitted with the "process_ready" event"""
+
+    start_time: float
+    """Time to create the process (spawn or fork from the forkserver), in seconds"""
+    initialize_time: float
+    """Time for the process to initialize (imports and initialize_process_fnc), in seconds"""
+
+    @property
+    def total_time(self) -> float:
+        return self.start_time + self.initialize_time
+
+
 MAX_CONCURRENT_INITIALIZATIONS = min(math.ceil(get_cpu_monitor().cpu_count()), 4)
+# minimum delay between two idle processes closed because the scaling policy lowered its target
+SHRINK_INTERVAL = 10.0
 
 
 class ProcPool(utils.EventEmitter[EventTypes]):
@@ -41,6 +65,8 @@ class ProcPool(utils.EventEmitter[EventTypes]):
         memory_limit_mb: float,
         http_proxy: str | None,
         loop: asyncio.AbstractEventLoop,
+        inference_shared_memory: bool = False,
+        scaling_policy: ScalingPolicy | None = None,
     ) -> None:
         super().__init__()
         self._job_executor_type = job_executor_type
@@ -53,15 +79,19 @@ class ProcPool(utils.EventEmitter[EventTypes]):
         self._loop = loop
         self._memory_limit_mb = memory_limit_mb
         self._memory_warn_mb = memory_warn_mb
-        self._default_num_idle_processes = num_idle_processes
         self._http_proxy = http_proxy
-        self._target_idle_processes = num_idle_processes
+        self._inference_shared_memory = inference_shared_memory
+        self._scaling_policy = scaling_policy or StaticScalingPolicy(num_idle_processes)
+        self._target_idle_processes = self._scaling_policy.max_idle_processes
+        self._initial_idle_processes = 0
+        self._last_shrink = 0.0
 
         self._init_sem = asyncio.Semaphore(MAX_CONCURRENT_INITIALIZATIONS)
         self._warmed_proc_queue = asyncio.Queue[JobExecutor]()
         self._executors: list[JobExecutor] = []
         self._spawn_tasks: set[asyncio.Task[None]] = set()
         self._monitor_tasks: set[asyncio.Task[None]] = set()
+        self._close_tasks: set[asyncio.Task[None]] = set()
         self._started = False
         self._closed = False
 
@@ -83,9 +113,10 @@ class ProcPool(utils.EventEmitter[EventTypes]):
             return
 
         self._started = True
+        self._initial_idle_processes = self._scaling_policy.target_idle_processes()
         self._main_atask = asyncio.create_task(self._main_task())
 
-        if self._default_num_idle_processes > 0:
+        if self._initial_idle_processes > 0:
             # wait for the idle processes to be warmed up (by the main task)
             await self._idle_ready.wait()
 
@@ -97,6 +128,10 @@ class ProcPool(utils.EventEmitter[EventTypes]):
         await aio.cancel_and_wait(self._main_atask)
 
     async def launch_job(self, info: RunningJobInfo) -> None:
+        warm_hit = not self._warmed_proc_queue.empty()
+        self._scaling_policy.on_job_requested(warm=warm_hit)
+        metrics.proc_pool_job_launched(warm_hit=warm_hit)
+
         self._jobs_waiting_for_process += 1
         if (
             self._warmed_proc_queue.empty()
@@ -120,6 +155,11 @@ class ProcPool(utils.EventEmitter[EventTypes]):
     def target_idle_processes(self) -> int:
         return self._target_idle_processes
 
+    @property
+    def max_idle_processes(self) -> int:
+        """Maximum number of idle processes the scaling policy may ask for"""
+        return self._scaling_policy.max_idle_processes
+
     @utils.log_exceptions(logger=logger)
     async def _proc_spawn_task(self) -> None:
         proc: JobExecutor
@@ -150,6 +190,7 @@ class ProcPool(utils.EventEmitter[EventTypes]):
                 memory_warn_mb=self._memory_warn_mb,
                 memory_limit_mb=self._memory_limit_mb,
                 http_proxy=self._http_proxy,
+                inference_shared_memory=self._inference_shared_memory,
             )
         else:
             raise ValueError(f"unsupported job executor: {self._job_executor_type}")
@@ -161,16 +202,27 @@ class ProcPool(utils.EventEmitter[EventTypes]):
                 return
 
             self.emit("process_created", proc)
+            start_time = time.perf_counter()
             await proc.start()
+            started_time = time.perf_counter()
             self.emit("process_started", proc)
             try:
                 await proc.initialize()
                 # process where initialization times out will never fire "process_ready"
                 # neither be used to launch jobs
 
-                self.emit("process_ready", proc)
+                timings = ProcStartupTimings(
+                    start_time=started_time - start_time,
+                    initialize_time=time.perf_counter() - started_time,
+                )
+                metrics.proc_spawned(time_elapsed=timings.total_time)
+                self._scaling_policy.on_process_ready(
+                    spawn_time=timings.total_time, memory_mb=_process_memory_mb(proc)
+                )
+
+                self.emit("process_ready", proc, timings)
                 self._warmed_proc_queue.put_nowait(proc)
-                if self._warmed_proc_queue.qsize() >= self._default_num_idle_processes:
+                if self._warmed_proc_queue.qsize() >= self._initial_idle_processes:
                     self._idle_ready.set()
             except Exception:
                 logger.exception("error initializing process", extra=proc.logging_extra())
@@ -189,21 +241,52 @@ class ProcPool(utils.EventEmitter[EventTypes]):
 
     @utils.log_exceptions(logger=logger)
     async def _main_task(self) -> None:
+        last_target: int | None = None
         try:
             while not self._closed:
+                policy_target = self._scaling_policy.target_idle_processes()
+                # the worker lowers _target_idle_processes when it is under load
+                target = min(self._target_idle_processes, policy_target)
+                if target != last_target:
+                    metrics.proc_pool_target_updated(target)
+                    last_target = target
+
                 current_pending = self._warmed_proc_queue.qsize() + len(self._spawn_tasks)
-                to_spawn = (
-                    min(self._target_idle_processes, self._default_num_idle_processes)
-                    - current_pending
-                )
+                to_spawn = target - current_pending
 
                 for _ in range(to_spawn):
                     task = asyncio.create_task(self._proc_spawn_task())
                     self._spawn_tasks.add(task)
                     task.add_done_callback(self._spawn_tasks.discard)
 
+                if (
+                    self._warmed_proc_queue.qsize() > policy_target
+                    and self._jobs_waiting_for_process == 0
+                    and time.monotonic() - self._last_shrink > SHRINK_INTERVAL
+                ):
+                    self._last_shrink = time.monotonic()
+                    self._close_idle_process()
+
                 await asyncio.sleep(0.1)
         except asyncio.CancelledError:
             await asyncio.gather(*[proc.aclose() for proc in self._executors])
             await asyncio.gather(*self._spawn_tasks)
+            await asyncio.gather(*self._close_tasks)
             await asyncio.gather(*self._monitor_tasks)
+
+    def _close_idle_process(self) -> None:
+        proc = self._warmed_proc_queue.get_nowait()
+        logger.debug("closing idle process", extra=proc.logging_extra())
+        task = asyncio.create_task(proc.aclose())
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
+
+
+def _process_memory_mb(proc: JobExecutor) -> float | None:
+    if not isinstance(proc, SupervisedProc) or proc.pid is None:
+        return None
+
+    try:
+        return psutil.Process(proc.pid).memory_info().rss / (1024 * 1024)
+    except psutil.Error:
+        return None
@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-import io
 from dataclasses import dataclass, field
 from typing import ClassVar
 
 from livekit.protocol import agent
 
 from ..job import JobAcceptArguments, RunningJobInfo
-from . import channel
+from . import channel, slab
 
 
 @dataclass
@@ -23,14 +22,14 @@ class InitializeRequest:
     high_ping_threshold: float = 0
     http_proxy: str = ""  # empty = None
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         channel.write_bool(b, self.asyncio_debug)
         channel.write_float(b, self.ping_interval)
         channel.write_float(b, self.ping_timeout)
         channel.write_float(b, self.high_ping_threshold)
         channel.write_string(b, self.http_proxy)
 
-    def read(self, b: io.BytesIO) -> None:
+    def read(self, b: channel.FrameReader) -> None:
         self.asyncio_debug = channel.read_bool(b)
         self.ping_interval = channel.read_float(b)
         self.ping_timeout = channel.read_float(b)
@@ -45,10 +44,10 @@ class InitializeResponse:
     MSG_ID: ClassVar[int] = 1
     error: str = ""
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         channel.write_string(b, self.error)
 
-    def read(self, b: io.BytesIO) -> None:
+    def read(self, b: channel.FrameReader) -> None:
         self.error = channel.read_string(b)
 
 
@@ -59,10 +58,10 @@ class PingRequest:
     MSG_ID: ClassVar[int] = 2
     timestamp: int = 0
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         channel.write_long(b, self.timestamp)
 
-    def read(self, b: io.BytesIO) -> None:
+    def read(self, b: channel.FrameReader) -> None:
         self.timestamp = channel.read_long(b)
 
 
@@ -74,11 +73,11 @@ class PongResponse:
     last_timestamp: int = 0
     timestamp: int = 0
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         channel.write_long(b, self.last_timestamp)
         channel.write_long(b, self.timestamp)
 
-    def read(self, b: io.BytesIO) -> None:
+    def read(self, b: channel.FrameReader) -> None:
         self.last_timestamp = channel.read_long(b)
         self.timestamp = channel.read_long(b)
 
@@ -91,7 +90,7 @@ class StartJobRequest:
     MSG_ID: ClassVar[int] = 4
     running_job: RunningJobInfo = field(init=False)
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         accept_args = self.running_job.accept_arguments
         channel.write_bytes(b, self.running_job.job.SerializeToString())
         channel.write_string(b, accept_args.name)
@@ -101,7 +100,7 @@ class StartJobRequest:
         channel.write_string(b, self.running_job.token)
         channel.write_string(b, self.running_job.worker_id)
 
-    def read(self, b: io.BytesIO) -> None:
+    def read(self, b: channel.FrameReader) -> None:
         job = agent.Job()
         job.ParseFromString(channel.read_bytes(b))
         self.running_job = RunningJobInfo(
@@ -125,10 +124,10 @@ class ShutdownRequest:
     MSG_ID: ClassVar[int] = 5
     reason: str = ""
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         channel.write_string(b, self.reason)
 
-    def read(self, b: io.BytesIO) -> None:
+    def read(self, b: channel.FrameReader) -> None:
         self.reason = channel.read_string(b)
 
 
@@ -139,10 +138,10 @@ class Exiting:
     MSG_ID: ClassVar[int] = 6
     reason: str = ""
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         channel.write_string(b, self.reason)
 
-    def read(self, b: io.BytesIO) -> None:
+    def read(self, b: channel.FrameReader) -> None:
         self.reason = channel.read_string(b)
 
 
@@ -154,16 +153,32 @@ class InferenceRequest:
     method: str = ""
     request_id: str = ""
     data: bytes = b""
+    # when set, the payload isn't inlined in data but stored in a shared memory slot
+    slab_slot: slab.SlabSlot | None = None
+    slab_length: int = 0
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         channel.write_string(b, self.method)
         channel.write_string(b, self.request_id)
         channel.write_bytes(b, self.data)
-
-    def read(self, b: io.BytesIO) -> None:
+        channel.write_bool(b, self.slab_slot is not None)
+        if self.slab_slot is not None:
+            channel.write_string(b, self.slab_slot.name)
+            channel.write_int(b, self.slab_slot.offset)
+            channel.write_int(b, self.slab_slot.capacity)
+            channel.write_int(b, self.slab_length)
+
+    def read(self, b: channel.FrameReader) -> None:
         self.method = channel.read_string(b)
         self.request_id = channel.read_string(b)
         self.data = channel.read_bytes(b)
+        if channel.read_bool(b):
+            self.slab_slot = slab.SlabSlot(
+                name=channel.read_string(b),
+                offset=channel.read_int(b),
+                capacity=channel.read_int(b),
+            )
+            self.slab_length = channel.read_int(b)
 
 
 @dataclass
@@ -174,20 +189,29 @@ class InferenceResponse:
     request_id: str = ""
     data: bytes | None = None
     error: str = ""
+    # the result was written in the shared memory slot of the request instead of data
+    in_slab: bool = False
+    slab_length: int = 0
 
-    def write(self, b: io.BytesIO) -> None:
+    def write(self, b: channel.FrameWriter) -> None:
         channel.write_string(b, self.request_id)
         channel.write_bool(b, self.data is not None)
         if self.data is not None:
             channel.write_bytes(b, self.data)
         channel.write_string(b, self.error)
+        channel.write_bool(b, self.in_slab)
+        if self.in_slab:
+            channel.write_int(b, self.slab_length)
 
-    def read(self, b: io.BytesIO) -> None:
+    def read(self, b: channel.FrameReader) -> None:
         self.request_id = channel.read_string(b)
         has_data = channel.read_bool(b)
         if has_data:
             self.data = channel.read_bytes(b)
         self.error = channel.read_string(b)
+        self.in_slab = channel.read_bool(b)
+        if self.in_slab:
+            self.slab_length = channel.read_int(b)
 
 
 IPC_MESSAGES = {
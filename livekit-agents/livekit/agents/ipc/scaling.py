@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import math
+import statistics
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+from ..utils import hw
+
+# used until the spawn time of a process has been observed
+_DEFAULT_SPAWN_TIME = 2.0
+_DEFAULT_PROCESS_MEMORY_MB = 500.0
+
+
+class ScalingPolicy(ABC):
+    """Decides how many idle (warm) processes the ProcPool keeps ready for the next jobs"""
+
+    @property
+    @abstractmethod
+    def max_idle_processes(self) -> int:
+        """Upper bound of target_idle_processes, used to cap the pool with the worker load"""
+        pass
+
+    @abstractmethod
+    def target_idle_processes(self) -> int:
+        """Number of idle processes the pool should currently keep"""
+        pass
+
+    def on_job_requested(self, *, warm: bool) -> None:  # noqa: B027
+        """Called when a job is launched, warm is False when it had to wait for a cold spawn"""
+        pass
+
+    def on_process_ready(self, *, spawn_time: float, memory_mb: float | None) -> None:  # noqa: B027
+        """Called when a new process is initialized and ready to accept a job"""
+        pass
+
+
+class StaticScalingPolicy(ScalingPolicy):
+    """Always keep the same number of idle processes"""
+
+    def __init__(self, num_idle_processes: int) -> None:
+        self._num_idle_processes = num_idle_processes
+
+    @property
+    def max_idle_processes(self) -> int:
+        return self._num_idle_processes
+
+    def target_idle_processes(self) -> int:
+        return self._num_idle_processes
+
+
+class PredictiveScalingPolicy(ScalingPolicy):
+    """Size the warm pool from the job arrival rate and the time it takes to spawn a process.
+
+    Jobs are assumed to arrive as a Poisson process, the pool keeps enough idle processes so the
+    jobs arriving while a new process is being initialized find a warm process with a probability
+    of at least `target_hit_probability`. The arrival rate is the maximum of an EWMA of the
+    arrivals and of the recent peak rate (weighted by `peak_weight`).
+
+    The number of idle processes is bounded by `max_idle_per_cpu` and by the fraction
+    `memory_budget` of the memory of the host (or container) they may use.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_idle_processes: int = 1,
+        max_idle_processes: int | None = None,
+        target_hit_probability: float = 0.95,
+        rate_half_life: float = 60.0,
+        peak_window: float = 300.0,
+        peak_bucket: float = 10.0,
+        peak_weight: float = 0.5,
+        max_idle_per_cpu: float = 1.0,
+        memory_budget: float = 0.25,
+    ) -> None:
+        if not 0.0 < target_hit_probability < 1.0:
+            raise ValueError("target_hit_probability must be between 0 and 1")
+
+        self._min_idle = min_idle_processes
+        self._max_idle = max_idle_processes
+        self._hit_probability = target_hit_probability
+        self._tau = rate_half_life / math.log(2)
+        self._peak_window = peak_window
+        self._peak_bucket = peak_bucket
+        self._peak_weight = peak_weight
+        self._max_idle_per_cpu = max_idle_per_cpu
+        self._memory_budget = memory_budget
+
+        self._ewma_rate = 0.0
+        self._last_arrival: float | None = None
+        self._buckets: deque[list[float]] = deque()  # [bucket start, count]
+        self._spawn_time: float | None = None
+        self._process_memory_mb: float | None = None
+        self._cpu_count = hw.get_cpu_monitor().cpu_count()
+        self._memory_total_mb = hw.get_memory_monitor().memory_total() / (1024 * 1024)
+
+    @property
+    def max_idle_processes(self) -> int:
+        cpu_cap = max(1, math.floor(self._cpu_count * self._max_idle_per_cpu))
+        if self._max_idle is not None:
+            return max(self._min_idle, min(self._max_idle, cpu_cap))
+        return max(self._min_idle, cpu_cap)
+
+    def arrival_rate(self, now: float | None = None) -> float:
+        """Estimated job arrival rate in jobs per second"""
+        now = time.monotonic() if now is None else now
+        ewma = 0.0
+        if self._last_arrival is not None:
+            ewma = self._ewma_rate * math.exp(-(now - self._last_arrival) / self._tau)
+
+        self._expire_buckets(now)
+        peak = max((count for _, count in self._buckets), default=0.0) / self._peak_bucket
+        return max(ewma, peak * self._peak_weight)
+
+    def target_idle_processes(self) -> int:
+        spawn_time = self._spawn_time or _DEFAULT_SPAWN_TIME
+        target = _poisson_quantile(self.arrival_rate() * spawn_time, self._hit_probability)
+        target = min(target, self.max_idle_processes, self._memory_cap())
+        return max(target, self._min_idle)
+
+    def on_job_requested(self, *, warm: bool) -> None:
+        now = time.monotonic()
+        if self._last_arrival is not None:
+            self._ewma_rate *= math.exp(-(now - self._last_arrival) / self._tau)
+        self._ewma_rate += 1.0 / self._tau
+        self._last_arrival = now
+
+        if not self._buckets or now - self._buckets[-1][0] >= self._peak_bucket:
+            self._buckets.append([now, 0.0])
+        self._buckets[-1][1] += 1.0
+
+    def on_process_ready(self, *, spawn_time: float, memory_mb: float | None) -> None:
+        # spawn times are noisy (concurrent initializations), smooth them
+        if self._spawn_time is None:
+            self._spawn_time = spawn_time
+        else:
+            self._spawn_time = 0.7 * self._spawn_time + 0.3 * spawn_time
+
+        if memory_mb is not None:
+            if self._process_memory_mb is None:
+                self._process_memory_mb = memory_mb
+            else:
+                self._process_memory_mb = 0.7 * self._process_memory_mb + 0.3 * memory_mb
+
+    def _memory_cap(self) -> int:
+        process_mb = self._process_memory_mb or _DEFAULT_PROCESS_MEMORY_MB
+        return math.floor(self._memory_total_mb * self._memory_budget / process_mb)
+
+    def _expire_buckets(self, now: float) -> None:
+        while self._buckets and now - self._buckets[0][0] > self._peak_window:
+            self._buckets.popleft()
+
+
+def _poisson_quantile(mean: float, p: float) -> int:
+    """Smallest n such that P(X <= n) >= p for X ~ Poisson(mean)"""
+    if mean <= 0.0:
+        return 0
+
+    if mean > 50.0:
+        # normal approximation, exp(-mean) underflows for big means
+        return math.ceil(mean + statistics.NormalDist().inv_cdf(p) * math.sqrt(mean))
+
+    n = 0
+    term = math.exp(-mean)
+    cdf = term
+    while cdf < p:
+        n += 1
+        term *= mean / n
+        cdf += term
+    return n
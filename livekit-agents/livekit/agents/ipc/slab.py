@@ -0,0 +1,152 @@
+"""Shared memory slots used to pass large inference payloads between processes.
+
+A job process owns a `SlabPool` (a single shared memory segment split into fixed-size slots).
+The payload of an inference request is written into a free slot and the request only carries
+the location of the slot. The inference process reads the payload from the slot and writes the
+result back into the same slot, the slot is released once the job received the response.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import cast
+
+from ..log import logger
+
+SLOT_SIZE = 64 * 1024
+NUM_SLOTS = 16
+# smaller payloads are cheaper to send inline through the socket
+MIN_PAYLOAD_SIZE = 4 * 1024
+
+# attached segments that weren't used for this duration are closed (the job process likely exited)
+_ATTACHMENT_IDLE_TIMEOUT = 60.0
+
+
+@dataclass(frozen=True)
+class SlabSlot:
+    name: str
+    offset: int
+    capacity: int
+
+
+def new_name() -> str:
+    """A name for the segment of a SlabPool, short enough for macOS (31 characters)"""
+    return f"lk_slab_{secrets.token_hex(6)}"
+
+
+def unlink(name: str) -> None:
+    """Remove the segment of a SlabPool whose process exited without closing it (e.g. killed)"""
+    try:
+        shm = _open_segment(name)
+    except FileNotFoundError:
+        return  # already unlinked by its process
+
+    shm.close()
+    _unlink_segment(shm)
+
+
+def _open_segment(name: str, *, size: int = 0) -> shared_memory.SharedMemory:
+    """Create (when `size` is given) or attach a segment not tracked by the resource tracker.
+
+    The resource tracker is shared by the processes of the worker, it would unlink the segment
+    when any of them exits. Its lifetime is managed explicitly instead: the job process unlinks
+    its pool when closing it, and the job executor when the process exited without doing so.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=size > 0, size=size, track=False)
+
+    shm = shared_memory.SharedMemory(name=name, create=size > 0, size=size)
+    if os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return shm
+
+
+def _unlink_segment(shm: shared_memory.SharedMemory) -> None:
+    if sys.version_info < (3, 13) and os.name == "posix":
+        # unlink() unregisters the segment, which must be registered
+        resource_tracker.register(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    shm.unlink()
+
+
+class SlabPool:
+    def __init__(
+        self,
+        *,
+        name: str | None = None,
+        slot_size: int = SLOT_SIZE,
+        num_slots: int = NUM_SLOTS,
+    ) -> None:
+        self._slot_size = slot_size
+        self._shm = _open_segment(name or new_name(), size=slot_size * num_slots)
+        self._buf = cast(memoryview, self._shm.buf)
+        self._free = [i * slot_size for i in reversed(range(num_slots))]
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def acquire(self, size: int) -> SlabSlot | None:
+        """Reserve a slot for a payload of `size` bytes, None if the pool is exhausted or the
+        payload doesn't fit in a slot (it must then be sent inline)"""
+        if size > self._slot_size or not self._free:
+            return None
+
+        return SlabSlot(name=self._shm.name, offset=self._free.pop(), capacity=self._slot_size)
+
+    def release(self, slot: SlabSlot) -> None:
+        self._free.append(slot.offset)
+
+    def write(self, slot: SlabSlot, data: bytes) -> None:
+        self._buf[slot.offset : slot.offset + len(data)] = data
+
+    def read(self, slot: SlabSlot, length: int) -> bytes:
+        return bytes(self._buf[slot.offset : slot.offset + length])
+
+    def close(self) -> None:
+        self._shm.close()
+        _unlink_segment(self._shm)
+
+
+class SlabAttachments:
+    """Segments of the SlabPools of other processes, attached on first use"""
+
+    def __init__(self) -> None:
+        self._segments: dict[str, tuple[shared_memory.SharedMemory, float]] = {}
+        self._last_sweep = time.monotonic()
+
+    def read(self, slot: SlabSlot, length: int) -> bytes:
+        buf = self._attach(slot.name)
+        return bytes(buf[slot.offset : slot.offset + length])
+
+    def write(self, slot: SlabSlot, data: bytes) -> None:
+        buf = self._attach(slot.name)
+        buf[slot.offset : slot.offset + len(data)] = data
+
+    def close(self) -> None:
+        for shm, _ in self._segments.values():
+            shm.close()
+
+        self._segments.clear()
+
+    def _attach(self, name: str) -> memoryview:
+        now = time.monotonic()
+        if now - self._last_sweep > _ATTACHMENT_IDLE_TIMEOUT:
+            self._last_sweep = now
+            for seg_name, (shm, last_used) in list(self._segments.items()):
+                if now - last_used > _ATTACHMENT_IDLE_TIMEOUT:
+                    logger.debug("closing idle shared memory segment", extra={"name": seg_name})
+                    shm.close()
+                    del self._segments[seg_name]
+
+        if (entry := self._segments.get(name)) is not None:
+            shm = entry[0]
+        else:
+            shm = _open_segment(name)
+
+        self._segments[name] = (shm, now)
+        return cast(memoryview, shm.buf)
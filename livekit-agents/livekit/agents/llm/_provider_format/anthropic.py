@@ -7,7 +7,7 @@ from typing import Any
 
 from livekit.agents import llm
 
-from .utils import group_tool_calls
+from .utils import _ChatItemGroup, convert_groups
 
 
 @dataclass
@@ -23,35 +23,54 @@ def to_chat_ctx(
     current_role: str | None = None
     content: list[dict[str, Any]] = []
 
-    chat_items: list[llm.ChatItem] = []
-    for group in group_tool_calls(chat_ctx):
-        chat_items.extend(group.flatten())
+    for group_entries in convert_groups(chat_ctx, "anthropic", _group_to_entries):
+        for role, parts in group_entries:
+            if role == "system":
+                system_messages.append(parts)
+                continue
 
-    for msg in chat_items:
+            if role != current_role:
+                if current_role is not None and content:
+                    messages.append({"role": current_role, "content": content})
+                content = []
+                current_role = role
+
+            content.extend([part.copy() for part in parts])
+
+    if current_role is not None and content:
+        messages.append({"role": current_role, "content": content})
+
+    # ensure the messages starts with a "user" message
+    if inject_dummy_user_message and (not messages or messages[0]["role"] != "user"):
+        messages.insert(
+            0,
+            {
+                "role": "user",
+                "content": [{"text": "(empty)", "type": "text"}],
+            },
+        )
+
+    return messages, AnthropicFormatData(system_messages=system_messages)
+
+
+def _group_to_entries(group: _ChatItemGroup) -> list[tuple[str, Any]]:
+    """(role, content blocks) of each item of the group, ("system", text) for the instructions"""
+    entries: list[tuple[str, Any]] = []
+    for msg in group.flatten():
         if msg.type == "message" and msg.role == "system" and (text := msg.text_content):
-            system_messages.append(text)
+            entries.append(("system", text))
             continue
 
+        content: list[dict[str, Any]] = []
         if msg.type == "message":
             role = "assistant" if msg.role == "assistant" else "user"
-        elif msg.type == "function_call":
-            role = "assistant"
-        elif msg.type == "function_call_output":
-            role = "user"
-
-        if role != current_role:
-            if current_role is not None and content:
-                messages.append({"role": current_role, "content": content})
-            content = []
-            current_role = role
-
-        if msg.type == "message":
             for c in msg.content:
                 if c and isinstance(c, str):
                     content.append({"text": c, "type": "text"})
                 elif isinstance(c, llm.ImageContent):
                     content.append(_to_image_content(c))
         elif msg.type == "function_call":
+            role = "assistant"
             content.append(
                 {
                     "id": msg.call_id,
@@ -61,6 +80,7 @@ def to_chat_ctx(
                 }
             )
         elif msg.type == "function_call_output":
+            role = "user"
             content.append(
                 {
                     "tool_use_id": msg.call_id,
@@ -70,27 +90,13 @@ def to_chat_ctx(
                 }
             )
 
-    if current_role is not None and content:
-        messages.append({"role": current_role, "content": content})
-
-    # ensure the messages starts with a "user" message
-    if inject_dummy_user_message and (not messages or messages[0]["role"] != "user"):
-        messages.insert(
-            0,
-            {
-                "role": "user",
-                "content": [{"text": "(empty)", "type": "text"}],
-            },
-        )
+        entries.append((role, content))
 
-    return messages, AnthropicFormatData(system_messages=system_messages)
+    return entries
 
 
 def _to_image_content(image: llm.ImageContent) -> dict[str, Any]:
-    cache_key = "serialized_image"
-    if cache_key not in image._cache:
-        image._cache[cache_key] = llm.utils.serialize_image(image)
-    img: llm.utils.SerializedImage = image._cache[cache_key]
+    img = llm.utils.serialize_image(image)
 
     if img.external_url:
         return {
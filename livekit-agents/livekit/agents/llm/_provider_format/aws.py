@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import itertools
 import json
 from dataclasses import dataclass
+from typing import Any
 
 from livekit.agents import llm
 
-from .utils import group_tool_calls
+from .utils import _ChatItemGroup, convert_groups
 
 
 @dataclass
@@ -22,33 +22,51 @@ def to_chat_ctx(
     current_role: str | None = None
     current_content: list[dict] = []
 
-    for msg in itertools.chain(*(group.flatten() for group in group_tool_calls(chat_ctx))):
+    for group_entries in convert_groups(chat_ctx, "aws", _group_to_entries):
+        for role, content in group_entries:
+            if role == "system":
+                system_messages.append(content)
+                continue
+
+            # if the effective role changed, finalize the previous turn.
+            if role != current_role:
+                if current_content and current_role is not None:
+                    messages.append({"role": current_role, "content": current_content})
+                current_content = []
+                current_role = role
+
+            current_content.extend([block.copy() for block in content])
+
+    # Finalize the last message if there’s any content left
+    if current_role is not None and current_content:
+        messages.append({"role": current_role, "content": current_content})
+
+    # Ensure the message list starts with a "user" message
+    if inject_dummy_user_message and (not messages or messages[0]["role"] != "user"):
+        messages.insert(0, {"role": "user", "content": [{"text": "(empty)"}]})
+
+    return messages, BedrockFormatData(system_messages=system_messages)
+
+
+def _group_to_entries(group: _ChatItemGroup) -> list[tuple[str, Any]]:
+    """(role, content blocks) of each item of the group, ("system", text) for the instructions"""
+    entries: list[tuple[str, Any]] = []
+    for msg in group.flatten():
         if msg.type == "message" and msg.role == "system" and (text := msg.text_content):
-            system_messages.append(text)
+            entries.append(("system", text))
             continue
 
+        content: list[dict] = []
         if msg.type == "message":
             role = "assistant" if msg.role == "assistant" else "user"
+            for c in msg.content:
+                if c and isinstance(c, str):
+                    content.append({"text": c})
+                elif isinstance(c, llm.ImageContent):
+                    content.append(_build_image(c))
         elif msg.type == "function_call":
             role = "assistant"
-        elif msg.type == "function_call_output":
-            role = "user"
-
-        # if the effective role changed, finalize the previous turn.
-        if role != current_role:
-            if current_content and current_role is not None:
-                messages.append({"role": current_role, "content": current_content})
-            current_content = []
-            current_role = role
-
-        if msg.type == "message":
-            for content in msg.content:
-                if content and isinstance(content, str):
-                    current_content.append({"text": content})
-                elif isinstance(content, llm.ImageContent):
-                    current_content.append(_build_image(content))
-        elif msg.type == "function_call":
-            current_content.append(
+            content.append(
                 {
                     "toolUse": {
                         "toolUseId": msg.call_id,
@@ -58,7 +76,8 @@ def to_chat_ctx(
                 }
             )
         elif msg.type == "function_call_output":
-            current_content.append(
+            role = "user"
+            content.append(
                 {
                     "toolResult": {
                         "toolUseId": msg.call_id,
@@ -72,22 +91,13 @@ def to_chat_ctx(
                 }
             )
 
-    # Finalize the last message if there’s any content left
-    if current_role is not None and current_content:
-        messages.append({"role": current_role, "content": current_content})
-
-    # Ensure the message list starts with a "user" message
-    if inject_dummy_user_message and (not messages or messages[0]["role"] != "user"):
-        messages.insert(0, {"role": "user", "content": [{"text": "(empty)"}]})
+        entries.append((role, content))
 
-    return messages, BedrockFormatData(system_messages=system_messages)
+    return entries
 
 
 def _build_image(image: llm.ImageContent) -> dict:
-    cache_key = "serialized_image"
-    if cache_key not in image._cache:
-        image._cache[cache_key] = llm.utils.serialize_image(image)
-    img: llm.utils.SerializedImage = image._cache[cache_key]
+    img = llm.utils.serialize_image(image)
 
     if img.external_url:
         raise ValueError("external_url is not supported by AWS Bedrock.")
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import itertools
 import json
 from dataclasses import dataclass
 from typing import Any
@@ -8,7 +7,7 @@ from typing import Any
 from livekit.agents import llm
 from livekit.agents.log import logger
 
-from .utils import group_tool_calls
+from .utils import _ChatItemGroup, convert_groups
 
 
 @dataclass
@@ -24,27 +23,47 @@ def to_chat_ctx(
     current_role: str | None = None
     parts: list[dict] = []
 
-    for msg in itertools.chain(*(group.flatten() for group in group_tool_calls(chat_ctx))):
+    for group_entries in convert_groups(chat_ctx, "google", _group_to_entries):
+        for role, item_parts in group_entries:
+            if role == "system":
+                system_messages.append(item_parts)
+                continue
+
+            # if the effective role changed, finalize the previous turn.
+            if role != current_role:
+                if current_role is not None and parts:
+                    turns.append({"role": current_role, "parts": parts})
+                parts = []
+                current_role = role
+
+            parts.extend([part.copy() for part in item_parts])
+
+    if current_role is not None and parts:
+        turns.append({"role": current_role, "parts": parts})
+
+    # convert role tool to user for gemini
+    for turn in turns:
+        if turn["role"] == "tool":
+            turn["role"] = "user"
+
+    # Gemini requires the last message to end with user's turn before they can generate
+    if inject_dummy_user_message and current_role != "user":
+        turns.append({"role": "user", "parts": [{"text": "."}]})
+
+    return turns, GoogleFormatData(system_messages=system_messages)
+
+
+def _group_to_entries(group: _ChatItemGroup) -> list[tuple[str, Any]]:
+    """(role, parts) of each item of the group, ("system", text) for the instructions"""
+    entries: list[tuple[str, Any]] = []
+    for msg in group.flatten():
         if msg.type == "message" and msg.role == "system" and (text := msg.text_content):
-            system_messages.append(text)
+            entries.append(("system", text))
             continue
 
+        parts: list[dict] = []
         if msg.type == "message":
             role = "model" if msg.role == "assistant" else "user"
-        elif msg.type == "function_call":
-            role = "model"
-        elif msg.type == "function_call_output":
-            # tool output shouldn't be mixed with other messages
-            role = "tool"
-
-        # if the effective role changed, finalize the previous turn.
-        if role != current_role:
-            if current_role is not None and parts:
-                turns.append({"role": current_role, "parts": parts})
-            parts = []
-            current_role = role
-
-        if msg.type == "message":
             for content in msg.content:
                 if content and isinstance(content, str):
                     parts.append({"text": content})
@@ -53,6 +72,7 @@ def to_chat_ctx(
                 elif isinstance(content, llm.ImageContent):
                     parts.append(_to_image_part(content))
         elif msg.type == "function_call":
+            role = "model"
             parts.append(
                 {
                     "function_call": {
@@ -63,6 +83,8 @@ def to_chat_ctx(
                 }
             )
         elif msg.type == "function_call_output":
+            # tool output shouldn't be mixed with other messages
+            role = "tool"
             response = {"output": msg.output} if not msg.is_error else {"error": msg.output}
             parts.append(
                 {
@@ -74,26 +96,13 @@ def to_chat_ctx(
                 }
             )
 
-    if current_role is not None and parts:
-        turns.append({"role": current_role, "parts": parts})
-
-    # convert role tool to user for gemini
-    for turn in turns:
-        if turn["role"] == "tool":
-            turn["role"] = "user"
-
-    # Gemini requires the last message to end with user's turn before they can generate
-    if inject_dummy_user_message and current_role != "user":
-        turns.append({"role": "user", "parts": [{"text": "."}]})
+        entries.append((role, parts))
 
-    return turns, GoogleFormatData(system_messages=system_messages)
+    return entries
 
 
 def _to_image_part(image: llm.ImageContent) -> dict[str, Any]:
-    cache_key = "serialized_image"
-    if cache_key not in image._cache:
-        image._cache[cache_key] = llm.utils.serialize_image(image)
-    img: llm.utils.SerializedImage = image._cache[cache_key]
+    img = llm.utils.serialize_image(image)
 
     if img.external_url:
         if img.mime_type:
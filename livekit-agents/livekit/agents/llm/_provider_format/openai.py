@@ -5,39 +5,44 @@ from typing import Any, Literal
 
 from livekit.agents import llm
 
-from .utils import group_tool_calls
+from .utils import _ChatItemGroup, convert_groups, copy_message
 
 
 def to_chat_ctx(
     chat_ctx: llm.ChatContext, *, inject_dummy_user_message: bool = True
 ) -> tuple[list[dict], Literal[None]]:
-    item_groups = group_tool_calls(chat_ctx)
-    messages = []
-    for group in item_groups:
-        if not group.message and not group.tool_calls and not group.tool_outputs:
-            continue
-
-        # one message can contain zero or more tool calls
-        msg = _to_chat_item(group.message) if group.message else {"role": "assistant"}
-        tool_calls = [
-            {
-                "id": tool_call.call_id,
-                "type": "function",
-                "function": {"name": tool_call.name, "arguments": tool_call.arguments},
-            }
-            for tool_call in group.tool_calls
-        ]
-        if tool_calls:
-            msg["tool_calls"] = tool_calls
-        messages.append(msg)
-
-        # append tool outputs following the tool calls
-        for tool_output in group.tool_outputs:
-            messages.append(_to_chat_item(tool_output))
+    messages: list[dict] = []
+    for group_messages in convert_groups(chat_ctx, "openai", _group_to_messages):
+        messages.extend([copy_message(msg) for msg in group_messages])
 
     return messages, None
 
 
+def _group_to_messages(group: _ChatItemGroup) -> list[dict[str, Any]]:
+    if not group.message and not group.tool_calls and not group.tool_outputs:
+        return []
+
+    # one message can contain zero or more tool calls
+    msg = _to_chat_item(group.message) if group.message else {"role": "assistant"}
+    tool_calls = [
+        {
+            "id": tool_call.call_id,
+            "type": "function",
+            "function": {"name": tool_call.name, "arguments": tool_call.arguments},
+        }
+        for tool_call in group.tool_calls
+    ]
+    if tool_calls:
+        msg["tool_calls"] = tool_calls
+    messages = [msg]
+
+    # append tool outputs following the tool calls
+    for tool_output in group.tool_outputs:
+        messages.append(_to_chat_item(tool_output))
+
+    return messages
+
+
 def _to_chat_item(msg: llm.ChatItem) -> dict[str, Any]:
     if msg.type == "message":
         list_content: list[dict[str, Any]] = []
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import threading
 from collections import OrderedDict
 from dataclasses import dataclass, field
+from typing import Any, Callable, TypeVar
 
 from livekit.agents import llm
 from livekit.agents.log import logger
 
+_T = TypeVar("_T")
+
 
 def group_tool_calls(chat_ctx: llm.ChatContext) -> list[_ChatItemGroup]:
     """Group chat items (messages, function calls, and function outputs)
@@ -76,6 +80,14 @@ class _ChatItemGroup:
             self.tool_outputs.append(item)
         return self
 
+    def copy_valid(self) -> _ChatItemGroup:
+        if len(self.tool_calls) == len(self.tool_outputs):
+            return self  # see remove_invalid_tool_calls
+
+        group = _ChatItemGroup(self.message, list(self.tool_calls), list(self.tool_outputs))
+        group.remove_invalid_tool_calls()
+        return group
+
     def remove_invalid_tool_calls(self) -> None:
         if len(self.tool_calls) == len(self.tool_outputs):
             return
@@ -115,3 +127,169 @@ class _ChatItemGroup:
         items.extend(self.tool_calls)
         items.extend(self.tool_outputs)
         return items
+
+
+def convert_groups(
+    chat_ctx: llm.ChatContext, format: str, convert: Callable[[_ChatItemGroup], _T]
+) -> list[_T]:
+    """Apply `convert` to the groups of `group_tool_calls(chat_ctx)`, reusing the results of the
+    previous calls.
+
+    The groups and their conversions are cached on the chat context and its copies, keyed by the
+    content of the items, so when items are appended only the new groups and the groups they
+    joined are converted again. The results are shared between calls, the callers copy
+    the messages and content blocks they return (the dicts nested deeper are shared).
+    """
+    items = chat_ctx.items
+    if not items:
+        return []
+
+    keys = [_item_key(item) for item in items]
+    cache = _acquire_cache(chat_ctx, keys)
+    try:
+        if not cache.update(items, keys):
+            # duplicated ids or call ids, the incremental grouping may differ
+            cache.reset()
+            return [convert(group) for group in group_tool_calls(chat_ctx)]
+
+        converted = cache.converted.get(format, {})
+        results: list[_T] = []
+        used: dict[str, tuple[tuple[Any, ...], Any]] = {}
+        for group_id, group in cache.groups.items():
+            sig = cache.signatures[group_id]
+            prev = converted.get(group_id)
+            if prev is not None and (prev[0] is sig or prev[0] == sig):
+                result = prev[1]
+            else:
+                result = convert(group.copy_valid())
+
+            used[group_id] = (sig, result)
+            results.append(result)
+
+        cache.converted[format] = used
+        return results
+    except Exception:
+        cache.reset()
+        raise
+    finally:
+        cache.lock.release()
+
+
+def _acquire_cache(chat_ctx: llm.ChatContext, keys: list[tuple[Any, ...]]) -> _GroupingCache:
+    """Lock the cache of the context (or of a context it was copied from) that the items extend.
+
+    A context and its copies share their caches, e.g. the copies of the agent context made for
+    every turn. A copy that diverged (filtered, truncated, or edited items) or a concurrent
+    conversion uses another cache, so the contexts don't reset each other's state.
+    """
+    caches = chat_ctx._format_caches
+    with _caches_lock:
+        cache: _GroupingCache | None = None
+        for c in caches:
+            n = len(c.keys)
+            if (
+                not c.lock.locked()
+                and (cache is None or n > len(cache.keys))
+                and n <= len(keys)
+                and keys[:n] == c.keys
+            ):
+                cache = c
+
+        if cache is None:
+            cache = _GroupingCache()
+            if caches:
+                # the groups that didn't change keep their conversions
+                cache.converted = {fmt: dict(c) for fmt, c in caches[-1].converted.items()}
+        else:
+            caches.remove(cache)
+
+        caches.append(cache)  # the most recently used is last
+        for stale in [c for c in caches[:-_MAX_CACHES_PER_CONTEXT] if not c.lock.locked()]:
+            caches.remove(stale)
+
+        cache.lock.acquire()
+        return cache
+
+
+def copy_message(msg: dict[str, Any]) -> dict[str, Any]:
+    """Copy a cached message, with its lists and the dicts in them (e.g. content blocks)"""
+    copy = msg.copy()
+    for key, value in msg.items():
+        if type(value) is list:
+            copy[key] = [v.copy() if type(v) is dict else v for v in value]
+    return copy
+
+
+def _item_key(item: llm.ChatItem) -> tuple[Any, ...]:
+    """The fields of an item used by the groups and the provider formats"""
+    if item.type == "message":
+        return (item.id, item.type, item.role, *item.content)
+    if item.type == "function_call":
+        return (item.id, item.type, item.call_id, item.name, item.arguments)
+    if item.type == "function_call_output":
+        return (item.id, item.type, item.call_id, item.name, item.output, item.is_error)
+    return (item.id, item.type, item)
+
+
+class _GroupingCache:
+    """The state of group_tool_calls over the items seen so far, extended when items are appended"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.converted: dict[str, dict[str, tuple[tuple[Any, ...], Any]]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        self.keys: list[tuple[Any, ...]] = []
+        self.groups: dict[str, _ChatItemGroup] = {}
+        # keys of the items added to each group, the cache key of its conversions
+        self.signatures: dict[str, tuple[tuple[Any, ...], ...]] = {}
+        self.call_groups: dict[str, str] = {}  # call_id to group_id
+        self.orphan_call_ids: set[str] = set()  # outputs seen before their call
+
+    def update(self, items: list[llm.ChatItem], keys: list[tuple[Any, ...]]) -> bool:
+        n = len(self.keys)
+        if n > len(keys) or keys[:n] != self.keys:
+            self.reset()
+            n = 0
+
+        for item, key in zip(items[n:], keys[n:]):
+            if not self._add(item, key):
+                return False
+
+        return True
+
+    def _add(self, item: llm.ChatItem, key: tuple[Any, ...]) -> bool:
+        if (item.type == "message" and item.role == "assistant") or item.type == "function_call":
+            group_id = item.id.split("/")[0]
+            if item.type == "function_call":
+                if item.call_id in self.call_groups or item.call_id in self.orphan_call_ids:
+                    return False
+                self.call_groups[item.call_id] = group_id
+        elif item.type == "function_call_output":
+            if item.call_id not in self.call_groups:
+                logger.warning(
+                    "function output missing the corresponding function call, ignoring",
+                    extra={"call_id": item.call_id, "tool_name": item.name},
+                )
+                self.orphan_call_ids.add(item.call_id)
+                self.keys.append(key)
+                return True
+            group_id = self.call_groups[item.call_id]
+        else:
+            group_id = item.id
+            if group_id in self.groups:
+                return False
+
+        if group_id not in self.groups:
+            self.groups[group_id] = _ChatItemGroup()
+            self.signatures[group_id] = ()
+
+        self.groups[group_id].add(item)
+        self.signatures[group_id] += (key,)
+        self.keys.append(key)
+        return True
+
+
+_MAX_CACHES_PER_CONTEXT = 4
+_caches_lock = threading.Lock()
@@ -14,9 +14,11 @@
 
 from __future__ import annotations
 
+import bisect
+import heapq
 import time
-from collections.abc import Sequence
-from typing import TYPE_CHECKING, Annotated, Any, Literal, Union, overload
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING, Annotated, Any, Literal, SupportsIndex, Union, overload
 
 from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter
 from typing_extensions import TypeAlias
@@ -166,9 +168,150 @@ ChatItem = Annotated[
 ]
 
 
+class _ChatItemList(list[ChatItem]):
+    """The items of a ChatContext, with an index by id and the sorted created_at keys.
+
+    Both are built lazily. Appending and inserting keep them up to date, other mutations of the
+    list drop them. Changing the id or created_at of an item already in the list isn't tracked (the id is
+    verified on lookup).
+    """
+
+    def __init__(self, items: Iterable[ChatItem] = ()) -> None:
+        super().__init__(items)
+        self._by_id: dict[str, ChatItem] | None = None  # first item of each id
+        self._positions: dict[str, int] | None = None  # position of the first item of each id
+        self._keys: list[float] | None = None  # created_at of the items, if they are sorted
+        self._keys_valid = False  # _keys is None when the items aren't sorted
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # unpickling a list subclass would call extend() before __init__
+        return (type(self), (list(self),))
+
+    def get_by_id(self, item_id: str) -> ChatItem | None:
+        if self._by_id is None:
+            self._by_id = {}
+            for item in self:
+                self._by_id.setdefault(item.id, item)
+
+        found = self._by_id.get(item_id)
+        if found is not None and found.id != item_id:
+            self._invalidate()  # the id of the item was changed
+            return self.get_by_id(item_id)
+        return found
+
+    def index_by_id(self, item_id: str) -> int | None:
+        if self._positions is None:
+            self._positions = {}
+            for i, item in enumerate(self):
+                self._positions.setdefault(item.id, i)
+
+        idx = self._positions.get(item_id)
+        if idx is not None and self[idx].id != item_id:
+            self._invalidate()
+            return self.index_by_id(item_id)
+        return idx
+
+    def sorted_keys(self) -> list[float] | None:
+        """The created_at of the items, None if they aren't sorted by created_at"""
+        if not self._keys_valid:
+            keys = [item.created_at for item in self]
+            is_sorted = all(keys[i] <= keys[i + 1] for i in range(len(keys) - 1))
+            self._keys = keys if is_sorted else None
+            self._keys_valid = True
+        return self._keys
+
+    def _invalidate(self) -> None:
+        self._by_id = self._positions = self._keys = None
+        self._keys_valid = False
+
+    def append(self, item: ChatItem) -> None:
+        super().append(item)
+        if self._by_id is not None:
+            self._by_id.setdefault(item.id, item)
+        if self._positions is not None:
+            self._positions.setdefault(item.id, len(self) - 1)
+        if self._keys is not None:
+            if not self._keys or self._keys[-1] <= item.created_at:
+                self._keys.append(item.created_at)
+            else:
+                self._keys = None
+
+    def extend(self, items: Iterable[ChatItem]) -> None:
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items: Iterable[ChatItem]) -> _ChatItemList:  # type: ignore[override,misc]
+        self.extend(items)
+        return self
+
+    def insert(self, index: SupportsIndex, item: ChatItem) -> None:
+        idx = index.__index__()
+        idx = max(idx + len(self), 0) if idx < 0 else min(idx, len(self))
+        super().insert(idx, item)
+        self._positions = None
+        if self._by_id is not None:
+            if item.id in self._by_id:
+                self._by_id = None  # the first item with this id may have changed
+            else:
+                self._by_id[item.id] = item
+        if self._keys is not None:
+            keys = self._keys
+            if (idx == 0 or keys[idx - 1] <= item.created_at) and (
+                idx == len(keys) or item.created_at <= keys[idx]
+            ):
+                keys.insert(idx, item.created_at)
+            else:
+                self._keys = None
+
+    def remove(self, item: ChatItem) -> None:
+        super().remove(item)
+        self._invalidate()
+
+    def pop(self, index: SupportsIndex = -1) -> ChatItem:
+        item = super().pop(index)
+        self._invalidate()
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self._invalidate()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        super().sort(*args, **kwargs)
+        self._invalidate()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._invalidate()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._invalidate()
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._invalidate()
+
+    def __imul__(self, n: SupportsIndex) -> _ChatItemList:
+        super().__imul__(n)
+        self._invalidate()
+        return self
+
+
+class _FormatCaches(list[Any]):
+    """The caches of the provider format conversions, shared by a context and its copies.
+
+    They're not pickled or deep copied, the restored context starts with no cache.
+    """
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (_FormatCaches, ())
+
+
 class ChatContext:
     def __init__(self, items: NotGivenOr[list[ChatItem]] = NOT_GIVEN):
-        self._items: list[ChatItem] = items if is_given(items) else []
+        self._items: _ChatItemList = _ChatItemList(items if is_given(items) else [])
+        self._format_caches = _FormatCaches()
 
     @classmethod
     def empty(cls) -> ChatContext:
@@ -180,7 +323,7 @@ class ChatContext:
 
     @items.setter
     def items(self, items: list[ChatItem]) -> None:
-        self._items = items
+        self._items = items if isinstance(items, _ChatItemList) else _ChatItemList(items)
 
     def add_message(
         self,
@@ -215,15 +358,26 @@ class ChatContext:
         """Insert an item or list of items into the chat context by creation time."""
         items = list(item) if isinstance(item, Sequence) else [item]
 
+        if len(items) > 1 and self._items.sorted_keys() is not None:
+            self._merge_sorted(items)
+            return
+
         for _item in items:
             idx = self.find_insertion_index(created_at=_item.created_at)
             self._items.insert(idx, _item)
 
     def get_by_id(self, item_id: str) -> ChatItem | None:
-        return next((item for item in self.items if item.id == item_id), None)
+        return self._items.get_by_id(item_id)
 
     def index_by_id(self, item_id: str) -> int | None:
-        return next((i for i, item in enumerate(self.items) if item.id == item_id), None)
+        return self._items.index_by_id(item_id)
+
+    def _merge_sorted(self, items: list[ChatItem]) -> None:
+        """Insert items into the sorted items of this context, equivalent to inserting them one by
+        one at find_insertion_index (each new item goes after the items with the same created_at)
+        """
+        new_items = sorted(items, key=lambda item: item.created_at)  # stable
+        self._items[:] = list(heapq.merge(self._items, new_items, key=lambda item: item.created_at))
 
     def copy(
         self,
@@ -279,7 +433,9 @@ class ChatContext:
 
             items.append(item)
 
-        return ChatContext(items)
+        copied = ChatContext(items)
+        copied._format_caches = self._format_caches
+        return copied
 
     def truncate(self, *, max_items: int) -> ChatContext:
         """Truncate the chat context to the last N items in place.
@@ -319,6 +475,7 @@ class ChatContext:
     ) -> ChatContext:
         """Add messages from `other_chat_ctx` into this one, avoiding duplicates, and keep items sorted by created_at."""
         existing_ids = {item.id for item in self._items}
+        new_items: list[ChatItem] = []
 
         for item in other_chat_ctx.items:
             if exclude_function_call and item.type in [
@@ -335,10 +492,10 @@ class ChatContext:
                 continue
 
             if item.id not in existing_ids:
-                idx = self.find_insertion_index(created_at=item.created_at)
-                self._items.insert(idx, item)
+                new_items.append(item)
                 existing_ids.add(item.id)
 
+        self.insert(new_items)
         return self
 
     def to_dict(
@@ -447,6 +604,16 @@ class ChatContext:
         Iterates in reverse, assuming items are sorted by `created_at`.
         Finds the position after the last item with `created_at <=` the given timestamp.
         """
+        if (keys := self._items.sorted_keys()) is not None:
+            idx = bisect.bisect_right(keys, created_at)
+            # the created_at of the items may have been changed since the keys were computed
+            if (idx == 0 or self._items[idx - 1].created_at == keys[idx - 1]) and (
+                idx == len(keys) or self._items[idx].created_at == keys[idx]
+            ):
+                return idx
+
+            self._items._invalidate()
+
         for i in reversed(range(len(self._items))):
             if self._items[i].created_at <= created_at:
                 return i + 1
@@ -513,7 +680,7 @@ class _ReadOnlyChatContext(ChatContext):
         "please use .copy() and agent.update_chat_ctx() to modify the chat context"
     )
 
-    class _ImmutableList(list[ChatItem]):
+    class _ImmutableList(_ChatItemList):
         def _raise_error(self, *args: Any, **kwargs: Any) -> None:
             logger.error(_ReadOnlyChatContext.error_msg)
             raise RuntimeError(_ReadOnlyChatContext.error_msg)
@@ -525,8 +692,9 @@ class _ReadOnlyChatContext(ChatContext):
         def copy(self) -> list[ChatItem]:
             return list(self)
 
-    def __init__(self, items: list[ChatItem]):
+    def __init__(self, items: list[ChatItem], *, format_caches: _FormatCaches | None = None):
         self._items = self._ImmutableList(items)
+        self._format_caches = format_caches if format_caches is not None else _FormatCaches()
 
     @property
     def readonly(self) -> bool:
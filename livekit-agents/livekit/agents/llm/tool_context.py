@@ -16,8 +16,9 @@ from __future__ import annotations
 
 import inspect
 from collections.abc import Awaitable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
     Literal,
@@ -31,6 +32,9 @@ from typing import (
 
 from typing_extensions import NotRequired, Required, TypedDict, TypeGuard
 
+if TYPE_CHECKING:
+    from .utils import _CompiledTool
+
 
 # Used by ToolChoice
 class Function(TypedDict, total=False):
@@ -79,6 +83,8 @@ class StopResponse(Exception):
 class _FunctionToolInfo:
     name: str
     description: str | None
+    # compiled signature/model/schemas, keyed by whether the tool is a bound method
+    _compiled: dict[bool, _CompiledTool] = field(default_factory=dict, repr=False, compare=False)
 
 
 @runtime_checkable
@@ -108,6 +114,7 @@ class RawFunctionDescription(TypedDict):
 class _RawFunctionToolInfo:
     name: str
     raw_schema: dict[str, Any]
+    _compiled: dict[bool, _CompiledTool] = field(default_factory=dict, repr=False, compare=False)
 
 
 @runtime_checkable
@@ -2,15 +2,22 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import bisect
+import hashlib
 import inspect
+import os
 import sys
+import threading
 import types
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import (
     TYPE_CHECKING,
     Annotated,
     Any,
     Callable,
+    Literal,
     Union,
     cast,
     get_args,
@@ -25,14 +32,18 @@ from typing_extensions import TypeVar
 
 from livekit import rtc
 
+from .. import telemetry
 from ..log import logger
 from ..utils import images
 from . import _strict
-from .chat_context import ChatContext, ImageContent
+from .chat_context import ChatContext, ChatItem, ImageContent
 from .tool_context import (
     FunctionTool,
     RawFunctionTool,
+    _FunctionToolInfo,
+    _RawFunctionToolInfo,
     get_function_info,
+    get_raw_function_info,
     is_function_tool,
     is_raw_function_tool,
 )
@@ -46,34 +57,59 @@ THINK_TAG_END = "</think>"
 
 def _compute_lcs(old_ids: list[str], new_ids: list[str]) -> list[str]:
     """
-    Standard dynamic-programming LCS to get the common subsequence
-    of IDs (in order) that appear in both old_ids and new_ids.
+    LCS of the IDs (in order) that appear in both old_ids and new_ids.
+
+    IDs are unique within a context, so the LCS is the longest increasing subsequence of the
+    positions in old_ids of the IDs of new_ids (patience sorting, O(n log n) time and linear
+    memory instead of an n*m DP table). The subsequence is built from the end, which picks the
+    same LCS as the backtracking of the DP table when there are several.
     """
-    n, m = len(old_ids), len(new_ids)
-    dp = [[0] * (m + 1) for _ in range(n + 1)]
-
-    # Fill DP table
-    for i in range(1, n + 1):
-        for j in range(1, m + 1):
-            if old_ids[i - 1] == new_ids[j - 1]:
-                dp[i][j] = dp[i - 1][j - 1] + 1
-            else:
-                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
-
-    # Backtrack to find the actual LCS sequence
-    lcs_ids = []
-    i, j = n, m
-    while i > 0 and j > 0:
-        if old_ids[i - 1] == new_ids[j - 1]:
-            lcs_ids.append(old_ids[i - 1])
-            i -= 1
-            j -= 1
-        elif dp[i - 1][j] > dp[i][j - 1]:
-            i -= 1
+    old_pos: dict[str, int] = {}
+    for i, item_id in enumerate(old_ids):
+        old_pos.setdefault(item_id, i)
+
+    # negated positions in old_ids of the common IDs, from the last ID of new_ids
+    seq = [-old_pos[item_id] for item_id in reversed(new_ids) if item_id in old_pos]
+
+    tails: list[int] = []  # tails[k]: smallest end of an increasing subsequence of length k+1
+    tail_idx: list[int] = []  # index in seq of tails[k]
+    prev = [-1] * len(seq)  # index in seq of the previous element of the subsequence
+    for k, pos in enumerate(seq):
+        i = bisect.bisect_left(tails, pos)
+        if i > 0:
+            prev[k] = tail_idx[i - 1]
+        if i == len(tails):
+            tails.append(pos)
+            tail_idx.append(k)
         else:
-            j -= 1
+            tails[i] = pos
+            tail_idx[i] = k
+
+    # following prev from the end of the longest subsequence yields the IDs in order
+    lcs_ids: list[str] = []
+    k = tail_idx[-1] if tail_idx else -1
+    while k >= 0:
+        lcs_ids.append(old_ids[-seq[k]])
+        k = prev[k]
+
+    return lcs_ids
 
-    return list(reversed(lcs_ids))
+
+def _content_hash(item: ChatItem) -> int:
+    """Hash of the content of an item that is synced with the realtime models.
+
+    Only the text of the messages is used, the audio and images aren't synced back from the
+    providers. `is_error` isn't either, the remote function call outputs never have it set. The
+    hashes of the strings are cached by Python, so hashing the same item again is
+    cheap.
+    """
+    if item.type == "message":
+        return hash((item.type, item.text_content))
+    if item.type == "function_call":
+        return hash((item.type, item.call_id, item.name, item.arguments))
+    if item.type == "function_call_output":
+        return hash((item.type, item.call_id, item.output))
+    return hash((item.type, item.id))
 
 
 @dataclass
@@ -88,9 +124,10 @@ class DiffOps:
 
 
 def compute_chat_ctx_diff(old_ctx: ChatContext, new_ctx: ChatContext) -> DiffOps:
-    """Computes the minimal list of create/remove operations to transform old_ctx into new_ctx."""
-    # TODO(theomonnom): Make ChatMessage hashable and also add update ops
+    """Computes the minimal list of create/remove operations to transform old_ctx into new_ctx.
 
+    Items kept in place whose content hash changed are returned in `to_update`.
+    """
     old_ids = [m.id for m in old_ctx.items]
     new_ids = [m.id for m in new_ctx.items]
 
@@ -106,12 +143,9 @@ def compute_chat_ctx_diff(old_ctx: ChatContext, new_ctx: ChatContext) -> DiffOps
         if new_msg.id not in lcs_ids:
             to_create.append((prev_id, new_msg.id))
         else:
-            # check if the content is different
             old_msg = old_ctx_by_id[new_msg.id]
-            if new_msg.type == "message" and old_msg.type == "message":
-                if new_msg.text_content != old_msg.text_content:
-                    to_update.append((prev_id, new_msg.id))
-                # TODO: check other content types
+            if old_msg is not new_msg and _content_hash(old_msg) != _content_hash(new_msg):
+                to_update.append((prev_id, new_msg.id))
 
         prev_id = new_msg.id
 
@@ -135,8 +169,71 @@ class SerializedImage:
     external_url: str | None = None
 
 
+class _EncodedFrameCache:
+    """LRU of the encoded VideoFrames, bounded by the size of the encoded data.
+
+    Keyed by a hash of the frame content and the encode options, so the same frame sent again in
+    another ImageContent (or formatted for another provider) isn't encoded again.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[Any, ...], bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()  # images are also serialized in the encode threads
+
+    def get(self, key: tuple[Any, ...]) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+
+        telemetry.metrics.image_cache_lookup(hit=data is not None)
+        return data
+
+    def put(self, key: tuple[Any, ...], data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            if (prev := self._entries.pop(key, None)) is not None:
+                self._size -= len(prev)
+
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_encoded_frame_cache = _EncodedFrameCache(max_bytes=64 * 1024 * 1024)
+_encode_executor: ThreadPoolExecutor | None = None
+
+
+def _frame_cache_key(frame: rtc.VideoFrame, opts: images.EncodeOptions) -> tuple[Any, ...]:
+    resize = opts.resize_options
+    return (
+        hashlib.blake2b(frame.data, digest_size=16).digest(),
+        frame.width,
+        frame.height,
+        frame.type,
+        opts.format,
+        opts.quality,
+        (resize.width, resize.height, resize.strategy) if resize else None,
+    )
+
+
+def _serialized_image_key(image: ImageContent) -> tuple[Any, ...]:
+    return ("serialized_image", image.inference_width, image.inference_height)
+
+
 def serialize_image(image: ImageContent, *, use_cache: bool = True) -> SerializedImage:
-    cache_key = "serialized_image"  # TODO(long): use hash of encoding options if available
+    cache_key = _serialized_image_key(image)
     if use_cache and cache_key in image._cache:
         return cast(SerializedImage, image._cache[cache_key])
 
@@ -180,10 +277,16 @@ def serialize_image(image: ImageContent, *, use_cache: bool = True) -> Serialize
                 height=image.inference_height,
                 strategy="scale_aspect_fit",
             )
-        encoded_data = images.encode(image.image, opts)
+
+        frame_key = _frame_cache_key(image.image, opts) if use_cache else None
+        encoded_frame = _encoded_frame_cache.get(frame_key) if frame_key else None
+        if encoded_frame is None:
+            encoded_frame = images.encode(image.image, opts)
+            if frame_key is not None:
+                _encoded_frame_cache.put(frame_key, encoded_frame)
 
         serialized_image = SerializedImage(
-            data_bytes=encoded_data,
+            data_bytes=encoded_frame,
             mime_type="image/jpeg",
             inference_detail=image.inference_detail,
         )
@@ -195,14 +298,117 @@ def serialize_image(image: ImageContent, *, use_cache: bool = True) -> Serialize
     return serialized_image
 
 
+async def serialize_images(chat_ctx: ChatContext) -> None:
+    """Encode the VideoFrames of the chat context in a thread pool.
+
+    The provider formats serialize the images synchronously, on the event loop. Calling this
+    before formatting the chat context makes them hit the cache instead of encoding the frames.
+    """
+    global _encode_executor
+
+    pending = [
+        content
+        for item in chat_ctx.items
+        if item.type == "message"
+        for content in item.content
+        if isinstance(content, ImageContent)
+        and isinstance(content.image, rtc.VideoFrame)
+        and _serialized_image_key(content) not in content._cache
+    ]
+    if not pending:
+        return
+
+    if _encode_executor is None:
+        _encode_executor = ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="lk_image_encode"
+        )
+
+    loop = asyncio.get_running_loop()
+    # errors are raised again when the provider format serializes the image
+    await asyncio.gather(
+        *(loop.run_in_executor(_encode_executor, serialize_image, image) for image in pending),
+        return_exceptions=True,
+    )
+
+
+@dataclass
+class _CompiledTool:
+    """Metadata of a tool computed once, stored on the tool info (see get_compiled_tool)"""
+
+    signature: inspect.Signature
+    type_hints: dict[str, Any]
+    context_params: list[str]
+    # parameters that can't be None, with their default value (Parameter.empty if required)
+    non_optional_params: dict[str, Any]
+    model: type[BaseModel] | None
+    # json schemas of the parameters, built lazily by name ("legacy", "strict")
+    schemas: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+def get_compiled_tool(tool: FunctionTool | RawFunctionTool) -> _CompiledTool:
+    """Signature, pydantic model and schemas of a tool, computed on first use.
+
+    They are cached on the tool info, so a new tool (or a tool decorated again) is compiled again.
+    """
+    info: _FunctionToolInfo | _RawFunctionToolInfo
+    if is_function_tool(tool):
+        info = get_function_info(tool)
+    elif is_raw_function_tool(tool):
+        info = get_raw_function_info(tool)
+    else:
+        raise ValueError(f"Unsupported function tool type: {type(tool)}")
+
+    # the info is shared by a method and its bound methods, but not their signatures
+    bound = inspect.ismethod(tool)
+    if (compiled := info._compiled.get(bound)) is not None:
+        return compiled
+
+    signature = inspect.signature(tool)
+    type_hints = get_type_hints(tool, include_extras=True)
+    non_optional_params = {}
+    context_params = []
+    for param_name, param in signature.parameters.items():
+        type_hint = type_hints[param_name]
+        if not _is_optional_type(type_hint):
+            non_optional_params[param_name] = param.default
+        if is_context_type(type_hint):
+            context_params.append(param_name)
+
+    compiled = _CompiledTool(
+        signature=signature,
+        type_hints=type_hints,
+        context_params=context_params,
+        non_optional_params=non_optional_params,
+        model=_build_pydantic_model(tool, signature, type_hints)
+        if is_function_tool(tool)
+        else None,
+    )
+    info._compiled[bound] = compiled
+    return compiled
+
+
+def _parameters_schema(function_tool: FunctionTool, kind: Literal["legacy", "strict"]) -> Any:
+    compiled = get_compiled_tool(function_tool)
+    if (schema := compiled.schemas.get(kind)) is None:
+        assert compiled.model is not None
+        if kind == "strict":
+            schema = _strict.to_strict_json_schema(compiled.model)
+        else:
+            schema = compiled.model.model_json_schema()
+        compiled.schemas[kind] = schema
+
+    return schema
+
+
 def build_legacy_openai_schema(
     function_tool: FunctionTool, *, internally_tagged: bool = False
 ) -> dict[str, Any]:
     """non-strict mode tool description
-    see https://serde.rs/enum-representations.html for the internally tagged representation"""
-    model = function_arguments_to_pydantic_model(function_tool)
+    see https://serde.rs/enum-representations.html for the internally tagged representation
+
+    the parameters schema is cached on the tool and must not be modified"""
     info = get_function_info(function_tool)
-    schema = model.model_json_schema()
+    schema = _parameters_schema(function_tool, "legacy")
 
     if internally_tagged:
         return {
@@ -225,10 +431,11 @@ def build_legacy_openai_schema(
 def build_strict_openai_schema(
     function_tool: FunctionTool,
 ) -> dict[str, Any]:
-    """strict mode tool description"""
-    model = function_arguments_to_pydantic_model(function_tool)
+    """strict mode tool description
+
+    the parameters schema is cached on the tool and must not be modified"""
     info = get_function_info(function_tool)
-    schema = _strict.to_strict_json_schema(model)
+    schema = _parameters_schema(function_tool, "strict")
 
     return {
         "type": "function",
@@ -301,7 +508,19 @@ def to_openai_response_format(response_format: type | dict[str, Any]) -> dict[st
 
 def function_arguments_to_pydantic_model(func: Callable[..., Any]) -> type[BaseModel]:
     """Create a Pydantic model from a function's signature. (excluding context types)"""
+    if is_function_tool(func):
+        model = get_compiled_tool(func).model
+        assert model is not None
+        return model
+
+    return _build_pydantic_model(
+        func, inspect.signature(func), get_type_hints(func, include_extras=True)
+    )
 
+
+def _build_pydantic_model(
+    func: Callable[..., Any], signature: inspect.Signature, type_hints: dict[str, Any]
+) -> type[BaseModel]:
     from docstring_parser import parse_from_object
 
     fnc_names = func.__name__.split("_")
@@ -311,9 +530,6 @@ def function_arguments_to_pydantic_model(func: Callable[..., Any]) -> type[BaseM
     docstring = parse_from_object(func)
     param_docs = {p.arg_name: p.description for p in docstring.params}
 
-    signature = inspect.signature(func)
-    type_hints = get_type_hints(func, include_extras=True)
-
     # field_name -> (type, FieldInfo or default)
     fields: dict[str, Any] = {}
 
@@ -356,31 +572,28 @@ def prepare_function_arguments(
     the raw function output from the LLM.
     """
 
-    signature = inspect.signature(fnc)
-    type_hints = get_type_hints(fnc, include_extras=True)
+    compiled = get_compiled_tool(fnc)
     args_dict = from_json(json_arguments)
 
     if is_function_tool(fnc):
-        model_type = function_arguments_to_pydantic_model(fnc)
+        assert compiled.model is not None
 
         # Function arguments with default values are treated as optional
         # when converted to strict LLM function descriptions. (e.g., we convert default
         # parameters to type: ["string", "null"]).
         # The following make sure to use the default value when we receive None.
         # (Only if the type can't be Optional)
-        for param_name, param in signature.parameters.items():
-            type_hint = type_hints[param_name]
+        for param_name, default in compiled.non_optional_params.items():
             if param_name in args_dict and args_dict[param_name] is None:
-                if not _is_optional_type(type_hint):
-                    if param.default is not inspect.Parameter.empty:
-                        args_dict[param_name] = param.default
-                    else:
-                        raise ValueError(
-                            f"Received None for required parameter '{param_name} ;"
-                            "this argument cannot be None and no default is available."
-                        )
-
-        model = model_type.model_validate(args_dict)  # can raise ValidationError
+                if default is not inspect.Parameter.empty:
+                    args_dict[param_name] = default
+                else:
+                    raise ValueError(
+                        f"Received None for required parameter '{param_name} ;"
+                        "this argument cannot be None and no default is available."
+                    )
+
+        model = compiled.model.model_validate(args_dict)  # can raise ValidationError
         raw_fields = _shallow_model_dump(model)
     elif is_raw_function_tool(fnc):
         # e.g async def open_gate(self, raw_arguments: dict[str, object]):
@@ -393,12 +606,10 @@ def prepare_function_arguments(
 
     # inject RunContext if needed
     context_dict = {}
-    for param_name, _ in signature.parameters.items():
-        type_hint = type_hints[param_name]
-        if is_context_type(type_hint) and call_ctx is not None:
-            context_dict[param_name] = call_ctx
+    if call_ctx is not None:
+        context_dict = dict.fromkeys(compiled.context_params, call_ctx)
 
-    bound = signature.bind(**{**raw_fields, **context_dict})
+    bound = compiled.signature.bind(**{**raw_fields, **context_dict})
     bound.apply_defaults()
     return bound.args, bound.kwargs
 
@@ -418,8 +629,8 @@ def _is_optional_type(hint: Any) -> bool:
 
 def _shallow_model_dump(model: BaseModel, *, by_alias: bool = False) -> dict[str, Any]:
     result = {}
-    for name, field in model.__class__.model_fields.items():
-        key = field.alias if by_alias and field.alias else name
+    for name, model_field in model.__class__.model_fields.items():
+        key = model_field.alias if by_alias and model_field.alias else name
         result[key] = getattr(model, name)
     return result
 
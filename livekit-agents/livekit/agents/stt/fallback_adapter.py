@@ -3,19 +3,21 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import dataclasses
+import functools
 import time
 from collections.abc import AsyncIterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Literal
 
 from livekit import rtc
 
-from .. import utils
+from .. import telemetry, utils
 from .._exceptions import APIConnectionError, APIError
 from ..log import logger
 from ..types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
 from ..utils import aio
 from ..utils.audio import AudioBuffer
+from ..utils.hedging import LatencyHistogram, run_hedged
 from ..vad import VAD
 from .stt import STT, RecognizeStream, SpeechEvent, SpeechEventType, STTCapabilities
 
@@ -36,6 +38,7 @@ class _STTStatus:
     available: bool
     recovering_synthesize_task: asyncio.Task[None] | None
     recovering_stream_task: asyncio.Task[None] | None
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
 
 
 class FallbackAdapter(
@@ -49,7 +52,15 @@ class FallbackAdapter(
         attempt_timeout: float = 10.0,
         max_retry_per_stt: int = 1,
         retry_interval: float = 5,
+        hedge_delay: float | None = None,
     ) -> None:
+        """
+        Args:
+            hedge_delay: enables hedged requests for ``recognize()``. When a STT hasn't returned
+                after its p95 latency (or ``hedge_delay`` until enough requests were made), the
+                next STT is started at the same time and the first result is kept. The STT are
+                also tried in the order of their median latency. Defaults to None (disabled).
+        """
         if len(stt) < 1:
             raise ValueError("At least one STT instance must be provided.")
 
@@ -80,6 +91,7 @@ class FallbackAdapter(
         self._attempt_timeout = attempt_timeout
         self._max_retry_per_stt = max_retry_per_stt
         self._retry_interval = retry_interval
+        self._hedge_delay = hedge_delay
 
         self._status: list[_STTStatus] = [
             _STTStatus(
@@ -111,8 +123,10 @@ class FallbackAdapter(
         conn_options: APIConnectOptions,
         recovering: bool = False,
     ) -> SpeechEvent:
+        stt_status = self._status[self._stt_instances.index(stt)]
+        started_at = time.perf_counter()
         try:
-            return await stt.recognize(
+            ev = await stt.recognize(
                 buffer,
                 language=language,
                 conn_options=dataclasses.replace(
@@ -122,6 +136,8 @@ class FallbackAdapter(
                     retry_interval=self._retry_interval,
                 ),
             )
+            stt_status.latency.add_sample(time.perf_counter() - started_at)
+            return ev
         except asyncio.TimeoutError:
             if recovering:
                 logger.warning(f"{stt.label} recovery timed out", extra={"streamed": False})
@@ -196,6 +212,82 @@ class FallbackAdapter(
 
             stt_status.recovering_synthesize_task = asyncio.create_task(_recover_stt_task(stt))
 
+    def _ordered_indices(self) -> list[int]:
+        """Index of the STT in the order to try them, by median latency when hedging is enabled"""
+        indices = list(range(len(self._stt_instances)))
+        if self._hedge_delay is not None:
+            indices.sort(key=self._median_latency)
+        return indices
+
+    def _median_latency(self, idx: int) -> float:
+        median = self._status[idx].latency.percentile(50)
+        return median if median is not None else float("inf")
+
+    def _hedge_deadline(self, idx: int) -> float | None:
+        if self._hedge_delay is None:
+            return None
+        p95 = self._status[idx].latency.percentile(95)
+        return p95 if p95 is not None else self._hedge_delay
+
+    async def _recognize_hedged(
+        self,
+        buffer: utils.AudioBuffer,
+        *,
+        language: NotGivenOr[str],
+        conn_options: APIConnectOptions,
+        all_failed: bool,
+    ) -> SpeechEvent:
+        indices = [i for i in self._ordered_indices() if self._status[i].available or all_failed]
+
+        def _on_error(attempt_idx: int, exc: Exception) -> None:
+            idx = indices[attempt_idx]
+            if self._status[idx].available:
+                self._status[idx].available = False
+                self.emit(
+                    "stt_availability_changed",
+                    AvailabilityChangedEvent(stt=self._stt_instances[idx], available=False),
+                )
+
+        def _on_cut_off(attempt_idx: int, elapsed: float) -> None:
+            # the hedged STT was slower than the winner, keep it in its p95
+            self._status[indices[attempt_idx]].latency.add_sample(elapsed)
+
+        try:
+            if not indices:
+                raise APIConnectionError("no STT available")
+
+            result = await run_hedged(
+                [
+                    functools.partial(
+                        self._try_recognize,
+                        stt=self._stt_instances[idx],
+                        buffer=buffer,
+                        language=language,
+                        conn_options=conn_options,
+                        recovering=False,
+                    )
+                    for idx in indices
+                ],
+                hedge_delay=lambda attempt_idx: self._hedge_deadline(indices[attempt_idx]),
+                on_error=_on_error,
+                on_cut_off=_on_cut_off,
+            )
+        finally:
+            for stt, stt_status in zip(self._stt_instances, self._status):
+                if not stt_status.available or all_failed:
+                    self._try_recovery(
+                        stt=stt, buffer=buffer, language=language, conn_options=conn_options
+                    )
+
+        telemetry.metrics.fallback_request(
+            kind="stt",
+            hedged=result.hedged,
+            latency_saved=(
+                result.latency_saved(self._status[indices[0]].latency) if result.hedged else None
+            ),
+        )
+        return result.value
+
     async def _recognize_impl(
         self,
         buffer: utils.AudioBuffer,
@@ -209,6 +301,16 @@ class FallbackAdapter(
         if all_failed:
             logger.error("all STTs are unavailable, retrying..")
 
+        if self._hedge_delay is not None:
+            try:
+                return await self._recognize_hedged(
+                    buffer, language=language, conn_options=conn_options, all_failed=all_failed
+                )
+            except Exception:  # exceptions already logged inside _try_recognize
+                raise APIConnectionError(
+                    f"all STTs failed ({[stt.label for stt in self._stt_instances]}) after {time.time() - start_time} seconds"  # noqa: E501
+                ) from None
+
         for i, stt in enumerate(self._stt_instances):
             stt_status = self._status[i]
             if stt_status.available or all_failed:
@@ -312,7 +414,8 @@ class FallbackRecognizeStream(RecognizeStream):
                 with contextlib.suppress(RuntimeError):
                     main_stream.end_input()
 
-        for i, stt in enumerate(self._fallback_adapter._stt_instances):
+        for i in self._fallback_adapter._ordered_indices():
+            stt = self._fallback_adapter._stt_instances[i]
             stt_status = self._fallback_adapter._status[i]
             if stt_status.available or all_failed:
                 try:
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import os
 
 import prometheus_client
@@ -12,6 +14,85 @@ PROC_INITIALIZE_TIME = prometheus_client.Histogram(
     buckets=[0.1, 0.5, 1, 2, 5, 10],
 )
 
+PROC_SPAWN_TIME = prometheus_client.Histogram(
+    "lk_agents_proc_spawn_duration_seconds",
+    "Time taken by the process pool to start and initialize a new process",
+    ["nodename"],
+    buckets=[0.05, 0.1, 0.5, 1, 2, 5, 10],
+)
+
+PROC_POOL_LAUNCH_COUNTER = prometheus_client.Counter(
+    "lk_agents_proc_pool_launch_total",
+    "Jobs launched by the process pool, hit when an idle process was ready for it",
+    ["nodename", "result"],
+)
+
+PROC_POOL_TARGET_IDLE_GAUGE = prometheus_client.Gauge(
+    "lk_agents_proc_pool_target_idle_processes",
+    "Number of idle processes the process pool is trying to keep",
+    ["nodename"],
+    multiprocess_mode="max",
+)
+
+IMAGE_CACHE_LOOKUP_COUNTER = prometheus_client.Counter(
+    "lk_agents_image_cache_lookup_total",
+    "Lookups of encoded video frames in the serialized image cache",
+    ["nodename", "result"],
+)
+
+TTS_SENTENCE_GAP_TIME = prometheus_client.Histogram(
+    "lk_agents_tts_sentence_gap_seconds",
+    "Time waited for the audio of a sentence after the previous one when synthesizing ahead",
+    ["nodename"],
+    buckets=[0.01, 0.05, 0.1, 0.2, 0.5, 1, 2],
+)
+
+TTS_SENTENCE_GAP_SAVED_TIME = prometheus_client.Histogram(
+    "lk_agents_tts_sentence_gap_saved_seconds",
+    "Time removed from the gap between sentences by synthesizing ahead",
+    ["nodename"],
+    buckets=[0.01, 0.05, 0.1, 0.2, 0.5, 1, 2],
+)
+
+FALLBACK_HEDGE_COUNTER = prometheus_client.Counter(
+    "lk_agents_fallback_hedge_total",
+    "Requests of a fallback adapter with hedging enabled, by whether a hedged attempt was started",
+    ["nodename", "kind", "result"],
+)
+
+FALLBACK_HEDGE_SAVED_TIME = prometheus_client.Histogram(
+    "lk_agents_fallback_hedge_latency_saved_seconds",
+    "Estimated latency saved when a hedged attempt responded first",
+    ["nodename", "kind"],
+    buckets=[0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10],
+)
+
+TTS_CACHE_LOOKUP_COUNTER = prometheus_client.Counter(
+    "lk_agents_tts_cache_lookup_total",
+    "Lookups of synthesized phrases in the TTS cache, by the tier that had the phrase",
+    ["nodename", "result"],
+)
+
+CONNECTION_POOL_WAIT_TIME = prometheus_client.Histogram(
+    "lk_agents_connection_pool_wait_seconds",
+    "Time waited for a connection of a connection pool",
+    ["nodename", "pool"],
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.2, 0.5, 1, 2, 5],
+)
+
+CONNECTION_POOL_CONNECT_TIME = prometheus_client.Histogram(
+    "lk_agents_connection_pool_connect_seconds",
+    "Time taken by a connection pool to create a new connection",
+    ["nodename", "pool"],
+    buckets=[0.01, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10],
+)
+
+CONNECTION_POOL_GET_COUNTER = prometheus_client.Counter(
+    "lk_agents_connection_pool_get_total",
+    "Connections taken from a connection pool, by whether an idle connection was reused",
+    ["nodename", "pool", "result"],
+)
+
 # Use 'livesum' mode to aggregate active jobs across all processes
 # This sums the values from processes that are still running
 RUNNING_JOB_GAUGE = prometheus_client.Gauge(
@@ -52,3 +133,53 @@ def job_ended() -> None:
 
 def proc_initialized(*, time_elapsed: float) -> None:
     PROC_INITIALIZE_TIME.labels(nodename=utils.nodename()).observe(time_elapsed)
+
+
+def proc_spawned(*, time_elapsed: float) -> None:
+    PROC_SPAWN_TIME.labels(nodename=utils.nodename()).observe(time_elapsed)
+
+
+def proc_pool_job_launched(*, warm_hit: bool) -> None:
+    PROC_POOL_LAUNCH_COUNTER.labels(
+        nodename=utils.nodename(), result="hit" if warm_hit else "miss"
+    ).inc()
+
+
+def proc_pool_target_updated(target_idle_processes: int) -> None:
+    PROC_POOL_TARGET_IDLE_GAUGE.labels(nodename=utils.nodename()).set(target_idle_processes)
+
+
+def image_cache_lookup(*, hit: bool) -> None:
+    IMAGE_CACHE_LOOKUP_COUNTER.labels(
+        nodename=utils.nodename(), result="hit" if hit else "miss"
+    ).inc()
+
+
+def tts_sentence_gap(*, gap: float, saved: float) -> None:
+    TTS_SENTENCE_GAP_TIME.labels(nodename=utils.nodename()).observe(gap)
+    TTS_SENTENCE_GAP_SAVED_TIME.labels(nodename=utils.nodename()).observe(saved)
+
+
+def fallback_request(*, kind: str, hedged: bool, latency_saved: float | None = None) -> None:
+    FALLBACK_HEDGE_COUNTER.labels(
+        nodename=utils.nodename(), kind=kind, result="hedged" if hedged else "not_hedged"
+    ).inc()
+    if latency_saved is not None:
+        FALLBACK_HEDGE_SAVED_TIME.labels(nodename=utils.nodename(), kind=kind).observe(
+            latency_saved
+        )
+
+
+def tts_cache_lookup(*, result: str) -> None:
+    TTS_CACHE_LOOKUP_COUNTER.labels(nodename=utils.nodename(), result=result).inc()
+
+
+def connection_pool_get(*, pool: str, reused: bool, wait: float) -> None:
+    CONNECTION_POOL_GET_COUNTER.labels(
+        nodename=utils.nodename(), pool=pool, result="reused" if reused else "connected"
+    ).inc()
+    CONNECTION_POOL_WAIT_TIME.labels(nodename=utils.nodename(), pool=pool).observe(wait)
+
+
+def connection_pool_connected(*, pool: str, elapsed: float) -> None:
+    CONNECTION_POOL_CONNECT_TIME.labels(nodename=utils.nodename(), pool=pool).observe(elapsed)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import re
-from functools import cache
-from typing import Any
+from collections.abc import Iterable
+from functools import cache, lru_cache
+
+# number of hyphenated words kept in memory by hyphenate_word
+CACHE_SIZE = 8192
 
 
 # Frank Liang hyphenator. impl from https://github.com/jfinkels/hyphenate
@@ -10,7 +13,11 @@ from typing import Any
 # Users that want different languages or more advanced hyphenation should use the livekit-plugins-*
 class Hyphenator:
     def __init__(self, patterns: str, exceptions: str = "") -> None:
-        self.tree: dict[str | None, Any] = {}
+        # the patterns are compiled into a trie stored in flat arrays, the node n has the
+        # transitions self._next[n] and the non-zero points self._points[n] as
+        # (offset, value) pairs, relative to the start of the pattern
+        self._next: list[dict[str, int]] = [{}]
+        self._points: list[tuple[tuple[int, int], ...]] = [()]
         for pattern in patterns.split():
             self._insert_pattern(pattern)
 
@@ -26,15 +33,15 @@ class Hyphenator:
         chars = re.sub("[0-9]", "", pattern)
         points = [int(d or 0) for d in re.split("[.a-z]", pattern)]
 
-        # Insert the pattern into the tree. Each character finds a dict
-        # another level down in the tree, and leaf nodes have the list of
-        # points.
-        t = self.tree
+        node = 0
         for c in chars:
-            if c not in t:
-                t[c] = {}
-            t = t[c]
-        t[None] = points
+            if (child := self._next[node].get(c)) is None:
+                child = len(self._next)
+                self._next[node][c] = child
+                self._next.append({})
+                self._points.append(())
+            node = child
+        self._points[node] = tuple((j, p) for j, p in enumerate(points) if p)
 
     def hyphenate_word(self, word: str) -> list[str]:
         """Given a word, returns a list of pieces, broken at the possible
@@ -49,26 +56,26 @@ class Hyphenator:
         else:
             work = "." + word.lower() + "."
             points = [0] * (len(work) + 1)
+            next_, points_ = self._next, self._points
             for i in range(len(work)):
-                t = self.tree
+                node = 0
                 for c in work[i:]:
-                    if c in t:
-                        t = t[c]
-                        if None in t:
-                            p = t[None]
-                            for j, p_j in enumerate(p):
-                                points[i + j] = max(points[i + j], p_j)
-                    else:
+                    if (node := next_[node].get(c, -1)) < 0:
                         break
+                    for j, p_j in points_[node]:
+                        if p_j > points[i + j]:
+                            points[i + j] = p_j
             # No hyphens in the first two chars or the last two.
             points[1] = points[2] = points[-2] = points[-3] = 0
 
         # Examine the points to build the pieces list.
-        pieces = [""]
-        for c, p in zip(word, points[2:]):
-            pieces[-1] += c
+        pieces = []
+        start = 0
+        for i, p in enumerate(points[2 : len(word) + 1], start=1):
             if p % 2:
-                pieces.append("")
+                pieces.append(word[start:i])
+                start = i
+        pieces.append(word[start:])
         return pieces
 
 
@@ -537,5 +544,14 @@ def _get_hyphenator() -> Hyphenator:
     return Hyphenator(PATTERNS, EXCEPTIONS)
 
 
+@lru_cache(maxsize=CACHE_SIZE)
+def _hyphenate_cached(word: str) -> tuple[str, ...]:
+    return tuple(_get_hyphenator().hyphenate_word(word))
+
+
 def hyphenate_word(word: str) -> list[str]:
-    return _get_hyphenator().hyphenate_word(word)
+    return list(_hyphenate_cached(word))
+
+
+def hyphenate_words(words: Iterable[str]) -> list[list[str]]:
+    return [list(_hyphenate_cached(word)) for word in words]
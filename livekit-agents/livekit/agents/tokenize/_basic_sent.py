@@ -1,5 +1,16 @@
 import re
 
+from .token_stream import TokenBoundaries
+
+# a sentence can only end right after one of these characters, the rules below look at most a
+# few characters further (e.g. "U.S. However")
+STREAM_BOUNDARIES = TokenBoundaries(
+    split_re=re.compile(r"[.!?。！？]"), content_re=re.compile(r"\S"), context_len=16
+)
+STREAM_BOUNDARIES_RETAIN_FORMAT = TokenBoundaries(
+    split_re=re.compile(r"[.!?。！？\n]"), content_re=re.compile(r"\S"), context_len=16
+)
+
 
 # rule based segmentation based on https://stackoverflow.com/a/31505798, works surprisingly well
 def split_sentences(
@@ -1,6 +1,14 @@
 import re
 
 from . import tokenizer
+from .token_stream import TokenBoundaries
+
+_CHAR_BASED_RANGES = (
+    r"\u4e00-\u9fff\u3040-\u30ff\u3400-\u4dbf"  # CJK scripts
+    r"\u0E00-\u0E7F"  # Thai
+)
+_CHAR_BASED_RE = re.compile(f"[{_CHAR_BASED_RANGES}]")
+_PUNCTUATIONS_TABLE = str.maketrans("", "", "".join(tokenizer.PUNCTUATIONS))
 
 
 def split_words(
@@ -23,21 +31,12 @@ def split_words(
 
     # CJK: \u4e00-\u9fff, \u3040-\u30ff, \u3400-\u4dbf
     # Thai: \u0E00-\u0E7F
-    char_based_codes = (
-        re.compile(
-            r"[\u4e00-\u9fff\u3040-\u30ff\u3400-\u4dbf"  # CJK scripts
-            r"\u0E00-\u0E7F]"  # Thai
-        )
-        if split_character
-        else None
-    )
+    char_based_codes = _CHAR_BASED_RE if split_character else None
 
     pos = 0
     word_start = 0
 
-    translation_table = (
-        str.maketrans("", "", "".join(tokenizer.PUNCTUATIONS)) if ignore_punctuation else None
-    )
+    translation_table = _PUNCTUATIONS_TABLE if ignore_punctuation else None
 
     def _add_current_word(start: int, end: int) -> None:
         word = text[start:end]
@@ -68,3 +67,15 @@ def split_words(
     _add_current_word(word_start, len(text))
 
     return words
+
+
+def stream_boundaries(*, ignore_punctuation: bool, split_character: bool) -> TokenBoundaries:
+    split_chars = r"\s" + (_CHAR_BASED_RANGES if split_character else "")
+    content_re = (
+        re.compile(f"[^\\s{re.escape(''.join(tokenizer.PUNCTUATIONS))}]")
+        if ignore_punctuation
+        else re.compile(r"\S")
+    )
+    return TokenBoundaries(
+        split_re=re.compile(f"[{split_chars}]"), content_re=content_re, prefix_stable=True
+    )
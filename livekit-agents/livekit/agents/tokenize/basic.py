@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import functools
+from collections.abc import Iterable
 from dataclasses import dataclass
 
 from . import (
@@ -12,13 +13,14 @@ from . import (
     tokenizer,
 )
 
-# Really naive implementation of SentenceTokenizer, WordTokenizer + hyphenate_word
+# Really naive implementation of SentenceTokenizer, WordTokenizer + hyphenate_word(s)
 # The basic tokenizer is rule-based and only English is really tested
 
 __all__ = [
     "SentenceTokenizer",
     "WordTokenizer",
     "hyphenate_word",
+    "hyphenate_words",
     "tokenize_paragraphs",
 ]
 
@@ -66,6 +68,9 @@ class SentenceTokenizer(tokenizer.SentenceTokenizer):
             ),
             min_token_len=self._config.min_sentence_len,
             min_ctx_len=self._config.stream_context_len,
+            boundaries=_basic_sent.STREAM_BOUNDARIES_RETAIN_FORMAT
+            if self._config.retain_format
+            else _basic_sent.STREAM_BOUNDARIES,
         )
 
 
@@ -102,6 +107,10 @@ class WordTokenizer(tokenizer.WordTokenizer):
             ),
             min_token_len=1,
             min_ctx_len=1,  # ignore
+            boundaries=_basic_word.stream_boundaries(
+                ignore_punctuation=self._ignore_punctuation,
+                split_character=self._split_character,
+            ),
         )
 
 
@@ -109,6 +118,11 @@ def hyphenate_word(word: str) -> list[str]:
     return _basic_hyphenator.hyphenate_word(word)
 
 
+def hyphenate_words(words: Iterable[str]) -> list[list[str]]:
+    """Hyphenate a batch of words, e.g. the words of a text delta"""
+    return _basic_hyphenator.hyphenate_words(words)
+
+
 def split_words(
     text: str, *, ignore_punctuation: bool = True, split_character: bool = False
 ) -> list[tuple[str, int, int]]:
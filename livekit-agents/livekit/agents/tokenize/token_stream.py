@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import re
 import typing
+from dataclasses import dataclass
 from typing import Callable, Union
 
 from ..utils import aio, shortuuid
@@ -11,6 +13,27 @@ from .tokenizer import SentenceStream, TokenData, WordStream
 TokenizeCallable = Callable[[str], Union[list[str], list[tuple[str, int, int]]]]
 
 
+@dataclass(frozen=True)
+class TokenBoundaries:
+    """Where a tokenizer may split the text.
+
+    Once the text after the last split character is long enough to be settled and already
+    produces a token, pushing text without split characters can only extend that last token.
+    BufferedTokenStream uses this to only queue these pushes, and to tokenize the start of its
+    buffer, not all of it, to settle the next token.
+    """
+
+    split_re: re.Pattern[str]
+    """Matches the characters where a token may end"""
+    content_re: re.Pattern[str]
+    """Matches the characters that are part of a token"""
+    context_len: int = 0
+    """Number of characters after a split character that can still change how the text is split"""
+    prefix_stable: bool = False
+    """Whether tokenizing the text after a token gives the tokens that followed it, so all the
+    tokens but the last one of a tokenization are settled"""
+
+
 class BufferedTokenStream:
     def __init__(
         self,
@@ -19,56 +42,132 @@ class BufferedTokenStream:
         min_token_len: int,
         min_ctx_len: int,
         retain_format: bool = False,
+        boundaries: TokenBoundaries | None = None,
     ) -> None:
         self._event_ch = aio.Chan[TokenData]()
         self._tokenize_fnc = tokenize_fnc
         self._min_ctx_len = min_ctx_len
         self._min_token_len = min_token_len
         self._retain_format = retain_format
+        self._boundaries = boundaries
         self._current_segment_id = shortuuid()
 
         self._buf_tokens: list[str] = []  # <= min_token_len
         self._in_buf = ""
+        self._in_pending: list[str] = []  # pushed after _in_buf while it was stable
+        # whether pushing text without split characters can't create a new token,
+        # None when _in_buf was just tokenized and it wasn't checked yet
+        self._stable: bool | None = False
         self._out_buf = ""
 
     @typing.no_type_check
     def push_text(self, text: str) -> None:
         self._check_not_closed()
-        self._in_buf += text
+        if self._boundaries is not None and not self._boundaries.split_re.search(text):
+            if self._stable is None:
+                self._stable = self._is_stable(self._in_buf, self._boundaries)
+
+            if self._stable:
+                # the text only extends the last token, avoid tokenizing the buffer again
+                self._in_pending.append(text)
+                return
+
+        if self._in_pending:
+            self._in_buf = "".join([self._in_buf, *self._in_pending, text])
+            self._in_pending.clear()
+        else:
+            self._in_buf += text
+        self._stable = False
 
         if len(self._in_buf) < self._min_ctx_len:
             return
 
         while True:
-            tokens = self._tokenize_fnc(self._in_buf)
+            tokens = self._tokenize_head()
             if len(tokens) <= 1:
                 break
 
-            if self._out_buf:
-                self._out_buf += " "
+            if self._boundaries is None or not self._boundaries.prefix_stable:
+                # only the first token is settled, the rest of the buffer is tokenized again
+                del tokens[1:]
+            else:
+                tokens.pop()
 
-            tok = tokens.pop(0)
-            tok_text = tok
-            if isinstance(tok, tuple):
-                tok_text = tok[0]
+            pos = 0
+            for tok in tokens:
+                if self._out_buf:
+                    self._out_buf += " "
 
-            self._out_buf += tok_text
-            if len(self._out_buf) >= self._min_token_len:
-                self._event_ch.send_nowait(
-                    TokenData(token=self._out_buf, segment_id=self._current_segment_id)
-                )
+                tok_text = tok
+                if isinstance(tok, tuple):
+                    tok_text = tok[0]
 
-                self._out_buf = ""
+                self._out_buf += tok_text
+                if len(self._out_buf) >= self._min_token_len:
+                    self._event_ch.send_nowait(
+                        TokenData(token=self._out_buf, segment_id=self._current_segment_id)
+                    )
 
-            if isinstance(tok, tuple):
-                self._in_buf = self._in_buf[tok[2] :]
-            else:
-                tok_i = max(self._in_buf.find(tok), 0)
-                self._in_buf = self._in_buf[tok_i + len(tok) :].lstrip()
+                    self._out_buf = ""
+
+                if isinstance(tok, tuple):
+                    pos = tok[2]
+                else:
+                    pos = _skip_whitespace(self._in_buf, _find_end(self._in_buf, tok, pos))
+
+            self._in_buf = self._in_buf[pos:]
+
+        self._stable = None
+
+    @typing.no_type_check
+    def _tokenize_head(self) -> list[str] | list[tuple[str, int, int]]:
+        """Tokenize the start of the buffer, long enough to settle its first token.
+
+        The window is doubled until the first token is followed by enough text to be settled, so
+        the text of a token is only tokenized a few times, whatever the size of the buffer.
+        """
+        boundaries = self._boundaries
+        if boundaries is None or boundaries.prefix_stable:
+            return self._tokenize_fnc(self._in_buf)
+
+        size = max(self._min_ctx_len, 4 * boundaries.context_len, 256)
+        while size < len(self._in_buf):
+            window = self._in_buf[:size]
+            tokens = self._tokenize_fnc(window)
+            if len(tokens) > 1:
+                tok = tokens[0]
+                end = tok[2] if isinstance(tok, tuple) else _find_end(window, tok, 0)
+                # the offsets of a tokenizer can lag behind the text (split_sentences drops the
+                # period of "Inc. However"), keep as much text after the token as before it
+                if size - end >= end + boundaries.context_len:
+                    return tokens
+
+            size *= 2
+
+        return self._tokenize_fnc(self._in_buf)
+
+    @staticmethod
+    def _is_stable(text: str, boundaries: TokenBoundaries) -> bool:
+        """Whether text (tokenized into at most one token) keeps at most one token when text
+        without split characters is appended to it"""
+        tail_start = 0
+        for m in boundaries.split_re.finditer(text):
+            tail_start = m.end()
+
+        if tail_start == 0:
+            # no split character, the whole text is a single token
+            return True
+
+        tail = text[tail_start:]
+        return (
+            len(tail) >= boundaries.context_len and boundaries.content_re.search(tail) is not None
+        )
 
     @typing.no_type_check
     def flush(self) -> None:
         self._check_not_closed()
+        self._in_buf = "".join([self._in_buf, *self._in_pending])
+        self._in_pending.clear()
 
         if self._in_buf or self._out_buf:
             tokens = self._tokenize_fnc(self._in_buf)
@@ -88,6 +187,7 @@ class BufferedTokenStream:
 
         self._current_segment_id = shortuuid()
         self._in_buf = ""
+        self._stable = False
         self._out_buf = ""
 
     def end_input(self) -> None:
@@ -109,6 +209,18 @@ class BufferedTokenStream:
         return await self._event_ch.__anext__()
 
 
+def _find_end(text: str, tok: str, start: int) -> int:
+    """End of the token found at or after start, like the token was at start if it isn't found"""
+    tok_i = text.find(tok, start)
+    return (start if tok_i < 0 else tok_i) + len(tok)
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+
 class BufferedSentenceStream(BufferedTokenStream, SentenceStream):
     def __init__(
         self,
@@ -116,11 +228,13 @@ class BufferedSentenceStream(BufferedTokenStream, SentenceStream):
         tokenizer: TokenizeCallable,
         min_token_len: int,
         min_ctx_len: int,
+        boundaries: TokenBoundaries | None = None,
     ) -> None:
         super().__init__(
             tokenize_fnc=tokenizer,
             min_token_len=min_token_len,
             min_ctx_len=min_ctx_len,
+            boundaries=boundaries,
         )
 
 
@@ -131,9 +245,11 @@ class BufferedWordStream(BufferedTokenStream, WordStream):
         tokenizer: TokenizeCallable,
         min_token_len: int,
         min_ctx_len: int,
+        boundaries: TokenBoundaries | None = None,
     ) -> None:
         super().__init__(
             tokenize_fnc=tokenizer,
             min_token_len=min_token_len,
             min_ctx_len=min_ctx_len,
+            boundaries=boundaries,
         )
@@ -1,3 +1,4 @@
+from .cache import CachedChunkedStream, CachedSynthesizeStream, CachedTTS
 from .fallback_adapter import (
     AvailabilityChangedEvent,
     FallbackAdapter,
@@ -31,6 +32,9 @@ __all__ = [
     "AudioEmitter",
     "TTSError",
     "SentenceStreamPacer",
+    "CachedTTS",
+    "CachedChunkedStream",
+    "CachedSynthesizeStream",
 ]
 
 
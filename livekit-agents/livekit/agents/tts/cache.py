@@ -0,0 +1,554 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+from collections import OrderedDict
+from collections.abc import AsyncIterable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Literal
+
+from .. import telemetry, utils
+from ..log import logger
+from ..types import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    NOT_GIVEN,
+    USERDATA_TIMED_TRANSCRIPT,
+    APIConnectOptions,
+)
+from .tts import (
+    TTS,
+    AudioEmitter,
+    ChunkedStream,
+    SynthesizedAudio,
+    SynthesizeStream,
+    TTSCapabilities,
+)
+
+if TYPE_CHECKING:
+    from ..voice.io import TimedString
+
+# already a retry mechanism in the wrapped TTS, don't retry in the cache
+DEFAULT_CACHED_TTS_API_CONNECT_OPTIONS = APIConnectOptions(
+    max_retry=0, timeout=DEFAULT_API_CONNECT_OPTIONS.timeout
+)
+
+
+@dataclass
+class _CachedPhrase:
+    sample_rate: int
+    num_channels: int
+    pcm: bytes | mmap.mmap
+    transcripts: list[tuple[int, TimedString]] = field(default_factory=list)
+    """timed transcripts with the offset in the PCM data they were received at"""
+
+    def pushes(self) -> list[bytes | list[TimedString]]:
+        """The PCM data split where the timed transcripts must be pushed"""
+        pushes: list[bytes | list[TimedString]] = []
+        offset = 0
+        pending: list[TimedString] = []
+        for pos, text in self.transcripts:
+            if pos > offset:
+                if pending:
+                    pushes.append(pending)
+                    pending = []
+                pushes.append(self.pcm[offset:pos])
+                offset = pos
+            pending.append(text)
+
+        if pending:
+            pushes.append(pending)
+        if offset < len(self.pcm):
+            pushes.append(self.pcm[offset:])
+        return pushes
+
+
+class _PhraseRecorder:
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self._transcripts: list[tuple[int, TimedString]] = []
+        self._sample_rate = 0
+        self._num_channels = 0
+
+    def add_audio(self, ev: SynthesizedAudio) -> bytes:
+        data = ev.frame.data.tobytes()
+        if texts := ev.frame.userdata.get(USERDATA_TIMED_TRANSCRIPT):
+            self._transcripts.extend((self._size, text) for text in texts)
+
+        self._sample_rate = ev.frame.sample_rate
+        self._num_channels = ev.frame.num_channels
+        self._chunks.append(data)
+        self._size += len(data)
+        return data
+
+    def phrase(self) -> _CachedPhrase | None:
+        if not self._size:
+            return None
+
+        return _CachedPhrase(
+            sample_rate=self._sample_rate,
+            num_channels=self._num_channels,
+            pcm=b"".join(self._chunks),
+            transcripts=self._transcripts,
+        )
+
+
+class _DiskPhraseCache:
+    """PCM files memory-mapped on replay, with a JSON sidecar written once the PCM is complete
+
+    The directory can be shared by several processes. The phrases written by the other ones are
+    indexed when they are first looked up, and each process evicts the phrases it indexed, so
+    the size of the directory can exceed ``max_bytes`` until the other processes evict theirs.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int) -> None:
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # oldest first, sizes include the sidecar
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        entries = []
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    key = entry.name[: -len(".json")]
+                    pcm_path = self._pcm_path(key)
+                    if os.path.exists(pcm_path):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, key, st.st_size + os.path.getsize(pcm_path)))
+
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+        self._total = sum(self._sizes.values())
+
+    def _pcm_path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.pcm")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.json")
+
+    def _discover(self, key: str) -> bool:
+        """Index a phrase written by another process since the directory was scanned"""
+        try:
+            # the sidecar is written last, the phrase is complete when it exists
+            size = os.path.getsize(self._meta_path(key)) + os.path.getsize(self._pcm_path(key))
+        except OSError:
+            return False
+
+        self.add(key, size)
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sizes or self._discover(key)
+
+    def get(self, key: str) -> _CachedPhrase | None:
+        if key not in self:
+            return None
+
+        from ..voice.io import TimedString
+
+        try:
+            with open(self._meta_path(key)) as f:
+                meta = json.load(f)
+
+            with open(self._pcm_path(key), "rb") as f:
+                pcm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            logger.warning("failed to read the cached TTS phrase %s", key, exc_info=True)
+            self._remove(key)
+            return None
+
+        self._sizes.move_to_end(key)
+        return _CachedPhrase(
+            sample_rate=meta["sample_rate"],
+            num_channels=meta["num_channels"],
+            pcm=pcm,
+            transcripts=[
+                (
+                    t["offset"],
+                    TimedString(
+                        t["text"],
+                        start_time=t.get("start_time", NOT_GIVEN),
+                        end_time=t.get("end_time", NOT_GIVEN),
+                    ),
+                )
+                for t in meta["transcripts"]
+            ],
+        )
+
+    def write(self, key: str, phrase: _CachedPhrase) -> int:
+        """Write the phrase to disk and return its size, blocking and thread-safe"""
+        meta = {
+            "sample_rate": phrase.sample_rate,
+            "num_channels": phrase.num_channels,
+            "transcripts": [
+                {
+                    "offset": offset,
+                    "text": str(text),
+                    **{
+                        name: value
+                        for name in ("start_time", "end_time")
+                        if utils.is_given(value := getattr(text, name))
+                    },
+                }
+                for offset, text in phrase.transcripts
+            ],
+        }
+        meta_json = json.dumps(meta)
+        for path, data in ((self._pcm_path(key), phrase.pcm), (self._meta_path(key), meta_json)):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data.encode() if isinstance(data, str) else data)
+            os.replace(tmp_path, path)
+
+        return len(phrase.pcm) + len(meta_json)
+
+    def add(self, key: str, size: int) -> None:
+        """Track a written phrase and evict the least recently used ones"""
+        self._total -= self._sizes.pop(key, 0)
+        self._sizes[key] = size
+        self._total += size
+        while self._total > self._max_bytes and len(self._sizes) > 1:
+            self._remove(next(iter(self._sizes)))
+
+    def _remove(self, key: str) -> None:
+        self._total -= self._sizes.pop(key, 0)
+        for path in (self._meta_path(key), self._pcm_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class CachedTTS(TTS):
+    """
+    Wraps a TTS to replay the audio of phrases that were already synthesized, e.g. greetings,
+    disclaimers or hold messages.
+
+    The phrases are keyed on the provider, model and options of the wrapped TTS and on the
+    whitespace-normalized text. The PCM is kept in a size-bounded memory cache and, when
+    ``cache_dir`` is set, in memory-mapped files that persist across processes.
+
+    The segments of a stream are only cached when their whole text was pushed at once (e.g.
+    ``session.say()``), the text streamed by an LLM is rarely repeated and would evict the
+    cached phrases.
+    """
+
+    def __init__(
+        self,
+        *,
+        tts: TTS,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        cache_dir: str | None = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        prewarm_phrases: Sequence[str] | None = None,
+        options_key: Callable[[TTS], str] | None = None,
+        cache_streamed: bool = False,
+    ) -> None:
+        """
+        Args:
+            tts: the TTS to cache
+            max_memory_bytes: maximum size of the PCM kept in memory
+            cache_dir: directory of the disk cache, disabled when None
+            max_disk_bytes: maximum size of the disk cache, enforced by each process on the
+                phrases it wrote or replayed
+            prewarm_phrases: phrases synthesized in the background by ``prewarm()`` when they
+                aren't cached yet
+            options_key: returns a string identifying the voice options of the wrapped TTS,
+                defaults to the repr of its ``_opts``. Use it when the repr isn't stable across
+                processes, or to ignore options that don't change the audio.
+            cache_streamed: also cache the stream segments whose text was pushed incrementally
+        """
+        super().__init__(
+            capabilities=TTSCapabilities(
+                streaming=tts.capabilities.streaming,
+                aligned_transcript=tts.capabilities.aligned_transcript,
+            ),
+            sample_rate=tts.sample_rate,
+            num_channels=tts.num_channels,
+        )
+        self._wrapped_tts = tts
+        self._max_memory_bytes = max_memory_bytes
+        self._memory: OrderedDict[str, _CachedPhrase] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = _DiskPhraseCache(cache_dir, max_disk_bytes) if cache_dir else None
+        self._prewarm_phrases = list(prewarm_phrases or [])
+        self._options_key = options_key or (lambda t: repr(getattr(t, "_opts", None)))
+        self._cache_streamed = cache_streamed
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+        self._wrapped_tts.on("metrics_collected", self._on_metrics_collected)
+
+    @property
+    def model(self) -> str:
+        return self._wrapped_tts.model
+
+    @property
+    def provider(self) -> str:
+        return self._wrapped_tts.provider
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> CachedChunkedStream:
+        return CachedChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def stream(
+        self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> CachedSynthesizeStream:
+        if not self._wrapped_tts.capabilities.streaming:
+            raise NotImplementedError(
+                "streaming is not supported by the wrapped TTS, please use a StreamAdapter"
+            )
+
+        return CachedSynthesizeStream(tts=self, conn_options=conn_options)
+
+    def prewarm(self) -> None:
+        self._wrapped_tts.prewarm()
+        if not self._prewarm_phrases:
+            return
+
+        try:
+            task = asyncio.get_running_loop().create_task(self.warm(self._prewarm_phrases))
+        except RuntimeError:
+            logger.warning("CachedTTS.prewarm() called outside of an event loop, skipping phrases")
+            return
+
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def warm(
+        self,
+        phrases: Sequence[str],
+        *,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> None:
+        """Synthesize and cache the phrases that aren't cached yet"""
+        for text in phrases:
+            key = self._cache_key(text)
+            if key in self._memory or (self._disk is not None and key in self._disk):
+                continue
+
+            recorder = _PhraseRecorder()
+            try:
+                async with self._wrapped_tts.synthesize(
+                    text, conn_options=conn_options
+                ) as tts_stream:
+                    async for ev in tts_stream:
+                        recorder.add_audio(ev)
+            except Exception:
+                logger.warning("failed to prewarm the TTS phrase %r", text, exc_info=True)
+                continue
+
+            await self._store(key, recorder)
+
+    def _cache_key(self, text: str) -> str:
+        tts = self._wrapped_tts
+        parts = (
+            tts.provider,
+            tts.model,
+            tts.label,
+            self._options_key(tts),
+            str(tts.sample_rate),
+            str(tts.num_channels),
+            " ".join(text.split()),
+        )
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def _lookup(self, key: str) -> _CachedPhrase | None:
+        tier: Literal["memory", "disk", "miss"] = "miss"
+        phrase = self._memory.get(key)
+        if phrase is not None:
+            self._memory.move_to_end(key)
+            tier = "memory"
+        elif self._disk is not None and (phrase := self._disk.get(key)) is not None:
+            tier = "disk"
+
+        if phrase is not None and (
+            phrase.sample_rate != self.sample_rate or phrase.num_channels != self.num_channels
+        ):
+            phrase = None
+            tier = "miss"
+
+        telemetry.metrics.tts_cache_lookup(result=tier)
+        return phrase
+
+    def _put_memory(self, key: str, phrase: _CachedPhrase) -> None:
+        size = len(phrase.pcm)
+        if size > self._max_memory_bytes:
+            return
+
+        if (prev := self._memory.pop(key, None)) is not None:
+            self._memory_bytes -= len(prev.pcm)
+
+        self._memory[key] = phrase
+        self._memory_bytes += size
+        while self._memory_bytes > self._max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.pcm)
+
+    async def _store(self, key: str, recorder: _PhraseRecorder) -> None:
+        if (phrase := recorder.phrase()) is None:
+            return
+
+        self._put_memory(key, phrase)
+        if self._disk is not None:
+            try:
+                size = await asyncio.get_running_loop().run_in_executor(
+                    None, self._disk.write, key, phrase
+                )
+                self._disk.add(key, size)
+            except OSError:
+                logger.warning("failed to write the TTS phrase to the disk cache", exc_info=True)
+
+    def _on_metrics_collected(self, *args: Any, **kwargs: Any) -> None:
+        self.emit("metrics_collected", *args, **kwargs)
+
+    async def aclose(self) -> None:
+        await utils.aio.cancel_and_wait(*self._tasks)
+        self._wrapped_tts.off("metrics_collected", self._on_metrics_collected)
+
+
+def _replay(phrase: _CachedPhrase, output_emitter: AudioEmitter) -> None:
+    try:
+        for data in phrase.pushes():
+            if isinstance(data, list):
+                output_emitter.push_timed_transcript(data)
+            else:
+                output_emitter.push(data)
+    finally:
+        if isinstance(phrase.pcm, mmap.mmap):
+            phrase.pcm.close()
+
+
+class CachedChunkedStream(ChunkedStream):
+    def __init__(self, *, tts: CachedTTS, input_text: str, conn_options: APIConnectOptions) -> None:
+        super().__init__(
+            tts=tts, input_text=input_text, conn_options=DEFAULT_CACHED_TTS_API_CONNECT_OPTIONS
+        )
+        self._cached_tts = tts
+        self._wrapped_tts_conn_options = conn_options
+
+    async def _metrics_monitor_task(self, event_aiter: AsyncIterable[SynthesizedAudio]) -> None:
+        pass  # do nothing, the wrapped TTS emits the metrics of the synthesized phrases
+
+    async def _run(self, output_emitter: AudioEmitter) -> None:
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=self._cached_tts.sample_rate,
+            num_channels=self._cached_tts.num_channels,
+            mime_type="audio/pcm",
+        )
+
+        key = self._cached_tts._cache_key(self._input_text)
+        if (phrase := self._cached_tts._lookup(key)) is not None:
+            _replay(phrase, output_emitter)
+            return
+
+        recorder = _PhraseRecorder()
+        async with self._cached_tts._wrapped_tts.synthesize(
+            self._input_text, conn_options=self._wrapped_tts_conn_options
+        ) as tts_stream:
+            async for ev in tts_stream:
+                if texts := ev.frame.userdata.get(USERDATA_TIMED_TRANSCRIPT):
+                    output_emitter.push_timed_transcript(texts)
+                output_emitter.push(recorder.add_audio(ev))
+
+        await self._cached_tts._store(key, recorder)
+
+
+class CachedSynthesizeStream(SynthesizeStream):
+    """
+    Replays the cached segment when its whole text is pushed at once (e.g. ``session.say()``),
+    otherwise streams the text to the wrapped TTS as it comes. Only the segments that could be
+    replayed are cached, unless ``cache_streamed`` is set.
+    """
+
+    def __init__(self, *, tts: CachedTTS, conn_options: APIConnectOptions) -> None:
+        super().__init__(tts=tts, conn_options=DEFAULT_CACHED_TTS_API_CONNECT_OPTIONS)
+        self._cached_tts = tts
+        self._wrapped_tts_conn_options = conn_options
+
+    async def _metrics_monitor_task(self, event_aiter: AsyncIterable[SynthesizedAudio]) -> None:
+        pass  # do nothing, the wrapped TTS emits the metrics of the synthesized phrases
+
+    async def _run(self, output_emitter: AudioEmitter) -> None:
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=self._cached_tts.sample_rate,
+            num_channels=self._cached_tts.num_channels,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+
+        # each flush() ends a segment, which is looked up and cached on its own
+        while await self._run_segment(output_emitter):
+            pass
+
+    async def _run_segment(self, output_emitter: AudioEmitter) -> bool:
+        """Synthesize the next segment of the input, returns False once the input ended"""
+        # only the text that is already pushed is looked up, so a streamed input isn't delayed
+        texts: list[str] = []
+        complete = ended = False
+        async for data in self._input_ch:
+            if isinstance(data, self._FlushSentinel):
+                complete = True
+                break
+
+            texts.append(data)
+            await asyncio.sleep(0)  # let the rest of an input pushed at once arrive
+            if self._input_ch.empty() and not self._input_ch.closed:
+                break
+        else:
+            complete = ended = True
+
+        text = "".join(texts)
+        if complete and not text.strip():
+            return not ended
+
+        key = self._cached_tts._cache_key(text)
+        if complete and (phrase := self._cached_tts._lookup(key)) is not None:
+            output_emitter.start_segment(segment_id=utils.shortuuid())
+            _replay(phrase, output_emitter)
+            output_emitter.end_segment()
+            return not ended
+
+        recorder = _PhraseRecorder()
+        tts_stream = self._cached_tts._wrapped_tts.stream(
+            conn_options=self._wrapped_tts_conn_options
+        )
+
+        async def _forward_input() -> None:
+            nonlocal text, ended
+            tts_stream.push_text(text)
+            if not complete:
+                async for data in self._input_ch:
+                    if isinstance(data, self._FlushSentinel):
+                        break
+                    text += data
+                    tts_stream.push_text(data)
+                else:
+                    ended = True
+
+            tts_stream.end_input()
+
+        forward_task = asyncio.create_task(_forward_input())
+        try:
+            output_emitter.start_segment(segment_id=utils.shortuuid())
+            async with tts_stream:
+                async for ev in tts_stream:
+                    if timed_texts := ev.frame.userdata.get(USERDATA_TIMED_TRANSCRIPT):
+                        output_emitter.push_timed_transcript(timed_texts)
+                    output_emitter.push(recorder.add_audio(ev))
+
+            output_emitter.end_segment()
+            await forward_task
+        finally:
+            await utils.aio.cancel_and_wait(forward_task)
+
+        if complete or self._cached_tts._cache_streamed:
+            await self._cached_tts._store(self._cached_tts._cache_key(text), recorder)
+        return not ended
@@ -3,17 +3,18 @@ from __future__ import annotations
 import asyncio
 import dataclasses
 import time
-from collections.abc import AsyncGenerator, AsyncIterable
-from dataclasses import dataclass
-from typing import Any, Literal, Union
+from collections.abc import AsyncGenerator, AsyncIterable, Awaitable
+from dataclasses import dataclass, field
+from typing import Any, Callable, Literal, Union
 
 from livekit import rtc
 
-from .. import utils
+from .. import telemetry, utils
 from .._exceptions import APIConnectionError
 from ..log import logger
 from ..types import DEFAULT_API_CONNECT_OPTIONS, USERDATA_TIMED_TRANSCRIPT, APIConnectOptions
 from ..utils import aio
+from ..utils.hedging import LatencyHistogram, run_hedged
 from .stream_adapter import StreamAdapter
 from .tts import (
     TTS,
@@ -35,6 +36,11 @@ class _TTSStatus:
     available: bool
     recovering_task: asyncio.Task[None] | None
     resampler: rtc.AudioResampler | None
+    ttfb: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+# the stream of a hedged synthesis, with its first audio frame
+_HedgedSynthesis = tuple[AsyncGenerator[SynthesizedAudio, None], Union[SynthesizedAudio, None]]
 
 
 @dataclass
@@ -56,6 +62,7 @@ class FallbackAdapter(
         *,
         max_retry_per_tts: int = 2,
         sample_rate: int | None = None,
+        hedge_delay: float | None = None,
     ) -> None:
         """
         Initialize a FallbackAdapter that manages multiple TTS instances.
@@ -64,6 +71,7 @@ class FallbackAdapter(
             tts (list[TTS]): A list of TTS instances to use for fallback.
             max_retry_per_tts (int, optional): Maximum number of retries per TTS instance. Defaults to 2.
             sample_rate (int | None, optional): Desired sample rate for the synthesized audio. If None, uses the maximum sample rate among the TTS instances.
+            hedge_delay (float | None, optional): Enables hedged requests. When a TTS hasn't produced audio after its p95 time to first audio (or `hedge_delay` until enough requests were made), the next TTS is started at the same time and the first one to produce audio is kept. The TTS are also tried in the order of their median time to first audio. Only used by `synthesize()`, the streams are ordered by latency but not hedged. Defaults to None (disabled).
 
         Raises:
             ValueError: If less than one TTS instance is provided.
@@ -92,6 +100,7 @@ class FallbackAdapter(
 
         self._tts_instances = tts
         self._max_retry_per_tts = max_retry_per_tts
+        self._hedge_delay = hedge_delay
 
         self._status: list[_TTSStatus] = []
         for t in tts:
@@ -131,6 +140,23 @@ class FallbackAdapter(
     def _on_metrics_collected(self, *args: Any, **kwargs: Any) -> None:
         self.emit("metrics_collected", *args, **kwargs)
 
+    def _ordered_indices(self) -> list[int]:
+        """Index of the TTS in the order to try them, by median ttfb when hedging is enabled"""
+        indices = list(range(len(self._tts_instances)))
+        if self._hedge_delay is not None:
+            indices.sort(key=self._median_ttfb)
+        return indices
+
+    def _median_ttfb(self, idx: int) -> float:
+        median = self._status[idx].ttfb.percentile(50)
+        return median if median is not None else float("inf")
+
+    def _hedge_deadline(self, idx: int) -> float | None:
+        if self._hedge_delay is None:
+            return None
+        p95 = self._status[idx].ttfb.percentile(95)
+        return p95 if p95 is not None else self._hedge_delay
+
     async def aclose(self) -> None:
         for tts_status in self._status:
             if tts_status.recovering_task is not None:
@@ -153,6 +179,9 @@ class FallbackChunkedStream(ChunkedStream):
     async def _try_synthesize(
         self, *, tts: TTS, recovering: bool = False
     ) -> AsyncGenerator[SynthesizedAudio, None]:
+        assert isinstance(self._tts, FallbackAdapter)
+        tts_status = self._tts._status[self._tts._tts_instances.index(tts)]
+        started_at: float | None = time.perf_counter()
         try:
             async with tts.synthesize(
                 self._input_text,
@@ -164,6 +193,9 @@ class FallbackChunkedStream(ChunkedStream):
                 ),
             ) as stream:
                 async for audio in stream:
+                    if started_at is not None:
+                        tts_status.ttfb.add_sample(time.perf_counter() - started_at)
+                        started_at = None
                     yield audio
 
         except Exception as e:
@@ -217,6 +249,10 @@ class FallbackChunkedStream(ChunkedStream):
             mime_type="audio/pcm",
         )
 
+        if self._tts._hedge_delay is not None:
+            await self._run_hedged(output_emitter, all_failed=all_failed, start_time=start_time)
+            return
+
         for i, tts in enumerate(self._tts._tts_instances):
             tts_status = self._tts._status[i]
             if tts_status.available or all_failed:
@@ -257,6 +293,115 @@ class FallbackChunkedStream(ChunkedStream):
             f"all TTSs failed ({[tts.label for tts in self._tts._tts_instances]}) after {time.time() - start_time} seconds"  # noqa: E501
         )
 
+    async def _run_hedged(
+        self, output_emitter: AudioEmitter, *, all_failed: bool, start_time: float
+    ) -> None:
+        assert isinstance(self._tts, FallbackAdapter)
+        adapter = self._tts
+
+        def _attempt(idx: int) -> Callable[[], Awaitable[_HedgedSynthesis]]:
+            async def _first_audio() -> _HedgedSynthesis:
+                stream = self._try_synthesize(tts=adapter._tts_instances[idx], recovering=False)
+                try:
+                    return stream, await stream.__anext__()
+                except StopAsyncIteration:
+                    return stream, None
+                except BaseException:
+                    await stream.aclose()
+                    raise
+
+            return _first_audio
+
+        def _on_error(attempt_idx: int, exc: Exception) -> None:
+            idx = indices[attempt_idx]
+            if adapter._status[idx].available:
+                adapter._status[idx].available = False
+                adapter.emit(
+                    "tts_availability_changed",
+                    AvailabilityChangedEvent(tts=adapter._tts_instances[idx], available=False),
+                )
+
+        async def _on_discard(attempt: _HedgedSynthesis) -> None:
+            await attempt[0].aclose()
+
+        def _on_cut_off(attempt_idx: int, elapsed: float) -> None:
+            # the hedged TTS was slower than the winner, keep it in its p95
+            adapter._status[indices[attempt_idx]].ttfb.add_sample(elapsed)
+
+        indices = [
+            i for i in adapter._ordered_indices() if adapter._status[i].available or all_failed
+        ]
+        try:
+            if not indices:
+                raise APIConnectionError("no TTS available")
+
+            result = await run_hedged(
+                [_attempt(idx) for idx in indices],
+                hedge_delay=lambda attempt_idx: adapter._hedge_deadline(indices[attempt_idx]),
+                on_error=_on_error,
+                on_discard=_on_discard,
+                on_cut_off=_on_cut_off,
+            )
+        except Exception:  # exceptions already logged inside _try_synthesize
+            for tts, tts_status in zip(adapter._tts_instances, adapter._status):
+                if not tts_status.available or all_failed:
+                    self._try_recovery(tts)
+
+            raise APIConnectionError(
+                f"all TTSs failed ({[tts.label for tts in adapter._tts_instances]}) after {time.time() - start_time} seconds"  # noqa: E501
+            ) from None
+
+        for tts, tts_status in zip(adapter._tts_instances, adapter._status):
+            if not tts_status.available:
+                self._try_recovery(tts)
+
+        telemetry.metrics.fallback_request(
+            kind="tts",
+            hedged=result.hedged,
+            latency_saved=(
+                result.latency_saved(adapter._status[indices[0]].ttfb) if result.hedged else None
+            ),
+        )
+
+        idx = indices[result.index]
+        tts, tts_status = adapter._tts_instances[idx], adapter._status[idx]
+        stream, first = result.value
+        resampler = tts_status.resampler
+        try:
+            if first is None:
+                return
+
+            synthesized_audio = first
+            while True:
+                if texts := synthesized_audio.frame.userdata.get(USERDATA_TIMED_TRANSCRIPT):
+                    output_emitter.push_timed_transcript(texts)
+
+                if resampler is not None:
+                    for rf in resampler.push(synthesized_audio.frame):
+                        output_emitter.push(rf.data.tobytes())
+                else:
+                    output_emitter.push(synthesized_audio.frame.data.tobytes())
+
+                try:
+                    synthesized_audio = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+
+            if resampler is not None:
+                for rf in resampler.flush():
+                    output_emitter.push(rf.data.tobytes())
+        except Exception:  # exceptions already logged inside _try_synthesize
+            if tts_status.available:
+                tts_status.available = False
+                adapter.emit(
+                    "tts_availability_changed",
+                    AvailabilityChangedEvent(tts=tts, available=False),
+                )
+
+            logger.warning(f"{tts.label} already synthesized of audio, ignoring fallback")
+        finally:
+            await stream.aclose()
+
 
 class FallbackSynthesizeStream(SynthesizeStream):
     def __init__(self, *, tts: FallbackAdapter, conn_options: APIConnectOptions):
@@ -354,7 +499,8 @@ class FallbackSynthesizeStream(SynthesizeStream):
         input_task = asyncio.create_task(_forward_input_task())
 
         try:
-            for i, tts in enumerate(self._fallback_adapter._tts_instances):
+            for i in self._fallback_adapter._ordered_indices():
+                tts = self._fallback_adapter._tts_instances[i]
                 tts_status = self._fallback_adapter._status[i]
                 if tts_status.available or all_failed:
                     try:
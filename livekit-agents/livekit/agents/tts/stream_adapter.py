@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from collections.abc import AsyncIterable
+from dataclasses import dataclass, field
 from typing import Any
 
-from .. import tokenize, utils
+from livekit import rtc
+
+from .. import telemetry, tokenize, utils
 from ..types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
 from .stream_pacer import SentenceStreamPacer
 from .tts import (
@@ -29,7 +33,20 @@ class StreamAdapter(TTS):
         tts: TTS,
         sentence_tokenizer: NotGivenOr[tokenize.SentenceTokenizer] = NOT_GIVEN,
         text_pacing: SentenceStreamPacer | bool = False,
+        lookahead: int = 0,
     ) -> None:
+        """
+        Args:
+            tts: the non-streaming TTS to wrap
+            sentence_tokenizer: tokenizer used to split the input text into sentences
+            text_pacing: pace the sentences sent to the TTS based on the audio already emitted
+            lookahead: number of following sentences synthesized in parallel while the audio of
+                the current sentence is emitted. The audio is still emitted in order, 0 disables
+                the look-ahead and synthesizes the sentences one after another.
+        """
+        if lookahead < 0:
+            raise ValueError("lookahead must be >= 0")
+
         super().__init__(
             capabilities=TTSCapabilities(streaming=True, aligned_transcript=True),
             sample_rate=tts.sample_rate,
@@ -45,6 +62,7 @@ class StreamAdapter(TTS):
         elif isinstance(text_pacing, SentenceStreamPacer):
             self._stream_pacer = text_pacing
 
+        self._lookahead = lookahead
         self._wrapped_tts.on("metrics_collected", self._on_metrics_collected)
 
     @property
@@ -75,6 +93,15 @@ class StreamAdapter(TTS):
         self._wrapped_tts.off("metrics_collected", self._on_metrics_collected)
 
 
+@dataclass
+class _SentenceSynthesis:
+    text: str
+    task: asyncio.Task[None] | None = None
+    audio_ch: utils.aio.Chan[rtc.AudioFrame] = field(default_factory=utils.aio.Chan)
+    started_at: float = 0.0
+    first_frame_at: float | None = None
+
+
 class StreamAdapterWrapper(SynthesizeStream):
     def __init__(self, *, tts: StreamAdapter, conn_options: APIConnectOptions) -> None:
         super().__init__(tts=tts, conn_options=DEFAULT_STREAM_ADAPTER_API_CONNECT_OPTIONS)
@@ -114,6 +141,76 @@ class StreamAdapterWrapper(SynthesizeStream):
 
             sent_stream.end_input()
 
+        async def _synthesize_sentence(sentence: _SentenceSynthesis) -> None:
+            try:
+                async with self._tts._wrapped_tts.synthesize(
+                    sentence.text.strip(), conn_options=self._wrapped_tts_conn_options
+                ) as tts_stream:
+                    async for audio in tts_stream:
+                        if sentence.first_frame_at is None:
+                            sentence.first_frame_at = time.perf_counter()
+                        sentence.audio_ch.send_nowait(audio.frame)
+            finally:
+                sentence.audio_ch.close()
+
+        async def _synthesize_lookahead() -> None:
+            from ..voice.io import TimedString
+
+            # the synthesis of a sentence is only started once there is room in the look-ahead,
+            # the sentences still waiting are dropped when the stream is closed
+            slots = asyncio.Semaphore(self._tts._lookahead + 1)
+            sentences_ch = utils.aio.Chan[_SentenceSynthesis]()
+
+            async def _start_sentences() -> None:
+                async for ev in sent_stream:
+                    sentence = _SentenceSynthesis(text=ev.token)
+                    if ev.token.strip():
+                        await slots.acquire()
+                        sentence.started_at = time.perf_counter()
+                        sentence.task = asyncio.create_task(
+                            _synthesize_sentence(sentence), name="StreamAdapter.synthesize"
+                        )
+                    sentences_ch.send_nowait(sentence)
+
+                sentences_ch.close()
+
+            start_atask = asyncio.create_task(_start_sentences())
+            current: _SentenceSynthesis | None = None
+            try:
+                duration = 0.0
+                prev_done_at: float | None = None
+                async for sentence in sentences_ch:
+                    current = sentence
+                    output_emitter.push_timed_transcript(
+                        TimedString(text=sentence.text, start_time=duration)
+                    )
+                    if sentence.task is None:
+                        continue
+
+                    async for frame in sentence.audio_ch:
+                        output_emitter.push(frame.data.tobytes())
+                        duration += frame.duration
+
+                    await sentence.task  # raise the synthesis error in order
+                    output_emitter.flush()
+                    slots.release()
+
+                    if prev_done_at is not None and sentence.first_frame_at is not None:
+                        # without look-ahead, the gap would have been the whole ttfb
+                        gap = max(0.0, sentence.first_frame_at - prev_done_at)
+                        ttfb = sentence.first_frame_at - sentence.started_at
+                        telemetry.metrics.tts_sentence_gap(gap=gap, saved=max(0.0, ttfb - gap))
+
+                    prev_done_at = time.perf_counter()
+
+                await start_atask
+            finally:
+                await utils.aio.cancel_and_wait(start_atask)
+                pending = [current] if current is not None else []
+                while not sentences_ch.empty():
+                    pending.append(sentences_ch.recv_nowait())
+                await utils.aio.cancel_and_wait(*(s.task for s in pending if s.task is not None))
+
         async def _synthesize() -> None:
             from ..voice.io import TimedString
 
@@ -136,7 +233,9 @@ class StreamAdapterWrapper(SynthesizeStream):
 
         tasks = [
             asyncio.create_task(_forward_input()),
-            asyncio.create_task(_synthesize()),
+            asyncio.create_task(
+                _synthesize_lookahead() if self._tts._lookahead > 0 else _synthesize()
+            ),
         ]
         try:
             await asyncio.gather(*tasks)
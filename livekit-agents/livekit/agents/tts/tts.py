@@ -625,8 +625,17 @@ class AudioEmitter:
         num_channels: int,
         mime_type: str,
         frame_size_ms: int = 200,
+        max_frame_size_ms: int | None = None,
         stream: bool = False,
     ) -> None:
+        """
+        Args:
+            frame_size_ms: size of the emitted audio frames
+            max_frame_size_ms: when set, the audio that is already available is emitted in
+                contiguous frames of up to this size (a multiple of ``frame_size_ms``) instead
+                of one frame per ``frame_size_ms``. This reduces the per-frame overhead for fast
+                TTS providers, the audio output still slices the frames before playout.
+        """
         if self._started:
             raise RuntimeError("AudioEmitter already started")
 
@@ -644,6 +653,7 @@ class AudioEmitter:
         self._started = True
         self._request_id = request_id
         self._frame_size_ms = frame_size_ms
+        self._merge_frames = max(1, (max_frame_size_ms or frame_size_ms) // frame_size_ms)
         self._sample_rate = sample_rate
         self._num_channels = num_channels
         self._streaming = stream
@@ -765,30 +775,48 @@ class AudioEmitter:
         debug_frames: list[rtc.AudioFrame] = []
         timed_transcripts: list[TimedString] = []
 
+        # a single timer per segment, only re-armed when it fires before the deadline
         flush_timer: asyncio.TimerHandle | None = None
+        flush_deadline: float | None = None
         sent_start: float | None = None
         sent_duration: float = 0.0
         event_loop = asyncio.get_event_loop()
 
+        def _on_flush_timer() -> None:
+            nonlocal flush_timer, flush_deadline
+            flush_timer = None
+            if flush_deadline is None:
+                return
+
+            if flush_deadline > event_loop.time():
+                flush_timer = event_loop.call_at(flush_deadline, _on_flush_timer)
+                return
+
+            flush_deadline = None
+            self.flush()
+            logger.debug("flush audio emitter due to slow audio generation")
+
         def _send_audio(ev: SynthesizedAudio, *, flush_if_delayed: bool = False) -> None:
-            nonlocal sent_start, sent_duration, flush_timer
+            nonlocal sent_start, sent_duration, flush_timer, flush_deadline
 
             self._dst_ch.send_nowait(ev)
             if sent_start is None:
                 sent_start = event_loop.time()
             sent_duration += ev.frame.duration
 
-            if flush_timer is not None:
-                flush_timer.cancel()
-
-            def _flush() -> None:
-                self.flush()
-                logger.debug("flush audio emitter due to slow audio generation")
+            if not flush_if_delayed:
+                flush_deadline = None
+                if flush_timer is not None:
+                    flush_timer.cancel()
+                    flush_timer = None
+                return
 
-            if flush_if_delayed:
-                # force flush the buffer if the audio comes slower than realtime
-                delay = sent_duration - (event_loop.time() - sent_start) - 0.02
-                flush_timer = event_loop.call_later(delay, _flush)
+            # force flush the buffer if the audio comes slower than realtime
+            flush_deadline = sent_start + sent_duration - 0.02
+            if flush_timer is None or flush_deadline < flush_timer.when():
+                if flush_timer is not None:
+                    flush_timer.cancel()
+                flush_timer = event_loop.call_at(flush_deadline, _on_flush_timer)
 
         def _emit_frame(frame: rtc.AudioFrame | None = None, *, is_final: bool = False) -> None:
             nonlocal last_frame, segment_ctx, timed_transcripts
@@ -848,9 +876,36 @@ class AudioEmitter:
 
             last_frame = frame
 
+        def _emit_frames(frames: list[rtc.AudioFrame]) -> None:
+            if self._merge_frames > 1 and frames:
+                # split the last merged frame so only a single frame is held back
+                last = frames[-1]
+                frame_samples = int(last.sample_rate // 1000 * self._frame_size_ms)
+                if last.samples_per_channel > frame_samples:
+                    head_samples = last.samples_per_channel - frame_samples
+                    data = last.data.cast("B")
+                    split = head_samples * last.num_channels * 2
+                    frames[-1:] = [
+                        rtc.AudioFrame(
+                            data=data[:split],
+                            sample_rate=last.sample_rate,
+                            num_channels=last.num_channels,
+                            samples_per_channel=head_samples,
+                        ),
+                        rtc.AudioFrame(
+                            data=data[split:],
+                            sample_rate=last.sample_rate,
+                            num_channels=last.num_channels,
+                            samples_per_channel=frame_samples,
+                        ),
+                    ]
+
+            for f in frames:
+                _emit_frame(f)
+
         def _flush_frame() -> None:
             nonlocal last_frame, segment_ctx, timed_transcripts
-            nonlocal flush_timer, sent_start, sent_duration
+            nonlocal flush_timer, flush_deadline, sent_start, sent_duration
             assert segment_ctx is not None
 
             if last_frame is None:
@@ -877,6 +932,7 @@ class AudioEmitter:
             # reset sent duration after flush
             sent_start = None
             sent_duration = 0.0
+            flush_deadline = None
             if flush_timer is not None:
                 flush_timer.cancel()
                 flush_timer = None
@@ -913,8 +969,7 @@ class AudioEmitter:
                         num_channels=frame.num_channels,
                         samples_per_channel=int(frame.sample_rate // 1000 * self._frame_size_ms),
                     )
-                for f in audio_byte_stream.push(frame.data):
-                    _emit_frame(f)
+                _emit_frames(audio_byte_stream.push(frame.data, merge_frames=self._merge_frames))
 
             if audio_byte_stream:
                 for f in audio_byte_stream.flush():
@@ -922,9 +977,35 @@ class AudioEmitter:
 
             await audio_decoder.aclose()
 
+        async def _recv_coalesced() -> AsyncIterator[
+            bytes
+            | AudioEmitter._FlushSegment
+            | AudioEmitter._StartSegment
+            | AudioEmitter._EndSegment
+            | TimedString
+        ]:
+            # consecutive pushes that are already queued are handled as a single push
+            async for data in self._write_ch:
+                if not isinstance(data, bytes):
+                    yield data
+                    continue
+
+                chunks = [data]
+                pending = None
+                while not self._write_ch.empty():
+                    pending = self._write_ch.recv_nowait()
+                    if not isinstance(pending, bytes):
+                        break
+                    chunks.append(pending)
+                    pending = None
+
+                yield b"".join(chunks) if len(chunks) > 1 else data
+                if pending is not None:
+                    yield pending
+
         audio_byte_stream: audio.AudioByteStream | None = None
         try:
-            async for data in self._write_ch:
+            async for data in _recv_coalesced():
                 if isinstance(data, TimedString):
                     timed_transcripts.append(data)
                     continue
@@ -959,8 +1040,7 @@ class AudioEmitter:
                                 ),
                             )
 
-                        for f in audio_byte_stream.push(data):
-                            _emit_frame(f)
+                        _emit_frames(audio_byte_stream.push(data, merge_frames=self._merge_frames))
                     elif audio_byte_stream:
                         if isinstance(data, AudioEmitter._FlushSegment):
                             for f in audio_byte_stream.flush():
@@ -9,6 +9,7 @@ from .log import log_exceptions
 from .misc import is_given, nodename, shortuuid, time_ms
 from .moving_average import MovingAverage
 from .participant import wait_for_participant, wait_for_track_publication
+from .ws_multiplexer import MultiplexedContext, WebSocketMultiplexer
 
 EventEmitter = rtc.EventEmitter
 
@@ -33,6 +34,8 @@ __all__ = [
     "hw",
     "is_given",
     "ConnectionPool",
+    "WebSocketMultiplexer",
+    "MultiplexedContext",
     "wait_for_participant",
     "wait_for_track_publication",
 ]
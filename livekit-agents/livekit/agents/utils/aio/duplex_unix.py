@@ -11,6 +11,9 @@ class DuplexClosed(Exception):
     pass
 
 
+_FRAME_HEADER = struct.Struct("!I")
+
+
 class _AsyncDuplex:
     def __init__(
         self,
@@ -19,10 +22,13 @@ class _AsyncDuplex:
         writer: asyncio.StreamWriter,
         loop: asyncio.AbstractEventLoop | None = None,
     ) -> None:
-        self._loop = loop
+        self._loop = loop or asyncio.get_event_loop()
         self._sock = sock
         self._reader = reader
         self._writer = writer
+        # frames written during the same loop iteration are sent together
+        self._wbuf = bytearray()
+        self._flush_handle: asyncio.Handle | None = None
 
     @staticmethod
     async def open(sock: socket.socket) -> _AsyncDuplex:
@@ -32,8 +38,8 @@ class _AsyncDuplex:
 
     async def recv_bytes(self) -> bytes:
         try:
-            len_bytes = await self._reader.readexactly(4)
-            len = struct.unpack("!I", len_bytes)[0]
+            len_bytes = await self._reader.readexactly(_FRAME_HEADER.size)
+            len = _FRAME_HEADER.unpack_from(len_bytes)[0]
             return await self._reader.readexactly(len)
         except (
             OSError,
@@ -42,16 +48,54 @@ class _AsyncDuplex:
         ) as e:
             raise DuplexClosed() from e
 
-    async def send_bytes(self, data: bytes) -> None:
+    def write_frame(self, frame: bytes | bytearray | memoryview) -> None:
+        """Write a frame that already starts with its length header.
+
+        The first frame of a loop iteration is written right away, the next ones are queued and
+        sent together with a single write. Use `drain` to wait for the flow control."""
+        if self._writer.is_closing():
+            raise DuplexClosed()
+
+        if self._flush_handle is None:
+            # the transport may keep a reference to the data it couldn't send yet
+            self._writer.write(bytes(frame))
+            self._flush_handle = self._loop.call_soon(self._flush)
+        else:
+            self._wbuf += frame
+
+    async def drain(self) -> None:
+        if self._flush_handle is not None and self._wbuf:
+            # the queued frames must count toward the flow control, send them once they would
+            # pause the writes (smaller ones are still coalesced by the pending flush)
+            transport = self._writer.transport
+            high_water = transport.get_write_buffer_limits()[1]
+            if len(self._wbuf) + transport.get_write_buffer_size() >= high_water:
+                self._flush_handle.cancel()
+                self._flush()
+
         try:
-            len_bytes = struct.pack("!I", len(data))
-            self._writer.write(len_bytes)
-            self._writer.write(data)
             await self._writer.drain()
         except OSError as e:
             raise DuplexClosed() from e
 
+    async def send_bytes(self, data: bytes) -> None:
+        self.write_frame(_FRAME_HEADER.pack(len(data)) + data)
+        await self.drain()
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        if not self._wbuf or self._writer.is_closing():
+            return
+
+        # the transport may keep a reference to the buffer, use a new one for the next frames
+        data, self._wbuf = self._wbuf, bytearray()
+        self._writer.write(data)
+
     async def aclose(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush()
+
         try:
             self._writer.close()
             await self._writer.wait_closed()
@@ -61,12 +105,22 @@ class _AsyncDuplex:
 
 
 def _read_exactly(sock: socket.socket, num_bytes: int) -> bytes:
-    data = bytearray()
-    while len(data) < num_bytes:
-        packet = sock.recv(num_bytes - len(data))
-        if not packet:
+    # most messages are received with a single recv, avoid the intermediate buffer for them
+    packet = sock.recv(num_bytes)
+    if len(packet) == num_bytes:
+        return packet
+    if not packet:
+        raise EOFError()
+
+    data = bytearray(num_bytes)
+    view = memoryview(data)
+    view[: len(packet)] = packet
+    pos = len(packet)
+    while pos < num_bytes:
+        n = sock.recv_into(view[pos:])
+        if n == 0:
             raise EOFError()
-        data.extend(packet)
+        pos += n
     return bytes(data)
 
 
@@ -83,20 +137,28 @@ class _Duplex:
             raise DuplexClosed()
 
         try:
-            len_bytes = _read_exactly(self._sock, 4)
-            len = struct.unpack("!I", len_bytes)[0]
+            len_bytes = _read_exactly(self._sock, _FRAME_HEADER.size)
+            len = _FRAME_HEADER.unpack_from(len_bytes)[0]
             return _read_exactly(self._sock, len)
         except (OSError, EOFError) as e:
             raise DuplexClosed() from e
 
+    def send_frame(self, frame: bytes | bytearray | memoryview) -> None:
+        """Send a frame that already starts with its length header"""
+        if self._sock is None:
+            raise DuplexClosed()
+
+        try:
+            self._sock.sendall(frame)
+        except OSError as e:
+            raise DuplexClosed() from e
+
     def send_bytes(self, data: bytes) -> None:
         if self._sock is None:
             raise DuplexClosed()
 
         try:
-            len_bytes = struct.pack("!I", len(data))
-            self._sock.sendall(len_bytes)
-            self._sock.sendall(data)
+            _sendmsg_all(self._sock, [_FRAME_HEADER.pack(len(data)), data])
         except OSError as e:
             raise DuplexClosed() from e
 
@@ -115,3 +177,20 @@ class _Duplex:
                 self._sock = None
         except OSError as e:
             raise DuplexClosed() from e
+
+
+def _sendmsg_all(sock: socket.socket, buffers: list[bytes]) -> None:
+    if not hasattr(sock, "sendmsg"):  # not available on Windows
+        sock.sendall(b"".join(buffers))
+        return
+
+    # header and payload are sent with a single syscall, without concatenating them
+    views = [memoryview(b) for b in buffers if b]
+    while views:
+        sent = sock.sendmsg(views)
+        while sent:
+            if sent >= len(views[0]):
+                sent -= len(views.pop(0))
+            else:
+                views[0] = views[0][sent:]
+                sent = 0
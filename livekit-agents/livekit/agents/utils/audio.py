@@ -78,14 +78,24 @@ class AudioByteStream:
 
         self._bytes_per_sample = num_channels * ctypes.sizeof(ctypes.c_int16)
         self._bytes_per_frame = samples_per_channel * self._bytes_per_sample
-        self._buf = bytearray()
 
-    def push(self, data: bytes | memoryview) -> list[rtc.AudioFrame]:
+        # preallocated buffer with read/write offsets, frames are emitted as memoryview slices.
+        # the capacity is always bigger than a frame so rtc.AudioFrame never keeps a reference
+        # to the whole buffer (a sliced view is materialized into its own bytearray)
+        self._buf = bytearray(2 * max(self._bytes_per_frame, self._bytes_per_sample))
+        self._view = memoryview(self._buf)
+        self._rpos = 0
+        self._wpos = 0
+
+    def push(self, data: bytes | memoryview, *, merge_frames: int = 1) -> list[rtc.AudioFrame]:
         """
         Add audio data to the buffer and retrieve fixed-size frames.
 
         Parameters:
             data (bytes): The incoming audio data to buffer.
+            merge_frames (int, optional): Up to `merge_frames` consecutive complete frames are
+                returned as a single contiguous `AudioFrame`, so a large push doesn't pay the
+                per-frame overhead for every fixed-size frame. Defaults to 1.
 
         Returns:
             list[rtc.AudioFrame]: A list of `AudioFrame` objects of fixed size.
@@ -99,21 +109,34 @@ class AudioByteStream:
         (e.g., from a stream or file) and receive back a list of
         fixed-size audio frames ready for processing or transmission.
         """
-        self._buf.extend(data)
+        with memoryview(data) as data_view:
+            size = data_view.nbytes
+            self._reserve(size)
+            self._view[self._wpos : self._wpos + size] = data_view.cast("B")
+            self._wpos += size
 
         frames = []
-        while len(self._buf) >= self._bytes_per_frame:
-            frame_data = self._buf[: self._bytes_per_frame]
-            self._buf = self._buf[self._bytes_per_frame :]
+        samples_per_channel = self._bytes_per_frame // self._bytes_per_sample
+        while (available := (self._wpos - self._rpos) // self._bytes_per_frame) > 0:
+            n = min(available, max(merge_frames, 1))
+            size = n * self._bytes_per_frame
+            chunk: memoryview | bytearray = self._view[self._rpos : self._rpos + size]
+            if size == len(self._buf):
+                # a view of the whole buffer wouldn't be materialized by rtc.AudioFrame
+                chunk = bytearray(chunk)
 
             frames.append(
                 rtc.AudioFrame(
-                    data=frame_data,
+                    data=chunk,
                     sample_rate=self._sample_rate,
                     num_channels=self._num_channels,
-                    samples_per_channel=len(frame_data) // self._bytes_per_sample,
+                    samples_per_channel=n * samples_per_channel,
                 )
             )
+            self._rpos += size
+
+        if self._rpos == self._wpos:
+            self._rpos = self._wpos = 0
 
         return frames
 
@@ -135,26 +158,45 @@ class AudioByteStream:
         Use this method when you have no more data to push and want to ensure
         that all buffered audio data has been processed.
         """
-        if len(self._buf) == 0:
+        remaining = self._wpos - self._rpos
+        if remaining == 0:
             return []
 
-        if len(self._buf) % (2 * self._num_channels) != 0:
+        if remaining % self._bytes_per_sample != 0:
             logger.warning("AudioByteStream: incomplete frame during flush, dropping")
+            self.clear()
             return []
 
         frames = [
             rtc.AudioFrame(
-                data=self._buf.copy(),
+                data=bytearray(self._view[self._rpos : self._wpos]),
                 sample_rate=self._sample_rate,
                 num_channels=self._num_channels,
-                samples_per_channel=len(self._buf) // 2,
+                samples_per_channel=remaining // self._bytes_per_sample,
             )
         ]
-        self._buf.clear()
+        self.clear()
         return frames
 
     def clear(self) -> None:
-        self._buf.clear()
+        self._rpos = self._wpos = 0
+
+    def _reserve(self, size: int) -> None:
+        """Make room for `size` more bytes, compacting or growing the buffer if needed."""
+        if self._wpos + size <= len(self._buf):
+            return
+
+        unread = self._wpos - self._rpos
+        if unread + size < len(self._buf):
+            # memoryview assignment handles overlapping regions
+            self._view[:unread] = self._view[self._rpos : self._wpos]
+        else:
+            capacity = max(2 * len(self._buf), unread + size + self._bytes_per_frame)
+            buf = bytearray(capacity)
+            buf[:unread] = self._view[self._rpos : self._wpos]
+            self._buf, self._view = buf, memoryview(buf)
+
+        self._rpos, self._wpos = 0, unread
 
 
 async def audio_frames_from_file(
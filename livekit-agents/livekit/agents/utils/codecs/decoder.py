@@ -15,9 +15,9 @@
 from __future__ import annotations
 
 import asyncio
-import io
 import struct
 import threading
+from collections import deque
 from collections.abc import AsyncIterator
 from concurrent.futures import ThreadPoolExecutor
 from typing import cast
@@ -66,45 +66,67 @@ class StreamBuffer:
     """
     A thread-safe buffer that behaves like an IO stream.
     Allows writing from one thread and reading from another.
+
+    Written chunks are kept in a list and consumed with a read offset, so reads only cost
+    the number of bytes returned (the unread data is never copied).
     """
 
     def __init__(self) -> None:
-        self._buffer = io.BytesIO()
+        self._chunks: deque[bytes] = deque()
+        self._offset = 0  # read position inside the first chunk
+        self._size = 0  # number of unread bytes
         self._lock = threading.Lock()
         self._data_available = threading.Condition(self._lock)
         self._eof = False
+        self._closed = False
 
     def write(self, data: bytes) -> None:
         """Write data to the buffer from a writer thread."""
+        if not data:
+            return
+
         with self._data_available:
-            self._buffer.seek(0, io.SEEK_END)
-            self._buffer.write(data)
+            self._chunks.append(bytes(data))
+            self._size += len(data)
             self._data_available.notify_all()
 
+    def readable(self) -> bool:
+        return True
+
     def read(self, size: int = -1) -> bytes:
         """Read data from the buffer in a reader thread."""
+        with self._data_available:
+            if not self._wait_for_data():
+                return b""
 
-        if self._buffer.closed:
-            return b""
+            if size < 0 or size > self._size:
+                size = self._size
 
-        with self._data_available:
-            while True:
-                if self._buffer.closed:
-                    return b""
-                # always read from beginning
-                self._buffer.seek(0)
-                data = self._buffer.read(size)
+            first = self._chunks[0]
+            if self._offset == 0 and len(first) == size:
+                self._consume(size)
+                return first
+
+            if len(first) - self._offset >= size:
+                data = first[self._offset : self._offset + size]
+                self._consume(size)
+                return data
 
-                if data:
-                    # shrink the buffer to remove already-read data
-                    remaining = self._buffer.read()
-                    self._buffer = io.BytesIO(remaining)
-                    return data
+            out = bytearray(size)
+            self._copy_into(memoryview(out))
+            return bytes(out)
 
-                if self._eof:
-                    return b""
+    def readinto(self, b: bytearray | memoryview) -> int:
+        """Read data directly into a pre-allocated, writable buffer.
+
+        Returns the number of bytes written, 0 on EOF."""
+        with self._data_available:
+            if not self._wait_for_data():
+                return 0
 
-                self._data_available.wait()
+            with memoryview(b) as view:
+                view = view.cast("B")
+                return self._copy_into(view[: min(len(view), self._size)])
 
     def end_input(self) -> None:
         """Signal that no more data will be written."""
@@ -113,7 +135,45 @@ class StreamBuffer:
             self._data_available.notify_all()
 
     def close(self) -> None:
-        self._buffer.close()
+        with self._data_available:
+            self._closed = True
+            self._chunks.clear()
+            self._offset = self._size = 0
+            self._data_available.notify_all()
+
+    def _wait_for_data(self) -> bool:
+        """Must be called with the lock held, returns False on EOF or when closed."""
+        while True:
+            if self._closed:
+                return False
+
+            if self._size > 0:
+                return True
+
+            if self._eof:
+                return False
+
+            self._data_available.wait()
+
+    def _copy_into(self, view: memoryview) -> int:
+        """Copy len(view) bytes (that must be available) into view"""
+        written = 0
+        while written < len(view):
+            first = self._chunks[0]
+            n = min(len(first) - self._offset, len(view) - written)
+            with memoryview(first) as src:
+                view[written : written + n] = src[self._offset : self._offset + n]
+            written += n
+            self._consume(n)
+
+        return written
+
+    def _consume(self, n: int) -> None:
+        self._offset += n
+        self._size -= n
+        if self._offset == len(self._chunks[0]):
+            self._chunks.popleft()
+            self._offset = 0
 
 
 class AudioStreamDecoder:
@@ -3,18 +3,42 @@ import time
 import weakref
 from collections.abc import AsyncGenerator, Awaitable
 from contextlib import asynccontextmanager
-from typing import Callable, Generic, Optional, TypeVar
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Optional, TypeVar
 
+from ..log import logger
 from . import aio
 
 T = TypeVar("T")
 
 
+@dataclass
+class ConnectionPoolStats:
+    gets: int = 0
+    reused: int = 0
+    connects: int = 0
+    failed_connects: int = 0
+    failed_health_checks: int = 0
+    refreshed: int = 0
+    wait_time: float = 0.0  # total time spent in get()
+    connect_time: float = 0.0  # total time spent connecting
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused / self.gets if self.gets else 0.0
+
+
 class ConnectionPool(Generic[T]):
     """Helper class to manage persistent connections like websockets.
 
     Handles connection pooling and reconnection after max duration.
     Can be used as an async context manager to automatically return connections to the pool.
+
+    Concurrent get() calls connect in parallel (up to `max_concurrent_connects`). When `min_idle`
+    or `health_check_cb` is set, a background task starts once the pool is used or prewarmed. It
+    keeps `min_idle` connections ready, replaces them `refresh_margin` seconds before they reach
+    `max_session_duration`, and probes the idle connections with `health_check_cb`. The idle
+    connections beyond `min_idle` are closed when they expire, without being replaced.
     """
 
     def __init__(
@@ -25,6 +49,12 @@ class ConnectionPool(Generic[T]):
         connect_cb: Optional[Callable[[float], Awaitable[T]]] = None,
         close_cb: Optional[Callable[[T], Awaitable[None]]] = None,
         connect_timeout: float = 10.0,
+        min_idle: int = 0,
+        max_concurrent_connects: int = 4,
+        refresh_margin: float = 10.0,
+        health_check_cb: Optional[Callable[[T], Awaitable[bool]]] = None,
+        health_check_interval: float = 30.0,
+        label: str = "default",
     ) -> None:
         """Initialize the connection wrapper.
 
@@ -33,6 +63,13 @@ class ConnectionPool(Generic[T]):
             mark_refreshed_on_get: If True, the session will be marked as fresh when get() is called. only used when max_session_duration is set.
             connect_cb: Optional async callback to create new connections
             close_cb: Optional async callback to close connections
+            connect_timeout: Timeout of the connections created in the background
+            min_idle: Number of idle connections kept ready in the background
+            max_concurrent_connects: Maximum number of connections being created at the same time
+            refresh_margin: The min_idle connections are replaced this many seconds before they expire
+            health_check_cb: Optional async liveness probe of the idle connections, the connections are removed when it returns False or raises
+            health_check_interval: Interval in seconds between two probes of an idle connection
+            label: Name of the pool in the reported metrics
         """  # noqa: E501
         self._max_session_duration = max_session_duration
         self._mark_refreshed_on_get = mark_refreshed_on_get
@@ -41,12 +78,31 @@ class ConnectionPool(Generic[T]):
         self._connections: dict[T, float] = {}  # conn -> connected_at timestamp
         self._available: set[T] = set()
         self._connect_timeout = connect_timeout
-        self._connect_lock = asyncio.Lock()
+        self._min_idle = min_idle
+        self._refresh_margin = refresh_margin
+        self._health_check_cb = health_check_cb
+        self._health_check_interval = health_check_interval
+        self._label = label
+        self._connect_sem = asyncio.Semaphore(max_concurrent_connects)
+        self._connecting = 0  # connections being created in the background
+        self._checked_at: dict[T, float] = {}  # conn -> last health check timestamp
+        self._probing: set[T] = set()
+        self._refreshing: set[T] = set()
 
         # store connections to be reaped (closed) later.
         self._to_close: set[T] = set()
 
         self._prewarm_task: Optional[weakref.ref[asyncio.Task[None]]] = None
+        self._upkeep_atask: Optional[asyncio.Task[None]] = None
+        self._upkeep_ev = asyncio.Event()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._close_tasks: set[asyncio.Task[None]] = set()
+        self._closed = False
+        self._stats = ConnectionPoolStats()
+
+    @property
+    def stats(self) -> ConnectionPoolStats:
+        return self._stats
 
     async def _connect(self, timeout: float) -> T:
         """Create a new connection.
@@ -59,15 +115,29 @@ class ConnectionPool(Generic[T]):
         """
         if self._connect_cb is None:
             raise NotImplementedError("Must provide connect_cb or implement connect()")
-        connection = await self._connect_cb(timeout)
+
+        from ..telemetry import metrics  # telemetry imports utils
+
+        start = time.perf_counter()
+        try:
+            connection = await self._connect_cb(timeout)
+        except Exception:
+            self._stats.failed_connects += 1
+            raise
+
+        elapsed = time.perf_counter() - start
+        self._stats.connects += 1
+        self._stats.connect_time += elapsed
+        metrics.connection_pool_connected(pool=self._label, elapsed=elapsed)
+
         self._connections[connection] = time.time()
         return connection
 
     async def _drain_to_close(self) -> None:
         """Drain and close all the connections queued for closing."""
-        for conn in list(self._to_close):
+        to_close, self._to_close = self._to_close, set()
+        for conn in to_close:
             await self._maybe_close_connection(conn)
-        self._to_close.clear()
 
     @asynccontextmanager
     async def connection(self, *, timeout: float) -> AsyncGenerator[T, None]:
@@ -91,24 +161,48 @@ class ConnectionPool(Generic[T]):
         Returns:
             An active connection object
         """
-        async with self._connect_lock:
-            await self._drain_to_close()
-            now = time.time()
+        from ..telemetry import metrics  # telemetry imports utils
+
+        start = time.perf_counter()
+        self._close_later()
+        self._ensure_upkeep()
+
+        conn, reused = self._pop_available(), True
+        if conn is None:
+            async with self._connect_sem:
+                # a background connection may have been made while waiting
+                if (conn := self._pop_available()) is None:
+                    conn, reused = await self._connect(timeout), False
+
+        wait = time.perf_counter() - start
+        self._stats.gets += 1
+        self._stats.reused += reused
+        self._stats.wait_time += wait
+        metrics.connection_pool_get(pool=self._label, reused=reused, wait=wait)
+
+        # wake up the upkeep task to replace the connection when min_idle is set
+        self._upkeep_ev.set()
+        return conn
+
+    def _pop_available(self) -> Optional[T]:
+        """Pop an available connection that hasn't expired."""
+        now = time.time()
+        while self._available:
+            conn = self._available.pop()
+            if not self._expired(conn, now):
+                if self._mark_refreshed_on_get:
+                    self._connections[conn] = now
+                return conn
+            # connection expired; mark it for resetting.
+            self.remove(conn)
 
-            # try to reuse an available connection that hasn't expired
-            while self._available:
-                conn = self._available.pop()
-                if (
-                    self._max_session_duration is None
-                    or now - self._connections[conn] <= self._max_session_duration
-                ):
-                    if self._mark_refreshed_on_get:
-                        self._connections[conn] = now
-                    return conn
-                # connection expired; mark it for resetting.
-                self.remove(conn)
-
-            return await self._connect(timeout)
+        return None
+
+    def _expired(self, conn: T, now: float) -> bool:
+        return (
+            self._max_session_duration is not None
+            and now - self._connections[conn] > self._max_session_duration
+        )
 
     def put(self, conn: T) -> None:
         """Mark a connection as available for reuse.
@@ -120,6 +214,7 @@ class ConnectionPool(Generic[T]):
         """
         if conn in self._connections:
             self._available.add(conn)
+            self._upkeep_ev.set()
 
     async def _maybe_close_connection(self, conn: T) -> None:
         """Close a connection if close_cb is provided.
@@ -139,9 +234,11 @@ class ConnectionPool(Generic[T]):
             conn: The connection to reset
         """
         self._available.discard(conn)
+        self._checked_at.pop(conn, None)
         if conn in self._connections:
             self._to_close.add(conn)
             self._connections.pop(conn, None)
+            self._upkeep_ev.set()
 
     def invalidate(self) -> None:
         """Clear all existing connections.
@@ -152,31 +249,168 @@ class ConnectionPool(Generic[T]):
             self._to_close.add(conn)
         self._connections.clear()
         self._available.clear()
+        self._checked_at.clear()
 
     def prewarm(self) -> None:
         """Initiate prewarming of the connection pool without blocking.
 
-        This method starts a background task that creates a new connection if none exist.
-        The task automatically cleans itself up when the connection pool is closed.
+        This method starts a background task that creates a new connection if none exist (or
+        `min_idle` connections). The task automatically cleans itself up when the connection
+        pool is closed.
         """
-        if self._prewarm_task is not None or self._connections:
-            return
+        self._ensure_upkeep()
+        if self._prewarm_task is not None or self._connections or self._min_idle > 0:
+            return  # the upkeep task creates the min_idle connections
 
         async def _prewarm_impl() -> None:
-            async with self._connect_lock:
+            async with self._connect_sem:
                 if not self._connections:
                     conn = await self._connect(timeout=self._connect_timeout)
-                    self._available.add(conn)
+                    self.put(conn)
 
         task = asyncio.create_task(_prewarm_impl())
         self._prewarm_task = weakref.ref(task)
 
+    def _close_later(self) -> None:
+        """Close the connections queued for closing without blocking the caller."""
+        if not self._to_close:
+            return
+
+        task = asyncio.create_task(self._drain_to_close())
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
+
+    def _ensure_upkeep(self) -> None:
+        if self._upkeep_atask is not None or self._closed:
+            return
+
+        # an idle pool without min_idle doesn't reconnect in the background
+        if self._min_idle <= 0 and self._health_check_cb is None:
+            return
+
+        self._upkeep_atask = asyncio.create_task(self._upkeep_task())
+
+    async def _refill(self) -> bool:
+        # _connecting is incremented by the caller, before the task starts
+        try:
+            async with self._connect_sem:
+                conn = await self._connect(self._connect_timeout)
+                self._available.add(conn)
+                return True
+        except Exception:
+            logger.warning("failed to create a connection in the background", exc_info=True)
+            await asyncio.sleep(1.0)  # don't retry in a loop if the server is unreachable
+            return False
+        finally:
+            self._connecting -= 1
+            self._upkeep_ev.set()
+
+    async def _refresh(self, conn: T) -> None:
+        # connect before retiring the old connection, it is still usable in the meantime
+        self._connecting += 1
+        try:
+            refilled = await self._refill()
+        finally:
+            self._refreshing.discard(conn)
+
+        # keep the old connection until it expires if the new one couldn't be created
+        if refilled and conn in self._available:
+            self._stats.refreshed += 1
+            self.remove(conn)
+            self._close_later()
+
+    async def _health_check(self, conn: T) -> None:
+        assert self._health_check_cb is not None
+        try:
+            healthy = await self._health_check_cb(conn)
+        except Exception:
+            healthy = False
+        finally:
+            self._probing.discard(conn)
+
+        if not healthy:
+            self._stats.failed_health_checks += 1
+            logger.debug("removing an unhealthy connection from the pool")
+            self.remove(conn)
+            self._close_later()
+        elif conn in self._connections:
+            self._checked_at[conn] = time.time()
+            self._available.add(conn)
+            self._upkeep_ev.set()
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        task: asyncio.Task[Any] = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _upkeep_task(self) -> None:
+        refresh_margin = self._refresh_margin
+        if self._max_session_duration is not None:
+            refresh_margin = min(refresh_margin, self._max_session_duration / 2)
+
+        while not self._closed:
+            self._upkeep_ev.clear()
+            now = time.time()
+            next_check: Optional[float] = None
+
+            # only the newest min_idle connections are refreshed, the others expire
+            newest = sorted(self._available, key=self._connections.__getitem__, reverse=True)
+            for i, conn in enumerate(newest):
+                if self._max_session_duration is not None:
+                    expires_at = self._connections[conn] + self._max_session_duration
+                    if now >= expires_at:
+                        self.remove(conn)
+                        self._close_later()
+                        continue
+
+                    refresh_at = expires_at - refresh_margin
+                    if i >= self._min_idle or conn in self._refreshing:
+                        next_check = min(next_check or expires_at, expires_at)
+                    elif now >= refresh_at:
+                        self._refreshing.add(conn)
+                        self._spawn(self._refresh(conn))
+                        continue
+                    else:
+                        next_check = min(next_check or refresh_at, refresh_at)
+
+                if self._health_check_cb is not None:
+                    probe_at = self._checked_at.setdefault(conn, now) + self._health_check_interval
+                    if now >= probe_at:
+                        # don't hand out the connection while it's being probed
+                        self._available.discard(conn)
+                        self._probing.add(conn)
+                        self._spawn(self._health_check(conn))
+                        continue
+
+                    next_check = min(next_check or probe_at, probe_at)
+
+            idle = len(self._available) + len(self._probing) + self._connecting
+            for _ in range(self._min_idle - idle):
+                self._connecting += 1
+                self._spawn(self._refill())
+
+            timeout = None if next_check is None else max(0.0, next_check - time.time())
+            try:
+                await asyncio.wait_for(self._upkeep_ev.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
     async def aclose(self) -> None:
         """Close all connections, draining any pending connection closures."""
+        self._closed = True
         if self._prewarm_task is not None:
             task = self._prewarm_task()
             if task:
                 await aio.gracefully_cancel(task)
 
+        if self._upkeep_atask is not None:
+            await aio.cancel_and_wait(self._upkeep_atask)
+
+        if self._tasks:
+            await aio.cancel_and_wait(*self._tasks)
+
+        if self._close_tasks:
+            await asyncio.gather(*self._close_tasks, return_exceptions=True)
+
         self.invalidate()
         await self._drain_to_close()
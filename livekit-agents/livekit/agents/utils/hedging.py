@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from collections.abc import Awaitable, Sequence
+from dataclasses import dataclass
+from typing import Callable, Generic, TypeVar
+
+from .aio import cancel_and_wait
+
+T = TypeVar("T")
+
+
+class LatencyHistogram:
+    """Rolling window of the latest latencies of a provider"""
+
+    def __init__(self, window_size: int = 100, *, min_samples: int = 10) -> None:
+        self._samples: deque[float] = deque(maxlen=window_size)
+        self._sorted: list[float] = []
+        self._min_samples = min_samples
+
+    def add_sample(self, sample: float) -> None:
+        if len(self._samples) == self._samples.maxlen:
+            evicted = self._samples[0]
+            del self._sorted[bisect.bisect_left(self._sorted, evicted)]
+
+        self._samples.append(sample)
+        bisect.insort(self._sorted, sample)
+
+    def percentile(self, q: float) -> float | None:
+        """Return the q-th percentile (0-100), None until enough samples were added"""
+        if len(self._sorted) < self._min_samples:
+            return None
+
+        idx = min(len(self._sorted) - 1, int(len(self._sorted) * q / 100))
+        return self._sorted[idx]
+
+    def expected_latency(self, *, at_least: float) -> float:
+        """Mean of the latencies that are at least `at_least`, used to estimate a cut-off attempt"""
+        tail = self._sorted[bisect.bisect_left(self._sorted, at_least) :]
+        return sum(tail) / len(tail) if tail else at_least
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._sorted.clear()
+
+    def size(self) -> int:
+        return len(self._samples)
+
+
+@dataclass
+class HedgedResult(Generic[T]):
+    index: int
+    """index of the attempt that won"""
+    value: T
+    hedged: bool
+    """whether an attempt was started before the previous one finished"""
+    elapsed: float
+    """time from the start of the first attempt to the winner's result"""
+    started_at: list[float]
+    """start time of each started attempt, relative to the first one"""
+    failed_at: dict[int, float]
+    """failure time of the attempts that failed, relative to the first one"""
+
+    def latency_saved(self, first_latency: LatencyHistogram) -> float:
+        """Estimate the latency saved compared to waiting for the first attempt"""
+        if self.index == 0:
+            return 0.0
+
+        if 0 in self.failed_at:
+            # without hedging, the winner would have been started once the first attempt failed
+            winner_latency = self.elapsed - self.started_at[self.index]
+            return max(0.0, self.failed_at[0] + winner_latency - self.elapsed)
+
+        # the first attempt was cancelled, it would have taken at least `elapsed`
+        return max(0.0, first_latency.expected_latency(at_least=self.elapsed) - self.elapsed)
+
+
+async def run_hedged(
+    attempts: Sequence[Callable[[], Awaitable[T]]],
+    *,
+    hedge_delay: Callable[[int], float | None],
+    on_error: Callable[[int, Exception], None],
+    on_discard: Callable[[T], Awaitable[None]] | None = None,
+    on_cut_off: Callable[[int, float], None] | None = None,
+) -> HedgedResult[T]:
+    """Run the attempts in order and return the first result.
+
+    The next attempt is started when the previous one fails, or concurrently when it takes longer
+    than ``hedge_delay(index)`` (None to never hedge it). Once an attempt succeeds, the other
+    running attempts are cancelled, and the results of the losers that still completed are passed
+    to ``on_discard``. The last error is raised if every attempt failed.
+
+    The attempts started before the winner and cancelled are passed to ``on_cut_off`` with their
+    running time, a lower bound of their latency. Only recording the latencies of the attempts
+    that finished would hide the slowest ones once they are hedged.
+    """
+    if not attempts:
+        raise ValueError("at least one attempt must be provided")
+
+    tasks: dict[asyncio.Task[T], int] = {}
+    started_at: list[float] = []
+    failed_at: dict[int, float] = {}
+    hedged = False
+    winner_idx: int | None = None
+    last_exc: Exception | None = None
+    start_time = time.perf_counter()
+
+    def _start_next() -> None:
+        idx = len(started_at)
+        started_at.append(time.perf_counter())
+        tasks[asyncio.ensure_future(attempts[idx]())] = idx
+
+    _start_next()
+    try:
+        while tasks:
+            timeout: float | None = None
+            last_idx = len(started_at) - 1
+            if len(started_at) < len(attempts) and (delay := hedge_delay(last_idx)) is not None:
+                timeout = max(0.0, started_at[last_idx] + delay - time.perf_counter())
+
+            done, _ = await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                hedged = True
+                _start_next()
+                continue
+
+            winner: tuple[int, T] | None = None
+            for task in sorted(done, key=lambda t: tasks[t]):
+                idx = tasks.pop(task)
+                if (exc := task.exception()) is not None:
+                    if not isinstance(exc, Exception):
+                        raise exc
+
+                    last_exc = exc
+                    failed_at[idx] = time.perf_counter() - start_time
+                    on_error(idx, exc)
+                elif winner is None:
+                    winner = (idx, task.result())
+                elif on_discard is not None:
+                    await on_discard(task.result())
+
+            if winner is not None:
+                winner_idx = winner[0]
+                return HedgedResult(
+                    index=winner[0],
+                    value=winner[1],
+                    hedged=hedged,
+                    elapsed=time.perf_counter() - start_time,
+                    started_at=[t - start_time for t in started_at],
+                    failed_at=failed_at,
+                )
+
+            if not tasks and len(started_at) < len(attempts):
+                _start_next()
+
+        assert last_exc is not None
+        raise last_exc
+    finally:
+        if tasks:
+            if winner_idx is not None and on_cut_off is not None:
+                now = time.perf_counter()
+                for idx in sorted(tasks.values()):
+                    if idx < winner_idx:
+                        on_cut_off(idx, now - started_at[idx])
+
+            await cancel_and_wait(*tasks)
+            for task in tasks:
+                if task.cancelled() or task.exception() is not None:
+                    continue
+                if on_discard is not None:
+                    await on_discard(task.result())
@@ -1,10 +1,22 @@
 from .cpu import CGroupV2CPUMonitor, CPUMonitor, DefaultCPUMonitor, get_cpu_monitor
+from .memory import (
+    CGroupV1MemoryMonitor,
+    CGroupV2MemoryMonitor,
+    DefaultMemoryMonitor,
+    MemoryMonitor,
+    get_memory_monitor,
+)
 
 __all__ = [
     "get_cpu_monitor",
     "CPUMonitor",
     "CGroupV2CPUMonitor",
     "DefaultCPUMonitor",
+    "get_memory_monitor",
+    "MemoryMonitor",
+    "CGroupV1MemoryMonitor",
+    "CGroupV2MemoryMonitor",
+    "DefaultMemoryMonitor",
 ]
 
 # Cleanup docs of unexported modules
@@ -0,0 +1,70 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import psutil
+
+
+class MemoryMonitor(ABC):
+    @abstractmethod
+    def memory_total(self) -> int:
+        """Total memory available to this host or container, in bytes"""
+        pass
+
+    @abstractmethod
+    def memory_available(self) -> int:
+        """Memory that can still be used without swapping, in bytes"""
+        pass
+
+
+class DefaultMemoryMonitor(MemoryMonitor):
+    def memory_total(self) -> int:
+        return int(psutil.virtual_memory().total)
+
+    def memory_available(self) -> int:
+        return int(psutil.virtual_memory().available)
+
+
+class CGroupV2MemoryMonitor(MemoryMonitor):
+    def memory_total(self) -> int:
+        limit = _read_int("/sys/fs/cgroup/memory.max")
+        host_total = int(psutil.virtual_memory().total)
+        if limit is None:  # "max", no limit
+            return host_total
+        return min(limit, host_total)
+
+    def memory_available(self) -> int:
+        usage = _read_int("/sys/fs/cgroup/memory.current") or 0
+        host_available = int(psutil.virtual_memory().available)
+        return max(min(self.memory_total() - usage, host_available), 0)
+
+
+class CGroupV1MemoryMonitor(MemoryMonitor):
+    def memory_total(self) -> int:
+        limit = _read_int("/sys/fs/cgroup/memory/memory.limit_in_bytes")
+        host_total = int(psutil.virtual_memory().total)
+        if limit is None:
+            return host_total
+        # an unlimited cgroup v1 reports a huge value (close to 2^63)
+        return min(limit, host_total)
+
+    def memory_available(self) -> int:
+        usage = _read_int("/sys/fs/cgroup/memory/memory.usage_in_bytes") or 0
+        host_available = int(psutil.virtual_memory().available)
+        return max(min(self.memory_total() - usage, host_available), 0)
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def get_memory_monitor() -> MemoryMonitor:
+    if os.path.exists("/sys/fs/cgroup/memory.max"):
+        return CGroupV2MemoryMonitor()
+    if os.path.exists("/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        return CGroupV1MemoryMonitor()
+    return DefaultMemoryMonitor()
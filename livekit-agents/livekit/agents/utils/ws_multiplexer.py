@@ -0,0 +1,440 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import time
+from collections.abc import AsyncGenerator, Awaitable
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional
+
+import aiohttp
+
+from .._exceptions import APIConnectionError
+from ..log import logger
+from . import aio
+from .misc import shortuuid
+
+
+class _Failed:
+    pass
+
+
+_FAILED = _Failed()
+
+
+class MultiplexedContext:
+    """A logical stream (e.g. one synthesis or one transcription) sharing a WebSocket connection.
+
+    The messages sent through the context are tagged with its id, the received messages tagged
+    with the same id are routed to its receive queue.
+    """
+
+    def __init__(self, conn: _MuxConnection, context_id: str) -> None:
+        self._conn = conn
+        self._context_id = context_id
+        self._queue: asyncio.Queue[dict[str, Any] | _Failed] = asyncio.Queue(
+            maxsize=conn._mux._max_buffered_messages
+        )
+        self._exc: Exception | None = None
+        self._closed = False
+
+        # messages sent again after a reconnection, None when the context can't be replayed
+        self._replay: list[str] | None = []
+        self._replayed = 0  # number of replay messages already sent on the current connection
+
+    @property
+    def context_id(self) -> str:
+        return self._context_id
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def send(self, data: dict[str, Any], *, replay: bool = False) -> None:
+        """Send a JSON message, waits while the send queue of the connection is full.
+
+        Messages sent with `replay=True` (e.g. the message creating the context on the server)
+        are sent again, in order, when the connection is lost and reestablished.
+        """
+        self._check()
+        payload = json.dumps({**data, self._conn._mux._context_field: self._context_id})
+        replay_idx: int | None = None
+        if replay and self._replay is not None:
+            replay_idx = len(self._replay)
+            self._replay.append(payload)
+
+        try:
+            await self._conn._send_ch.send((self, payload, replay_idx))
+        except aio.ChanClosed:
+            raise APIConnectionError("the multiplexed connection was closed") from None
+
+    def stop_replay(self) -> None:
+        """Fail the context instead of replaying it if the connection is lost.
+
+        Used once the server state of the context can't be rebuilt from the replayed messages,
+        e.g. when a part of the output was already received.
+        """
+        self._replay = None
+
+    async def recv(self, *, timeout: float | None = None) -> dict[str, Any]:
+        """Receive the next message of the context.
+
+        Raises:
+            APIConnectionError: if the connection was lost and the context couldn't be replayed
+            asyncio.TimeoutError: if no message was received within `timeout`
+        """
+        if self._queue.empty():
+            self._check()
+
+        data = await asyncio.wait_for(self._queue.get(), timeout)
+        if isinstance(data, _Failed):
+            assert self._exc is not None
+            raise self._exc
+        return data
+
+    def close(self) -> None:
+        """Stop routing messages to this context, the connection is kept for the other ones"""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._clear()
+        self._conn._remove_context(self)
+
+    def _fail(self, exc: Exception) -> None:
+        self._exc = exc
+        with contextlib.suppress(asyncio.QueueFull):
+            self._queue.put_nowait(_FAILED)
+
+    def _clear(self) -> None:
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def _check(self) -> None:
+        if self._exc is not None:
+            raise self._exc
+        if self._closed:
+            raise APIConnectionError("the multiplexed context is closed")
+
+
+class _MuxConnection:
+    def __init__(self, mux: WebSocketMultiplexer, ws: aiohttp.ClientWebSocketResponse) -> None:
+        self._mux = mux
+        self._ws = ws
+        self._connected_at = time.time()
+        self._contexts: dict[str, MultiplexedContext] = {}
+        self._send_ch = aio.Chan[tuple[MultiplexedContext, str, Optional[int]]](
+            maxsize=mux._send_queue_size
+        )
+        self._closed = False
+        self._idle_handle: asyncio.TimerHandle | None = None
+        self._main_atask = asyncio.create_task(self._main_task())
+        self.reconnections = 0
+
+    @property
+    def expired(self) -> bool:
+        max_duration = self._mux._max_session_duration
+        return max_duration is not None and time.time() - self._connected_at > max_duration
+
+    def accepts_contexts(self) -> bool:
+        return (
+            not self._closed
+            and not self.expired
+            and len(self._contexts) < self._mux._max_contexts_per_connection
+        )
+
+    def add_context(self, context_id: str) -> MultiplexedContext:
+        if context_id in self._contexts:
+            raise ValueError(f"context {context_id} already exists")
+
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+        ctx = self._contexts[context_id] = MultiplexedContext(self, context_id)
+        return ctx
+
+    def _remove_context(self, ctx: MultiplexedContext) -> None:
+        if self._contexts.get(ctx.context_id) is not ctx:
+            return
+
+        del self._contexts[ctx.context_id]
+        if self._contexts or self._closed:
+            return
+
+        if self.expired or not self._mux._is_preferred(self):
+            self._mux._close_later(self)
+        elif self._mux._idle_timeout is not None:
+            self._idle_handle = asyncio.get_running_loop().call_later(
+                self._mux._idle_timeout, self._mux._close_later, self
+            )
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+
+        self._closed = True
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+
+        self._send_ch.close()
+        await aio.cancel_and_wait(self._main_atask)
+        await self._ws.close()
+        self._fail_contexts(APIConnectionError("the multiplexed connection was closed"))
+
+    def _fail_contexts(self, exc: Exception, *, replayable: bool = True) -> None:
+        for ctx in list(self._contexts.values()):
+            if replayable or ctx._replay is None:
+                ctx._fail(exc)
+                del self._contexts[ctx.context_id]
+
+    async def _main_task(self) -> None:
+        try:
+            while True:
+                tasks = [
+                    asyncio.create_task(self._send_task(self._ws)),
+                    asyncio.create_task(self._recv_task(self._ws)),
+                ]
+                try:
+                    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    await aio.cancel_and_wait(*tasks)
+
+                exc = next((t.exception() for t in done if t.exception() is not None), None)
+                if self._send_ch.closed:
+                    return
+
+                if not self._contexts:
+                    # nothing to replay, the next context will use a new connection
+                    self._closed = True
+                    return
+
+                logger.warning(
+                    "multiplexed websocket lost, reconnecting",
+                    extra={"contexts": len(self._contexts), "error": str(exc)},
+                )
+                await self._reconnect()
+        except Exception as e:
+            self._closed = True
+            self._fail_contexts(APIConnectionError("the multiplexed connection was lost"))
+            if not isinstance(e, APIConnectionError):
+                logger.exception("error in the multiplexed websocket")
+        finally:
+            self._mux._forget(self)
+            if not self._ws.closed:
+                await self._ws.close()
+
+    async def _reconnect(self) -> None:
+        with contextlib.suppress(Exception):
+            await self._ws.close()
+
+        # the contexts whose output was partially received can't be resumed
+        self._fail_contexts(
+            APIConnectionError("the multiplexed connection was lost"), replayable=False
+        )
+
+        for attempt in range(self._mux._max_reconnect_attempts):
+            if attempt > 0:
+                await asyncio.sleep(min(2.0, 0.1 * 2**attempt))
+
+            try:
+                ws = await self._mux._connect_cb(self._mux._connect_timeout)
+                break
+            except Exception as e:
+                logger.warning(
+                    "failed to reconnect the multiplexed websocket",
+                    extra={"attempt": attempt + 1, "error": str(e)},
+                )
+        else:
+            raise APIConnectionError("failed to reconnect the multiplexed websocket")
+
+        self._ws = ws
+        self._connected_at = time.time()
+        self.reconnections += 1
+
+        for ctx in list(self._contexts.values()):
+            if ctx._replay is None:
+                continue
+            for payload in ctx._replay:
+                await ws.send_str(payload)
+            ctx._replayed = len(ctx._replay)
+
+    async def _send_task(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        # the messages of closed contexts are still sent (e.g. their close message)
+        async for ctx, payload, replay_idx in self._send_ch:
+            if ctx._exc is not None:
+                continue
+
+            if replay_idx is not None and replay_idx < ctx._replayed:
+                continue  # already sent when the context was replayed
+
+            await ws.send_str(payload)
+
+    async def _recv_task(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        context_field = self._mux._context_field
+        while True:
+            msg = await ws.receive()
+            if msg.type in (
+                aiohttp.WSMsgType.CLOSED,
+                aiohttp.WSMsgType.CLOSE,
+                aiohttp.WSMsgType.CLOSING,
+            ):
+                return
+
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                logger.warning("unexpected multiplexed websocket message type %s", msg.type)
+                continue
+
+            data = json.loads(msg.data)
+            ctx = self._contexts.get(data.get(context_field))
+            if ctx is None:
+                continue  # the context was already closed
+
+            try:
+                ctx._queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # the socket is shared, a slow consumer must not stall the other contexts
+                logger.warning(
+                    "multiplexed context fell behind, closing it",
+                    extra={"context_id": ctx.context_id},
+                )
+                ctx._clear()
+                ctx._fail(APIConnectionError("the multiplexed context receive buffer is full"))
+                self._remove_context(ctx)
+
+
+class WebSocketMultiplexer:
+    """Shares WebSocket connections between many concurrent contexts.
+
+    Instead of one WebSocket (and its TLS handshake) per stream, the streams open a context on
+    a shared connection. Every JSON message carries the id of its context in `context_field`.
+
+    A new connection is opened when all the connections are full (`max_contexts_per_connection`)
+    or older than `max_session_duration`. Idle connections are closed after `idle_timeout`.
+
+    Backpressure: senders wait while the send queue of a connection is full. The socket is
+    always read, a context whose receive queue is full fails with an APIConnectionError instead
+    of stalling the other contexts of the connection.
+
+    When a connection is lost, it's reestablished and the messages sent with `replay=True` by
+    every open context are sent again. The contexts that stopped replaying fail with an
+    APIConnectionError.
+    """
+
+    def __init__(
+        self,
+        *,
+        connect_cb: Callable[[float], Awaitable[aiohttp.ClientWebSocketResponse]],
+        context_field: str = "context_id",
+        max_contexts_per_connection: int = 64,
+        max_session_duration: float | None = None,
+        idle_timeout: float | None = 60.0,
+        max_buffered_messages: int = 256,
+        send_queue_size: int = 256,
+        max_reconnect_attempts: int = 3,
+        connect_timeout: float = 10.0,
+    ) -> None:
+        """
+        Args:
+            connect_cb: Async callback opening a new WebSocket, called with the connect timeout
+            context_field: Field of the JSON messages carrying the context id
+            max_contexts_per_connection: Maximum number of concurrent contexts on a connection
+            max_session_duration: No new context is opened on connections older than this
+            idle_timeout: Close the connections without any context after this duration
+            max_buffered_messages: Maximum number of received messages buffered per context
+            send_queue_size: Maximum number of messages waiting to be sent per connection
+            max_reconnect_attempts: Attempts to reestablish a lost connection
+            connect_timeout: Timeout used when reconnecting or prewarming
+        """
+        self._connect_cb = connect_cb
+        self._context_field = context_field
+        self._max_contexts_per_connection = max_contexts_per_connection
+        self._max_session_duration = max_session_duration
+        self._idle_timeout = idle_timeout
+        self._max_buffered_messages = max_buffered_messages
+        self._send_queue_size = send_queue_size
+        self._max_reconnect_attempts = max_reconnect_attempts
+        self._connect_timeout = connect_timeout
+
+        self._connections: list[_MuxConnection] = []
+        self._connect_lock = asyncio.Lock()
+        self._close_tasks: set[asyncio.Task[None]] = set()
+        self._prewarm_task: asyncio.Task[None] | None = None
+
+    @property
+    def num_connections(self) -> int:
+        return len(self._connections)
+
+    @property
+    def num_contexts(self) -> int:
+        return sum(len(conn._contexts) for conn in self._connections)
+
+    async def open_context(
+        self, *, timeout: float, context_id: str | None = None
+    ) -> MultiplexedContext:
+        """Open a context on a connection that accepts new contexts, or on a new connection"""
+        context_id = context_id or shortuuid("ctx_")
+        async with self._connect_lock:
+            conn = next((c for c in self._connections if c.accepts_contexts()), None)
+            if conn is None:
+                conn = _MuxConnection(self, await self._connect_cb(timeout))
+                self._connections.append(conn)
+
+            return conn.add_context(context_id)
+
+    @asynccontextmanager
+    async def context(
+        self, *, timeout: float, context_id: str | None = None
+    ) -> AsyncGenerator[MultiplexedContext, None]:
+        """Open a context and close it when done"""
+        ctx = await self.open_context(timeout=timeout, context_id=context_id)
+        try:
+            yield ctx
+        finally:
+            ctx.close()
+
+    def prewarm(self) -> None:
+        """Open a connection in the background if there is none"""
+        if self._prewarm_task is not None or self._connections:
+            return
+
+        async def _prewarm_impl() -> None:
+            async with self._connect_lock:
+                if not self._connections:
+                    conn = _MuxConnection(self, await self._connect_cb(self._connect_timeout))
+                    self._connections.append(conn)
+                    if self._idle_timeout is not None:
+                        conn._idle_handle = asyncio.get_running_loop().call_later(
+                            self._idle_timeout, self._close_later, conn
+                        )
+
+        self._prewarm_task = asyncio.create_task(_prewarm_impl())
+
+    async def aclose(self) -> None:
+        if self._prewarm_task is not None:
+            await aio.cancel_and_wait(self._prewarm_task)
+
+        for conn in list(self._connections):
+            await conn.aclose()
+        self._connections.clear()
+
+        if self._close_tasks:
+            await asyncio.gather(*self._close_tasks, return_exceptions=True)
+
+    def _is_preferred(self, conn: _MuxConnection) -> bool:
+        # keep only the first connection accepting contexts when they're idle
+        return next((c for c in self._connections if c.accepts_contexts()), None) is conn
+
+    def _close_later(self, conn: _MuxConnection) -> None:
+        if conn._contexts:
+            return
+
+        self._forget(conn)
+        task = asyncio.create_task(conn.aclose())
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
+
+    def _forget(self, conn: _MuxConnection) -> None:
+        with contextlib.suppress(ValueError):
+            self._connections.remove(conn)
@@ -121,7 +121,9 @@ class Agent:
         See Also:
             update_chat_ctx: Method to update the internal chat context.
         """
-        return _ReadOnlyChatContext(self._chat_ctx.items)
+        return _ReadOnlyChatContext(
+            self._chat_ctx.items, format_caches=self._chat_ctx._format_caches
+        )
 
     async def update_instructions(self, instructions: str) -> None:
         """
@@ -104,6 +104,9 @@ async def _llm_inference_task(
         trace_types.ATTR_FUNCTION_TOOLS, json.dumps(list(tool_ctx.function_tools.keys()))
     )
 
+    # encode the video frames off the event loop before the LLM formats the chat context
+    await llm.utils.serialize_images(chat_ctx)
+
     llm_node = node(chat_ctx, tools, model_settings)
     if asyncio.iscoroutine(llm_node):
         llm_node = await llm_node
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import weakref
+from collections.abc import Generator
+from typing import Any
+
+# deadlines are rounded to the nearest tick, the entries of a tick are woken up together
+TICK_DURATION = 0.01
+
+
+class PacingEntry:
+    """A pending sleep of a PacingScheduler, it can be awaited once"""
+
+    __slots__ = ("_scheduler", "_tick", "_deadline", "_fut", "_remaining")
+
+    def __init__(self, scheduler: PacingScheduler, tick: int, deadline: float) -> None:
+        self._scheduler = scheduler
+        self._tick = tick
+        self._deadline = deadline
+        self._fut: asyncio.Future[None] = scheduler._loop.create_future()
+        self._remaining = 0.0
+
+    @property
+    def remaining(self) -> float:
+        """Time that was left before the deadline when the entry was cancelled, 0 otherwise"""
+        return self._remaining
+
+    def done(self) -> bool:
+        return self._fut.done()
+
+    def cancel(self) -> None:
+        """Wake up the waiter before the deadline"""
+        if self._fut.done():
+            return
+
+        self._remaining = max(0.0, self._deadline - self._scheduler._loop.time())
+        self._scheduler._remove(self)
+        self._fut.set_result(None)
+
+    def __await__(self) -> Generator[Any, None, None]:
+        return self._fut.__await__()
+
+
+class PacingScheduler:
+    """Timer wheel shared by the transcript synchronizers of an event loop.
+
+    Every pending sleep is stored in the bucket of its tick, a single TimerHandle is armed for
+    the earliest tick. Instead of one timer (and its wait machinery) per emitted word, the
+    event loop wakes up at most once per tick for all the concurrent segments.
+    """
+
+    def __init__(
+        self, *, loop: asyncio.AbstractEventLoop, tick_duration: float = TICK_DURATION
+    ) -> None:
+        # the schedulers are stored by loop in a WeakKeyDictionary, don't keep the loop alive
+        self._loop = weakref.proxy(loop)
+        self._tick_duration = tick_duration
+        self._buckets: dict[int, dict[PacingEntry, None]] = {}
+        self._ticks: list[int] = []  # heap of the ticks in self._buckets
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_tick: int | None = None
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def sleep(self, delay: float) -> PacingEntry:
+        """Schedule a sleep of `delay` seconds, the returned entry must be awaited"""
+        deadline = self._loop.time() + max(0.0, delay)
+        tick = round(deadline / self._tick_duration)
+        entry = PacingEntry(self, tick, deadline)
+
+        if (bucket := self._buckets.get(tick)) is None:
+            bucket = self._buckets[tick] = {}
+            heapq.heappush(self._ticks, tick)
+        bucket[entry] = None
+
+        if self._timer_tick is None or tick < self._timer_tick:
+            self._arm(tick)
+        return entry
+
+    def _remove(self, entry: PacingEntry) -> None:
+        # the tick stays in the heap, it is skipped once it's reached
+        if (bucket := self._buckets.get(entry._tick)) is not None:
+            bucket.pop(entry, None)
+            if not bucket:
+                del self._buckets[entry._tick]
+
+    def _arm(self, tick: int) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+
+        self._timer_tick = tick
+        self._timer = self._loop.call_at(tick * self._tick_duration, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = self._timer_tick = None
+
+        # fire every tick that is closer than half a tick, deadlines are rounded to the nearest
+        now_tick = (self._loop.time() + self._tick_duration / 2) / self._tick_duration
+        while self._ticks and self._ticks[0] <= now_tick:
+            tick = heapq.heappop(self._ticks)
+            for entry in self._buckets.pop(tick, {}):
+                if not entry._fut.done():  # the waiter may have been cancelled
+                    entry._fut.set_result(None)
+
+        while self._ticks and self._ticks[0] not in self._buckets:
+            heapq.heappop(self._ticks)  # all the entries of the tick were cancelled
+
+        if self._ticks:
+            self._arm(self._ticks[0])
+
+
+_schedulers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PacingScheduler] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_scheduler() -> PacingScheduler:
+    """Return the PacingScheduler of the running event loop"""
+    loop = asyncio.get_running_loop()
+    if (scheduler := _schedulers.get(loop)) is None:
+        scheduler = _schedulers[loop] = PacingScheduler(loop=loop)
+    return scheduler
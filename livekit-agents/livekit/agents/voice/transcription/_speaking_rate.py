@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from typing import Union
@@ -25,6 +26,115 @@ class _SpeakingRateDetectionOptions:
     "silence threshold for silence detection on audio RMS"
 
 
+@functools.lru_cache(maxsize=8)
+def _hann_window(frame_length: int) -> tuple[np.ndarray, float]:
+    window = np.hanning(frame_length)
+    window.flags.writeable = False
+    return window, float(1.0 / np.sqrt(np.sum(window**2)))
+
+
+def _stft_magnitudes(
+    audio: np.ndarray[tuple[int], np.dtype[np.float32]], frame_length: int, hop_length: int
+) -> np.ndarray[tuple[int, int], np.dtype[np.float64]]:
+    """Magnitudes of the scaled STFT of the audio, one row per frame"""
+    if len(audio) < frame_length:
+        return np.empty((0, frame_length // 2 + 1), dtype=np.float64)
+
+    window, scale = _hann_window(frame_length)
+    frames = np.lib.stride_tricks.sliding_window_view(audio, frame_length)[::hop_length]
+    return np.abs(np.fft.rfft(frames * window, axis=1) * scale)
+
+
+def _flux_diffs(
+    magnitudes: np.ndarray[tuple[int, int], np.dtype[np.float64]],
+) -> np.ndarray[tuple[int], np.dtype[np.float64]]:
+    """L1 norm of the difference between consecutive spectral frames"""
+    diffs: np.ndarray[tuple[int], np.dtype[np.float64]] = np.sum(
+        np.abs(np.diff(magnitudes, axis=0)), axis=1
+    )
+    return diffs
+
+
+class _SpectralFluxStream:
+    """Audio of the current segment and its STFT, each spectral frame is only computed once.
+
+    The detection windows start every `step` samples, when `step` is a multiple of the hop
+    length, the spectral frames of consecutive windows are shared.
+    """
+
+    def __init__(self, *, frame_length: int, hop_length: int) -> None:
+        self._frame_length = frame_length
+        self._hop_length = hop_length
+        self.reset()
+
+    def reset(self) -> None:
+        self._audio = np.empty(0, dtype=np.float32)
+        self._audio_start = 0  # absolute sample index of self._audio[0]
+        self._mags = np.empty((0, self._frame_length // 2 + 1), dtype=np.float64)
+        self._diffs = np.empty(0, dtype=np.float64)  # diffs[i] is between mags[i - 1] and mags[i]
+        self._col_start = 0  # absolute index of the spectral frame self._mags[0]
+
+    @property
+    def end(self) -> int:
+        """absolute index of the end of the pushed audio"""
+        return self._audio_start + len(self._audio)
+
+    def push(self, audio: np.ndarray[tuple[int], np.dtype[np.float32]]) -> None:
+        self._audio = np.concatenate((self._audio, audio))
+
+    def audio(self, start: int, length: int) -> np.ndarray[tuple[int], np.dtype[np.float32]]:
+        offset = start - self._audio_start
+        return self._audio[offset : offset + length]
+
+    def spectral_flux(self, start: int, length: int) -> float:
+        """Average spectral flux of the audio window"""
+        num_frames = (length - self._frame_length) // self._hop_length + 1
+        if num_frames < 2:
+            return 0.0
+
+        if start % self._hop_length != 0:
+            mags = _stft_magnitudes(self.audio(start, length), self._frame_length, self._hop_length)
+            return float(np.mean(_flux_diffs(mags)))
+
+        first_col = start // self._hop_length
+        self._compute_frames(first_col + num_frames)
+        offset = first_col - self._col_start
+        return float(np.mean(self._diffs[offset + 1 : offset + num_frames]))
+
+    def trim(self, start: int) -> None:
+        """Drop the audio and the spectral frames before `start`"""
+        if (offset := start - self._audio_start) > 0:
+            self._audio = self._audio[offset:]
+            self._audio_start = start
+
+        # the flux of a window doesn't use the diff of its first spectral frame, so the frames
+        # before it can be dropped, even if they were never computed (silent windows)
+        keep_from = start // self._hop_length
+        if (offset := keep_from - self._col_start) > 0:
+            self._mags = self._mags[offset:]
+            self._diffs = self._diffs[offset:]
+            self._col_start = keep_from if len(self._mags) else 0
+
+    def _compute_frames(self, end_col: int) -> None:
+        next_col = self._col_start + len(self._mags)
+        if end_col <= next_col:
+            return
+
+        if not len(self._mags):
+            self._col_start = next_col = -(-self._audio_start // self._hop_length)
+
+        start = next_col * self._hop_length
+        length = (end_col - next_col - 1) * self._hop_length + self._frame_length
+        mags = _stft_magnitudes(self.audio(start, length), self._frame_length, self._hop_length)
+
+        diffs = _flux_diffs(np.concatenate((self._mags[-1:], mags)))
+        if not len(self._mags):
+            diffs = np.concatenate(([0.0], diffs))  # the first frame has no previous frame
+
+        self._mags = np.concatenate((self._mags, mags))
+        self._diffs = np.concatenate((self._diffs, diffs))
+
+
 @dataclass
 class SpeakingRateEvent:
     timestamp: float
@@ -72,22 +182,27 @@ class SpeakingRateStream:
     @log_exceptions(logger=logger)
     async def _main_task(self) -> None:
         _inference_sample_rate = 0
-        inference_f32_data = np.empty(0, dtype=np.float32)
 
         pub_timestamp = self._opts.window_duration / 2
-        inference_frames: list[rtc.AudioFrame] = []
+        flux_stream: _SpectralFluxStream | None = None
+        window_start = 0  # absolute index of the start of the next window
         resampler: rtc.AudioResampler | None = None
 
         async for input_frame in self._input_ch:
             if not isinstance(input_frame, rtc.AudioFrame):
+                if flux_stream is None:
+                    continue
+
                 # estimate the speech rate for the last frame
-                available_samples = sum(frame.samples_per_channel for frame in inference_frames)
+                available_samples = flux_stream.end - window_start
                 if available_samples > self._window_size_samples * 0.5:
-                    frame = rtc.combine_audio_frames(inference_frames)
-                    frame_f32_data = np.divide(frame.data, np.iinfo(np.int16).max, dtype=np.float32)
-
-                    sr = self._compute_speaking_rate(frame_f32_data, _inference_sample_rate)
-                    pub_timestamp += frame.duration
+                    sr = self._compute_speaking_rate(
+                        flux_stream.audio(window_start, available_samples),
+                        _inference_sample_rate,
+                        flux_stream=flux_stream,
+                        start=window_start,
+                    )
+                    pub_timestamp += available_samples / _inference_sample_rate
                     self._event_ch.send_nowait(
                         SpeakingRateEvent(
                             timestamp=pub_timestamp,
@@ -95,7 +210,8 @@ class SpeakingRateStream:
                             speaking_rate=sr,
                         )
                     )
-                inference_frames = []
+                flux_stream.reset()
+                window_start = 0
                 continue
 
             # resample the input frame if necessary
@@ -105,7 +221,8 @@ class SpeakingRateStream:
 
                 self._window_size_samples = int(self._opts.window_duration * _inference_sample_rate)
                 self._step_size_samples = int(self._opts.step_size * _inference_sample_rate)
-                inference_f32_data = np.empty(self._window_size_samples, dtype=np.float32)
+                frame_length, hop_length = self._stft_params(_inference_sample_rate)
+                flux_stream = _SpectralFluxStream(frame_length=frame_length, hop_length=hop_length)
 
                 if self._input_sample_rate != _inference_sample_rate:
                     resampler = rtc.AudioResampler(
@@ -124,26 +241,18 @@ class SpeakingRateStream:
                 )
                 continue
 
-            if resampler is not None:
-                inference_frames.extend(resampler.push(input_frame))
-            else:
-                inference_frames.append(input_frame)
-
-            while True:
-                available_samples = sum(frame.samples_per_channel for frame in inference_frames)
-                if available_samples < self._window_size_samples:
-                    break
-
-                inference_frame = rtc.combine_audio_frames(inference_frames)
-                np.divide(
-                    inference_frame.data[: self._window_size_samples],
-                    np.iinfo(np.int16).max,
-                    out=inference_f32_data,
-                    dtype=np.float32,
-                )
+            assert flux_stream is not None
+            for frame in resampler.push(input_frame) if resampler is not None else [input_frame]:
+                flux_stream.push(np.divide(frame.data, np.iinfo(np.int16).max, dtype=np.float32))
 
+            while flux_stream.end - window_start >= self._window_size_samples:
                 # run the inference
-                sr = self._compute_speaking_rate(inference_f32_data, _inference_sample_rate)
+                sr = self._compute_speaking_rate(
+                    flux_stream.audio(window_start, self._window_size_samples),
+                    _inference_sample_rate,
+                    flux_stream=flux_stream,
+                    start=window_start,
+                )
                 self._event_ch.send_nowait(
                     SpeakingRateEvent(
                         timestamp=pub_timestamp,
@@ -154,19 +263,22 @@ class SpeakingRateStream:
 
                 # move the window forward by the hop size
                 pub_timestamp += self._opts.step_size
-                if len(inference_frame.data) - self._step_size_samples > 0:
-                    data = inference_frame.data[self._step_size_samples :]
-                    inference_frames = [
-                        rtc.AudioFrame(
-                            data=data,
-                            sample_rate=inference_frame.sample_rate,
-                            num_channels=1,
-                            samples_per_channel=len(data) // 2,
-                        )
-                    ]
+                window_start += self._step_size_samples
+                flux_stream.trim(window_start)
+
+    @staticmethod
+    def _stft_params(sample_rate: int) -> tuple[int, int]:
+        frame_length = int(sample_rate * 0.025)  # 25ms
+        hop_length = frame_length // 2  # 50% overlap
+        return frame_length, hop_length
 
     def _compute_speaking_rate(
-        self, audio: np.ndarray[tuple[int], np.dtype[np.float32]], sample_rate: int
+        self,
+        audio: np.ndarray[tuple[int], np.dtype[np.float32]],
+        sample_rate: int,
+        *,
+        flux_stream: _SpectralFluxStream | None = None,
+        start: int = 0,
     ) -> float:
         """
         Compute the speaking rate of the audio using the selected method
@@ -184,30 +296,10 @@ class SpeakingRateStream:
         if len(tail_audio_sq) > 0 and np.sqrt(np.mean(tail_audio_sq)) < silence_threshold * 0.5:
             return 0.0
 
-        return self._spectral_flux(audio, sample_rate)
+        if flux_stream is not None:
+            return flux_stream.spectral_flux(start, len(audio))
 
-    def _stft(
-        self,
-        audio: np.ndarray[tuple[int], np.dtype[np.float32]],
-        frame_length: int,
-        hop_length: int,
-    ) -> np.ndarray[tuple[int, int], np.dtype[np.complex128]]:
-        num_frames = (len(audio) - frame_length) // hop_length + 1
-        result = np.zeros((frame_length // 2 + 1, num_frames), dtype=np.complex128)
-
-        window = np.hanning(frame_length)
-        scale_factor = 1.0 / np.sqrt(np.sum(window**2))
-        for i in range(num_frames):
-            start = i * hop_length
-            end = start + frame_length
-            frame = audio[start:end]
-            windowed = frame * window
-
-            # perform fft and scale
-            fft_result = np.fft.rfft(windowed)
-            result[:, i] = fft_result * scale_factor
-
-        return result
+        return self._spectral_flux(audio, sample_rate)
 
     def _spectral_flux(
         self, audio: np.ndarray[tuple[int], np.dtype[np.float32]], sample_rate: int
@@ -216,26 +308,14 @@ class SpeakingRateStream:
         Calculate speaking rate based on spectral flux.
         Higher spectral flux correlates with more rapid speech articulation.
         """
-        # Parameters
-        frame_length = int(sample_rate * 0.025)  # 25ms
-        hop_length = frame_length // 2  # 50% overlap
-
-        Zxx = self._stft(audio, frame_length, hop_length)
-
-        # calculate spectral flux (sum of spectral magnitude changes between frames)
-        spectral_magnitudes = np.abs(Zxx)
-        spectral_flux_values = []
-
-        for i in range(1, spectral_magnitudes.shape[1]):
-            # l1 norm of difference between consecutive spectral frames
-            flux = np.sum(np.abs(spectral_magnitudes[:, i] - spectral_magnitudes[:, i - 1]))
-            spectral_flux_values.append(flux)
+        frame_length, hop_length = self._stft_params(sample_rate)
 
-        if not spectral_flux_values:
+        # sum of spectral magnitude changes between frames
+        spectral_flux_values = _flux_diffs(_stft_magnitudes(audio, frame_length, hop_length))
+        if not len(spectral_flux_values):
             return 0.0
 
-        avg_flux = float(np.mean(spectral_flux_values))
-        return avg_flux
+        return float(np.mean(spectral_flux_values))
 
     def push_frame(self, frame: rtc.AudioFrame) -> None:
         """Push audio frame for syllable rate detection"""
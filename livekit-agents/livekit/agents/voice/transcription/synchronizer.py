@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import contextlib
 import itertools
 import time
 from dataclasses import dataclass, field
@@ -16,6 +15,7 @@ from ...log import logger
 from ...types import NOT_GIVEN, NotGivenOr
 from ...utils import is_given
 from .. import io
+from ._pacing import PacingEntry, get_scheduler
 from ._speaking_rate import SpeakingRateDetector, SpeakingRateStream
 
 STANDARD_SPEECH_RATE = 3.83  # hyphens (syllables) per second
@@ -25,6 +25,7 @@ STANDARD_SPEECH_RATE = 3.83  # hyphens (syllables) per second
 class _TextSyncOptions:
     speed: float
     hyphenate_word: Callable[[str], list[str]]
+    hyphenate_words: Callable[[list[str]], list[list[str]]]
     word_tokenizer: tokenize.WordTokenizer
     speaking_rate_detector: SpeakingRateDetector
 
@@ -150,6 +151,8 @@ class _SegmentSynchronizerImpl:
 
         self._out_ch = utils.aio.Chan[str]()
         self._close_future = asyncio.Future[None]()
+        self._pacing = get_scheduler()
+        self._pacing_entry: PacingEntry | None = None
 
         self._main_atask = asyncio.create_task(self._main_task())
         self._main_atask.add_done_callback(lambda _: self._out_ch.close())
@@ -232,6 +235,7 @@ class _SegmentSynchronizerImpl:
         if self._paused_wall_time is None:
             self._paused_wall_time = time.time()
         self._output_enabled_ev.clear()
+        self._wake_up()
 
     def resume(self) -> None:
         if self.closed:
@@ -276,6 +280,7 @@ class _SegmentSynchronizerImpl:
         # transcript is sent. (In case we're late)
         if not interrupted:
             self._playback_completed = True
+            self._wake_up()
 
     @property
     def synchronized_transcript(self) -> str:
@@ -352,9 +357,9 @@ class _SegmentSynchronizerImpl:
             if self._playback_completed:
                 delay = 0
 
-            await self._sleep_if_not_closed(delay / 2.0)
+            await self._pace(delay / 2.0)
             self._out_ch.send_nowait(word)
-            await self._sleep_if_not_closed(delay / 2.0)
+            await self._pace(delay / 2.0)
 
             self._text_data.forwarded_hyphens += word_hyphens
             self._text_data.forwarded_text += word
@@ -362,20 +367,34 @@ class _SegmentSynchronizerImpl:
     def _calc_hyphens(self, text: str) -> list[str]:
         """Calculate hyphens for text."""
         words = self._opts.word_tokenizer.tokenize(text)
-        hyphens = list(
-            itertools.chain.from_iterable(self._opts.hyphenate_word(word) for word in words)
-        )
+        hyphens = list(itertools.chain.from_iterable(self._opts.hyphenate_words(words)))
         return hyphens
 
-    async def _sleep_if_not_closed(self, delay: float) -> None:
-        with contextlib.suppress(asyncio.TimeoutError):
-            await asyncio.wait([self._close_future], timeout=delay)
+    async def _pace(self, delay: float) -> None:
+        """Wait for `delay` seconds of unpaused time, or until the segment is closed or its
+        playback completed"""
+        while delay > 0 and not self.closed and not self._playback_completed:
+            self._pacing_entry = entry = self._pacing.sleep(delay)
+            try:
+                await entry
+            finally:
+                self._pacing_entry = None
+
+            # the entry is cancelled when pausing, wait for the remaining time once resumed
+            delay = entry.remaining
+            if delay > 0:
+                await self._output_enabled_ev.wait()
+
+    def _wake_up(self) -> None:
+        if self._pacing_entry is not None:
+            self._pacing_entry.cancel()
 
     async def aclose(self) -> None:
         if self.closed:
             return
 
         self._close_future.set_result(None)
+        self._wake_up()
         self._start_fut.set()  # avoid deadlock of main_task in case it never started
         self._output_enabled_ev.set()
         await self._text_data.word_stream.aclose()
@@ -409,6 +428,11 @@ class TranscriptSynchronizer:
         self._opts = _TextSyncOptions(
             speed=speed,
             hyphenate_word=hyphenate_word,
+            hyphenate_words=(
+                tokenize.basic.hyphenate_words
+                if hyphenate_word is tokenize.basic.hyphenate_word
+                else lambda words: [hyphenate_word(word) for word in words]
+            ),
             word_tokenizer=(
                 word_tokenizer
                 or tokenize.basic.WordTokenizer(
@@ -59,6 +59,8 @@ ASSIGNMENT_TIMEOUT = 7.5
 UPDATE_STATUS_INTERVAL = 2.5
 UPDATE_LOAD_INTERVAL = 0.5
 HEARTBEAT_INTERVAL = 30
+# imported by the forkserver when WorkerOptions.forkserver_preload is enabled
+_FORKSERVER_PRELOAD = ["livekit.agents.ipc.job_proc_lazy_main", "numpy", "onnxruntime"]
 
 
 def _default_initialize_process_fnc(proc: JobProcess) -> Any:
@@ -226,6 +228,26 @@ class WorkerOptions:
 
     By default it uses "spawn" on all platforms, but "forkserver" on Linux.
     """
+    forkserver_preload: bool = False
+    """When using the "forkserver" multiprocessing context, also import the agent module, the job
+    process runtime and heavy dependencies (numpy, onnxruntime) in the forkserver.
+
+    Job processes are forked from the forkserver, so they start with these modules already
+    imported instead of importing them again. The agent module must be safe to import (no side
+    effects outside of ``if __name__ == "__main__"``).
+    """
+    inference_shared_memory: bool = False
+    """Pass the big payloads of the inference requests of job processes (e.g. audio windows)
+    through shared memory instead of the IPC socket.
+
+    Each job process allocates a small pool of shared memory slots, payloads are sent inline when
+    the pool is exhausted.
+    """
+    proc_scaling_policy: ipc.scaling.ScalingPolicy | None = None
+    """Policy deciding how many idle processes to keep warm, e.g.
+    :class:`~livekit.agents.ipc.scaling.PredictiveScalingPolicy` to size the pool from the job
+    arrival rate. Replaces ``num_idle_processes`` when set, ignored in development mode.
+    """
     prometheus_port: NotGivenOr[int] = NOT_GIVEN
     """When enabled, will expose prometheus metrics on :{prometheus_port}/metrics"""
     prometheus_multiproc_dir: str | None = None
@@ -339,6 +361,7 @@ class Worker(utils.EventEmitter[EventTypes]):
             job_entrypoint_fnc=opts.entrypoint_fnc,
             num_idle_processes=_WorkerEnvOption.getvalue(opts.num_idle_processes, self._devmode),
             loop=self._loop,
+            scaling_policy=opts.proc_scaling_policy if not self._devmode else None,
             job_executor_type=opts.job_executor_type,
             inference_executor=self._inference_executor,
             mp_ctx=self._mp_ctx,
@@ -347,6 +370,8 @@ class Worker(utils.EventEmitter[EventTypes]):
             memory_warn_mb=opts.job_memory_warn_mb,
             memory_limit_mb=opts.job_memory_limit_mb,
             http_proxy=opts.http_proxy or None,
+            inference_shared_memory=opts.inference_shared_memory
+            and self._inference_executor is not None,
         )
 
         self._previous_status = agent.WorkerStatus.WS_AVAILABLE
@@ -436,6 +461,13 @@ class Worker(utils.EventEmitter[EventTypes]):
 
         if self._opts.multiprocessing_context == "forkserver":
             plugin_packages = [p.package for p in Plugin.registered_plugins] + ["av"]
+            if self._opts.forkserver_preload:
+                # missing modules are ignored by the forkserver
+                plugin_packages = [
+                    *_FORKSERVER_PRELOAD,
+                    *plugin_packages,
+                    self._opts.entrypoint_fnc.__module__,
+                ]
             logger.info("preloading plugins", extra={"packages": plugin_packages})
             self._mp_ctx.set_forkserver_preload(plugin_packages)
 
@@ -489,9 +521,7 @@ class Worker(utils.EventEmitter[EventTypes]):
                     telemetry.metrics._update_child_proc_count()
 
                 load_threshold = _WorkerEnvOption.getvalue(self._opts.load_threshold, self._devmode)
-                default_num_idle_processes = _WorkerEnvOption.getvalue(
-                    self._opts.num_idle_processes, self._devmode
-                )
+                max_idle_processes = self._proc_pool.max_idle_processes
 
                 if not math.isinf(load_threshold):
                     active_jobs = len(self.active_jobs)
@@ -500,11 +530,11 @@ class Worker(utils.EventEmitter[EventTypes]):
                         if job_load > 0.0:
                             available_load = max(load_threshold - self._worker_load, 0.0)
                             available_job = min(
-                                math.ceil(available_load / job_load), default_num_idle_processes
+                                math.ceil(available_load / job_load), max_idle_processes
                             )
                             self._proc_pool.set_target_idle_processes(available_job)
                     else:
-                        self._proc_pool.set_target_idle_processes(default_num_idle_processes)
+                        self._proc_pool.set_target_idle_processes(max_idle_processes)
 
         tasks = []
         self._load_task = asyncio.create_task(_load_task(), name="load_task")
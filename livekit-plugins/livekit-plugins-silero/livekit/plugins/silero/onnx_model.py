@@ -4,12 +4,18 @@ from __future__ import annotations
 
 import atexit
 import importlib.resources
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from contextlib import ExitStack, nullcontext
 from pathlib import Path
 
 import numpy as np
 import onnxruntime  # type: ignore
 
+from .log import logger
+
 _resource_files = ExitStack()
 atexit.register(_resource_files.close)
 
@@ -17,6 +23,14 @@ atexit.register(_resource_files.close)
 SUPPORTED_SAMPLE_RATES = [8000, 16000]
 
 
+def window_size_samples(sample_rate: int) -> int:
+    """Number of samples of a single inference window"""
+    if sample_rate not in SUPPORTED_SAMPLE_RATES:
+        raise ValueError("Silero VAD only supports 8KHz and 16KHz sample rates")
+
+    return 256 if sample_rate == 8000 else 512
+
+
 def new_inference_session(
     force_cpu: bool, onnx_file_path: Path | str | None = None
 ) -> onnxruntime.InferenceSession:
@@ -55,15 +69,8 @@ class OnnxModel:
         self._sess = onnx_session
         self._sample_rate = sample_rate
 
-        if sample_rate not in SUPPORTED_SAMPLE_RATES:
-            raise ValueError("Silero VAD only supports 8KHz and 16KHz sample rates")
-
-        if sample_rate == 8000:
-            self._window_size_samples = 256
-            self._context_size = 32
-        elif sample_rate == 16000:
-            self._window_size_samples = 512
-            self._context_size = 64
+        self._window_size_samples = window_size_samples(sample_rate)
+        self._context_size = 32 if sample_rate == 8000 else 64
 
         self._sample_rate_nd = np.array(sample_rate, dtype=np.int64)
         self._context = np.zeros((1, self._context_size), dtype=np.float32)
@@ -85,14 +92,135 @@ class OnnxModel:
         return self._context_size
 
     def __call__(self, x: np.ndarray) -> float:
-        self._input_buffer[:, : self._context_size] = self._context
-        self._input_buffer[:, self._context_size :] = x
+        self._prepare_input(x)
 
         ort_inputs = {
             "input": self._input_buffer,
             "state": self._rnn_state,
             "sr": self._sample_rate_nd,
         }
-        out, self._state = self._sess.run(None, ort_inputs)
-        self._context = self._input_buffer[:, -self._context_size :]  # type: ignore
+        out, state = self._sess.run(None, ort_inputs)
+        self._update(state)
         return out.item()  # type: ignore
+
+    def _prepare_input(self, x: np.ndarray) -> None:
+        self._input_buffer[:, : self._context_size] = self._context
+        self._input_buffer[:, self._context_size :] = x
+
+    def _update(self, state: np.ndarray) -> None:
+        self._state = state
+        self._context = self._input_buffer[:, -self._context_size :]
+
+
+class BatchedInference:
+    """Runs the pending windows of several OnnxModel in a single batched inference.
+
+    Windows are submitted from any thread or event loop and collected by a dedicated thread
+    for at most `max_delay` seconds (or until `max_batch_size` windows are pending). The input
+    of each model is stacked on the batch axis and its RNN state on the `state` tensor, so every
+    model gets the same result as if `OnnxModel.__call__` was used.
+    """
+
+    def __init__(
+        self,
+        *,
+        onnx_session: onnxruntime.InferenceSession,
+        max_batch_size: int = 64,
+        max_delay: float = 0.002,
+    ) -> None:
+        self._sess = onnx_session
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._queue: queue.SimpleQueue[tuple[OnnxModel, np.ndarray, Future[float]]] = (
+            queue.SimpleQueue()
+        )
+        self._thread = threading.Thread(target=self._run, name="silero_batched_vad", daemon=True)
+        self._thread.start()
+
+    @property
+    def session(self) -> onnxruntime.InferenceSession:
+        return self._sess
+
+    def submit(self, model: OnnxModel, x: np.ndarray) -> Future[float]:
+        """Schedule the inference of a window, `x` must not be modified until the future is done"""
+        fut: Future[float] = Future()
+        self._queue.put((model, x, fut))
+        return fut
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._run_once()
+            except Exception:
+                # the thread must stay alive, every later submit() would hang otherwise
+                logger.exception("error in the silero batched inference")
+
+    def _run_once(self) -> None:
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self._max_delay
+        while len(pending) < self._max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        # a model can only be batched with models using the same sample rate
+        by_sample_rate: dict[int, list[tuple[OnnxModel, np.ndarray, Future[float]]]] = {}
+        for item in pending:
+            # the window of a cancelled stream isn't run, its model state is left untouched
+            if item[2].set_running_or_notify_cancel():
+                by_sample_rate.setdefault(item[0].sample_rate, []).append(item)
+
+        for batch in by_sample_rate.values():
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list[tuple[OnnxModel, np.ndarray, Future[float]]]) -> None:
+        try:
+            probs = run_batched(self._sess, [(model, x) for model, x, _ in batch])
+        except Exception as e:
+            for _, _, fut in batch:
+                fut.set_exception(e)
+            return
+
+        for (_, _, fut), p in zip(batch, probs):
+            fut.set_result(p)
+
+
+def run_batched(
+    onnx_session: onnxruntime.InferenceSession, windows: list[tuple[OnnxModel, np.ndarray]]
+) -> list[float]:
+    """Run one window for each model (all using the same sample rate) in a single inference"""
+    for model, x in windows:
+        model._prepare_input(x)
+
+    ort_inputs = {
+        "input": np.concatenate([model._input_buffer for model, _ in windows], axis=0),
+        "state": np.concatenate([model._rnn_state for model, _ in windows], axis=1),
+        "sr": windows[0][0]._sample_rate_nd,
+    }
+    out, state = onnx_session.run(None, ort_inputs)
+
+    for i, (model, _) in enumerate(windows):
+        model._update(state[:, i : i + 1, :])
+
+    return [out[i].item() for i in range(len(windows))]
+
+
+_shared_lock = threading.Lock()
+_shared_batched_inference: dict[tuple[bool, str | None], BatchedInference] = {}
+
+
+def shared_batched_inference(
+    force_cpu: bool, onnx_file_path: Path | str | None = None
+) -> BatchedInference:
+    """Return the process-wide BatchedInference for the given model, creating it if needed"""
+    key = (force_cpu, str(Path(onnx_file_path).resolve()) if onnx_file_path else None)
+    with _shared_lock:
+        if key not in _shared_batched_inference:
+            session = new_inference_session(force_cpu, onnx_file_path=onnx_file_path)
+            _shared_batched_inference[key] = BatchedInference(onnx_session=session)
+
+        return _shared_batched_inference[key]
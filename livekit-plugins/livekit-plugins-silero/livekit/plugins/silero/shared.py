@@ -0,0 +1,309 @@
+# Copyright 2023 LiveKit, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Silero VAD running inside the shared inference process.
+
+Importing this module registers the Silero inference runner, it must be imported by the main
+module of the worker (the inference process is started before any job process):
+
+    ```python
+    from livekit.plugins.silero import shared
+
+
+    def prewarm(proc: JobProcess):
+        proc.userdata["vad"] = shared.VAD.load()
+    ```
+
+The model and its thread pool are loaded once in the inference process, instead of once per job
+process. The RNN state and context of each stream are kept on the runner side.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+import threading
+import time
+import uuid
+import weakref
+from typing import Literal
+
+import numpy as np
+
+from livekit import agents
+from livekit.agents.inference_runner import _InferenceRunner
+from livekit.agents.ipc.inference_executor import InferenceExecutor
+from livekit.agents.job import get_job_context
+from livekit.agents.types import NOT_GIVEN, NotGivenOr
+from livekit.agents.utils import is_given
+
+from . import onnx_model
+from .log import logger
+from .vad import VADStream as _VADStream, _VADOptions
+
+# op (u8), stream id (16 bytes), sample rate (u32), followed by the f32 window for _OP_INFERENCE
+_REQUEST_HEADER = struct.Struct("<B16sI")
+_RESPONSE = struct.Struct("<f")
+_OP_INFERENCE = 0
+_OP_CLOSE = 1
+
+# states of streams that didn't send anything for this duration are dropped (e.g. crashed jobs)
+_STREAM_IDLE_TIMEOUT = 60.0
+
+
+class _SileroVADRunner(_InferenceRunner):
+    INFERENCE_METHOD = "lk_silero_vad"
+    SUPPORTS_BATCHING = True
+    BATCH_MAX_SIZE = 64
+    BATCH_WINDOW = 0.002
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._models: dict[bytes, tuple[onnx_model.OnnxModel, float]] = {}
+
+    def initialize(self) -> None:
+        self._session = onnx_model.new_inference_session(force_cpu=True)
+
+    def run(self, data: bytes) -> bytes | None:
+        return self.run_batch([data])[0]
+
+    def run_batch(self, data: list[bytes]) -> list[bytes | None]:
+        results: list[bytes | None] = [None] * len(data)
+        # a stream only has one pending window at a time, but be safe and never put the same
+        # model twice in a batch (its context must be updated between the two windows)
+        batches: list[dict[onnx_model.OnnxModel, tuple[int, np.ndarray]]] = []
+
+        with self._lock:
+            now = time.monotonic()
+            for i, req in enumerate(data):
+                # a malformed request only fails its own stream, not the whole batch
+                if (parsed := self._parse_request(req)) is None:
+                    logger.warning("ignoring an invalid silero inference request")
+                    continue
+
+                op, stream_id, sample_rate = parsed
+                if op == _OP_CLOSE:
+                    self._models.pop(stream_id, None)
+                    continue
+
+                if (entry := self._models.get(stream_id)) is not None:
+                    model = entry[0]
+                    if model.sample_rate != sample_rate:
+                        logger.warning("the sample rate of a silero stream can't change")
+                        continue
+                else:
+                    model = onnx_model.OnnxModel(
+                        onnx_session=self._session, sample_rate=sample_rate
+                    )
+                self._models[stream_id] = (model, now)
+
+                x = np.frombuffer(req, dtype=np.float32, offset=_REQUEST_HEADER.size)
+                for batch in batches:
+                    if model not in batch:
+                        batch[model] = (i, x)
+                        break
+                else:
+                    batches.append({model: (i, x)})
+
+            for stream_id, (_, last_used) in list(self._models.items()):
+                if now - last_used > _STREAM_IDLE_TIMEOUT:
+                    del self._models[stream_id]
+
+        for batch in batches:
+            by_sample_rate: dict[int, list[tuple[onnx_model.OnnxModel, int, np.ndarray]]] = {}
+            for model, (i, x) in batch.items():
+                by_sample_rate.setdefault(model.sample_rate, []).append((model, i, x))
+
+            for windows in by_sample_rate.values():
+                try:
+                    probs = onnx_model.run_batched(self._session, [(m, x) for m, _, x in windows])
+                except Exception:
+                    logger.exception("silero batched inference failed")
+                    continue
+
+                for (_, i, _), p in zip(windows, probs):
+                    results[i] = _RESPONSE.pack(p)
+
+        return results
+
+    @staticmethod
+    def _parse_request(req: bytes) -> tuple[int, bytes, int] | None:
+        if len(req) < _REQUEST_HEADER.size:
+            return None
+
+        op, stream_id, sample_rate = _REQUEST_HEADER.unpack_from(req)
+        if op == _OP_CLOSE:
+            return op, stream_id, sample_rate
+
+        if op != _OP_INFERENCE or sample_rate not in onnx_model.SUPPORTED_SAMPLE_RATES:
+            return None
+
+        window_bytes = onnx_model.window_size_samples(sample_rate) * 4  # f32
+        if len(req) - _REQUEST_HEADER.size != window_bytes:
+            return None
+
+        return op, stream_id, sample_rate
+
+
+class VAD(agents.vad.VAD):
+    """
+    Silero VAD running inside the shared inference process.
+
+    Streams send their inference windows to the inference process over IPC, so a worker with many
+    job processes only holds a single model.
+    """
+
+    @classmethod
+    def load(
+        cls,
+        *,
+        min_speech_duration: float = 0.05,
+        min_silence_duration: float = 0.55,
+        prefix_padding_duration: float = 0.5,
+        max_buffered_speech: float = 60.0,
+        activation_threshold: float = 0.5,
+        sample_rate: Literal[8000, 16000] = 16000,
+        inference_executor: InferenceExecutor | None = None,
+    ) -> VAD:
+        """
+        Create a VAD using the Silero model of the inference process.
+
+        This doesn't load any model, it can be called in the prewarm function or in the job
+        entrypoint.
+
+        Args:
+            min_speech_duration (float): Minimum duration of speech to start a new speech chunk.
+            min_silence_duration (float): At the end of each speech, wait this duration before ending the speech.
+            prefix_padding_duration (float): Duration of padding to add to the beginning of each speech chunk.
+            max_buffered_speech (float): Maximum duration of speech to keep in the buffer (in seconds).
+            activation_threshold (float): Threshold to consider a frame as speech.
+            sample_rate (Literal[8000, 16000]): Sample rate for the inference (only 8KHz and 16KHz are supported).
+            inference_executor (InferenceExecutor | None): Executor used to reach the inference process. Defaults to the one of the current job.
+
+        Raises:
+            ValueError: If an unsupported sample rate is provided.
+        """  # noqa: E501
+        if sample_rate not in onnx_model.SUPPORTED_SAMPLE_RATES:
+            raise ValueError("Silero VAD only supports 8KHz and 16KHz sample rates")
+
+        opts = _VADOptions(
+            min_speech_duration=min_speech_duration,
+            min_silence_duration=min_silence_duration,
+            prefix_padding_duration=prefix_padding_duration,
+            max_buffered_speech=max_buffered_speech,
+            activation_threshold=activation_threshold,
+            sample_rate=sample_rate,
+        )
+        return cls(opts=opts, inference_executor=inference_executor)
+
+    def __init__(
+        self, *, opts: _VADOptions, inference_executor: InferenceExecutor | None = None
+    ) -> None:
+        super().__init__(capabilities=agents.vad.VADCapabilities(update_interval=0.032))
+        self._opts = opts
+        self._inference_executor = inference_executor
+        self._streams = weakref.WeakSet[VADStream]()
+
+    @property
+    def model(self) -> str:
+        return "silero"
+
+    @property
+    def provider(self) -> str:
+        return "ONNX"
+
+    def stream(self) -> VADStream:
+        executor = self._inference_executor or get_job_context().inference_executor
+        stream = VADStream(self, self._opts, executor)
+        self._streams.add(stream)
+        return stream
+
+    def update_options(
+        self,
+        *,
+        min_speech_duration: NotGivenOr[float] = NOT_GIVEN,
+        min_silence_duration: NotGivenOr[float] = NOT_GIVEN,
+        prefix_padding_duration: NotGivenOr[float] = NOT_GIVEN,
+        max_buffered_speech: NotGivenOr[float] = NOT_GIVEN,
+        activation_threshold: NotGivenOr[float] = NOT_GIVEN,
+    ) -> None:
+        """
+        Update the VAD options.
+
+        Args:
+            min_speech_duration (float): Minimum duration of speech to start a new speech chunk.
+            min_silence_duration (float): At the end of each speech, wait this duration before ending the speech.
+            prefix_padding_duration (float): Duration of padding to add to the beginning of each speech chunk.
+            max_buffered_speech (float): Maximum duration of speech to keep in the buffer (in seconds).
+            activation_threshold (float): Threshold to consider a frame as speech.
+        """  # noqa: E501
+        if is_given(min_speech_duration):
+            self._opts.min_speech_duration = min_speech_duration
+        if is_given(min_silence_duration):
+            self._opts.min_silence_duration = min_silence_duration
+        if is_given(prefix_padding_duration):
+            self._opts.prefix_padding_duration = prefix_padding_duration
+        if is_given(max_buffered_speech):
+            self._opts.max_buffered_speech = max_buffered_speech
+        if is_given(activation_threshold):
+            self._opts.activation_threshold = activation_threshold
+
+        for stream in self._streams:
+            stream.update_options(
+                min_speech_duration=min_speech_duration,
+                min_silence_duration=min_silence_duration,
+                prefix_padding_duration=prefix_padding_duration,
+                max_buffered_speech=max_buffered_speech,
+                activation_threshold=activation_threshold,
+            )
+
+
+class VADStream(_VADStream):
+    def __init__(self, vad: VAD, opts: _VADOptions, executor: InferenceExecutor) -> None:
+        self._inference_executor = executor
+        self._stream_id = uuid.uuid4().bytes
+        super().__init__(vad, opts, self._run_inference)
+
+    async def _run_inference(self, data: np.ndarray) -> float:
+        header = _REQUEST_HEADER.pack(_OP_INFERENCE, self._stream_id, self._opts.sample_rate)
+        result = await self._inference_executor.do_inference(
+            _SileroVADRunner.INFERENCE_METHOD, header + data.astype(np.float32).tobytes()
+        )
+        if result is None:
+            raise RuntimeError("silero inference failed in the inference process")
+        return float(_RESPONSE.unpack(result)[0])
+
+    async def _main_task(self) -> None:
+        try:
+            await super()._main_task()
+        finally:
+            # release the state kept by the runner, without blocking the close of the stream
+            task = asyncio.ensure_future(self._release())
+            _release_tasks.add(task)
+            task.add_done_callback(_release_tasks.discard)
+
+    async def _release(self) -> None:
+        try:
+            await self._inference_executor.do_inference(
+                _SileroVADRunner.INFERENCE_METHOD,
+                _REQUEST_HEADER.pack(_OP_CLOSE, self._stream_id, self._opts.sample_rate),
+            )
+        except Exception:
+            logger.debug("failed to release the silero stream state", exc_info=True)
+
+
+_release_tasks: set[asyncio.Task[None]] = set()
+
+_InferenceRunner.register_runner(_SileroVADRunner)
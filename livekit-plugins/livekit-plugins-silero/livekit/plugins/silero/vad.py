@@ -17,10 +17,11 @@ from __future__ import annotations
 import asyncio
 import time
 import weakref
+from collections.abc import Awaitable
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Literal
+from typing import Callable, Literal
 
 import numpy as np
 import onnxruntime  # type: ignore
@@ -38,6 +39,51 @@ from .log import logger
 
 SLOW_INFERENCE_THRESHOLD = 0.2  # late by 200ms
 
+# returns the speech probability of a window, the window is reused once the call returns
+_InferenceFnc = Callable[[np.ndarray], Awaitable[float]]
+
+
+class _SlidingWindow:
+    """Preallocated int16 sample buffer, consumed from the front.
+
+    Pushed audio is copied once into the buffer and windows are returned as views, so reading
+    a window doesn't concatenate or reallocate the pending audio.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._buf = np.empty(max(capacity, 1), dtype=np.int16)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def push(self, data: np.ndarray) -> None:
+        n = len(data)
+        if self._end + n > len(self._buf):
+            pending = self._end - self._start
+            if pending + n <= len(self._buf):
+                # move the pending samples to the front (np.copyto handles overlapping memory)
+                np.copyto(self._buf[:pending], self._buf[self._start : self._end])
+            else:
+                buf = np.empty(max(2 * len(self._buf), pending + n), dtype=np.int16)
+                buf[:pending] = self._buf[self._start : self._end]
+                self._buf = buf
+
+            self._start, self._end = 0, pending
+
+        self._buf[self._end : self._end + n] = data
+        self._end += n
+
+    def peek(self, n: int) -> np.ndarray:
+        """Return a view of the first n pending samples (or less if not enough are available)"""
+        return self._buf[self._start : min(self._start + n, self._end)]
+
+    def consume(self, n: int) -> None:
+        self._start = min(self._start + n, self._end)
+        if self._start == self._end:
+            self._start = self._end = 0
+
 
 @dataclass
 class _VADOptions:
@@ -68,6 +114,7 @@ class VAD(agents.vad.VAD):
         sample_rate: Literal[8000, 16000] = 16000,
         force_cpu: bool = True,
         onnx_file_path: NotGivenOr[Path | str] = NOT_GIVEN,
+        batched_inference: bool = False,
         # deprecated
         padding_duration: NotGivenOr[float] = NOT_GIVEN,
     ) -> VAD:
@@ -106,6 +153,7 @@ class VAD(agents.vad.VAD):
             sample_rate (Literal[8000, 16000]): Sample rate for the inference (only 8KHz and 16KHz are supported).
             onnx_file_path (Path | str | None): Path to the ONNX model file. If not provided, the default model will be loaded. This can be helpful if you want to use a previous version of the silero model.
             force_cpu (bool): Force the use of CPU for inference.
+            batched_inference (bool): Share a single model between all the VAD instances of the process, and run the pending windows of all their streams as one batched inference. This reduces the inference overhead when many sessions run in the same process.
             padding_duration (float | None): **Deprecated**. Use `prefix_padding_duration` instead.
 
         Returns:
@@ -123,7 +171,17 @@ class VAD(agents.vad.VAD):
             )
             prefix_padding_duration = padding_duration
 
-        session = onnx_model.new_inference_session(force_cpu, onnx_file_path=onnx_file_path or None)
+        batched: onnx_model.BatchedInference | None = None
+        if batched_inference:
+            batched = onnx_model.shared_batched_inference(
+                force_cpu, onnx_file_path=onnx_file_path or None
+            )
+            session = batched.session
+        else:
+            session = onnx_model.new_inference_session(
+                force_cpu, onnx_file_path=onnx_file_path or None
+            )
+
         opts = _VADOptions(
             min_speech_duration=min_speech_duration,
             min_silence_duration=min_silence_duration,
@@ -132,17 +190,19 @@ class VAD(agents.vad.VAD):
             activation_threshold=activation_threshold,
             sample_rate=sample_rate,
         )
-        return cls(session=session, opts=opts)
+        return cls(session=session, opts=opts, batched_inference=batched)
 
     def __init__(
         self,
         *,
         session: onnxruntime.InferenceSession,
         opts: _VADOptions,
+        batched_inference: onnx_model.BatchedInference | None = None,
     ) -> None:
         super().__init__(capabilities=agents.vad.VADCapabilities(update_interval=0.032))
         self._onnx_session = session
         self._opts = opts
+        self._batched_inference = batched_inference
         self._streams = weakref.WeakSet[VADStream]()
 
     @property
@@ -160,13 +220,27 @@ class VAD(agents.vad.VAD):
         Returns:
             VADStream: A stream object for processing audio input and detecting speech.
         """
-        stream = VADStream(
-            self,
-            self._opts,
-            onnx_model.OnnxModel(
-                onnx_session=self._onnx_session, sample_rate=self._opts.sample_rate
-            ),
+        model = onnx_model.OnnxModel(
+            onnx_session=self._onnx_session, sample_rate=self._opts.sample_rate
         )
+
+        if self._batched_inference is not None:
+            batched = self._batched_inference
+
+            async def _batched_inference(data: np.ndarray) -> float:
+                return await asyncio.wrap_future(batched.submit(model, data))
+
+            stream = VADStream(self, self._opts, _batched_inference)
+        else:
+            loop = asyncio.get_event_loop()
+            executor = ThreadPoolExecutor(max_workers=1)
+
+            async def _inference(data: np.ndarray) -> float:
+                return await loop.run_in_executor(executor, model, data)
+
+            stream = VADStream(self, self._opts, _inference)
+            stream._task.add_done_callback(lambda _: executor.shutdown(wait=False))
+
         self._streams.add(stream)
         return stream
 
@@ -213,13 +287,13 @@ class VAD(agents.vad.VAD):
 
 
 class VADStream(agents.vad.VADStream):
-    def __init__(self, vad: VAD, opts: _VADOptions, model: onnx_model.OnnxModel) -> None:
+    def __init__(
+        self, vad: agents.vad.VAD, opts: _VADOptions, inference_fnc: _InferenceFnc
+    ) -> None:
         super().__init__(vad)
-        self._opts, self._model = opts, model
-        self._loop = asyncio.get_event_loop()
-
-        self._executor = ThreadPoolExecutor(max_workers=1)
-        self._task.add_done_callback(lambda _: self._executor.shutdown(wait=False))
+        self._opts = opts
+        self._inference_fnc = inference_fnc
+        self._window_size_samples = onnx_model.window_size_samples(opts.sample_rate)
         self._exp_filter = utils.ExpFilter(alpha=0.35)
 
         self._input_sample_rate = 0
@@ -278,7 +352,7 @@ class VADStream(agents.vad.VADStream):
 
     @agents.utils.log_exceptions(logger=logger)
     async def _main_task(self) -> None:
-        inference_f32_data = np.empty(self._model.window_size_samples, dtype=np.float32)
+        inference_f32_data = np.empty(self._window_size_samples, dtype=np.float32)
         speech_buffer_index: int = 0
 
         # "pub_" means public, these values are exposed to the users through events
@@ -291,8 +365,9 @@ class VADStream(agents.vad.VADStream):
         speech_threshold_duration = 0.0
         silence_threshold_duration = 0.0
 
-        input_frames: list[rtc.AudioFrame] = []
-        inference_frames: list[rtc.AudioFrame] = []
+        # pending samples at the input sample rate and at the model sample rate
+        input_window: _SlidingWindow | None = None
+        inference_window = _SlidingWindow(self._window_size_samples * 4)
         resampler: rtc.AudioResampler | None = None
 
         # used to avoid drift when the sample_rate ratio is not an integer
@@ -318,6 +393,11 @@ class VADStream(agents.vad.VADStream):
                     dtype=np.int16,
                 )
 
+                input_window = _SlidingWindow(
+                    int(self._window_size_samples * 4 * self._input_sample_rate)
+                    // self._opts.sample_rate
+                )
+
                 if self._input_sample_rate != self._opts.sample_rate:
                     # resampling needed: the input sample rate isn't the same as the model's
                     # sample rate used for inference
@@ -331,61 +411,53 @@ class VADStream(agents.vad.VADStream):
                 logger.error("a frame with another sample rate was already pushed")
                 continue
 
-            assert self._speech_buffer is not None
+            assert self._speech_buffer is not None and input_window is not None
 
-            input_frames.append(input_frame)
+            input_window.push(np.frombuffer(input_frame.data, dtype=np.int16))
             if resampler is not None:
                 # the resampler may have a bit of latency, but it is OK to ignore since it should be
                 # negligible
-                inference_frames.extend(resampler.push(input_frame))
+                for frame in resampler.push(input_frame):
+                    inference_window.push(np.frombuffer(frame.data, dtype=np.int16))
             else:
-                inference_frames.append(input_frame)
+                inference_window.push(np.frombuffer(input_frame.data, dtype=np.int16))
 
             while True:
                 start_time = time.perf_counter()
 
-                available_inference_samples = sum(
-                    [frame.samples_per_channel for frame in inference_frames]
-                )
-                if available_inference_samples < self._model.window_size_samples:
+                if len(inference_window) < self._window_size_samples:
                     break  # not enough samples to run inference
 
-                input_frame = utils.combine_frames(input_frames)
-                inference_frame = utils.combine_frames(inference_frames)
-
                 # convert data to f32
                 np.divide(
-                    inference_frame.data[: self._model.window_size_samples],
+                    inference_window.peek(self._window_size_samples),
                     np.iinfo(np.int16).max,
                     out=inference_f32_data,
                     dtype=np.float32,
                 )
 
                 # run the inference
-                p = await self._loop.run_in_executor(
-                    self._executor, self._model, inference_f32_data
-                )
+                p = await self._inference_fnc(inference_f32_data)
                 p = self._exp_filter.apply(exp=1.0, sample=p)
 
-                window_duration = self._model.window_size_samples / self._opts.sample_rate
+                window_duration = self._window_size_samples / self._opts.sample_rate
 
-                pub_current_sample += self._model.window_size_samples
+                pub_current_sample += self._window_size_samples
                 pub_timestamp += window_duration
 
-                resampling_ratio = self._input_sample_rate / self._model.sample_rate
-                to_copy = (
-                    self._model.window_size_samples * resampling_ratio + input_copy_remaining_fract
-                )
+                resampling_ratio = self._input_sample_rate / self._opts.sample_rate
+                to_copy = self._window_size_samples * resampling_ratio + input_copy_remaining_fract
                 to_copy_int = int(to_copy)
                 input_copy_remaining_fract = to_copy - to_copy_int
+                input_data = input_window.peek(to_copy_int)
 
                 # copy the inference window to the speech buffer
                 available_space = len(self._speech_buffer) - speech_buffer_index
-                to_copy_buffer = min(to_copy_int, available_space)
+                to_copy_buffer = min(len(input_data), available_space)
                 if to_copy_buffer > 0:
                     self._speech_buffer[
                         speech_buffer_index : speech_buffer_index + to_copy_buffer
-                    ] = input_frame.data[:to_copy_buffer]
+                    ] = input_data[:to_copy_buffer]
                     speech_buffer_index += to_copy_buffer
                 elif not self._speech_buffer_max_reached:
                     # reached self._opts.max_buffered_speech (padding is included)
@@ -448,10 +520,10 @@ class VADStream(agents.vad.VADStream):
                         inference_duration=inference_duration,
                         frames=[
                             rtc.AudioFrame(
-                                data=input_frame.data[:to_copy_int].tobytes(),
+                                data=input_data.tobytes(),
                                 sample_rate=self._input_sample_rate,
                                 num_channels=1,
-                                samples_per_channel=to_copy_int,
+                                samples_per_channel=len(input_data),
                             )
                         ],
                         speaking=pub_speaking,
@@ -511,29 +583,6 @@ class VADStream(agents.vad.VADStream):
 
                         _reset_write_cursor()
 
-                # remove the frames that were used for inference from the input and inference frames
-                input_frames = []
-                inference_frames = []
-
-                # add the remaining data
-                if len(input_frame.data) - to_copy_int > 0:
-                    data = input_frame.data[to_copy_int:].tobytes()
-                    input_frames.append(
-                        rtc.AudioFrame(
-                            data=data,
-                            sample_rate=self._input_sample_rate,
-                            num_channels=1,
-                            samples_per_channel=len(data) // 2,
-                        )
-                    )
-
-                if len(inference_frame.data) - self._model.window_size_samples > 0:
-                    data = inference_frame.data[self._model.window_size_samples :].tobytes()
-                    inference_frames.append(
-                        rtc.AudioFrame(
-                            data=data,
-                            sample_rate=self._opts.sample_rate,
-                            num_channels=1,
-                            samples_per_channel=len(data) // 2,
-                        )
-                    )
+                # remove the samples that were used for inference
+                input_window.consume(to_copy_int)
+                inference_window.consume(self._window_size_samples)
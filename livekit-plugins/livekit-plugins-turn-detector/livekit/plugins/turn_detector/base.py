@@ -9,6 +9,7 @@ import unicodedata
 from abc import ABC, abstractmethod
 from typing import Any
 
+import numpy as np
 from huggingface_hub import errors
 
 from livekit.agents import llm
@@ -43,9 +44,14 @@ def _download_from_hf_hub(repo_id: str, filename: str, **kwargs: Any) -> str:
 
 
 class _EUORunnerBase(_InferenceRunner):
+    SUPPORTS_BATCHING = True
+    BATCH_MAX_SIZE = 16
+    BATCH_WINDOW = 0.005
+
     def __init__(self, model_type: EOUModelType):
         super().__init__()
         self._model_revision = MODEL_REVISIONS[model_type]
+        self._batched_outputs = True  # cleared if the model can't run padded batches
 
     def _normalize_text(self, text: str) -> str:
         if not text:
@@ -129,16 +135,16 @@ class _EUORunnerBase(_InferenceRunner):
                 f"Could not find model {HG_MODEL} with revision {self._model_revision}."
             ) from None
 
-    def run(self, data: bytes) -> bytes | None:
+    def _parse_request(self, data: bytes) -> str:
         data_json = json.loads(data)
         chat_ctx = data_json.get("chat_ctx", None)
 
         if not chat_ctx:
             raise ValueError("chat_ctx is required on the inference input data")
 
-        start_time = time.perf_counter()
+        return self._format_chat_ctx(chat_ctx)
 
-        text = self._format_chat_ctx(chat_ctx)
+    def _tokenize(self, text: str) -> np.ndarray:
         inputs = self._tokenizer(
             text,
             add_special_tokens=False,
@@ -146,18 +152,106 @@ class _EUORunnerBase(_InferenceRunner):
             max_length=MAX_HISTORY_TOKENS,
             truncation=True,
         )
+        input_ids = inputs["input_ids"][0].astype(np.int64)
+        if len(input_ids) == 0:
+            raise ValueError("the chat context is empty after tokenization")
+        return input_ids  # type: ignore
+
+    def _infer(self, input_ids: np.ndarray) -> float:
+        outputs = self._session.run(None, {"input_ids": input_ids[np.newaxis, :]})
+        return float(outputs[0].flatten()[-1])
+
+    def _infer_each(self, token_ids: list[np.ndarray]) -> list[float | Exception]:
+        results: list[float | Exception] = []
+        for ids in token_ids:
+            try:
+                results.append(self._infer(ids))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _infer_batch(self, token_ids: list[np.ndarray]) -> list[float | Exception]:
+        if len(token_ids) == 1 or not self._batched_outputs:
+            return self._infer_each(token_ids)
+
+        lengths = [len(ids) for ids in token_ids]
+        max_len = max(lengths)
+
+        # the model is causal, so right-padding doesn't affect the logits of the real tokens
+        pad_id = self._tokenizer.pad_token_id or 0
+        input_ids = np.full((len(token_ids), max_len), pad_id, dtype=np.int64)
+        for i, ids in enumerate(token_ids):
+            input_ids[i, : len(ids)] = ids
+
+        try:
+            probs = np.asarray(self._session.run(None, {"input_ids": input_ids})[0])
+        except Exception:
+            probs = None  # e.g. the batch axis of the exported model isn't dynamic
+
+        if probs is None or probs.ndim < 2 or probs.shape[:2] != input_ids.shape:
+            # the model doesn't return a probability per position (e.g. only the last one, which
+            # is a pad token for the shorter inputs), run the requests one by one from now on
+            logger.warning(
+                "turn detector model doesn't support batching, running requests sequentially",
+                extra={"output_shape": None if probs is None else probs.shape},
+            )
+            self._batched_outputs = False
+            return self._infer_each(token_ids)
+
+        probs = probs.reshape(len(token_ids), max_len, -1)
+        return [float(probs[i, length - 1, -1]) for i, length in enumerate(lengths)]
+
+    def run(self, data: bytes) -> bytes | None:
+        start_time = time.perf_counter()
+
+        text = self._parse_request(data)
+        input_ids = self._tokenize(text)
         # Run inference
-        outputs = self._session.run(None, {"input_ids": inputs["input_ids"].astype("int64")})
-        eou_probability = outputs[0].flatten()[-1]
+        eou_probability = self._infer(input_ids)
         end_time = time.perf_counter()
 
         result: dict[str, Any] = {
-            "eou_probability": float(eou_probability),
+            "eou_probability": eou_probability,
             "input": text,
             "duration": round(end_time - start_time, 3),
         }
         return json.dumps(result).encode()
 
+    def run_batch(self, data: list[bytes]) -> list[bytes | None | Exception]:
+        start_time = time.perf_counter()
+
+        # an invalid request only fails itself, not the rest of the batch
+        results: list[bytes | None | Exception] = []
+        valid: list[tuple[int, str, np.ndarray]] = []
+        for i, d in enumerate(data):
+            try:
+                text = self._parse_request(d)
+                valid.append((i, text, self._tokenize(text)))
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+
+        if not valid:
+            return results
+
+        probs = self._infer_batch([ids for _, _, ids in valid])
+        end_time = time.perf_counter()
+
+        for (i, text, _), eou_probability in zip(valid, probs):
+            if isinstance(eou_probability, Exception):
+                results[i] = eou_probability
+                continue
+
+            result: dict[str, Any] = {
+                "eou_probability": eou_probability,
+                "input": text,
+                "duration": round(end_time - start_time, 3),
+                "batch_size": len(valid),
+            }
+            results[i] = json.dumps(result).encode()
+
+        return results
+
 
 class EOUModelBase(ABC):
     def __init__(
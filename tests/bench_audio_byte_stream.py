@@ -0,0 +1,69 @@
+"""Benchmark AudioByteStream.push with multi-second chunks at 48kHz stereo.
+
+Run with: python -m tests.bench_audio_byte_stream
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+from livekit import rtc
+from livekit.agents.utils.audio import AudioByteStream
+
+SAMPLE_RATE = 48000
+NUM_CHANNELS = 2
+SAMPLES_PER_CHANNEL = SAMPLE_RATE // 100  # 10ms frames
+
+
+class _LegacyAudioByteStream:
+    """previous implementation, re-slicing the bytearray for every emitted frame"""
+
+    def __init__(self, sample_rate: int, num_channels: int, samples_per_channel: int) -> None:
+        self._sample_rate = sample_rate
+        self._num_channels = num_channels
+        self._bytes_per_sample = num_channels * 2
+        self._bytes_per_frame = samples_per_channel * self._bytes_per_sample
+        self._buf = bytearray()
+
+    def push(self, data: bytes) -> list[rtc.AudioFrame]:
+        self._buf.extend(data)
+        frames = []
+        while len(self._buf) >= self._bytes_per_frame:
+            frame_data = self._buf[: self._bytes_per_frame]
+            self._buf = self._buf[self._bytes_per_frame :]
+            frames.append(
+                rtc.AudioFrame(
+                    data=frame_data,
+                    sample_rate=self._sample_rate,
+                    num_channels=self._num_channels,
+                    samples_per_channel=len(frame_data) // self._bytes_per_sample,
+                )
+            )
+        return frames
+
+
+def _bench(cls: type, chunk: bytes, iterations: int) -> float:
+    bstream = cls(SAMPLE_RATE, NUM_CHANNELS, SAMPLES_PER_CHANNEL)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        bstream.push(chunk)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    print(f"{'chunk':>8} {'legacy ms/push':>16} {'current ms/push':>16} {'speedup':>8}")
+    for seconds in (0.1, 1.0, 5.0, 10.0):
+        # add a few extra bytes so the chunks don't align on frame boundaries
+        chunk = os.urandom(int(SAMPLE_RATE * seconds) * NUM_CHANNELS * 2 + 4 * NUM_CHANNELS)
+        iterations = max(3, int(20 / seconds))
+        legacy = _bench(_LegacyAudioByteStream, chunk, iterations)
+        current = _bench(AudioByteStream, chunk, iterations)
+        print(
+            f"{seconds:>7.1f}s {legacy * 1000:>16.2f} {current * 1000:>16.2f} "
+            f"{legacy / current:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
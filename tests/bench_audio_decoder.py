@@ -0,0 +1,125 @@
+"""Benchmark AudioStreamDecoder throughput when decoding tests/long.mp3.
+
+The compressed data is pushed in small chunks (like a streaming TTS response) and compared
+against the previous StreamBuffer implementation, which rebuilt an io.BytesIO with all the
+unread data on every read.
+
+Run with: python -m tests.bench_audio_decoder [path/to/file.mp3]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+
+from livekit.agents.utils.codecs import AudioStreamDecoder, decoder
+
+MP3_FILEPATH = os.path.join(os.path.dirname(__file__), "long.mp3")
+CHUNK_SIZE = 4096
+
+
+class _LegacyStreamBuffer:
+    def __init__(self) -> None:
+        self._buffer = io.BytesIO()
+        self._lock = threading.Lock()
+        self._data_available = threading.Condition(self._lock)
+        self._eof = False
+
+    def write(self, data: bytes) -> None:
+        with self._data_available:
+            self._buffer.seek(0, io.SEEK_END)
+            self._buffer.write(data)
+            self._data_available.notify_all()
+
+    def read(self, size: int = -1) -> bytes:
+        if self._buffer.closed:
+            return b""
+
+        with self._data_available:
+            while True:
+                if self._buffer.closed:
+                    return b""
+                self._buffer.seek(0)
+                data = self._buffer.read(size)
+                if data:
+                    remaining = self._buffer.read()
+                    self._buffer = io.BytesIO(remaining)
+                    return data
+                if self._eof:
+                    return b""
+                self._data_available.wait()
+
+    def end_input(self) -> None:
+        with self._data_available:
+            self._eof = True
+            self._data_available.notify_all()
+
+    def close(self) -> None:
+        self._buffer.close()
+
+
+async def _decode(data: bytes) -> tuple[float, float, float]:
+    dec = AudioStreamDecoder(sample_rate=24000, num_channels=1, format="audio/mpeg")
+    start = time.perf_counter()
+    for i in range(0, len(data), CHUNK_SIZE):
+        dec.push(data[i : i + CHUNK_SIZE])
+    dec.end_input()
+
+    audio_duration = 0.0
+    async for frame in dec:
+        audio_duration += frame.duration
+
+    elapsed = time.perf_counter() - start
+    await dec.aclose()
+    return elapsed, audio_duration, time.process_time()
+
+
+async def _bench(label: str, path: str) -> None:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    cpu_start = time.process_time()
+    elapsed, audio_duration, cpu_end = await _decode(data)
+    print(
+        f"{label:>8}: {len(data) / 1024:.0f} KiB, {audio_duration:.1f}s of audio decoded in "
+        f"{elapsed * 1000:.0f}ms ({audio_duration / elapsed:.0f}x realtime), "
+        f"cpu {(cpu_end - cpu_start) * 1000:.0f}ms"
+    )
+
+
+def _bench_reads(label: str, cls: type, data: bytes, read_size: int = 256) -> None:
+    buf = cls()
+    for i in range(0, len(data), CHUNK_SIZE):
+        buf.write(data[i : i + CHUNK_SIZE])
+    buf.end_input()
+
+    start = time.perf_counter()
+    while buf.read(read_size):
+        pass
+    elapsed = time.perf_counter() - start
+    print(f"{label:>8}: StreamBuffer drained in {read_size}B reads in {elapsed * 1000:.1f}ms")
+
+
+def main() -> None:
+    path = sys.argv[1] if len(sys.argv) > 1 else MP3_FILEPATH
+    current_cls = decoder.StreamBuffer
+    try:
+        decoder.StreamBuffer = _LegacyStreamBuffer  # type: ignore
+        asyncio.run(_bench("legacy", path))
+    finally:
+        decoder.StreamBuffer = current_cls  # type: ignore
+
+    asyncio.run(_bench("current", path))
+
+    with open(path, "rb") as f:
+        data = f.read()
+    _bench_reads("legacy", _LegacyStreamBuffer, data)
+    _bench_reads("current", decoder.StreamBuffer, data)
+
+
+if __name__ == "__main__":
+    main()
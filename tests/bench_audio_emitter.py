@@ -0,0 +1,75 @@
+"""Benchmark the per-frame overhead of AudioEmitter for a fast streaming TTS.
+
+A 60s segment of 24kHz audio is pushed in 20ms chunks, faster than realtime, and the emitted
+frames are consumed from the destination channel. The default emission (one frame per
+frame_size_ms) is compared with the batched emission (max_frame_size_ms).
+
+Run with: python -m tests.bench_audio_emitter
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from livekit.agents import tts
+from livekit.agents.utils import aio
+
+SAMPLE_RATE = 24000
+DURATION = 60.0
+CHUNK_MS = 20
+ROUNDS = 5
+
+
+async def _run(*, frame_size_ms: int, max_frame_size_ms: int | None) -> tuple[float, int]:
+    ch = aio.Chan[tts.SynthesizedAudio]()
+    emitter = tts.AudioEmitter(label="bench", dst_ch=ch)
+    emitter.initialize(
+        request_id="bench",
+        sample_rate=SAMPLE_RATE,
+        num_channels=1,
+        mime_type="audio/pcm",
+        frame_size_ms=frame_size_ms,
+        max_frame_size_ms=max_frame_size_ms,
+        stream=True,
+    )
+    chunk = b"\0\0" * (SAMPLE_RATE * CHUNK_MS // 1000)
+
+    async def _consume() -> int:
+        num_frames = 0
+        async for _ in ch:
+            num_frames += 1
+        return num_frames
+
+    consume_atask = asyncio.create_task(_consume())
+    start = time.perf_counter()
+    emitter.start_segment(segment_id="seg")
+    for i in range(int(DURATION * 1000 / CHUNK_MS)):
+        emitter.push(chunk)
+        if i % 10 == 0:
+            await asyncio.sleep(0)  # the provider yields to the event loop between messages
+    emitter.end_input()
+    await emitter.join()
+    ch.close()
+    num_frames = await consume_atask
+    return time.perf_counter() - start, num_frames
+
+
+async def main() -> None:
+    for frame_size_ms, max_frame_size_ms in [(20, None), (20, 200), (200, None), (200, 1000)]:
+        best, num_frames = min(
+            [
+                await _run(frame_size_ms=frame_size_ms, max_frame_size_ms=max_frame_size_ms)
+                for _ in range(ROUNDS)
+            ]
+        )
+        print(
+            f"frame_size_ms={frame_size_ms:<4} max_frame_size_ms={max_frame_size_ms!s:<5}: "
+            f"{num_frames:5d} frames, {best * 1000:7.2f}ms "
+            f"({best / num_frames * 1e6:6.1f}us/frame, {best / DURATION * 1e6:6.1f}us per "
+            "second of audio)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
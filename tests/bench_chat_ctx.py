@@ -0,0 +1,99 @@
+"""Benchmark id lookups, insertions and merges on a large ChatContext.
+
+Compares ChatContext with a plain list of items and the linear scans of the previous
+implementation, at 5k items. The resulting items of both must be identical.
+
+Run with: python -m tests.bench_chat_ctx
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable
+
+from livekit.agents.llm import ChatContext, ChatItem, ChatMessage
+
+NUM_ITEMS = 5000
+NUM_OPS = 1000
+MERGE_SIZE = 500
+
+
+class _LegacyChatContext:
+    def __init__(self, items: list[ChatItem]) -> None:
+        self.items = items
+
+    def get_by_id(self, item_id: str) -> ChatItem | None:
+        return next((item for item in self.items if item.id == item_id), None)
+
+    def find_insertion_index(self, *, created_at: float) -> int:
+        for i in reversed(range(len(self.items))):
+            if self.items[i].created_at <= created_at:
+                return i + 1
+        return 0
+
+    def insert(self, item: ChatItem) -> None:
+        self.items.insert(self.find_insertion_index(created_at=item.created_at), item)
+
+    def merge(self, other: list[ChatItem]) -> None:
+        existing_ids = {item.id for item in self.items}
+        for item in other:
+            if item.id not in existing_ids:
+                self.insert(item)
+                existing_ids.add(item.id)
+
+
+def _messages(rng: random.Random, prefix: str, n: int) -> list[ChatItem]:
+    return [
+        ChatMessage(id=f"{prefix}_{i}", role="user", content=["hi"], created_at=rng.random())
+        for i in range(n)
+    ]
+
+
+def _timed(fnc: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fnc()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rng = random.Random(0)
+    base = sorted(_messages(rng, "item", NUM_ITEMS), key=lambda item: item.created_at)
+    lookups = [rng.choice(base).id for _ in range(NUM_OPS)]
+    inserts = _messages(rng, "insert", NUM_OPS)
+    merged = _messages(rng, "merge", MERGE_SIZE) + rng.sample(base, MERGE_SIZE)
+
+    legacy = _LegacyChatContext(list(base))
+    chat_ctx = ChatContext(list(base))
+
+    cases: list[tuple[str, Callable[[], object], Callable[[], object]]] = [
+        (
+            f"{NUM_OPS} get_by_id",
+            lambda: [legacy.get_by_id(i) for i in lookups],
+            lambda: [chat_ctx.get_by_id(i) for i in lookups],
+        ),
+        (
+            f"{NUM_OPS} inserts",
+            lambda: [legacy.insert(item) for item in inserts],
+            lambda: [chat_ctx.insert(item) for item in inserts],
+        ),
+        (
+            f"merge of {len(merged)}",
+            lambda: legacy.merge(merged),
+            lambda: chat_ctx.merge(ChatContext(merged)),
+        ),
+    ]
+
+    print(f"{'case':>20} {'legacy ms':>10} {'current ms':>11} {'speedup':>8}")
+    for name, run_legacy, run_current in cases:
+        legacy_t = _timed(run_legacy)
+        current_t = _timed(run_current)
+        assert chat_ctx.items == legacy.items, f"{name}: items differ"
+        print(
+            f"{name:>20} {legacy_t * 1000:>10.1f} {current_t * 1000:>11.1f} "
+            f"{legacy_t / current_t:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
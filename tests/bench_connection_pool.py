@@ -0,0 +1,141 @@
+"""Benchmark the time streams wait for a connection of the ConnectionPool.
+
+A local websocket server delays every handshake by CONNECT_LATENCY (TLS and round trips to the
+provider). Compares the previous pool, whose get() connected behind a single lock, with the
+current one (parallel connects, then min_idle whose connections are refreshed in the
+background) on two workloads:
+
+- burst: BURST streams start together on a prewarmed pool (like the plugins do when the job
+  starts), then again once the connections were returned.
+- after expiry: a single stream every SESSION_INTERVAL, longer than max_session_duration, like
+  the first utterance of a user after a pause. Without min_idle, the expired connection is
+  only replaced by get().
+
+Run with: python -m tests.bench_connection_pool
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+from livekit.agents.utils import ConnectionPool
+
+CONNECT_LATENCY = 0.15
+BURST = 16
+MAX_SESSION_DURATION = 1.0
+SESSION_INTERVAL = 1.2
+NUM_SESSIONS = 5
+
+
+class _LegacyPool(ConnectionPool[Any]):
+    """get() of the previous implementation: drain, reuse and connect behind one lock"""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._connect_lock = asyncio.Lock()
+
+    async def get(self, *, timeout: float) -> Any:
+        start = time.perf_counter()
+        async with self._connect_lock:
+            await self._drain_to_close()
+            reused = self._pop_available()
+            conn = reused if reused is not None else await self._connect(timeout)
+
+        self._stats.gets += 1
+        self._stats.reused += reused is not None
+        self._stats.wait_time += time.perf_counter() - start
+        return conn
+
+    def _ensure_upkeep(self) -> None:
+        pass  # expired connections were only found by get()
+
+
+async def _handler(request: web.Request) -> web.WebSocketResponse:
+    await asyncio.sleep(CONNECT_LATENCY)
+    ws = web.WebSocketResponse()
+    try:
+        await ws.prepare(request)
+    except ConnectionResetError:
+        return ws  # background connects are cancelled when the pool is closed
+
+    async for _ in ws:
+        pass
+    return ws
+
+
+async def _stream(pool: ConnectionPool[Any]) -> float:
+    start = time.perf_counter()
+    async with pool.connection(timeout=10) as ws:
+        wait = time.perf_counter() - start
+        await ws.send_str("hello")
+        await asyncio.sleep(0.05)
+    return wait
+
+
+async def _run(url: str, pool_cls: type[ConnectionPool[Any]], **kwargs: Any) -> None:
+    async with aiohttp.ClientSession() as session:
+
+        async def _connect(timeout: float) -> aiohttp.ClientWebSocketResponse:
+            return await session.ws_connect(url)
+
+        async def _close(ws: aiohttp.ClientWebSocketResponse) -> None:
+            await ws.close()
+
+        def _pool(**extra: Any) -> ConnectionPool[Any]:
+            return pool_cls(connect_cb=_connect, close_cb=_close, **kwargs, **extra)
+
+        pool = _pool()
+        pool.prewarm()
+        await asyncio.sleep(CONNECT_LATENCY * 2)
+        first = await asyncio.gather(*[_stream(pool) for _ in range(BURST)])
+        second = await asyncio.gather(*[_stream(pool) for _ in range(BURST)])
+        print(
+            f"  burst       : first p50 {statistics.median(first) * 1000:6.1f}ms "
+            f"max {max(first) * 1000:6.1f}ms, second max {max(second) * 1000:6.1f}ms, "
+            f"{pool.stats.connects} connects"
+        )
+        await pool.aclose()
+
+        pool = _pool(max_session_duration=MAX_SESSION_DURATION, refresh_margin=0.3)
+        pool.prewarm()
+        await asyncio.sleep(CONNECT_LATENCY * 2)
+        waits = []
+        for _ in range(NUM_SESSIONS):
+            await asyncio.sleep(SESSION_INTERVAL)
+            waits.append(await _stream(pool))
+        print(
+            f"  after expiry: mean {statistics.mean(waits) * 1000:6.1f}ms "
+            f"max {max(waits) * 1000:6.1f}ms, reuse ratio {pool.stats.reuse_ratio:.2f}"
+        )
+        await pool.aclose()
+
+
+async def main() -> None:
+    app = web.Application()
+    app.router.add_get("/", _handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"  # type: ignore[union-attr]
+
+    try:
+        print(f"connect latency {CONNECT_LATENCY * 1000:.0f}ms, {BURST} streams per burst")
+        print("legacy (single lock)")
+        await _run(url, _LegacyPool)
+        print("parallel connects")
+        await _run(url, ConnectionPool, max_concurrent_connects=BURST)
+        print("parallel connects + min_idle=4")
+        await _run(url, ConnectionPool, max_concurrent_connects=BURST, min_idle=4)
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
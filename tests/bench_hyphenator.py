@@ -0,0 +1,120 @@
+"""Benchmark the syllable counting of the basic hyphenator on tests/long_synthesize.txt.
+
+Compares the previous engine (walking a nested dict tree and concatenating the pieces char by
+char) with the flat array trie, uncached and through the per-process LRU used by
+hyphenate_word/hyphenate_words. The last table replays the TranscriptSynchronizer workload:
+every word is hyphenated, and the text between two words is re-tokenized and hyphenated again.
+
+Run with: python -m tests.bench_hyphenator
+"""
+
+from __future__ import annotations
+
+import pathlib
+import re
+import time
+from typing import Any, Callable
+
+from livekit.agents.tokenize import _basic_hyphenator, basic
+
+ROUNDS = 5
+REPEAT = 50
+
+
+class _LegacyHyphenator:
+    def __init__(self, patterns: str) -> None:
+        self.tree: dict[str | None, Any] = {}
+        for pattern in patterns.split():
+            chars = re.sub("[0-9]", "", pattern)
+            points = [int(d or 0) for d in re.split("[.a-z]", pattern)]
+            t = self.tree
+            for c in chars:
+                t = t.setdefault(c, {})
+            t[None] = points
+
+    def hyphenate_word(self, word: str) -> list[str]:
+        if len(word) <= 4:
+            return [word]
+        work = "." + word.lower() + "."
+        points = [0] * (len(work) + 1)
+        for i in range(len(work)):
+            t = self.tree
+            for c in work[i:]:
+                if c in t:
+                    t = t[c]
+                    if None in t:
+                        for j, p_j in enumerate(t[None]):
+                            points[i + j] = max(points[i + j], p_j)
+                else:
+                    break
+        points[1] = points[2] = points[-2] = points[-3] = 0
+        pieces = [""]
+        for c, p in zip(word, points[2:]):
+            pieces[-1] += c
+            if p % 2:
+                pieces.append("")
+        return pieces
+
+
+def _best(fnc: Callable[[], int]) -> tuple[float, int]:
+    results = []
+    for _ in range(ROUNDS):
+        _basic_hyphenator._hyphenate_cached.cache_clear()
+        start = time.perf_counter()
+        syllables = fnc()
+        results.append((time.perf_counter() - start, syllables))
+    return min(results)
+
+
+def main() -> None:
+    text = (pathlib.Path(__file__).parent / "long_synthesize.txt").read_text() * REPEAT
+    tokenizer = basic.WordTokenizer(
+        retain_format=True, ignore_punctuation=False, split_character=True
+    )
+    words = tokenizer.tokenize(text)
+
+    legacy = _LegacyHyphenator(_basic_hyphenator.PATTERNS)
+    compiled = _basic_hyphenator.Hyphenator(_basic_hyphenator.PATTERNS)
+
+    def _count(hyphenate_word: Callable[[str], list[str]]) -> Callable[[], int]:
+        return lambda: sum(len(hyphenate_word(w)) for w in words)
+
+    print(f"{len(words)} words")
+    variants = {
+        "legacy": _count(legacy.hyphenate_word),
+        "trie": _count(compiled.hyphenate_word),
+        "trie + lru (hyphenate_words)": lambda: sum(len(p) for p in basic.hyphenate_words(words)),
+    }
+    counts = set()
+    for name, fnc in variants.items():
+        elapsed, syllables = _best(fnc)
+        counts.add(syllables)
+        print(f"{name:<30}: {elapsed * 1000:7.2f}ms, {syllables / elapsed / 1e3:8.1f}k syllables/s")
+    assert len(counts) == 1
+
+    # synchronizer: each word, then the text delta between two words
+    def _synchronizer(
+        hyphenate_words: Callable[[list[str]], list[list[str]]],
+    ) -> Callable[[], int]:
+        def _run() -> int:
+            syllables, offset = 0, 0
+            for word in words:
+                syllables += len(hyphenate_words([word])[0])
+                delta = text[max(0, offset - 40) : offset + len(word)]
+                syllables += sum(len(p) for p in hyphenate_words(tokenizer.tokenize(delta)))
+                offset += len(word)
+            return syllables
+
+        return _run
+
+    print("\nsynchronizer workload")
+    for name, fnc in {
+        "legacy": _synchronizer(lambda ws: [legacy.hyphenate_word(w) for w in ws]),
+        "trie + lru": _synchronizer(basic.hyphenate_words),
+    }.items():
+        elapsed, syllables = _best(fnc)
+        print(f"{name:<30}: {elapsed * 1000:7.2f}ms, {syllables / elapsed / 1e3:8.1f}k syllables/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Benchmark the IPC channel between two processes (like the worker and a job process).
+
+Measures the round-trip latency of small messages (ping/pong) and the throughput of
+InferenceRequest messages sent concurrently, with the current codec and with the previous one
+(io.BytesIO serialization, separate writes for the length header and the payload).
+
+Run with: python -m tests.bench_ipc_channel
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import multiprocessing as mp
+import socket
+import statistics
+import struct
+import time
+import uuid
+
+from livekit.agents.ipc import channel, proto
+from livekit.agents.utils.aio import duplex_unix
+
+NUM_PINGS = 5000
+NUM_REQUESTS = 20000
+CONCURRENCY = 64
+PAYLOAD_SIZE = 2048  # ~ a VAD window
+
+
+def _legacy_write_message(msg: channel.Message) -> bytes:
+    bio = io.BytesIO()
+    channel.write_int(bio, msg.MSG_ID)
+    if isinstance(msg, channel.DataMessage):
+        msg.write(bio)  # type: ignore[arg-type]
+    return bio.getvalue()
+
+
+def _legacy_read_message(data: bytes) -> channel.Message:
+    bio = io.BytesIO(data)
+    msg = proto.IPC_MESSAGES[channel.read_int(bio)]()
+    if isinstance(msg, channel.DataMessage):
+        msg.read(bio)  # type: ignore[arg-type]
+    return msg
+
+
+async def _legacy_send(dplx: duplex_unix._AsyncDuplex, msg: channel.Message) -> None:
+    data = _legacy_write_message(msg)
+    dplx._writer.write(struct.pack("!I", len(data)))
+    dplx._writer.write(data)
+    await dplx._writer.drain()
+
+
+async def _legacy_recv(dplx: duplex_unix._AsyncDuplex) -> channel.Message:
+    return _legacy_read_message(await dplx.recv_bytes())
+
+
+async def _send(dplx: duplex_unix._AsyncDuplex, msg: channel.Message) -> None:
+    await channel.asend_message(dplx, msg)
+
+
+async def _recv(dplx: duplex_unix._AsyncDuplex) -> channel.Message:
+    return await channel.arecv_message(dplx, proto.IPC_MESSAGES)
+
+
+def _echo_main(sock: socket.socket, legacy: bool) -> None:
+    send, recv = (_legacy_send, _legacy_recv) if legacy else (_send, _recv)
+
+    async def _run() -> None:
+        dplx = await duplex_unix._AsyncDuplex.open(sock)
+        while True:
+            try:
+                msg = await recv(dplx)
+            except duplex_unix.DuplexClosed:
+                break
+
+            if isinstance(msg, proto.PingRequest):
+                await send(dplx, proto.PongResponse(last_timestamp=msg.timestamp))
+            elif isinstance(msg, proto.InferenceRequest):
+                await send(dplx, proto.InferenceResponse(request_id=msg.request_id, data=b"ok"))
+
+    asyncio.run(_run())
+
+
+async def _bench(legacy: bool) -> tuple[list[float], float, float]:
+    send, recv = (_legacy_send, _legacy_recv) if legacy else (_send, _recv)
+
+    pch, cch = socket.socketpair()
+    proc = mp.get_context("spawn").Process(target=_echo_main, args=(cch, legacy))
+    proc.start()
+    cch.close()
+    dplx = await duplex_unix._AsyncDuplex.open(pch)
+
+    latencies = []
+    for i in range(NUM_PINGS):
+        start = time.perf_counter()
+        await send(dplx, proto.PingRequest(timestamp=i))
+        await recv(dplx)
+        latencies.append(time.perf_counter() - start)
+
+    payload = bytes(PAYLOAD_SIZE)
+    requests = [
+        proto.InferenceRequest(method="lk_bench", request_id=uuid.uuid4().hex, data=payload)
+        for _ in range(NUM_REQUESTS)
+    ]
+    start, start_cpu = time.perf_counter(), time.process_time()
+
+    async def _recv_responses() -> None:
+        for _ in range(NUM_REQUESTS):
+            await recv(dplx)
+
+    recv_task = asyncio.create_task(_recv_responses())
+    for i in range(0, NUM_REQUESTS, CONCURRENCY):
+        await asyncio.gather(*(send(dplx, req) for req in requests[i : i + CONCURRENCY]))
+    await recv_task
+    throughput = NUM_REQUESTS / (time.perf_counter() - start)
+    cpu_per_msg = (time.process_time() - start_cpu) / NUM_REQUESTS
+
+    await dplx.aclose()
+    proc.join()
+    return latencies, throughput, cpu_per_msg
+
+
+def _report(name: str, latencies: list[float], throughput: float, cpu_per_msg: float) -> None:
+    latencies_us = sorted(lat * 1e6 for lat in latencies)
+    p50 = statistics.median(latencies_us)
+    p99 = latencies_us[int(len(latencies_us) * 0.99)]
+    print(
+        f"{name:>8}: ping rtt p50 {p50:7.1f}us  p99 {p99:7.1f}us  |  "
+        f"inference requests {throughput:7.0f} msg/s, {cpu_per_msg * 1e6:5.1f}us cpu/msg"
+    )
+
+
+def main() -> None:
+    for legacy in (True, False):
+        _report("legacy" if legacy else "current", *asyncio.run(_bench(legacy)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark the startup time of job processes.
+
+Starts a ProcPool with the "spawn" context, the "forkserver" context and the "forkserver" context
+with the job runtime preloaded (like WorkerOptions.forkserver_preload), and reports the
+ProcStartupTimings emitted with the "process_ready" events. The first process of the forkserver
+modes also pays for starting the forkserver, it is reported separately.
+
+Each mode runs in its own interpreter, the forkserver is a per-interpreter singleton.
+
+Run with: python -m tests.bench_proc_spawn
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing as mp
+import statistics
+import subprocess
+import sys
+
+from livekit.agents import JobContext, JobProcess, ipc, job
+
+NUM_PROCESSES = 8
+MODES = ("spawn", "forkserver", "forkserver_preload")
+PRELOAD = [
+    "livekit.agents.ipc.job_proc_lazy_main",
+    "numpy",
+    "onnxruntime",
+    "tests.bench_proc_spawn",
+]
+
+
+def _initialize(proc: JobProcess) -> None:
+    pass
+
+
+async def _entrypoint(ctx: JobContext) -> None:
+    pass
+
+
+async def _bench(mode: str) -> list[ipc.proc_pool.ProcStartupTimings]:
+    mp_ctx = mp.get_context("spawn" if mode == "spawn" else "forkserver")
+    if mode == "forkserver_preload":
+        mp_ctx.set_forkserver_preload(PRELOAD)
+
+    pool = ipc.proc_pool.ProcPool(
+        initialize_process_fnc=_initialize,
+        job_entrypoint_fnc=_entrypoint,
+        num_idle_processes=NUM_PROCESSES,
+        loop=asyncio.get_running_loop(),
+        job_executor_type=job.JobExecutorType.PROCESS,
+        inference_executor=None,
+        mp_ctx=mp_ctx,
+        initialize_timeout=60.0,
+        close_timeout=10.0,
+        memory_warn_mb=0,
+        memory_limit_mb=0,
+        http_proxy=None,
+    )
+
+    timings: list[ipc.proc_pool.ProcStartupTimings] = []
+    all_ready = asyncio.Event()
+
+    @pool.on("process_ready")
+    def _on_ready(proc: ipc.job_executor.JobExecutor, t: ipc.proc_pool.ProcStartupTimings) -> None:
+        timings.append(t)
+        if len(timings) == NUM_PROCESSES:
+            all_ready.set()
+
+    await pool.start()
+    await all_ready.wait()
+    await pool.aclose()
+    return timings
+
+
+def _report(mode: str, timings: list[dict[str, float]]) -> None:
+    first, rest = timings[0], timings[1:]
+    start_ms = statistics.median(t["start_time"] for t in rest) * 1000
+    init_ms = statistics.median(t["initialize_time"] for t in rest) * 1000
+    print(
+        f"{mode:>18}: first process {sum(first.values()) * 1000:7.1f}ms  |  "
+        f"next processes start {start_ms:6.1f}ms + initialize {init_ms:6.1f}ms "
+        f"= {start_ms + init_ms:7.1f}ms (median)"
+    )
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        timings = asyncio.run(_bench(sys.argv[1]))
+        print(
+            json.dumps(
+                [
+                    {"start_time": t.start_time, "initialize_time": t.initialize_time}
+                    for t in timings
+                ]
+            )
+        )
+        return
+
+    for mode in MODES:
+        res = subprocess.run(
+            [sys.executable, "-m", "tests.bench_proc_spawn", mode],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        _report(mode, json.loads(res.stdout.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
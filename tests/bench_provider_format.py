@@ -0,0 +1,89 @@
+"""Benchmark the per-turn conversion of a long chat context to the provider formats.
+
+Builds a 1k-item conversation (with tool calls and a few images) and, for each turn, appends a
+user message, a tool call and an assistant message before converting the context. The uncached
+numbers clear the conversion caches before each turn, converting every item like on the first
+turn. Both must produce the same messages.
+
+Run with: python -m tests.bench_provider_format
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+
+from livekit import rtc
+from livekit.agents.llm import ChatContext, FunctionCall, FunctionCallOutput, ImageContent
+from livekit.agents.llm._provider_format import utils as format_utils
+
+NUM_ITEMS = 1000
+NUM_TURNS = 50
+FORMATS = ["openai", "anthropic", "google", "aws"]
+
+
+def _add_turn(chat_ctx: ChatContext, turn: int) -> None:
+    content: list[str | ImageContent] = [f"what about item {turn}? " * 5]
+    if turn % 50 == 0:
+        frame = rtc.VideoFrame(
+            320, 240, rtc.VideoBufferType.RGBA, bytes([turn % 256]) * 320 * 240 * 4
+        )
+        content.append(ImageContent(image=frame))
+    chat_ctx.add_message(role="user", content=content)
+    chat_ctx.items.append(
+        FunctionCall(
+            id=f"item_turn{turn}/fnc_0",
+            call_id=f"call_{turn}",
+            name="lookup",
+            arguments=json.dumps({"item": turn}),
+        )
+    )
+    chat_ctx.items.append(
+        FunctionCallOutput(call_id=f"call_{turn}", output=f"details of item {turn}", is_error=False)
+    )
+    chat_ctx.add_message(role="assistant", content=f"item {turn} is great " * 10)
+
+
+def _bench(fmt: str) -> tuple[float, float]:
+    chat_ctx = ChatContext()
+    chat_ctx.add_message(role="system", content=f"you are a {fmt} assistant")
+    turn = 0
+    while len(chat_ctx.items) < NUM_ITEMS:
+        _add_turn(chat_ctx, turn)
+        turn += 1
+    chat_ctx.to_provider_format(fmt)  # first conversion, and image encoding
+
+    cached = uncached = 0.0
+    for _ in range(NUM_TURNS):
+        _add_turn(chat_ctx, turn)
+        turn += 1
+
+        start = time.perf_counter()
+        result = chat_ctx.to_provider_format(fmt)
+        cached += time.perf_counter() - start
+
+        caches = dict(format_utils._grouping_caches)
+        format_utils._grouping_caches.clear()
+        start = time.perf_counter()
+        uncached_result = chat_ctx.to_provider_format(fmt)
+        uncached += time.perf_counter() - start
+        format_utils._grouping_caches.update(caches)
+
+        assert result == uncached_result, f"{fmt}: results differ"
+
+    return uncached / NUM_TURNS, cached / NUM_TURNS
+
+
+def main() -> None:
+    logging.disable(logging.WARNING)
+    print(f"{'format':>10} {'uncached ms':>11} {'cached ms':>10} {'speedup':>8}")
+    for fmt in FORMATS:
+        uncached, cached = _bench(fmt)
+        print(
+            f"{fmt:>10} {uncached * 1000:>11.2f} {cached * 1000:>10.2f} {uncached / cached:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark the CPU cost of the Silero VADStream windowing at 16/24/48kHz input.
+
+The first table compares the previous windowing (summing frame lengths and calling
+combine_frames on the pending input and inference frames for every 32ms window) with the
+preallocated sliding windows used by VADStream. The second table measures the total CPU time of
+a VADStream (model inference included) per second of audio.
+
+Run with: python -m tests.bench_silero_vad [path/to/silero_vad.onnx]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+import numpy as np
+
+from livekit import rtc
+from livekit.agents import utils
+from livekit.agents.types import NOT_GIVEN
+from livekit.plugins import silero
+from livekit.plugins.silero.vad import _SlidingWindow
+
+MODEL_SAMPLE_RATE = 16000
+WINDOW_SIZE = 512
+AUDIO_DURATION = 60.0
+FRAME_DURATION = 0.01
+
+
+def _frames(sample_rate: int) -> list[rtc.AudioFrame]:
+    rng = np.random.default_rng(0)
+    pcm = rng.integers(-3000, 3000, int(sample_rate * AUDIO_DURATION), dtype=np.int16)
+    n = int(sample_rate * FRAME_DURATION)
+    return [
+        rtc.AudioFrame(pcm[i : i + n].tobytes(), sample_rate, 1, n) for i in range(0, len(pcm), n)
+    ]
+
+
+def _legacy_windowing(frames: list[rtc.AudioFrame], sample_rate: int) -> None:
+    resampler = (
+        rtc.AudioResampler(sample_rate, MODEL_SAMPLE_RATE, quality=rtc.AudioResamplerQuality.QUICK)
+        if sample_rate != MODEL_SAMPLE_RATE
+        else None
+    )
+    out = np.empty(WINDOW_SIZE, dtype=np.float32)
+    to_copy = int(WINDOW_SIZE * sample_rate / MODEL_SAMPLE_RATE)
+    input_frames: list[rtc.AudioFrame] = []
+    inference_frames: list[rtc.AudioFrame] = []
+    for frame in frames:
+        input_frames.append(frame)
+        inference_frames.extend(resampler.push(frame) if resampler else [frame])
+        while sum([f.samples_per_channel for f in inference_frames]) >= WINDOW_SIZE:
+            input_frame = utils.combine_frames(input_frames)
+            inference_frame = utils.combine_frames(inference_frames)
+            np.divide(inference_frame.data[:WINDOW_SIZE], 32767, out=out, dtype=np.float32)
+            input_frame.data[:to_copy].tobytes()
+
+            input_frames, inference_frames = [], []
+            if len(input_frame.data) > to_copy:
+                data = input_frame.data[to_copy:].tobytes()
+                input_frames.append(rtc.AudioFrame(data, sample_rate, 1, len(data) // 2))
+            if len(inference_frame.data) > WINDOW_SIZE:
+                data = inference_frame.data[WINDOW_SIZE:].tobytes()
+                inference_frames.append(rtc.AudioFrame(data, MODEL_SAMPLE_RATE, 1, len(data) // 2))
+
+
+def _sliding_windowing(frames: list[rtc.AudioFrame], sample_rate: int) -> None:
+    resampler = (
+        rtc.AudioResampler(sample_rate, MODEL_SAMPLE_RATE, quality=rtc.AudioResamplerQuality.QUICK)
+        if sample_rate != MODEL_SAMPLE_RATE
+        else None
+    )
+    out = np.empty(WINDOW_SIZE, dtype=np.float32)
+    to_copy = int(WINDOW_SIZE * sample_rate / MODEL_SAMPLE_RATE)
+    input_window = _SlidingWindow(to_copy * 4)
+    inference_window = _SlidingWindow(WINDOW_SIZE * 4)
+    for frame in frames:
+        input_window.push(np.frombuffer(frame.data, dtype=np.int16))
+        for f in resampler.push(frame) if resampler else [frame]:
+            inference_window.push(np.frombuffer(f.data, dtype=np.int16))
+        while len(inference_window) >= WINDOW_SIZE:
+            np.divide(inference_window.peek(WINDOW_SIZE), 32767, out=out, dtype=np.float32)
+            input_window.peek(to_copy).tobytes()
+            input_window.consume(to_copy)
+            inference_window.consume(WINDOW_SIZE)
+
+
+async def _vad_stream_cpu(vad: silero.VAD, frames: list[rtc.AudioFrame]) -> float:
+    stream = vad.stream()
+    start = time.process_time()
+    for frame in frames:
+        stream.push_frame(frame)
+    stream.end_input()
+    async for _ in stream:
+        pass
+    elapsed = time.process_time() - start
+    await stream.aclose()
+    return elapsed
+
+
+def main() -> None:
+    print("windowing cpu per second of audio (model excluded)")
+    print(f"{'input rate':>10} {'legacy us':>10} {'current us':>11} {'speedup':>8}")
+    for sample_rate in (16000, 24000, 48000):
+        frames = _frames(sample_rate)
+        results = []
+        for fnc in (_legacy_windowing, _sliding_windowing):
+            start = time.process_time()
+            fnc(frames, sample_rate)
+            results.append((time.process_time() - start) / AUDIO_DURATION)
+
+        print(
+            f"{sample_rate:>10} {results[0] * 1e6:>10.0f} {results[1] * 1e6:>11.0f} "
+            f"{results[0] / results[1]:>7.1f}x"
+        )
+
+    onnx_file_path = sys.argv[1] if len(sys.argv) > 1 else None
+    try:
+        vad = silero.VAD.load(onnx_file_path=onnx_file_path or NOT_GIVEN)
+    except Exception as e:
+        print(f"skipping VADStream benchmark, failed to load the model: {e}")
+        return
+
+    print("VADStream cpu per second of audio (model included)")
+    for sample_rate in (16000, 24000, 48000):
+        cpu = asyncio.run(_vad_stream_cpu(vad, _frames(sample_rate)))
+        print(f"{sample_rate:>10} {cpu / AUDIO_DURATION * 1e3:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
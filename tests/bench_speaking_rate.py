@@ -0,0 +1,101 @@
+"""Benchmark the CPU cost of a SpeakingRateStream session.
+
+60s of speech-like audio is pushed in 10ms frames, the detector estimates the speaking rate of
+a 1s window every 100ms. Three variants of the spectral flux are compared:
+
+- legacy: a python loop computing one rFFT per STFT frame, for every window
+- vectorized: one batched rFFT per window
+- streaming: the default, each STFT frame is computed once and shared by the overlapping windows
+
+Run with: python -m tests.bench_speaking_rate
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import numpy as np
+
+from livekit import rtc
+from livekit.agents.voice.transcription._speaking_rate import (
+    SpeakingRateDetector,
+    SpeakingRateStream,
+    _SpectralFluxStream,
+)
+
+from .test_speaking_rate import _legacy_spectral_flux, _speech_like
+
+AUDIO_DURATION = 60.0
+FRAME_DURATION = 0.01
+ROUNDS = 3
+
+
+class _VectorizedStream(SpeakingRateStream):
+    def _compute_speaking_rate(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        *,
+        flux_stream: _SpectralFluxStream | None = None,
+        start: int = 0,
+    ) -> float:
+        return super()._compute_speaking_rate(audio.copy(), sample_rate)
+
+
+class _LegacyStream(SpeakingRateStream):
+    def _spectral_flux(self, audio: np.ndarray, sample_rate: int) -> float:
+        return _legacy_spectral_flux(audio, sample_rate)
+
+    def _compute_speaking_rate(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        *,
+        flux_stream: _SpectralFluxStream | None = None,
+        start: int = 0,
+    ) -> float:
+        return super()._compute_speaking_rate(audio.copy(), sample_rate)
+
+
+async def _run(stream_cls: type[SpeakingRateStream], frames: list[rtc.AudioFrame]) -> float:
+    detector = SpeakingRateDetector()
+    start = time.process_time()
+    stream = stream_cls(detector, detector._opts)
+    for frame in frames:
+        stream.push_frame(frame)
+    stream.flush()
+    stream.end_input()
+    async for _ in stream:
+        pass
+    await stream.aclose()
+    return time.process_time() - start
+
+
+async def main() -> None:
+    for sample_rate in (16000, 24000, 48000):
+        pcm = _speech_like(sample_rate, AUDIO_DURATION)
+        n = int(sample_rate * FRAME_DURATION)
+        frames = [
+            rtc.AudioFrame(pcm[i : i + n].tobytes(), sample_rate, 1, n)
+            for i in range(0, len(pcm), n)
+        ]
+        results = {}
+        for name, cls in [
+            ("legacy", _LegacyStream),
+            ("vectorized", _VectorizedStream),
+            ("streaming", SpeakingRateStream),
+        ]:
+            results[name] = min([await _run(cls, frames) for _ in range(ROUNDS)])
+
+        print(
+            f"{sample_rate:5d}Hz: "
+            + ", ".join(
+                f"{name} {cpu * 1000:7.1f}ms ({cpu / AUDIO_DURATION * 100:5.2f}% of a core)"
+                for name, cpu in results.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""Benchmark the basic sentence/word token streams fed with LLM-like deltas.
+
+Streams tests/long_transcript.txt (repeated) in token-sized deltas, with and without its
+punctuation, and pushed at once (e.g. session.say()), through the basic tokenizers and through
+the same streams without TokenBoundaries (tokenizing the whole buffer on every push and after
+every token, the previous behaviour). The tokens of both must be identical.
+
+Run with: python -m tests.bench_tokenizer_stream
+"""
+
+from __future__ import annotations
+
+import pathlib
+import re
+import time
+from typing import Callable
+
+from livekit.agents.tokenize import basic, token_stream, tokenizer
+
+REPEAT = 20
+# roughly the size of LLM tokens: a word with its leading space, long words split in 4 chars
+_DELTA_RE = re.compile(r"\s*\S{1,4}")
+
+
+def _deltas(text: str) -> list[str]:
+    return _DELTA_RE.findall(text)
+
+
+def _without_boundaries(
+    stream: token_stream.BufferedTokenStream,
+) -> token_stream.BufferedTokenStream:
+    stream._boundaries = None
+    return stream
+
+
+def _run(
+    make_stream: Callable[[], token_stream.BufferedTokenStream], deltas: list[str]
+) -> tuple[float, list[str]]:
+    stream = make_stream()
+    tokens: list[str] = []
+    start = time.perf_counter()
+    for delta in deltas:
+        stream.push_text(delta)
+    stream.end_input()
+    elapsed = time.perf_counter() - start
+
+    while True:
+        try:
+            tokens.append(stream._event_ch.recv_nowait().token)
+        except Exception:
+            break
+    return elapsed, tokens
+
+
+def main() -> None:
+    text = (pathlib.Path(__file__).parent / "long_transcript.txt").read_text()
+    text = " ".join([text] * REPEAT)
+    no_punct = text.translate(str.maketrans("", "", "".join(tokenizer.PUNCTUATIONS)))
+
+    sent_tok = basic.SentenceTokenizer()
+    word_tok = basic.WordTokenizer()
+    cases: list[tuple[str, Callable[[], token_stream.BufferedTokenStream], str, bool]] = [
+        ("sentences", sent_tok.stream, text, False),  # type: ignore[list-item]
+        ("sentences (no punct)", sent_tok.stream, no_punct, False),  # type: ignore[list-item]
+        ("sentences (one push)", sent_tok.stream, text, True),  # type: ignore[list-item]
+        ("words", word_tok.stream, text, False),  # type: ignore[list-item]
+        ("words (no spaces)", word_tok.stream, text.replace(" ", ""), False),  # type: ignore[list-item]
+        ("words (one push)", word_tok.stream, text, True),  # type: ignore[list-item]
+    ]
+
+    print(f"{'case':>22} {'chars':>8} {'legacy ms':>10} {'current ms':>11} {'speedup':>8}")
+    for name, make_stream, case_text, one_push in cases:
+        deltas = [case_text] if one_push else _deltas(case_text)
+        legacy, legacy_tokens = _run(lambda: _without_boundaries(make_stream()), deltas)  # noqa: B023
+        current, tokens = _run(make_stream, deltas)
+        assert tokens == legacy_tokens, f"{name}: tokens differ"
+        print(
+            f"{name:>22} {len(case_text):>8} {legacy * 1000:>10.1f} {current * 1000:>11.1f} "
+            f"{legacy / current:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
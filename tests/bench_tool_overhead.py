@@ -0,0 +1,80 @@
+"""Benchmark the per-turn overhead of function tools.
+
+Each LLM turn converts all the tools of the agent into provider schemas (inference.llm.to_fnc_ctx,
+strict and legacy) and prepares the arguments of a tool call. The previous behaviour is measured
+by dropping the compiled tools before every turn.
+
+Run with: python -m tests.bench_tool_overhead
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Annotated, Any, Literal
+
+from pydantic import Field
+
+from livekit.agents import RunContext, function_tool
+from livekit.agents.inference.llm import to_fnc_ctx
+from livekit.agents.llm import FunctionTool, utils as llm_utils
+from livekit.agents.llm.tool_context import get_function_info
+
+NUM_TOOLS = 30
+NUM_TURNS = 200
+
+
+def _make_tool(i: int) -> FunctionTool:
+    async def tool(
+        ctx: RunContext,
+        query: Annotated[str, Field(description="what to look for")],
+        limit: int = 10,
+        unit: Literal["metric", "imperial"] = "metric",
+        tags: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Look up something in the catalog
+
+        Args:
+            query: what to look for
+            limit: maximum number of results
+            unit: unit system of the results
+            tags: only return results with these tags
+        """
+        return {}
+
+    tool.__name__ = f"lookup_{i}"
+    return function_tool(tool)
+
+
+def _turn(tools: list[FunctionTool], ctx: Any) -> None:
+    to_fnc_ctx(tools, strict=True)  # type: ignore[arg-type]
+    to_fnc_ctx(tools, strict=False)  # type: ignore[arg-type]
+    llm_utils.prepare_function_arguments(
+        fnc=tools[0],
+        json_arguments='{"query": "shoes", "limit": 3, "unit": "metric", "tags": null}',
+        call_ctx=ctx,
+    )
+
+
+def _bench(tools: list[FunctionTool], *, cached: bool) -> float:
+    ctx: Any = object()
+    start = time.perf_counter()
+    for _ in range(NUM_TURNS):
+        if not cached:
+            for tool in tools:
+                get_function_info(tool)._compiled.clear()
+        _turn(tools, ctx)
+    return (time.perf_counter() - start) / NUM_TURNS
+
+
+def main() -> None:
+    tools = [_make_tool(i) for i in range(NUM_TOOLS)]
+    uncached = _bench(tools, cached=False)
+    cached = _bench(tools, cached=True)
+    print(
+        f"{NUM_TOOLS} tools: uncached {uncached * 1000:.2f}ms/turn, "
+        f"cached {cached * 1000:.3f}ms/turn ({uncached / cached:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark the event loop wakeups of the transcript word pacing.
+
+100 segments are synchronized concurrently, each one paces ~80 words over 12s of audio. The
+event loop wakeups (blocking selector polls) per second are compared between the previous pacing, two
+`asyncio.wait([close_future], timeout=...)` per word, and the shared PacingScheduler, along
+with the event loop iterations, the timers armed and the CPU time of the whole run.
+
+Run with: python -m tests.bench_transcript_pacing
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import pathlib
+import random
+import time
+from typing import Any
+
+from livekit import rtc
+from livekit.agents import tokenize
+from livekit.agents.voice.io import TextOutput
+from livekit.agents.voice.transcription._speaking_rate import SpeakingRateDetector
+from livekit.agents.voice.transcription.synchronizer import (
+    _SegmentSynchronizerImpl,
+    _TextSyncOptions,
+)
+
+NUM_SESSIONS = 100
+AUDIO_DURATION = 12.0
+SAMPLE_RATE = 16000
+
+
+class _NullTextOutput(TextOutput):
+    def __init__(self) -> None:
+        super().__init__(label="bench", next_in_chain=None)
+        self.num_words = 0
+
+    async def capture_text(self, text: str) -> None:
+        self.num_words += 1
+
+    def flush(self) -> None:
+        pass
+
+
+async def _legacy_pace(self: _SegmentSynchronizerImpl, delay: float) -> None:
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait([self._close_future], timeout=delay)
+
+
+async def _session(options: _TextSyncOptions, text: str, output: _NullTextOutput) -> None:
+    await asyncio.sleep(random.uniform(0, 1.0))  # sessions don't start speaking together
+    segment = _SegmentSynchronizerImpl(options=options, next_in_chain=output)
+    segment.push_text(text)
+    segment.end_text_input()
+    samples = int(SAMPLE_RATE * AUDIO_DURATION)
+    segment.push_audio(rtc.AudioFrame(b"\0\0" * samples, SAMPLE_RATE, 1, samples))
+    segment.end_audio_input()
+    await segment._main_atask
+    await segment.aclose()
+
+
+async def _run(text: str) -> dict[str, float]:
+    loop = asyncio.get_running_loop()
+    selector = loop._selector  # type: ignore[attr-defined]
+    select, call_at = selector.select, loop.call_at
+    stats = {"wakeups": 0, "iterations": 0, "timers": 0}
+
+    def _select(timeout: float | None = None) -> list:
+        stats["iterations"] += 1
+        if timeout is None or timeout > 0:  # the loop had nothing to run and went to sleep
+            stats["wakeups"] += 1
+        return select(timeout)
+
+    def _call_at(*args: Any, **kwargs: Any) -> asyncio.TimerHandle:
+        stats["timers"] += 1
+        return call_at(*args, **kwargs)
+
+    options = _TextSyncOptions(
+        speed=1.0,
+        hyphenate_word=tokenize.basic.hyphenate_word,
+        hyphenate_words=tokenize.basic.hyphenate_words,
+        word_tokenizer=tokenize.basic.WordTokenizer(
+            retain_format=True, ignore_punctuation=False, split_character=True
+        ),
+        speaking_rate_detector=SpeakingRateDetector(),
+    )
+    outputs = [_NullTextOutput() for _ in range(NUM_SESSIONS)]
+
+    random.seed(0)
+    selector.select, loop.call_at = _select, _call_at  # type: ignore[method-assign]
+    start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        await asyncio.gather(*[_session(options, text, output) for output in outputs])
+    finally:
+        selector.select, loop.call_at = select, call_at  # type: ignore[method-assign]
+
+    elapsed = time.perf_counter() - start
+    return {
+        **{name: count / elapsed for name, count in stats.items()},
+        "words": sum(o.num_words for o in outputs),
+        "elapsed": elapsed,
+        "cpu": time.process_time() - cpu_start,
+    }
+
+
+def main() -> None:
+    text = (pathlib.Path(__file__).parent / "long_synthesize.txt").read_text().strip()
+    pace = _SegmentSynchronizerImpl._pace
+    for name, pace_fnc in [("legacy", _legacy_pace), ("scheduler", pace)]:
+        _SegmentSynchronizerImpl._pace = pace_fnc  # type: ignore[method-assign]
+        r = asyncio.run(_run(text))
+        print(
+            f"{name:<10}: {NUM_SESSIONS} sessions, {r['words']:.0f} words in {r['elapsed']:.1f}s, "
+            f"{r['wakeups']:6.1f} wakeups/s, {r['iterations']:7.1f} loop iterations/s, "
+            f"{r['timers']:6.1f} timers/s, cpu {r['cpu'] * 1000:.0f}ms"
+        )
+    _SegmentSynchronizerImpl._pace = pace  # type: ignore[method-assign]
+
+
+if __name__ == "__main__":
+    main()
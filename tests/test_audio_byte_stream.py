@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from livekit.agents.utils.audio import AudioByteStream
+
+
+@pytest.mark.parametrize("num_channels", [1, 2])
+def test_audio_byte_stream_chunking(num_channels: int):
+    sample_rate = 48000
+    samples_per_channel = 480
+    bytes_per_frame = samples_per_channel * num_channels * 2
+    data = os.urandom(bytes_per_frame * 37 + num_channels * 2 * 13)
+
+    bstream = AudioByteStream(sample_rate, num_channels, samples_per_channel)
+    frames = []
+    # push irregular chunk sizes, including chunks much bigger than a frame
+    chunk_sizes = [1, 3, 7, bytes_per_frame * 5 + 11, 2, bytes_per_frame - 1, 4096]
+    offset, i = 0, 0
+    while offset < len(data):
+        size = chunk_sizes[i % len(chunk_sizes)]
+        frames.extend(bstream.push(memoryview(data)[offset : offset + size]))
+        offset += size
+        i += 1
+
+    assert all(f.samples_per_channel == samples_per_channel for f in frames)
+    assert len(frames) == 37
+
+    frames.extend(bstream.flush())
+    assert frames[-1].samples_per_channel == 13
+    assert frames[-1].num_channels == num_channels
+    assert b"".join(bytes(f.data) for f in frames) == data
+    assert bstream.flush() == []
+
+
+def test_audio_byte_stream_frames_are_independent():
+    bstream = AudioByteStream(16000, 1, 160)
+    first = bstream.push(b"\x01\x00" * 160)[0]
+    second = bstream.push(b"\x02\x00" * 160)[0]
+
+    # frames must not alias the internal buffer
+    assert bytes(first.data) == b"\x01\x00" * 160
+    assert bytes(second.data) == b"\x02\x00" * 160
+
+
+def test_audio_byte_stream_clear():
+    bstream = AudioByteStream(16000, 1, 160)
+    assert bstream.push(b"\x00" * 100) == []
+    bstream.clear()
+    assert bstream.flush() == []
+    assert len(bstream.push(b"\x00" * 320)) == 1
+
+
+def test_audio_byte_stream_merge_frames():
+    bstream = AudioByteStream(16000, 1, 160)
+    data = os.urandom(320 * 7 + 10)
+
+    frames = bstream.push(data, merge_frames=3)
+    assert [f.samples_per_channel for f in frames] == [480, 480, 160]
+    frames.extend(bstream.flush())
+    assert frames[-1].samples_per_channel == 5
+    assert b"".join(bytes(f.data) for f in frames) == data
+
+    # a merged frame spanning the whole internal buffer must not alias it
+    bstream = AudioByteStream(16000, 1, 160)
+    first = bstream.push(b"\x01\x00" * 320, merge_frames=2)[0]
+    bstream.push(b"\x02\x00" * 320, merge_frames=2)
+    assert bytes(first.data) == b"\x01\x00" * 320
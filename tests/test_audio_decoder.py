@@ -150,3 +150,33 @@ def test_stream_buffer_early_close():
 
     # Reading from closed buffer should return empty bytes
     assert buffer.read() == b""
+
+
+def test_stream_buffer_readinto():
+    buffer = StreamBuffer()
+    buffer.write(b"hello")
+    buffer.write(b"world")
+    buffer.end_input()
+
+    out = bytearray(7)
+    assert buffer.readinto(out) == 7
+    assert bytes(out) == b"hellowo"
+
+    # partial read when less data is available than the buffer size
+    assert buffer.readinto(out) == 3
+    assert bytes(out[:3]) == b"rld"
+
+    assert buffer.readinto(out) == 0
+    assert buffer.read() == b""
+
+
+def test_stream_buffer_read_across_chunks():
+    buffer = StreamBuffer()
+    for chunk in (b"ab", b"cde", b"f", b"ghij"):
+        buffer.write(chunk)
+    buffer.end_input()
+
+    assert buffer.read(1) == b"a"
+    assert buffer.read(4) == b"bcde"
+    assert buffer.read(100) == b"fghij"
+    assert buffer.read() == b""
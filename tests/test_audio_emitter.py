@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from livekit.agents import tts
+from livekit.agents.types import USERDATA_TIMED_TRANSCRIPT
+from livekit.agents.utils import aio
+from livekit.agents.voice.io import TimedString
+
+SAMPLE_RATE = 16000
+
+
+async def _run_segments(
+    segments: list[list[bytes | TimedString]], *, max_frame_size_ms: int | None
+) -> list[tts.SynthesizedAudio]:
+    ch = aio.Chan[tts.SynthesizedAudio]()
+    emitter = tts.AudioEmitter(label="test", dst_ch=ch)
+    emitter.initialize(
+        request_id="req",
+        sample_rate=SAMPLE_RATE,
+        num_channels=1,
+        mime_type="audio/pcm",
+        frame_size_ms=20,
+        max_frame_size_ms=max_frame_size_ms,
+        stream=True,
+    )
+    for i, segment in enumerate(segments):
+        emitter.start_segment(segment_id=f"seg_{i}")
+        for data in segment:
+            if isinstance(data, TimedString):
+                emitter.push_timed_transcript(data)
+            else:
+                emitter.push(data)
+        emitter.end_segment()
+
+    emitter.end_input()
+    await emitter.join()
+    ch.close()
+    return [ev async for ev in ch]
+
+
+@pytest.mark.parametrize("max_frame_size_ms", [None, 200, 1000])
+async def test_audio_emitter_segments(max_frame_size_ms: int | None):
+    segments: list[list[bytes | TimedString]] = []
+    for n in (3, 57, 120):
+        segment: list[bytes | TimedString] = []
+        for i in range(n):
+            segment.append(os.urandom(2 * 87))  # chunks not aligned with the frames
+            if i % 10 == 0:
+                segment.append(TimedString(text=f"w{i} ", start_time=i, end_time=i + 1))
+        segments.append(segment)
+
+    events = await _run_segments(segments, max_frame_size_ms=max_frame_size_ms)
+    for i, segment in enumerate(segments):
+        seg_events = [ev for ev in events if ev.segment_id == f"seg_{i}"]
+        assert [ev.is_final for ev in seg_events] == [False] * (len(seg_events) - 1) + [True]
+        assert b"".join(bytes(ev.frame.data) for ev in seg_events) == b"".join(
+            d for d in segment if isinstance(d, bytes)
+        )
+
+        transcripts = [t for ev in seg_events for t in ev.frame.userdata[USERDATA_TIMED_TRANSCRIPT]]
+        assert transcripts == [d for d in segment if isinstance(d, TimedString)]
+
+        max_samples = SAMPLE_RATE * (max_frame_size_ms or 20) // 1000
+        assert all(ev.frame.samples_per_channel <= max_samples for ev in seg_events)
+
+    if max_frame_size_ms is None:
+        assert all(ev.frame.samples_per_channel <= SAMPLE_RATE // 50 for ev in events)
+
+
+async def test_audio_emitter_flush_when_delayed():
+    ch = aio.Chan[tts.SynthesizedAudio]()
+    emitter = tts.AudioEmitter(label="test", dst_ch=ch)
+    emitter.initialize(
+        request_id="req",
+        sample_rate=SAMPLE_RATE,
+        num_channels=1,
+        mime_type="audio/pcm",
+        frame_size_ms=50,
+        max_frame_size_ms=200,
+        stream=True,
+    )
+    emitter.start_segment(segment_id="seg")
+    for _ in range(4):
+        emitter.push(b"\0\0" * (SAMPLE_RATE // 20))
+
+    # the queued pushes are emitted as a single frame, except for the last 50ms which are
+    # held back until the audio generation is slower than realtime
+    first = await asyncio.wait_for(ch.recv(), 1.0)
+    assert first.frame.duration == pytest.approx(0.15)
+    held = await asyncio.wait_for(ch.recv(), 1.0)
+    assert held.frame.duration == pytest.approx(0.05)
+    assert not first.is_final and not held.is_final
+
+    emitter.end_input()
+    await emitter.join()
+    final = ch.recv_nowait()
+    assert final.is_final and final.segment_id == "seg"
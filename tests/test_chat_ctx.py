@@ -1,3 +1,5 @@
+import pytest
+
 from livekit.agents.llm import utils
 
 # function_arguments_to_pydantic_model
@@ -48,3 +50,392 @@ def test_dict():
     print(chat_ctx.items)
 
     print(ChatContext.from_dict(chat_ctx.to_dict()).items)
+
+
+def _legacy_insertion_index(items: list, created_at: float) -> int:
+    for i in reversed(range(len(items))):
+        if items[i].created_at <= created_at:
+            return i + 1
+    return 0
+
+
+def test_chat_ctx_index_consistency():
+    import random
+
+    from livekit.agents.llm import ChatContext, ChatMessage
+
+    rng = random.Random(7)
+
+    def msg(i: int) -> ChatMessage:
+        return ChatMessage(
+            id=f"item_{i}", role="user", content=[str(i)], created_at=float(rng.randint(0, 50))
+        )
+
+    chat_ctx = ChatContext()
+    reference: list[ChatMessage] = []
+    next_id = 0
+    for step in range(400):
+        op = rng.randrange(7)
+        if op == 0:
+            item = msg(next_id)
+            next_id += 1
+            chat_ctx.items.append(item)  # may break the ordering
+            reference.append(item)
+        elif op == 1:
+            item = msg(next_id)
+            next_id += 1
+            idx = _legacy_insertion_index(reference, item.created_at)
+            chat_ctx.insert(item)
+            reference.insert(idx, item)
+        elif op == 2:
+            batch = [msg(next_id + i) for i in range(rng.randint(2, 5))]
+            next_id += len(batch)
+            chat_ctx.insert(batch)
+            for item in batch:
+                reference.insert(_legacy_insertion_index(reference, item.created_at), item)
+        elif op == 3 and reference:
+            other = ChatContext([*rng.sample(reference, min(3, len(reference))), msg(next_id)])
+            next_id += 1
+            chat_ctx.merge(other)
+            reference.insert(
+                _legacy_insertion_index(reference, other.items[-1].created_at), other.items[-1]
+            )
+        elif op == 4 and reference:
+            idx = rng.randrange(len(reference))
+            del chat_ctx.items[idx]
+            del reference[idx]
+        elif op == 5:
+            chat_ctx.truncate(max_items=30)
+            reference[:] = chat_ctx.items[:]  # checked against the items below
+            assert len(reference) <= 30
+        elif op == 6:
+            reference.sort(key=lambda item: item.created_at)
+            chat_ctx.items = list(reference)
+
+        assert chat_ctx.items == reference, step
+        for item in rng.sample(reference, min(5, len(reference))):
+            assert chat_ctx.get_by_id(item.id) is item
+            assert chat_ctx.index_by_id(item.id) == reference.index(item)
+        assert chat_ctx.get_by_id("missing") is None
+        created_at = float(rng.randint(0, 50))
+        if all(a.created_at <= b.created_at for a, b in zip(reference, reference[1:])):
+            assert chat_ctx.find_insertion_index(created_at=created_at) == (
+                _legacy_insertion_index(reference, created_at)
+            )
+
+
+def test_chat_ctx_index_after_item_changes():
+    from livekit.agents.llm import ChatContext
+    from livekit.agents.llm.chat_context import _ReadOnlyChatContext
+
+    chat_ctx = ChatContext()
+    first = chat_ctx.add_message(role="user", content="first", created_at=1.0)
+    second = chat_ctx.add_message(role="assistant", content="second", created_at=2.0)
+    assert chat_ctx.get_by_id(second.id) is second
+    assert chat_ctx.find_insertion_index(created_at=1.5) == 1
+
+    # items are mutable, the index must not return stale results
+    old_id = first.id
+    first.id = "renamed"
+    assert chat_ctx.get_by_id(old_id) is None
+    assert chat_ctx.index_by_id(old_id) is None
+    second.created_at = 0.5
+    assert chat_ctx.find_insertion_index(created_at=1.5) == 2
+
+    readonly = _ReadOnlyChatContext(chat_ctx.items)
+    assert readonly.get_by_id(second.id) is second
+    with pytest.raises(RuntimeError):
+        readonly.items.append(first)
+
+
+def test_chat_ctx_pickle_and_copy():
+    import copy
+    import pickle
+
+    from livekit.agents.llm import ChatContext
+    from livekit.agents.llm.chat_context import _ReadOnlyChatContext
+
+    chat_ctx = ChatContext()
+    first = chat_ctx.add_message(role="user", content="first", created_at=1.0)
+    chat_ctx.add_message(role="assistant", content="second", created_at=2.0)
+    assert chat_ctx.get_by_id(first.id) is first  # build the index before copying
+
+    assert copy.copy(chat_ctx.items).get_by_id(first.id) is first
+    for restored in (pickle.loads(pickle.dumps(chat_ctx)), copy.deepcopy(chat_ctx)):
+        assert restored.items == chat_ctx.items
+        assert restored.get_by_id(first.id) == first
+        assert restored.find_insertion_index(created_at=1.5) == 1
+        restored.add_message(role="user", content="third", created_at=3.0)
+        assert restored.index_by_id(restored.items[-1].id) == 2
+
+    readonly = pickle.loads(pickle.dumps(_ReadOnlyChatContext(chat_ctx.items)))
+    assert readonly.items == chat_ctx.items
+    with pytest.raises(RuntimeError):
+        readonly.items.append(first)
+
+
+def _legacy_chat_ctx_diff(old_ctx, new_ctx) -> utils.DiffOps:
+    # previous implementation, with the full DP table
+    old_ids = [m.id for m in old_ctx.items]
+    new_ids = [m.id for m in new_ctx.items]
+    n, m = len(old_ids), len(new_ids)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            if old_ids[i - 1] == new_ids[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1] + 1
+            else:
+                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+    lcs_ids = set()
+    i, j = n, m
+    while i > 0 and j > 0:
+        if old_ids[i - 1] == new_ids[j - 1]:
+            lcs_ids.add(old_ids[i - 1])
+            i -= 1
+            j -= 1
+        elif dp[i - 1][j] > dp[i][j - 1]:
+            i -= 1
+        else:
+            j -= 1
+
+    old_by_id = {item.id: item for item in old_ctx.items}
+    to_create, to_update = [], []
+    prev_id = None
+    for item in new_ctx.items:
+        if item.id not in lcs_ids:
+            to_create.append((prev_id, item.id))
+        elif item.type == "message" and old_by_id[item.id].type == "message":
+            if item.text_content != old_by_id[item.id].text_content:
+                to_update.append((prev_id, item.id))
+        prev_id = item.id
+    to_remove = [item.id for item in old_ctx.items if item.id not in lcs_ids]
+    return utils.DiffOps(to_remove=to_remove, to_create=to_create, to_update=to_update)
+
+
+def test_chat_ctx_diff_fuzz():
+    import random
+
+    from livekit.agents.llm import ChatContext, ChatMessage, FunctionCall, FunctionCallOutput
+
+    rng = random.Random(3)
+
+    def make_item(i: int):
+        kind = rng.randrange(3)
+        if kind == 0:
+            return ChatMessage(id=f"item_{i}", role="user", content=[f"text {i}"])
+        if kind == 1:
+            return FunctionCall(id=f"item_{i}", call_id=f"call_{i}", name="f", arguments="{}")
+        return FunctionCallOutput(id=f"item_{i}", call_id=f"call_{i}", output="ok", is_error=False)
+
+    for _ in range(500):
+        size = rng.choice([0, 3, 10, 40])
+        old_items = [make_item(i) for i in range(size)]
+        new_items = rng.sample(old_items, rng.randint(0, size))
+        for _ in range(rng.randint(0, 5)):
+            new_items.insert(rng.randint(0, len(new_items)), make_item(rng.randint(size, 1000)))
+        new_items = list({item.id: item for item in new_items}.values())
+
+        changed = set()
+        for idx, item in enumerate(new_items):
+            if rng.random() < 0.2:
+                if item.type == "message":
+                    new_items[idx] = item.model_copy(update={"content": ["changed"]})
+                elif item.type == "function_call":
+                    new_items[idx] = item.model_copy(update={"arguments": '{"a": 1}'})
+                else:
+                    new_items[idx] = item.model_copy(update={"output": "failed"})
+                changed.add(item.id)
+
+        old_ctx, new_ctx = ChatContext(old_items), ChatContext(new_items)
+        diff = utils.compute_chat_ctx_diff(old_ctx, new_ctx)
+        legacy = _legacy_chat_ctx_diff(old_ctx, new_ctx)
+
+        assert diff.to_remove == legacy.to_remove
+        assert diff.to_create == legacy.to_create
+        # the content hash also detects the updates of the function calls and outputs
+        message_updates = [
+            op for op in diff.to_update if new_ctx.get_by_id(op[1]).type == "message"
+        ]
+        assert message_updates == legacy.to_update
+        created = {item_id for _, item_id in diff.to_create}
+        assert {item_id for _, item_id in diff.to_update} == changed - created
+
+        # applying the ops on the old ids gives the new ids
+        ids = [item_id for item_id in (i.id for i in old_items) if item_id not in diff.to_remove]
+        for prev_id, item_id in diff.to_create:
+            ids.insert(0 if prev_id is None else ids.index(prev_id) + 1, item_id)
+        assert ids == [item.id for item in new_items]
+
+
+def test_chat_ctx_diff_large():
+    from livekit.agents.llm import ChatContext
+
+    old_ctx = ChatContext()
+    for i in range(2000):
+        old_ctx.add_message(role="user", content=f"message {i}")
+    new_ctx = old_ctx.copy()
+    new_ctx.items.pop(0)
+    new_ctx.add_message(role="assistant", content="reply")
+
+    diff = utils.compute_chat_ctx_diff(old_ctx, new_ctx)
+    assert diff.to_remove == [old_ctx.items[0].id]
+    assert diff.to_create == [(old_ctx.items[-1].id, new_ctx.items[-1].id)]
+    assert diff.to_update == []
+
+
+def test_chat_ctx_diff_remote_function_call_output():
+    from livekit.agents.llm import ChatContext, FunctionCall, FunctionCallOutput
+    from livekit.plugins.openai.realtime.utils import (
+        livekit_item_to_openai_item,
+        openai_item_to_livekit_item,
+    )
+
+    local_ctx = ChatContext(
+        [
+            FunctionCall(id="call", call_id="call_1", name="f", arguments="{}"),
+            FunctionCallOutput(id="output", call_id="call_1", output="failed", is_error=True),
+        ]
+    )
+    # the realtime session rebuilds its copy of the items from the server events
+    remote_ctx = ChatContext(
+        [openai_item_to_livekit_item(livekit_item_to_openai_item(i)) for i in local_ctx.items]
+    )
+    assert remote_ctx.items[1].is_error is False
+
+    diff = utils.compute_chat_ctx_diff(remote_ctx, local_ctx)
+    assert diff.to_remove == [] and diff.to_create == [] and diff.to_update == []
+
+
+async def test_serialized_image_cache(monkeypatch):
+    from livekit import rtc
+    from livekit.agents.llm import ChatContext, ImageContent
+    from livekit.agents.utils import images
+
+    encoded = []
+    encode = images.encode
+
+    def _encode(frame, opts):
+        encoded.append(opts)
+        return encode(frame, opts)
+
+    monkeypatch.setattr(utils.images, "encode", _encode)
+    monkeypatch.setattr(utils, "_encoded_frame_cache", utils._EncodedFrameCache(1024 * 1024))
+
+    def frame(value: int) -> rtc.VideoFrame:
+        return rtc.VideoFrame(32, 32, rtc.VideoBufferType.RGBA, bytes([value]) * 32 * 32 * 4)
+
+    first = utils.serialize_image(ImageContent(image=frame(1)))
+    # same content in another frame and ImageContent, e.g. the same frame sent on every turn
+    again = utils.serialize_image(ImageContent(image=frame(1), inference_detail="low"))
+    assert len(encoded) == 1
+    assert again.data_bytes == first.data_bytes
+    assert again.inference_detail == "low"
+
+    # the resize options are part of the key
+    utils.serialize_image(ImageContent(image=frame(1), inference_width=16, inference_height=16))
+    utils.serialize_image(ImageContent(image=frame(2)))
+    assert len(encoded) == 3
+
+    # encoded off the event loop, the provider formats then hit the caches
+    chat_ctx = ChatContext()
+    chat_ctx.add_message(role="user", content=[ImageContent(image=frame(3)), "what is this?"])
+    await utils.serialize_images(chat_ctx)
+    assert len(encoded) == 4
+    chat_ctx.to_provider_format("openai")
+    chat_ctx.to_provider_format("anthropic")
+    assert len(encoded) == 4
+
+    # bounded by the size of the encoded data
+    cache = utils._EncodedFrameCache(max_bytes=10)
+    cache.put(("a",), b"12345")
+    cache.put(("b",), b"12345")
+    assert cache.get(("a",)) == b"12345"  # a becomes the most recently used
+    cache.put(("c",), b"12345")
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None and cache.get(("c",)) is not None
+    cache.put(("d",), b"x" * 11)
+    assert cache.get(("d",)) is None
+
+
+def test_provider_format_cache():
+    import json
+    import random
+
+    from livekit.agents.llm import ChatContext, FunctionCall, FunctionCallOutput
+    from livekit.agents.llm._provider_format import utils as format_utils
+
+    def uncached(chat_ctx, fmt):
+        return ChatContext(list(chat_ctx.items)).to_provider_format(fmt)  # a context has no cache
+
+    rng = random.Random(5)
+    formats = ["openai", "anthropic", "google", "aws", "mistralai"]
+    chat_ctx = ChatContext()
+    chat_ctx.add_message(role="system", content="be helpful")
+    for turn in range(40):
+        chat_ctx.add_message(role="user", content=f"question {turn}")
+        if rng.random() < 0.5:
+            group_id = f"item_turn{turn}"
+            for i in range(rng.randint(1, 2)):
+                chat_ctx.items.append(
+                    FunctionCall(
+                        id=f"{group_id}/fnc_{i}",
+                        call_id=f"call_{turn}_{i}",
+                        name="lookup",
+                        arguments=json.dumps({"turn": turn}),
+                    )
+                )
+            if rng.random() < 0.8:  # missing outputs make the calls invalid
+                for i in range(rng.randint(1, 2)):
+                    chat_ctx.items.append(
+                        FunctionCallOutput(call_id=f"call_{turn}_{i}", output="ok", is_error=False)
+                    )
+        chat_ctx.add_message(role="assistant", content=f"answer {turn}")
+
+        if rng.random() < 0.2:  # items are also edited in place
+            msg = rng.choice([item for item in chat_ctx.items if item.type == "message"])
+            msg.content = [f"edited {turn}"]
+        if rng.random() < 0.1:
+            chat_ctx.truncate(max_items=20)
+
+        for fmt in formats:
+            messages, extra = chat_ctx.to_provider_format(fmt)
+            assert (messages, extra) == uncached(chat_ctx, fmt), (turn, fmt)
+
+            # the returned messages can be modified without changing the cached ones
+            for msg in messages:
+                content = msg.get("content") or msg.get("parts")
+                if isinstance(content, list) and content:
+                    content[-1]["cache_control"] = {"type": "ephemeral"}
+            assert chat_ctx.to_provider_format(fmt) == uncached(chat_ctx, fmt)
+
+    # the contexts with the same first item (e.g. the instructions) don't share a cache
+    converted: list[str] = []
+
+    def convert(group):
+        converted.append(group.flatten()[0].id)
+        return group
+
+    main = ChatContext()
+    main.add_message(role="system", content="instructions", id="lk.agent_task.instructions")
+    main.add_message(role="user", content="hello", id="hello")
+    other = ChatContext(list(main.items))
+    other.add_message(role="user", content="summarize", id="summarize")
+    for ctx in (main, other, main, other):
+        format_utils.convert_groups(ctx, "test", convert)
+    assert converted == ["lk.agent_task.instructions", "hello"] * 2 + ["summarize"]
+    assert len(main._format_caches) == len(other._format_caches) == 1
+
+    # the copies of a context made for each turn extend its cache
+    converted.clear()
+    turn = main.copy()
+    turn.add_message(role="user", content="next", id="next")
+    format_utils.convert_groups(turn, "test", convert)
+    assert converted == ["next"]
+
+    # a copy that diverged uses another cache of the context
+    converted.clear()
+    filtered = main.copy(exclude_instructions=True)
+    format_utils.convert_groups(filtered, "test", convert)
+    format_utils.convert_groups(turn, "test", convert)
+    assert converted == []  # the conversions of the unchanged groups are reused
+    assert len(main._format_caches) == 2
@@ -1,7 +1,11 @@
+import asyncio
 import time
 
+import aiohttp
 import pytest
+from aiohttp import web
 
+from livekit.agents import inference
 from livekit.agents.utils import ConnectionPool
 
 
@@ -81,3 +85,191 @@ async def test_get_expired():
 
     conn2 = await pool.get()
     assert conn2 is not conn, "Expected a new connection to be returned."
+
+
+class _WebSocketServer:
+    def __init__(self) -> None:
+        self.connections = 0
+        self.open_sockets: set[web.WebSocketResponse] = set()
+        self.answer_pings = True
+
+    async def handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(autoping=self.answer_pings)
+        await ws.prepare(request)
+        self.connections += 1
+        self.open_sockets.add(ws)
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            self.open_sockets.discard(ws)
+        return ws
+
+
+@pytest.fixture
+async def ws_server():
+    server = _WebSocketServer()
+    app = web.Application()
+    app.router.add_get("/", server.handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    async with aiohttp.ClientSession() as session:
+
+        async def _connect(timeout: float) -> aiohttp.ClientWebSocketResponse:
+            # like the inference TTS, the pongs are received by the health check
+            return await session.ws_connect(f"http://127.0.0.1:{port}/", autoping=False)
+
+        async def _close(ws: aiohttp.ClientWebSocketResponse) -> None:
+            await ws.close()
+
+        yield server, _connect, _close
+
+    await runner.cleanup()
+
+
+async def test_concurrent_connects():
+    async def slow_connect(timeout: float) -> DummyConnection:
+        await asyncio.sleep(0.2)
+        return DummyConnection(0)
+
+    pool = ConnectionPool(connect_cb=slow_connect, max_concurrent_connects=4)
+
+    start = time.perf_counter()
+    conns = await asyncio.gather(*[pool.get(timeout=5) for _ in range(8)])
+    # two waves of 4 parallel connects instead of 8 serialized ones
+    assert time.perf_counter() - start == pytest.approx(0.4, abs=0.15)
+    assert len(set(conns)) == 8 and pool.stats.connects == 8
+
+    for conn in conns:
+        pool.put(conn)
+    await asyncio.gather(*[pool.get(timeout=5) for _ in range(8)])
+    assert pool.stats.connects == 8 and pool.stats.reuse_ratio == 0.5
+    await pool.aclose()
+
+
+async def test_min_idle(ws_server):
+    server, connect, close = ws_server
+    pool = ConnectionPool(connect_cb=connect, close_cb=close, min_idle=2)
+    pool.prewarm()
+    await asyncio.sleep(0.2)
+    assert server.connections == 2 and len(pool._available) == 2
+
+    async with pool.connection(timeout=5), pool.connection(timeout=5):
+        await asyncio.sleep(0.2)
+        # the connections taken are replaced in the background
+        assert server.connections == 4 and len(pool._available) == 2
+
+    assert pool.stats.reuse_ratio == 1.0 and pool.stats.wait_time < 0.05
+    await pool.aclose()
+    await asyncio.sleep(0.1)
+    assert not server.open_sockets
+
+
+async def test_background_refresh(ws_server):
+    server, connect, close = ws_server
+    pool = ConnectionPool(
+        connect_cb=connect,
+        close_cb=close,
+        max_session_duration=0.6,
+        refresh_margin=0.2,
+        min_idle=1,
+    )
+    pool.prewarm()
+    await asyncio.sleep(0.1)
+    (first,) = pool._available
+
+    # the idle connection is replaced before it expires, get() doesn't reconnect
+    await asyncio.sleep(0.6)
+    conn = await pool.get(timeout=5)
+    assert conn is not first and first.closed
+    assert pool.stats.refreshed >= 1 and pool.stats.reuse_ratio == 1.0
+    assert server.connections == pool.stats.connects
+    pool.put(conn)
+    await pool.aclose()
+
+
+async def test_idle_pool_doesnt_reconnect(ws_server):
+    server, connect, close = ws_server
+    pool = ConnectionPool(connect_cb=connect, close_cb=close, max_session_duration=0.3)
+    pool.prewarm()
+    await asyncio.sleep(1.0)
+
+    # without min_idle, the expired connection is only replaced when a stream needs one
+    assert server.connections == 1
+    async with pool.connection(timeout=5):
+        pass
+    assert server.connections == 2
+    await pool.aclose()
+
+
+async def test_failed_refresh_keeps_connection(ws_server):
+    server, connect, close = ws_server
+    fail = False
+
+    async def flaky_connect(timeout: float) -> aiohttp.ClientWebSocketResponse:
+        if fail:
+            raise ConnectionError("unreachable")
+        return await connect(timeout)
+
+    pool = ConnectionPool(
+        connect_cb=flaky_connect,
+        close_cb=close,
+        max_session_duration=1.0,
+        refresh_margin=0.5,
+        min_idle=1,
+    )
+    pool.prewarm()
+    await asyncio.sleep(0.1)
+    (first,) = pool._available
+
+    # the connection is still valid until it expires, it isn't dropped without a replacement
+    fail = True
+    await asyncio.sleep(0.7)  # the refresh started after 0.5s
+    assert pool._available == {first} and not first.closed
+    assert pool.stats.failed_connects >= 1 and pool.stats.refreshed == 0
+
+    fail = False
+    await asyncio.sleep(1.0)
+    assert first.closed and len(pool._available) == 1
+    await pool.aclose()
+
+
+async def test_health_check(ws_server, monkeypatch):
+    server, connect, close = ws_server
+    monkeypatch.setattr(inference.tts, "PING_TIMEOUT", 0.1)
+    tts = inference.TTS("cartesia/sonic-2", api_key="devkey", api_secret="secret" * 6)
+
+    pool = ConnectionPool(
+        connect_cb=connect,
+        close_cb=close,
+        min_idle=1,
+        health_check_cb=tts._check_ws,
+        health_check_interval=0.1,
+    )
+    pool.prewarm()
+    await asyncio.sleep(0.3)
+    (first,) = pool._available
+    assert pool.stats.failed_health_checks == 0
+
+    # the server drops the idle connection, the probe replaces it
+    for ws in list(server.open_sockets):
+        await ws.close()
+    await asyncio.sleep(0.4)
+
+    assert pool.stats.failed_health_checks == 1
+    assert first not in pool._connections and len(pool._available) == 1
+    assert server.connections == 2
+
+    # the connection is open but the server stopped answering
+    server.answer_pings = False
+    for ws in list(server.open_sockets):
+        await ws.close()
+    await asyncio.sleep(0.6)
+    assert pool.stats.failed_health_checks >= 3
+    assert server.connections >= 4
+
+    await pool.aclose()
+    await tts.aclose()
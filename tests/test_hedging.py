@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable
+from typing import Callable
+
+import pytest
+
+from livekit.agents.utils.hedging import run_hedged
+
+
+class _Attempts:
+    """Attempts returning their index after a delay, or raising if the delay is an exception"""
+
+    def __init__(self, *delays: float | tuple[float, Exception]) -> None:
+        self.delays = delays
+        self.started: list[int] = []
+        self.cancelled: list[int] = []
+        self.errors: list[tuple[int, Exception]] = []
+        self.discarded: list[int] = []
+        self.cut_off: list[tuple[int, float]] = []
+
+    def attempts(self) -> list[Callable[[], Awaitable[int]]]:
+        return [self._attempt(idx) for idx in range(len(self.delays))]
+
+    def _attempt(self, idx: int) -> Callable[[], Awaitable[int]]:
+        async def _run() -> int:
+            self.started.append(idx)
+            delay = self.delays[idx]
+            try:
+                if isinstance(delay, tuple):
+                    await asyncio.sleep(delay[0])
+                    raise delay[1]
+
+                await asyncio.sleep(delay)
+                return idx
+            except asyncio.CancelledError:
+                self.cancelled.append(idx)
+                raise
+
+        return _run
+
+    async def run(self, hedge_delay: float | None) -> int:
+        async def _on_discard(value: int) -> None:
+            self.discarded.append(value)
+
+        result = await run_hedged(
+            self.attempts(),
+            hedge_delay=lambda _: hedge_delay,
+            on_error=lambda idx, exc: self.errors.append((idx, exc)),
+            on_discard=_on_discard,
+            on_cut_off=lambda idx, elapsed: self.cut_off.append((idx, elapsed)),
+        )
+        return result.value
+
+
+async def test_hedged_attempt_wins() -> None:
+    attempts = _Attempts(1.0, 0.05)
+    assert await attempts.run(hedge_delay=0.1) == 1
+
+    assert attempts.cancelled == [0]
+    assert [idx for idx, _ in attempts.cut_off] == [0]
+    assert attempts.cut_off[0][1] >= 0.15  # the first attempt was cut off after hedge + 50ms
+
+
+async def test_failure_while_hedged() -> None:
+    error = RuntimeError("first failed")
+    attempts = _Attempts((0.15, error), 0.3, 1.0)
+    assert await attempts.run(hedge_delay=0.1) == 1
+
+    # the first failure doesn't stop the hedged attempt, the next one is started after its delay
+    assert attempts.started == [0, 1, 2]
+    assert attempts.errors == [(0, error)]
+    # the third attempt started after the winner, its running time isn't a lower bound
+    assert attempts.cancelled == [2]
+    assert attempts.cut_off == []
+
+
+async def test_completed_losers_are_discarded() -> None:
+    release = asyncio.Event()
+    discarded: list[int] = []
+
+    async def _first() -> int:
+        await release.wait()
+        return 0
+
+    async def _second() -> int:
+        release.set()  # both attempts complete during the same iteration
+        return 1
+
+    async def _on_discard(value: int) -> None:
+        discarded.append(value)
+
+    result = await run_hedged(
+        [_first, _second],
+        hedge_delay=lambda _: 0.05,
+        on_error=lambda idx, exc: None,
+        on_discard=_on_discard,
+    )
+
+    # the earliest attempt wins, the result of the other one is handed back
+    assert result.index == 0 and result.value == 0 and result.hedged
+    assert discarded == [1]
+
+
+async def test_all_attempts_failed() -> None:
+    errors = [RuntimeError("first"), ValueError("second")]
+    attempts = _Attempts((0.3, errors[0]), (0.05, errors[1]))
+
+    with pytest.raises(RuntimeError, match="first"):
+        await attempts.run(hedge_delay=0.1)
+
+    assert attempts.errors == [(1, errors[1]), (0, errors[0])]
+    assert attempts.cut_off == [] and attempts.discarded == []
+
+    with pytest.raises(ValueError):
+        await run_hedged([], hedge_delay=lambda _: None, on_error=lambda idx, exc: None)
@@ -3,17 +3,25 @@ from __future__ import annotations
 import asyncio
 import ctypes
 import io
+import json
 import multiprocessing as mp
 import socket
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from multiprocessing.context import BaseContext
 from typing import ClassVar
 
+import numpy as np
 import psutil
+import pytest
 
 from livekit.agents import JobContext, JobProcess, ipc, job, utils
+from livekit.agents.inference_runner import _InferenceRunner
+from livekit.agents.ipc import scaling, slab
+from livekit.agents.ipc.inference_proc_lazy_main import _BatchScheduler
+from livekit.agents.ipc.job_proc_lazy_main import _InfClient
 from livekit.protocol import agent
 
 
@@ -107,6 +115,77 @@ def test_sync_channel():
     pch.close()
 
 
+def test_sync_channel_without_sendmsg():
+    class _NoSendmsgSocket:
+        # sockets don't have sendmsg on Windows
+        def __init__(self, sock: socket.socket) -> None:
+            self._sock = sock
+
+        def sendall(self, data: bytes) -> None:
+            self._sock.sendall(data)
+
+        def close(self) -> None:
+            self._sock.close()
+
+    pch_sock, cch_sock = socket.socketpair()
+    pch = utils.aio.duplex_unix._Duplex(_NoSendmsgSocket(pch_sock))  # type: ignore[arg-type]
+    cch = utils.aio.duplex_unix._Duplex.open(cch_sock)
+
+    msg = SomeDataMessage(string="hello", number=42, double=3.14, data=b"world")
+    ipc.channel.send_message(pch, msg)
+    assert ipc.channel.recv_message(cch, IPC_MESSAGES) == msg
+
+    pch.close()
+    cch.close()
+
+
+async def test_async_channel_batched_frames():
+    pch_sock, cch_sock = socket.socketpair()
+    pch = await utils.aio.duplex_unix._AsyncDuplex.open(pch_sock)
+    cch = await utils.aio.duplex_unix._AsyncDuplex.open(cch_sock)
+
+    # concurrent sends are coalesced, bigger payloads grow the reusable frame buffer
+    msgs = [
+        SomeDataMessage(string=f"msg_{i}", number=i, double=i / 3, data=bytes([i]) * (i * 4096))
+        for i in range(64)
+    ]
+
+    async def _recv_all() -> list[ipc.channel.Message]:
+        return [await ipc.channel.arecv_message(cch, IPC_MESSAGES) for _ in range(len(msgs) + 1)]
+
+    recv_task = asyncio.create_task(_recv_all())
+    await asyncio.gather(*(ipc.channel.asend_message(pch, msg) for msg in msgs))
+    await ipc.channel.asend_message(pch, EmptyMessage())
+
+    assert await recv_task == [*msgs, EmptyMessage()]
+
+    await pch.aclose()
+    await cch.aclose()
+
+
+async def test_async_channel_flow_control():
+    pch_sock, cch_sock = socket.socketpair()
+    pch = await utils.aio.duplex_unix._AsyncDuplex.open(pch_sock)
+    cch = await utils.aio.duplex_unix._AsyncDuplex.open(cch_sock)
+
+    # a small frame is written right away, the big ones written in the same loop iteration are
+    # queued, they must still pause the senders while the other side isn't reading
+    msgs = [SomeDataMessage(data=b"small")] + [
+        SomeDataMessage(string=f"msg_{i}", data=bytes([i]) * 256 * 1024) for i in range(32)
+    ]
+    send_tasks = [asyncio.create_task(ipc.channel.asend_message(pch, msg)) for msg in msgs]
+    _, pending = await asyncio.wait(send_tasks, timeout=0.5)
+    assert pending, "the senders must wait for the flow control"
+    assert len(pch._wbuf) < 2 * 256 * 1024
+
+    received = [await ipc.channel.arecv_message(cch, IPC_MESSAGES) for _ in msgs]
+    await asyncio.gather(*send_tasks)
+    assert received == msgs
+
+    await pch.aclose()
+    await cch.aclose()
+
+
 def _generate_fake_job() -> job.RunningJobInfo:
     return job.RunningJobInfo(
         job=agent.Job(id="fake_job_" + str(uuid.uuid4().hex), type=agent.JobType.JT_ROOM),
@@ -391,3 +470,296 @@ async def test_job_graceful_shutdown():
     assert proc.exitcode == 0, "process should have exited cleanly"
     assert not proc.killed
     assert start_args.shutdown_counter.value == 1
+
+
+class _BatchEchoRunner(_InferenceRunner):
+    INFERENCE_METHOD = "test_batch_echo"
+    SUPPORTS_BATCHING = True
+    BATCH_MAX_SIZE = 4
+    BATCH_WINDOW = 0.05
+
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+
+    def initialize(self) -> None:
+        pass
+
+    def run(self, data: bytes) -> bytes | None:
+        return data[::-1]
+
+    def run_batch(self, data: list[bytes]) -> list[bytes | None]:
+        self.batch_sizes.append(len(data))
+        return [self.run(d) for d in data]
+
+
+class _FakeProcClient:
+    def __init__(self) -> None:
+        self.responses: dict[str, ipc.proto.InferenceResponse] = {}
+
+    async def send(self, msg: ipc.channel.Message) -> None:
+        assert isinstance(msg, ipc.proto.InferenceResponse)
+        self.responses[msg.request_id] = msg
+
+
+async def test_inference_batch_scheduler():
+    runner = _BatchEchoRunner()
+    client = _FakeProcClient()
+    executor = ThreadPoolExecutor(max_workers=2)
+    scheduler = _BatchScheduler(
+        runner, executor=executor, client=client, loop=asyncio.get_running_loop()
+    )
+
+    # 6 requests: the first 4 fill a batch, the 2 remaining are flushed by the window timer
+    for i in range(6):
+        scheduler.push(
+            ipc.proto.InferenceRequest(
+                method=_BatchEchoRunner.INFERENCE_METHOD,
+                request_id=f"req_{i}",
+                data=f"abc{i}".encode(),
+            )
+        )
+
+    await asyncio.sleep(0.2)
+    await scheduler.aclose()
+    executor.shutdown()
+
+    assert runner.batch_sizes == [4, 2]
+    assert len(client.responses) == 6
+    for i in range(6):
+        assert client.responses[f"req_{i}"].data == f"{i}cba".encode()
+
+
+class _FailingEchoRunner(_BatchEchoRunner):
+    def run(self, data: bytes) -> bytes | None:
+        if data == b"bad":
+            raise ValueError("bad request")
+        return data[::-1]
+
+    run_batch = _InferenceRunner.run_batch
+
+
+async def test_inference_batch_scheduler_item_error():
+    runner = _FailingEchoRunner()
+    client = _FakeProcClient()
+    executor = ThreadPoolExecutor(max_workers=2)
+    scheduler = _BatchScheduler(
+        runner, executor=executor, client=client, loop=asyncio.get_running_loop()
+    )
+
+    for i, data in enumerate([b"abc", b"bad", b"def"]):
+        scheduler.push(
+            ipc.proto.InferenceRequest(
+                method=_FailingEchoRunner.INFERENCE_METHOD, request_id=f"req_{i}", data=data
+            )
+        )
+
+    await asyncio.sleep(0.2)
+    await scheduler.aclose()
+    executor.shutdown()
+
+    # only the invalid request fails
+    assert client.responses["req_0"].data == b"cba"
+    assert client.responses["req_1"].error == "bad request"
+    assert client.responses["req_2"].data == b"fed"
+    assert not client.responses["req_0"].error and not client.responses["req_2"].error
+
+
+class _FakeEOUTokenizer:
+    pad_token_id = 0
+
+    def apply_chat_template(self, chat_ctx: list[dict], **kwargs: object) -> str:
+        return " ".join(msg["content"] for msg in chat_ctx) + "<|im_end|>"
+
+    def __call__(self, text: str, **kwargs: object) -> dict[str, np.ndarray]:
+        return {"input_ids": np.array([[ord(c) for c in text]], dtype=np.int64)}
+
+
+class _FakeEOUSession:
+    """Returns a probability per position, or only for the last one like a non-batchable export"""
+
+    def __init__(self, *, per_position: bool) -> None:
+        self.per_position = per_position
+        self.batch_sizes: list[int] = []
+
+    def run(self, output_names: object, inputs: dict[str, np.ndarray]) -> list[np.ndarray]:
+        input_ids = inputs["input_ids"]
+        self.batch_sizes.append(len(input_ids))
+        probs = (input_ids % 100 / 100.0).astype(np.float32)
+        return [probs[:, :, np.newaxis] if self.per_position else probs[:, -1:]]
+
+
+@pytest.mark.parametrize("per_position", [True, False])
+def test_turn_detector_run_batch(per_position: bool):
+    from livekit.plugins.turn_detector.base import _EUORunnerBase
+
+    runner = _EUORunnerBase("en")
+    runner._tokenizer = _FakeEOUTokenizer()
+    runner._session = session = _FakeEOUSession(per_position=per_position)
+
+    def request(*contents: str) -> bytes:
+        return json.dumps({"chat_ctx": [{"role": "user", "content": c} for c in contents]}).encode()
+
+    valid = [request("hello there"), request("hi", "how are you"), request("ok")]
+    data = [valid[0], b"not json", valid[1], b"{}", request("?!"), valid[2]]
+    results = runner.run_batch(data)
+
+    assert len(results) == len(data)
+    assert isinstance(results[1], ValueError)  # json.JSONDecodeError
+    assert isinstance(results[3], ValueError) and "chat_ctx" in str(results[3])
+    assert isinstance(results[4], ValueError) and "empty" in str(results[4])
+
+    # the padded batch gives the same probabilities as running each request alone
+    for i, req in zip((0, 2, 5), valid):
+        batched = results[i]
+        assert isinstance(batched, bytes)
+        single = runner.run(req)
+        assert single is not None
+        assert json.loads(batched)["eou_probability"] == pytest.approx(
+            json.loads(single)["eou_probability"]
+        )
+        assert json.loads(batched)["batch_size"] == 3
+
+    if per_position:
+        assert session.batch_sizes[0] == 3
+    else:
+        # the model can't be batched, it falls back to one request at a time and remembers it
+        assert session.batch_sizes[:4] == [3, 1, 1, 1]
+        session.batch_sizes.clear()
+        runner.run_batch(valid)
+        assert session.batch_sizes == [1, 1, 1]
+
+
+class _ForwardingProcClient:
+    """Forwards the requests of an _InfClient to the inference process, like ProcJobExecutor"""
+
+    def __init__(self, executor: ipc.inference_proc_executor.InferenceProcExecutor) -> None:
+        self.executor = executor
+        self.inf_client: _InfClient | None = None
+        self.requests: list[ipc.proto.InferenceRequest] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def send(self, msg: ipc.channel.Message) -> None:
+        assert isinstance(msg, ipc.proto.InferenceRequest)
+        self.requests.append(msg)
+
+        async def _forward() -> None:
+            resp = await self.executor.forward_inference(msg)
+            resp.request_id = msg.request_id
+            assert self.inf_client is not None
+            self.inf_client._on_inference_response(resp)
+
+        task = asyncio.create_task(_forward())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+async def test_inference_shared_memory():
+    executor = ipc.inference_proc_executor.InferenceProcExecutor(
+        runners={_BatchEchoRunner.INFERENCE_METHOD: _BatchEchoRunner},
+        initialize_timeout=20.0,
+        close_timeout=5.0,
+        memory_warn_mb=0,
+        memory_limit_mb=0,
+        ping_interval=5.0,
+        ping_timeout=60.0,
+        high_ping_threshold=2.5,
+        mp_ctx=mp.get_context("spawn"),
+        loop=asyncio.get_running_loop(),
+        http_proxy=None,
+    )
+    await executor.start()
+    await executor.initialize()
+
+    pool = slab.SlabPool(num_slots=2)
+    client = _ForwardingProcClient(executor)
+    inf_client = client.inf_client = _InfClient(client, slabs=pool)  # type: ignore[arg-type]
+
+    try:
+        # 2 slots for 4 requests, the remaining payloads fallback to inline bytes
+        payloads = [bytes([i]) * slab.MIN_PAYLOAD_SIZE + b"end" for i in range(4)]
+        results = await asyncio.gather(
+            *(inf_client.do_inference(_BatchEchoRunner.INFERENCE_METHOD, p) for p in payloads)
+        )
+        assert results == [p[::-1] for p in payloads]
+
+        in_slab = [req for req in client.requests if req.slab_slot is not None]
+        assert len(in_slab) == 2
+        assert all(req.data == b"" for req in in_slab)
+        assert len(pool._free) == 2, "all the slots must be released"
+
+        # small payloads are always inlined
+        assert await inf_client.do_inference(_BatchEchoRunner.INFERENCE_METHOD, b"abc") == b"cba"
+        assert client.requests[-1].slab_slot is None
+    finally:
+        inf_client.close()
+        await executor.aclose()
+
+
+def test_predictive_scaling_policy():
+    policy = scaling.PredictiveScalingPolicy(
+        min_idle_processes=1, max_idle_processes=8, max_idle_per_cpu=64
+    )
+    # small processes, so the memory budget doesn't limit the pool
+    policy.on_process_ready(spawn_time=2.0, memory_mb=1.0)
+    assert policy.target_idle_processes() == 1
+
+    for _ in range(5):
+        policy.on_job_requested(warm=True)
+    low_target = policy.target_idle_processes()
+    assert 1 <= low_target < 8
+
+    # a burst of jobs grows the pool up to max_idle_processes
+    for _ in range(100):
+        policy.on_job_requested(warm=False)
+    assert policy.target_idle_processes() == 8
+
+    # the arrival rate decays once the burst is out of the peak window
+    now = time.monotonic()
+    assert policy.arrival_rate(now + 1000) < policy.arrival_rate(now) / 10
+
+    # slow spawns need more warm processes for the same arrival rate
+    fast = scaling.PredictiveScalingPolicy(max_idle_processes=64, max_idle_per_cpu=64)
+    slow = scaling.PredictiveScalingPolicy(max_idle_processes=64, max_idle_per_cpu=64)
+    fast.on_process_ready(spawn_time=0.1, memory_mb=1.0)
+    slow.on_process_ready(spawn_time=5.0, memory_mb=1.0)
+    for _ in range(20):
+        fast.on_job_requested(warm=True)
+        slow.on_job_requested(warm=True)
+    assert fast.target_idle_processes() < slow.target_idle_processes()
+
+    assert scaling._poisson_quantile(0.0, 0.95) == 0
+    assert scaling._poisson_quantile(1.0, 0.95) == 3
+    assert scaling._poisson_quantile(100.0, 0.95) == 117
+
+    static = scaling.StaticScalingPolicy(3)
+    static.on_job_requested(warm=False)
+    assert static.target_idle_processes() == static.max_idle_processes == 3
+
+
+def test_slab_segments_untracked(monkeypatch: pytest.MonkeyPatch):
+    from collections import Counter
+    from multiprocessing import resource_tracker, shared_memory
+
+    # the resource tracker is shared by the processes of the worker, it must not unlink the
+    # segments when one of them exits
+    registered: Counter[str] = Counter()
+    monkeypatch.setattr(resource_tracker, "register", lambda name, _: registered.update([name]))
+    monkeypatch.setattr(resource_tracker, "unregister", lambda name, _: registered.subtract([name]))
+
+    pool = slab.SlabPool(num_slots=2)
+    slot = pool.acquire(slab.MIN_PAYLOAD_SIZE)
+    assert slot is not None
+    pool.write(slot, b"hello")
+
+    attachments = slab.SlabAttachments()  # in the inference process
+    assert attachments.read(slot, 5) == b"hello"
+    attachments.close()
+    assert all(n == 0 for n in registered.values())
+
+    # a killed job process doesn't unlink its pool, the job executor does it once it exited
+    pool._shm.close()
+    slab.unlink(pool.name)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=pool.name)
+    slab.unlink(pool.name)  # already unlinked
+    assert all(n == 0 for n in registered.values())
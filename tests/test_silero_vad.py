@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from livekit import rtc
+from livekit.agents import utils, vad as vad_events
+from livekit.plugins import silero
+from livekit.plugins.silero import onnx_model, shared
+from livekit.plugins.silero.vad import _SlidingWindow, _VADOptions
+
+MODEL_SAMPLE_RATE = 16000
+WINDOW_SIZE = 512
+
+
+def _random_frames(
+    sample_rate: int, *, seed: int = 0
+) -> list[tuple[rtc.AudioFrame, list[rtc.AudioFrame]]]:
+    """~2s of noise split into frames of arbitrary sizes (including empty and tiny ones), along
+    with their frames resampled to the model sample rate"""
+    rng = np.random.default_rng(seed)
+    pcm = rng.integers(-3000, 3000, sample_rate * 2, dtype=np.int16)
+    frames, offset = [], 0
+    while offset < len(pcm):
+        n = int(rng.choice([0, 1, 7, 160, 333, 480, 1024, 2400]))
+        data = pcm[offset : offset + n]
+        frames.append(rtc.AudioFrame(data.tobytes(), sample_rate, 1, len(data)))
+        offset += n
+
+    if sample_rate == MODEL_SAMPLE_RATE:
+        return [(f, [f]) for f in frames]
+
+    # the resampler dithers, resample once for both implementations
+    resampler = rtc.AudioResampler(
+        sample_rate, MODEL_SAMPLE_RATE, quality=rtc.AudioResamplerQuality.QUICK
+    )
+    return [(f, resampler.push(f)) for f in frames]
+
+
+def _legacy_windows(
+    frames: list[tuple[rtc.AudioFrame, list[rtc.AudioFrame]]], sample_rate: int
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Windowing of the previous VADStream, concatenating the pending frames for every window"""
+    input_frames: list[rtc.AudioFrame] = []
+    inference_frames: list[rtc.AudioFrame] = []
+    remaining_fract = 0.0
+    windows = []
+    for frame, resampled in frames:
+        input_frames.append(frame)
+        inference_frames.extend(resampled)
+        while sum(f.samples_per_channel for f in inference_frames) >= WINDOW_SIZE:
+            input_frame = utils.combine_frames(input_frames)
+            inference_frame = utils.combine_frames(inference_frames)
+
+            to_copy = WINDOW_SIZE * sample_rate / MODEL_SAMPLE_RATE + remaining_fract
+            to_copy_int = int(to_copy)
+            remaining_fract = to_copy - to_copy_int
+            windows.append(
+                (
+                    np.array(inference_frame.data[:WINDOW_SIZE]),
+                    np.array(input_frame.data[:to_copy_int]),
+                )
+            )
+
+            input_frames, inference_frames = [], []
+            if len(input_frame.data) > to_copy_int:
+                data = input_frame.data[to_copy_int:].tobytes()
+                input_frames.append(rtc.AudioFrame(data, sample_rate, 1, len(data) // 2))
+            if len(inference_frame.data) > WINDOW_SIZE:
+                data = inference_frame.data[WINDOW_SIZE:].tobytes()
+                inference_frames.append(rtc.AudioFrame(data, MODEL_SAMPLE_RATE, 1, len(data) // 2))
+    return windows
+
+
+def _sliding_windows(
+    frames: list[tuple[rtc.AudioFrame, list[rtc.AudioFrame]]], sample_rate: int
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Windowing of VADStream._main_task"""
+    # small capacities to exercise the compaction and the growth of the buffers
+    input_window = _SlidingWindow(int(WINDOW_SIZE * sample_rate / MODEL_SAMPLE_RATE))
+    inference_window = _SlidingWindow(WINDOW_SIZE)
+    remaining_fract = 0.0
+    windows = []
+    for frame, resampled in frames:
+        input_window.push(np.frombuffer(frame.data, dtype=np.int16))
+        for f in resampled:
+            inference_window.push(np.frombuffer(f.data, dtype=np.int16))
+        while len(inference_window) >= WINDOW_SIZE:
+            to_copy = WINDOW_SIZE * sample_rate / MODEL_SAMPLE_RATE + remaining_fract
+            to_copy_int = int(to_copy)
+            remaining_fract = to_copy - to_copy_int
+            windows.append(
+                (
+                    inference_window.peek(WINDOW_SIZE).copy(),
+                    input_window.peek(to_copy_int).copy(),
+                )
+            )
+            input_window.consume(to_copy_int)
+            inference_window.consume(WINDOW_SIZE)
+    return windows
+
+
+def test_sliding_window() -> None:
+    window = _SlidingWindow(4)
+    window.push(np.arange(3, dtype=np.int16))
+    assert window.peek(10).tolist() == [0, 1, 2]
+
+    window.consume(2)
+    window.push(np.arange(3, 6, dtype=np.int16))  # compacted to the front
+    assert len(window) == 4 and window.peek(4).tolist() == [2, 3, 4, 5]
+
+    window.push(np.arange(6, 12, dtype=np.int16))  # grown
+    assert window.peek(3).tolist() == [2, 3, 4]
+    window.consume(100)
+    assert len(window) == 0 and window.peek(1).tolist() == []
+
+
+@pytest.mark.parametrize("sample_rate", [16000, 24000, 44100, 48000])
+def test_sliding_windows_match_concatenation(sample_rate: int) -> None:
+    frames = _random_frames(sample_rate)
+    legacy = _legacy_windows(frames, sample_rate)
+    sliding = _sliding_windows(frames, sample_rate)
+
+    assert len(legacy) == len(sliding) > 50
+    for (legacy_inference, legacy_input), (inference, input_data) in zip(legacy, sliding):
+        np.testing.assert_array_equal(inference, legacy_inference)
+        np.testing.assert_array_equal(input_data, legacy_input)
+
+
+class _FakeSileroSession:
+    """Deterministic stand-in of the Silero ONNX session, batched like the real model"""
+
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def run(self, _: None, inputs: dict[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        self.release.wait()
+        x, state = inputs["input"], inputs["state"]
+        assert x.shape[0] == state.shape[1]
+        self.batch_sizes.append(x.shape[0])
+        mean = x.mean(axis=1, keepdims=True)
+        out = np.tanh(mean * 10 + state[0, :, :1]).astype(np.float32)
+        new_state = (state * 0.5 + mean[None, :, :]).astype(np.float32)
+        return out, new_state
+
+
+def _models(session: _FakeSileroSession, n: int) -> list[onnx_model.OnnxModel]:
+    return [onnx_model.OnnxModel(onnx_session=session, sample_rate=16000) for _ in range(n)]
+
+
+async def test_batched_inference_matches_onnx_model() -> None:
+    rng = np.random.default_rng(0)
+    num_streams, num_windows = 5, 8
+    windows = rng.uniform(-1, 1, (num_windows, num_streams, WINDOW_SIZE)).astype(np.float32)
+
+    session = _FakeSileroSession()
+    sequential = _models(session, num_streams)
+    expected = [[m(windows[w, i]) for i, m in enumerate(sequential)] for w in range(num_windows)]
+
+    batched = onnx_model.BatchedInference(onnx_session=session, max_delay=0.05)
+    models = _models(session, num_streams)
+    session.batch_sizes.clear()
+    for w in range(num_windows):
+        futs = [batched.submit(m, windows[w, i]) for i, m in enumerate(models)]
+        probs = await asyncio.gather(*[asyncio.wrap_future(f) for f in futs])
+        assert probs == pytest.approx(expected[w])
+
+    assert max(session.batch_sizes) > 1  # the windows were batched
+    for model, ref in zip(models, sequential):
+        np.testing.assert_allclose(model._state, ref._state)
+        np.testing.assert_array_equal(model._context, ref._context)
+
+
+async def test_batched_inference_cancelled_stream() -> None:
+    session = _FakeSileroSession()
+    batched = onnx_model.BatchedInference(onnx_session=session, max_delay=0.001)
+    running, cancelled, other = _models(session, 3)
+    x = np.ones(WINDOW_SIZE, dtype=np.float32)
+
+    # block the thread on a first batch, the next window stays queued
+    session.release.clear()
+    running_fut = batched.submit(running, x)
+    await asyncio.sleep(0.05)
+
+    async def _infer() -> float:
+        return await asyncio.wrap_future(batched.submit(cancelled, x))
+
+    task = asyncio.create_task(_infer())
+    await asyncio.sleep(0.01)
+    task.cancel()  # cancels the concurrent future, like a cancelled VADStream
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    session.release.set()
+    await asyncio.wrap_future(running_fut)
+
+    # the thread is still alive and the cancelled window wasn't run
+    p = await asyncio.wait_for(asyncio.wrap_future(batched.submit(other, x)), 1.0)
+    assert p == pytest.approx(running_fut.result())
+    assert batched._thread.is_alive()
+    assert not hasattr(cancelled, "_state")
+
+
+def _runner() -> shared._SileroVADRunner:
+    runner = shared._SileroVADRunner()
+    runner._session = _FakeSileroSession()  # instead of initialize()
+    return runner
+
+
+def _request(stream_id: bytes, x: np.ndarray, *, sample_rate: int = 16000) -> bytes:
+    header = shared._REQUEST_HEADER.pack(shared._OP_INFERENCE, stream_id, sample_rate)
+    return header + x.astype(np.float32).tobytes()
+
+
+def _close_request(stream_id: bytes) -> bytes:
+    return shared._REQUEST_HEADER.pack(shared._OP_CLOSE, stream_id, 16000)
+
+
+def _prob(result: bytes | None) -> float:
+    assert result is not None
+    return float(shared._RESPONSE.unpack(result)[0])
+
+
+def test_runner_keeps_state_per_stream() -> None:
+    rng = np.random.default_rng(1)
+    windows = rng.uniform(-1, 1, (6, 3, WINDOW_SIZE)).astype(np.float32)
+    stream_ids = [bytes([i]) * 16 for i in range(3)]
+
+    references = _models(_FakeSileroSession(), 3)
+    runner = _runner()
+    for w in range(len(windows)):
+        # the streams are interleaved, each one must only see its own context and state
+        for i in (2, 0, 1):
+            p = _prob(runner.run(_request(stream_ids[i], windows[w, i])))
+            assert p == pytest.approx(references[i](windows[w, i]))
+
+    assert set(runner._models) == set(stream_ids)
+
+
+def test_runner_batched_matches_unbatched() -> None:
+    rng = np.random.default_rng(2)
+    windows = rng.uniform(-1, 1, (4, 5, WINDOW_SIZE)).astype(np.float32)
+    stream_ids = [bytes([i]) * 16 for i in range(5)]
+
+    unbatched, batched = _runner(), _runner()
+    for w in range(len(windows)):
+        requests = [_request(sid, windows[w, i]) for i, sid in enumerate(stream_ids)]
+        # the same stream twice in a batch runs its windows one after the other
+        requests.append(_request(stream_ids[0], windows[w, 0] * 0.5))
+
+        expected = [_prob(unbatched.run(req)) for req in requests]
+        assert [_prob(r) for r in batched.run_batch(requests)] == pytest.approx(expected)
+
+    assert max(batched._session.batch_sizes) == 5
+
+
+def test_runner_close_and_idle_eviction(monkeypatch: pytest.MonkeyPatch) -> None:
+    x = np.full(WINDOW_SIZE, 0.3, dtype=np.float32)
+    closed, idle, active = (bytes([i]) * 16 for i in range(3))
+
+    runner = _runner()
+    first = _prob(runner.run(_request(closed, x)))
+    assert _prob(runner.run(_request(closed, x))) != pytest.approx(first)
+
+    # a closed stream starts over from a fresh state
+    assert runner.run(_close_request(closed)) is None
+    assert closed not in runner._models
+    assert _prob(runner.run(_request(closed, x))) == pytest.approx(first)
+
+    runner.run(_request(idle, x))
+    now = time.monotonic()
+    monkeypatch.setattr(shared.time, "monotonic", lambda: now + shared._STREAM_IDLE_TIMEOUT / 2)
+    runner.run(_request(active, x))
+    runner.run(_request(closed, x))
+
+    monkeypatch.setattr(shared.time, "monotonic", lambda: now + shared._STREAM_IDLE_TIMEOUT + 1)
+    runner.run(_request(active, x))
+    assert idle not in runner._models
+    assert active in runner._models and closed in runner._models
+
+
+def test_runner_invalid_request() -> None:
+    x = np.zeros(WINDOW_SIZE, dtype=np.float32)
+    valid = _request(b"a" * 16, x)
+    results = _runner().run_batch(
+        [
+            valid,
+            b"\x00",  # truncated header
+            _request(b"b" * 16, x, sample_rate=44100),  # unsupported sample rate
+            _request(b"c" * 16, x[:100]),  # wrong window size
+            _request(b"a" * 16, np.zeros(256), sample_rate=8000),  # sample rate changed
+        ]
+    )
+    assert results[0] is not None
+    assert results[1:] == [None, None, None, None]
+
+
+@pytest.mark.parametrize("batched", [False, True])
+async def test_vad_stream_inference(batched: bool) -> None:
+    session = _FakeSileroSession()
+    opts = _VADOptions(
+        min_speech_duration=0.05,
+        min_silence_duration=0.55,
+        prefix_padding_duration=0.5,
+        max_buffered_speech=60.0,
+        activation_threshold=0.5,
+        sample_rate=16000,
+    )
+    vad = silero.VAD(
+        session=session,
+        opts=opts,
+        batched_inference=onnx_model.BatchedInference(onnx_session=session) if batched else None,
+    )
+
+    rng = np.random.default_rng(3)
+    pcm = rng.integers(-3000, 3000, 16000, dtype=np.int16)
+    stream = vad.stream()
+    stream.push_frame(rtc.AudioFrame(pcm.tobytes(), 16000, 1, len(pcm)))
+    stream.end_input()
+    events = [ev async for ev in stream if ev.type == vad_events.VADEventType.INFERENCE_DONE]
+    await stream.aclose()
+
+    reference = onnx_model.OnnxModel(onnx_session=_FakeSileroSession(), sample_rate=16000)
+    exp_filter = utils.ExpFilter(alpha=0.35)
+    expected = [
+        exp_filter.apply(exp=1.0, sample=reference(pcm[i : i + WINDOW_SIZE] / 32767))
+        for i in range(0, len(pcm) - WINDOW_SIZE + 1, WINDOW_SIZE)
+    ]
+    assert [ev.probability for ev in events] == pytest.approx(expected, abs=1e-5)
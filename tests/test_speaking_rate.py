@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from livekit import rtc
+from livekit.agents.voice.transcription._speaking_rate import (
+    SpeakingRateDetector,
+    SpeakingRateEvent,
+)
+
+
+def _legacy_spectral_flux(audio: np.ndarray, sample_rate: int) -> float:
+    # per-frame STFT loop used before the vectorized implementation
+    frame_length = int(sample_rate * 0.025)
+    hop_length = frame_length // 2
+    num_frames = (len(audio) - frame_length) // hop_length + 1
+    zxx = np.zeros((frame_length // 2 + 1, num_frames), dtype=np.complex128)
+    window = np.hanning(frame_length)
+    scale_factor = 1.0 / np.sqrt(np.sum(window**2))
+    for i in range(num_frames):
+        frame = audio[i * hop_length : i * hop_length + frame_length]
+        zxx[:, i] = np.fft.rfft(frame * window) * scale_factor
+
+    mags = np.abs(zxx)
+    values = [np.sum(np.abs(mags[:, i] - mags[:, i - 1])) for i in range(1, mags.shape[1])]
+    return float(np.mean(values)) if values else 0.0
+
+
+def _legacy_speaking_rate(audio: np.ndarray, sample_rate: int) -> float:
+    audio_sq = audio**2
+    if np.sqrt(np.mean(audio_sq)) < 0.005:
+        return 0.0
+    tail_audio_sq = audio_sq[int(len(audio_sq) * 0.7) :]
+    if len(tail_audio_sq) > 0 and np.sqrt(np.mean(tail_audio_sq)) < 0.005 * 0.5:
+        return 0.0
+    return _legacy_spectral_flux(audio, sample_rate)
+
+
+def _legacy_events(pcm: np.ndarray, sample_rate: int) -> list[SpeakingRateEvent]:
+    window, step = sample_rate, int(0.1 * sample_rate)
+    audio = np.divide(pcm, np.iinfo(np.int16).max, dtype=np.float32)
+    events = []
+    timestamp = 0.5
+    start = 0
+    while len(audio) - start >= window:
+        sr = _legacy_speaking_rate(audio[start : start + window], sample_rate)
+        events.append(SpeakingRateEvent(timestamp=timestamp, speaking=sr > 0, speaking_rate=sr))
+        timestamp += 0.1
+        start += step
+
+    # flush the last partial window
+    if (available := len(audio) - start) > window * 0.5:
+        sr = _legacy_speaking_rate(audio[start:], sample_rate)
+        timestamp += available / sample_rate
+        events.append(SpeakingRateEvent(timestamp=timestamp, speaking=sr > 0, speaking_rate=sr))
+    return events
+
+
+def _speech_like(sample_rate: int, duration: float, *, seed: int = 0) -> np.ndarray:
+    # amplitude modulated harmonics with silent gaps, roughly like syllables
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (t % 3.0 < 1.8)
+    signal = 0.3 * voiced * envelope + 0.001 * rng.standard_normal(len(t))
+    return np.clip(signal * 32767, -32768, 32767).astype(np.int16)
+
+
+async def _stream_events(pcm: np.ndarray, sample_rate: int, frame_ms: int) -> list:
+    stream = SpeakingRateDetector().stream()
+    n = sample_rate * frame_ms // 1000
+    for i in range(0, len(pcm), n):
+        chunk = pcm[i : i + n]
+        stream.push_frame(rtc.AudioFrame(chunk.tobytes(), sample_rate, 1, len(chunk)))
+    stream.flush()
+    stream.end_input()
+    events = [ev async for ev in stream]
+    await stream.aclose()
+    return events
+
+
+# 44.1kHz steps are not aligned with the STFT hop
+@pytest.mark.parametrize("sample_rate", [16000, 24000, 44100])
+async def test_speaking_rate_matches_legacy(sample_rate: int) -> None:
+    pcm = _speech_like(sample_rate, 4.35)
+    expected = _legacy_events(pcm, sample_rate)
+
+    for frame_ms in (10, 20, 130):
+        events = await _stream_events(pcm, sample_rate, frame_ms)
+        assert len(events) == len(expected)
+        assert any(ev.speaking for ev in events) and not all(ev.speaking for ev in events)
+        for ev, exp in zip(events, expected):
+            assert ev.timestamp == pytest.approx(exp.timestamp)
+            assert ev.speaking == exp.speaking
+            assert ev.speaking_rate == pytest.approx(exp.speaking_rate, rel=1e-5)
+
+
+async def test_speaking_rate_segments() -> None:
+    sample_rate = 24000
+    first, second = _speech_like(sample_rate, 2.0), _speech_like(sample_rate, 1.7, seed=1)
+
+    stream = SpeakingRateDetector().stream()
+    for pcm in (first, second):
+        stream.push_frame(rtc.AudioFrame(pcm.tobytes(), sample_rate, 1, len(pcm)))
+        stream.flush()
+    stream.end_input()
+    events = [ev async for ev in stream]
+    await stream.aclose()
+
+    # the state is reset between segments, the timestamps keep increasing
+    expected = _legacy_events(first, sample_rate)
+    second_events = _legacy_events(second, sample_rate)
+    offset = expected[-1].timestamp - 0.5
+    expected += [
+        SpeakingRateEvent(ev.timestamp + offset, ev.speaking, ev.speaking_rate)
+        for ev in second_events
+    ]
+    assert [ev.speaking for ev in events] == [ev.speaking for ev in expected]
+    assert [ev.timestamp for ev in events] == pytest.approx([ev.timestamp for ev in expected])
+    assert [ev.speaking_rate for ev in events] == pytest.approx(
+        [ev.speaking_rate for ev in expected], rel=1e-5
+    )
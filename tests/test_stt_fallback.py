@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import time
 
 import pytest
 
@@ -134,3 +135,24 @@ async def test_stt_recover() -> None:
         fallback_adapter.availability_changed_ch(fake2).recv_nowait()
 
     await fallback_adapter.aclose()
+
+
+async def test_stt_hedged() -> None:
+    slow = FakeSTT(fake_transcript="slow", fake_timeout=2.0)
+    fast = FakeSTT(fake_transcript="fast", fake_timeout=0.05)
+    fallback_adapter = FallbackAdapter([slow, fast], hedge_delay=0.2)
+
+    start = time.perf_counter()
+    ev = await fallback_adapter.recognize([])
+    assert ev.alternatives[0].text == "fast"
+    assert time.perf_counter() - start < 1.0
+    assert slow.recognize_ch.recv_nowait()
+    assert fast.recognize_ch.recv_nowait()
+
+    # a failure starts the next STT right away
+    slow.update_options(fake_exception=APIConnectionError("slow failed"), fake_timeout=0.0)
+    ev = await fallback_adapter.recognize([])
+    assert ev.alternatives[0].text == "fast"
+    assert not fallback_adapter._status[0].available
+
+    await fallback_adapter.aclose()
@@ -271,6 +271,19 @@ def test_hyphenate_word():
         assert hyphenated == HYPHENATOR_EXPECTED[i]
 
 
+def test_hyphenate_words():
+    assert basic.hyphenate_words(HYPHENATOR_TEXT) == HYPHENATOR_EXPECTED
+
+    # the cached results are not shared with the caller
+    basic.hyphenate_word("communication").append("x")
+    assert basic.hyphenate_words(["communication", "presents", "Associate", "a"]) == [
+        ["com", "mu", "ni", "ca", "tion"],
+        ["presents"],
+        ["As", "so", "ciate"],
+        ["a"],
+    ]
+
+
 REPLACE_TEXT = (
     "This is a test. Hello world, I'm creating this agents..     framework. Once again "
     "framework.  A.B.C"
@@ -374,3 +387,48 @@ def test_split_paragraphs(test_case):
     input_text, expected_output = test_case
     result = split_paragraphs(input_text)
     assert result == expected_output, f"Failed for input: {input_text}"
+
+
+async def test_streamed_tokenizers_match_full_tokenization():
+    # the streams only tokenize again when the pushed text may create a new token, and only the
+    # start of the buffer, the output must be the same as tokenizing the whole buffer on every
+    # push and after every token
+    import random
+
+    from livekit.agents.tokenize import token_stream
+
+    rng = random.Random(42)
+    parts = ["Mr", "He ", "U.S. They ", ". ", "!", "?", '"', "”", " ", "\n", "2.5", "。", "这"]
+    parts += ["Inc. However ", "x" * 30, "word ", "...", "e.g. ", "Inc. Their ", "A.B.C. Wherever "]
+    tokenizers = [
+        basic.SentenceTokenizer(),
+        basic.SentenceTokenizer(retain_format=True),
+        basic.SentenceTokenizer(min_sentence_len=5, stream_context_len=3),
+        basic.WordTokenizer(),
+        basic.WordTokenizer(ignore_punctuation=False, split_character=True),
+        basic.WordTokenizer(retain_format=True),
+    ]
+
+    async def _tokens(stream: token_stream.BufferedTokenStream, chunks: list[str]) -> list[str]:
+        for chunk in chunks:
+            stream.push_text(chunk)
+        stream.end_input()
+        return [ev.token async for ev in stream]
+
+    for _ in range(200):
+        text = TEXT + "".join(rng.choice(parts) for _ in range(rng.randint(1, 300)))
+        # LLM-like deltas, or larger pushes tokenized from the start of the buffer
+        max_size = rng.choice([8, 8, 512, len(text)])
+        chunks = []
+        while text:
+            size = rng.randint(1, max_size)
+            chunks.append(text[:size])
+            text = text[size:]
+
+        for tokenizer in tokenizers:
+            stream = tokenizer.stream()
+            full_stream = tokenizer.stream()
+            assert isinstance(stream, token_stream.BufferedTokenStream)
+            assert isinstance(full_stream, token_stream.BufferedTokenStream)
+            full_stream._boundaries = None
+            assert await _tokens(stream, chunks) == await _tokens(full_stream, chunks)
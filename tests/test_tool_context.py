@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from livekit.agents import RunContext, function_tool
+from livekit.agents.llm import utils as llm_utils
+from livekit.agents.llm.tool_context import get_function_info
+
+
+class _Tools:
+    @function_tool
+    async def book_table(self, ctx: RunContext, guests: int, time: str = "19:00") -> str:
+        """Book a table
+
+        Args:
+            guests: number of guests
+            time: time of the reservation
+        """
+        return f"{guests} at {time}"
+
+
+@function_tool(raw_schema={"name": "open_gate", "parameters": {"type": "object"}})
+async def open_gate(raw_arguments: dict[str, Any], ctx: RunContext) -> None:
+    pass
+
+
+def test_compiled_tool_is_cached():
+    tools = _Tools()
+    compiled = llm_utils.get_compiled_tool(tools.book_table)
+    # shared by all the bound methods of the tool
+    assert llm_utils.get_compiled_tool(_Tools().book_table) is compiled
+    assert compiled.context_params == ["ctx"]
+    assert list(compiled.signature.parameters) == ["ctx", "guests", "time"]
+
+    schema = llm_utils.build_strict_openai_schema(tools.book_table)
+    again = llm_utils.build_strict_openai_schema(tools.book_table)
+    assert schema == again
+    assert schema["function"]["parameters"] is again["function"]["parameters"]
+    assert schema["function"]["description"].strip() == "Book a table"
+
+    legacy = llm_utils.build_legacy_openai_schema(tools.book_table, internally_tagged=True)
+    assert legacy["parameters"]["properties"]["guests"]["type"] == "integer"
+    assert "ctx" not in legacy["parameters"]["properties"]
+
+    # the name and description of the tool are read on every call
+    get_function_info(tools.book_table).name = "reserve_table"
+    assert llm_utils.build_strict_openai_schema(tools.book_table)["function"]["name"] == (
+        "reserve_table"
+    )
+    get_function_info(tools.book_table).name = "book_table"
+
+
+def test_prepare_function_arguments_cached():
+    tools = _Tools()
+    ctx: Any = object()
+    for _ in range(2):
+        args, kwargs = llm_utils.prepare_function_arguments(
+            fnc=tools.book_table, json_arguments='{"guests": 4, "time": null}', call_ctx=ctx
+        )
+        assert args == (ctx, 4, "19:00")
+        assert kwargs == {}
+
+    with pytest.raises(ValueError):
+        llm_utils.prepare_function_arguments(
+            fnc=tools.book_table, json_arguments='{"guests": null}', call_ctx=ctx
+        )
+
+    args, _ = llm_utils.prepare_function_arguments(
+        fnc=open_gate, json_arguments='{"a": 1}', call_ctx=ctx
+    )
+    assert args == ({"a": 1}, ctx)
+
+
+def test_redecorated_tool_is_compiled_again():
+    async def lookup(city: str) -> str:
+        return city
+
+    first = function_tool(lookup)
+    model = llm_utils.function_arguments_to_pydantic_model(first)
+    assert llm_utils.function_arguments_to_pydantic_model(first) is model
+
+    second = function_tool(lookup, description="Find a city")
+    assert llm_utils.function_arguments_to_pydantic_model(second) is not model
+    assert llm_utils.build_legacy_openai_schema(second)["function"]["description"] == (
+        "Find a city"
+    )
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from livekit import rtc
+from livekit.agents import tokenize
+from livekit.agents.voice.transcription._pacing import PacingScheduler, get_scheduler
+from livekit.agents.voice.transcription._speaking_rate import SpeakingRateDetector
+from livekit.agents.voice.transcription.synchronizer import (
+    _SegmentSynchronizerImpl,
+    _TextSyncOptions,
+)
+
+from .fake_io import FakeTextOutput
+
+TEXT = "Hello there, this is a sentence that is paced with the audio playback of the segment."
+
+
+class _TimedTextOutput(FakeTextOutput):
+    def __init__(self) -> None:
+        super().__init__()
+        self.words: list[tuple[float, str]] = []
+
+    async def capture_text(self, text: str) -> None:
+        self.words.append((time.perf_counter(), text))
+        await super().capture_text(text)
+
+
+def _segment(text_output: _TimedTextOutput) -> _SegmentSynchronizerImpl:
+    options = _TextSyncOptions(
+        speed=1.0,
+        hyphenate_word=tokenize.basic.hyphenate_word,
+        hyphenate_words=tokenize.basic.hyphenate_words,
+        word_tokenizer=tokenize.basic.WordTokenizer(
+            retain_format=True, ignore_punctuation=False, split_character=True
+        ),
+        speaking_rate_detector=SpeakingRateDetector(),
+    )
+    return _SegmentSynchronizerImpl(options=options, next_in_chain=text_output)
+
+
+def _push_segment(segment: _SegmentSynchronizerImpl, *, duration: float) -> None:
+    segment.push_text(TEXT)
+    segment.end_text_input()
+    samples = int(24000 * duration)
+    segment.push_audio(rtc.AudioFrame(b"\0\0" * samples, 24000, 1, samples))
+    segment.end_audio_input()
+
+
+async def test_pacing_scheduler() -> None:
+    scheduler = get_scheduler()
+    assert get_scheduler() is scheduler
+
+    wakeups = 0
+    on_timer = scheduler._on_timer
+
+    def _count_wakeups() -> None:
+        nonlocal wakeups
+        wakeups += 1
+        on_timer()
+
+    scheduler._on_timer = _count_wakeups  # type: ignore[method-assign]
+
+    start = time.perf_counter()
+    entries = [scheduler.sleep(0.1 + i * 0.0001) for i in range(50)]
+    cancelled = scheduler.sleep(0.3)
+    cancelled.cancel()
+    assert cancelled.done() and cancelled.remaining == pytest.approx(0.3, abs=0.05)
+    assert len(scheduler) == 50
+
+    for entry in entries:
+        await entry
+    assert time.perf_counter() - start == pytest.approx(0.1, abs=0.05)
+    assert all(entry.remaining == 0 for entry in entries)
+    assert wakeups == len({entry._tick for entry in entries}) <= 2
+    assert len(scheduler) == 0
+
+
+async def test_pacing_scheduler_order() -> None:
+    scheduler = PacingScheduler(loop=asyncio.get_running_loop())
+    done: list[float] = []
+
+    async def _sleep(delay: float) -> None:
+        await scheduler.sleep(delay)
+        done.append(delay)
+
+    await asyncio.gather(*[_sleep(d) for d in (0.15, 0.05, 0.1, 0.0)])
+    assert done == [0.0, 0.05, 0.1, 0.15]
+
+
+async def test_segment_paced_with_audio() -> None:
+    text_output = _TimedTextOutput()
+    segment = _segment(text_output)
+    start = time.perf_counter()
+    _push_segment(segment, duration=1.0)
+
+    await segment._main_atask
+    await segment.aclose()
+
+    assert "".join(w for _, w in text_output.words) == TEXT
+    assert text_output.words[-1][0] - start == pytest.approx(1.0, abs=0.25)
+
+
+async def test_segment_pause_and_close() -> None:
+    text_output = _TimedTextOutput()
+    segment = _segment(text_output)
+    _push_segment(segment, duration=2.0)
+
+    await asyncio.sleep(0.5)
+    segment.pause()
+    paused_count = len(text_output.words)
+    assert 0 < paused_count < 10
+
+    # no words are emitted while paused
+    await asyncio.sleep(0.3)
+    assert len(text_output.words) == paused_count
+    assert len(get_scheduler()) == 0
+
+    segment.resume()
+    await asyncio.sleep(0.3)
+    assert len(text_output.words) > paused_count
+
+    # closing wakes up the segment right away
+    start = time.perf_counter()
+    await segment.aclose()
+    await segment._main_atask
+    assert time.perf_counter() - start < 0.05
+    assert len(get_scheduler()) == 0
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from livekit import rtc
+from livekit.agents.tts import AudioEmitter, CachedTTS, SynthesizedAudio
+from livekit.agents.tts.cache import _CachedPhrase, _replay
+from livekit.agents.types import USERDATA_TIMED_TRANSCRIPT
+from livekit.agents.utils import aio
+from livekit.agents.utils.aio.channel import ChanEmpty
+from livekit.agents.voice.io import TimedString
+
+from .fake_tts import FakeTTS
+
+
+async def _synthesize(tts: CachedTTS, text: str) -> rtc.AudioFrame:
+    async with tts.synthesize(text) as stream:
+        return await stream.collect()
+
+
+async def _stream(tts: CachedTTS, text: str) -> list[SynthesizedAudio]:
+    async with tts.stream() as stream:
+        stream.push_text(text)
+        stream.end_input()
+        return [ev async for ev in stream]
+
+
+async def test_tts_cache_memory() -> None:
+    fake_tts = FakeTTS(fake_audio_duration=0.5)
+    tts = CachedTTS(tts=fake_tts)
+
+    first = await _synthesize(tts, "Hello, how can I help you today?")
+    assert fake_tts.synthesize_ch.recv_nowait()
+
+    # the text is normalized
+    second = await _synthesize(tts, "  Hello, how can I  help you today? ")
+    with pytest.raises(ChanEmpty):
+        fake_tts.synthesize_ch.recv_nowait()
+    assert bytes(second.data) == bytes(first.data)
+
+    await _synthesize(tts, "Something else")
+    assert fake_tts.synthesize_ch.recv_nowait()
+
+    await tts.aclose()
+
+
+async def test_tts_cache_stream(tmp_path: Path) -> None:
+    fake_tts = FakeTTS(fake_audio_duration=0.5)
+    tts = CachedTTS(tts=fake_tts, cache_dir=str(tmp_path))
+
+    events = await _stream(tts, "Please hold while I transfer your call.")
+    assert fake_tts.stream_ch.recv_nowait()
+
+    replayed = await _stream(tts, "Please hold while I transfer your call.")
+    with pytest.raises(ChanEmpty):
+        fake_tts.stream_ch.recv_nowait()
+
+    assert b"".join(bytes(ev.frame.data) for ev in replayed) == b"".join(
+        bytes(ev.frame.data) for ev in events
+    )
+    assert len({ev.segment_id for ev in replayed}) == 1
+    assert [ev.is_final for ev in replayed][-1]
+    await tts.aclose()
+
+    # the disk cache is shared across instances
+    tts = CachedTTS(tts=fake_tts, cache_dir=str(tmp_path))
+    frame = await _synthesize(tts, "Please hold while I transfer your call.")
+    with pytest.raises(ChanEmpty):
+        fake_tts.synthesize_ch.recv_nowait()
+    assert frame.duration == pytest.approx(0.5, abs=0.02)
+    await tts.aclose()
+
+
+async def test_tts_cache_stream_segments() -> None:
+    fake_tts = FakeTTS(fake_audio_duration=0.2)
+    tts = CachedTTS(tts=fake_tts)
+    await _stream(tts, "Welcome!")
+    assert fake_tts.stream_ch.recv_nowait()
+
+    # every segment is replayed or synthesized on its own (push_text() only forwards the first
+    # one since multiple segments are deprecated, so they are sent to the input channel)
+    async with tts.stream() as stream:
+        for text in ("Welcome!", "Goodbye!", "Welcome!"):
+            stream._input_ch.send_nowait(text)
+            stream._input_ch.send_nowait(stream._FlushSentinel())
+        stream._input_ch.close()
+        events = [ev async for ev in stream]
+
+    assert fake_tts.stream_ch.recv_nowait()
+    with pytest.raises(ChanEmpty):
+        fake_tts.stream_ch.recv_nowait()
+
+    segments = list(dict.fromkeys(ev.segment_id for ev in events))
+    assert len(segments) == 3
+    for segment_id in segments:
+        duration = sum(ev.frame.duration for ev in events if ev.segment_id == segment_id)
+        assert duration == pytest.approx(0.2, abs=0.02)
+
+    await _stream(tts, "Goodbye!")
+    with pytest.raises(ChanEmpty):
+        fake_tts.stream_ch.recv_nowait()
+    await tts.aclose()
+
+
+@pytest.mark.parametrize("cache_streamed", [False, True])
+async def test_tts_cache_streamed_text(tmp_path: Path, cache_streamed: bool) -> None:
+    fake_tts = FakeTTS(fake_audio_duration=0.2)
+    tts = CachedTTS(tts=fake_tts, cache_dir=str(tmp_path), cache_streamed=cache_streamed)
+
+    # like the output of an LLM, the text is pushed as it comes
+    async with tts.stream() as stream:
+        for token in ("Sure, ", "let me ", "check."):
+            stream.push_text(token)
+            await asyncio.sleep(0.01)
+        stream.end_input()
+        events = [ev async for ev in stream]
+
+    assert fake_tts.stream_ch.recv_nowait()
+    assert sum(ev.frame.duration for ev in events) == pytest.approx(0.2, abs=0.02)
+    assert (len(tts._memory) == 1) == cache_streamed
+    assert any(tmp_path.iterdir()) == cache_streamed
+
+    await _stream(tts, "Sure, let me check.")
+    if cache_streamed:
+        with pytest.raises(ChanEmpty):
+            fake_tts.stream_ch.recv_nowait()
+    else:
+        assert fake_tts.stream_ch.recv_nowait()
+    await tts.aclose()
+
+
+async def test_tts_cache_disk_shared(tmp_path: Path) -> None:
+    fake_tts = FakeTTS(fake_audio_duration=0.2)
+    first = CachedTTS(tts=fake_tts, cache_dir=str(tmp_path), max_memory_bytes=0)
+    second = CachedTTS(tts=fake_tts, cache_dir=str(tmp_path), max_memory_bytes=0)
+
+    # the phrases written by another process after the directory was scanned are found
+    await _synthesize(first, "Welcome!")
+    assert fake_tts.synthesize_ch.recv_nowait()
+    await _synthesize(second, "Welcome!")
+    with pytest.raises(ChanEmpty):
+        fake_tts.synthesize_ch.recv_nowait()
+
+    await first.aclose()
+    await second.aclose()
+
+
+async def test_tts_cache_warm(tmp_path: Path) -> None:
+    fake_tts = FakeTTS(fake_audio_duration=0.2)
+    tts = CachedTTS(tts=fake_tts, cache_dir=str(tmp_path), max_memory_bytes=0)
+
+    await tts.warm(["Welcome!", "Goodbye!"])
+    assert fake_tts.synthesize_ch.recv_nowait()
+    assert fake_tts.synthesize_ch.recv_nowait()
+
+    await tts.warm(["Welcome!"])
+    await _synthesize(tts, "Goodbye!")
+    with pytest.raises(ChanEmpty):
+        fake_tts.synthesize_ch.recv_nowait()
+
+    await tts.aclose()
+
+
+async def test_tts_cache_replay_timed_transcripts() -> None:
+    phrase = _CachedPhrase(
+        sample_rate=16000,
+        num_channels=1,
+        pcm=b"\x01\x00" * 16000,
+        transcripts=[
+            (0, TimedString("Hello ", start_time=0.0, end_time=0.4)),
+            (16000, TimedString("world", start_time=0.5, end_time=1.0)),
+        ],
+    )
+    ch = aio.Chan[SynthesizedAudio]()
+    emitter = AudioEmitter(label="test", dst_ch=ch)
+    emitter.initialize(
+        request_id="req",
+        sample_rate=16000,
+        num_channels=1,
+        mime_type="audio/pcm",
+        frame_size_ms=100,
+    )
+    _replay(phrase, emitter)
+    emitter.end_input()
+    await emitter.join()
+    ch.close()
+
+    events = [ev async for ev in ch]
+    assert b"".join(bytes(ev.frame.data) for ev in events) == phrase.pcm
+
+    # the transcripts are attached to the frames emitted after they were pushed
+    received = [
+        (i, t) for i, ev in enumerate(events) for t in ev.frame.userdata[USERDATA_TIMED_TRANSCRIPT]
+    ]
+    assert [t for _, t in received] == ["Hello ", "world"]
+    assert [t.start_time for _, t in received] == [0.0, 0.5]
+    assert received[0][0] < received[1][0]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import time
 
 import pytest
 
@@ -263,3 +264,75 @@ async def test_timeout():
     assert await asyncio.wait_for(fake2.stream_ch.recv(), 1.0)
 
     await fallback_adapter.aclose()
+
+
+async def test_tts_hedged() -> None:
+    slow = FakeTTS(fake_audio_duration=1.0, fake_timeout=2.0)
+    fast = FakeTTS(fake_audio_duration=1.0)
+    fallback_adapter = FallbackAdapter([slow, fast], hedge_delay=0.2)
+
+    start = time.perf_counter()
+    async with fallback_adapter.synthesize("hello test") as stream:
+        frames = [data.frame async for data in stream]
+
+    # the second TTS is started once the first one exceeds the hedge delay, the first is cancelled
+    assert time.perf_counter() - start < 1.0
+    assert rtc.combine_audio_frames(frames).duration == pytest.approx(1.0, abs=0.02)
+    assert slow.synthesize_ch.recv_nowait()
+    assert fast.synthesize_ch.recv_nowait()
+    assert fallback_adapter._status[0].available
+    assert fallback_adapter._status[1].ttfb.size() == 1
+    # the cancelled TTS ran for at least the hedge delay
+    assert fallback_adapter._status[0].ttfb.size() == 1
+    assert fallback_adapter._status[0].ttfb._sorted[0] >= 0.2
+
+    # once enough latencies are known, the fastest TTS is tried first
+    for _ in range(10):
+        fallback_adapter._status[0].ttfb.add_sample(2.0)
+        fallback_adapter._status[1].ttfb.add_sample(0.01)
+
+    async with fallback_adapter.synthesize("hello test") as stream:
+        async for _ in stream:
+            pass
+
+    assert fast.synthesize_ch.recv_nowait()
+    with pytest.raises(ChanEmpty):
+        slow.synthesize_ch.recv_nowait()
+
+    # a null latency is a valid one
+    fallback_adapter._status[1].ttfb.reset()
+    for _ in range(10):
+        fallback_adapter._status[1].ttfb.add_sample(0.0)
+    assert fallback_adapter._ordered_indices() == [1, 0]
+    assert fallback_adapter._hedge_deadline(1) == 0.0
+
+    # the first audio of a stream waits for the text, its latency isn't a synthesis latency
+    sizes = [status.ttfb.size() for status in fallback_adapter._status]
+    async with fallback_adapter.stream() as stream:
+        stream.push_text("hello test")
+        stream.end_input()
+        async for _ in stream:
+            pass
+    assert [status.ttfb.size() for status in fallback_adapter._status] == sizes
+
+    await fallback_adapter.aclose()
+
+
+async def test_tts_hedged_fallback() -> None:
+    fake1 = FakeTTS(fake_exception=APIConnectionError("fake1 failed"))
+    fake2 = FakeTTS(fake_audio_duration=0.5)
+    fallback_adapter = FallbackAdapter([fake1, fake2], hedge_delay=5.0)
+
+    async with fallback_adapter.synthesize("hello test") as stream:
+        frames = [data.frame async for data in stream]
+
+    assert rtc.combine_audio_frames(frames).duration == pytest.approx(0.5, abs=0.02)
+    assert not fallback_adapter._status[0].available
+
+    fake2.update_options(fake_audio_duration=0.0)
+    with pytest.raises(APIConnectionError):
+        async with fallback_adapter.synthesize("hello test") as stream:
+            async for _ in stream:
+                pass
+
+    await fallback_adapter.aclose()
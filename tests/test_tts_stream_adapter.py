@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from livekit.agents import tokenize
+from livekit.agents.tts import StreamAdapter
+from livekit.agents.types import USERDATA_TIMED_TRANSCRIPT
+
+from .fake_tts import FakeTTS, FakeTTSResponse
+
+SENTENCES = [
+    "The first sentence is the longest one of them all.",
+    "Then comes a second sentence.",
+    "A third sentence follows it.",
+    "And the last one ends here.",
+]
+
+
+def _fake_tts() -> FakeTTS:
+    # later sentences are synthesized faster, so they finish first when synthesized ahead
+    return FakeTTS(
+        fake_responses=[
+            FakeTTSResponse(
+                input=text, audio_duration=0.1 * (i + 1), ttfb=0.3 - 0.05 * i, duration=0
+            )
+            for i, text in enumerate(SENTENCES)
+        ]
+    )
+
+
+async def _synthesize(adapter: StreamAdapter) -> tuple[float, list[float], list[str]]:
+    start = time.perf_counter()
+    durations: list[float] = []
+    transcripts: list[str] = []
+    async with adapter.stream() as stream:
+        stream.push_text(" ".join(SENTENCES))
+        stream.end_input()
+        async for ev in stream:
+            durations.append(ev.frame.duration)
+            transcripts.extend(
+                t.strip() for t in ev.frame.userdata.get(USERDATA_TIMED_TRANSCRIPT, [])
+            )
+    return time.perf_counter() - start, durations, transcripts
+
+
+async def test_stream_adapter_lookahead():
+    sequential = StreamAdapter(
+        tts=_fake_tts(), sentence_tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=5)
+    )
+    elapsed_sequential, durations, transcripts = await _synthesize(sequential)
+
+    lookahead_tts = _fake_tts()
+    lookahead = StreamAdapter(
+        tts=lookahead_tts,
+        sentence_tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=5),
+        lookahead=3,
+    )
+    elapsed_lookahead, lookahead_durations, lookahead_transcripts = await _synthesize(lookahead)
+
+    # the audio and the transcripts are emitted in order
+    assert transcripts == SENTENCES
+    assert lookahead_transcripts == SENTENCES
+    assert [round(d, 2) for d in lookahead_durations] == [round(d, 2) for d in durations]
+
+    # the wrapped TTS receives the same stripped text as without look-ahead
+    synthesized = []
+    while not lookahead_tts.synthesize_ch.empty():
+        synthesized.append(lookahead_tts.synthesize_ch.recv_nowait().input_text)
+    assert synthesized == SENTENCES
+
+    # the ttfb of the following sentences is hidden behind the first one
+    assert elapsed_sequential > 0.9
+    assert elapsed_lookahead < 0.6
+
+
+async def test_stream_adapter_lookahead_interrupted():
+    fake_tts = FakeTTS(fake_audio_duration=0.1, fake_timeout=0.5)
+    adapter = StreamAdapter(
+        tts=fake_tts,
+        sentence_tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=5),
+        lookahead=1,
+    )
+    async with adapter.stream() as stream:
+        stream.push_text(" ".join(SENTENCES))
+        stream.end_input()
+        await asyncio.sleep(0.1)
+
+    # only the current sentence and the one ahead of it were started
+    started = []
+    while not fake_tts.synthesize_ch.empty():
+        started.append(fake_tts.synthesize_ch.recv_nowait())
+    assert [s.input_text for s in started] == SENTENCES[:2]
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from livekit import rtc
+from livekit.agents import APIConnectionError, APIConnectOptions, inference, stt, utils
+from livekit.agents.inference._utils import close_shared_multiplexers, shared_multiplexer
+
+
+class _FakeGateway:
+    """Echo server routing the replies by context_id, like the multiplexed gateway"""
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.drop_on_audio = False
+        self.received: list[list[dict[str, Any]]] = []  # messages by connection
+        self._sockets: list[web.WebSocketResponse] = []
+
+    async def handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        received: list[dict[str, Any]] = []
+        self.received.append(received)
+        self._sockets.append(ws)
+
+        async for msg in ws:
+            data = json.loads(msg.data)
+            received.append(data)
+            ctx_id, msg_type = data["context_id"], data["type"]
+            if msg_type == "echo":
+                await ws.send_json({"context_id": ctx_id, "type": "echo", "n": data["n"]})
+            elif msg_type == "burst":
+                for n in range(data["count"]):
+                    await ws.send_json({"context_id": ctx_id, "type": "echo", "n": n})
+            elif msg_type == "drop" or (msg_type == "input_audio" and self.drop_on_audio):
+                self.drop_on_audio = False
+                await ws.close()
+            elif msg_type == "session.flush":  # inference TTS
+                await ws.send_json({"context_id": ctx_id, "type": "session.created"})
+                audio = base64.b64encode(b"\0\0" * 2400).decode()
+                await ws.send_json(
+                    {
+                        "context_id": ctx_id,
+                        "session_id": ctx_id,
+                        "type": "output_audio",
+                        "audio": audio,
+                    }
+                )
+                await ws.send_json({"context_id": ctx_id, "session_id": ctx_id, "type": "done"})
+            elif msg_type == "session.finalize":  # inference STT
+                n_audio = sum(
+                    m["type"] == "input_audio" for m in received if m["context_id"] == ctx_id
+                )
+                await ws.send_json(
+                    {"context_id": ctx_id, "type": "final_transcript", "transcript": str(n_audio)}
+                )
+                await ws.send_json({"context_id": ctx_id, "type": "session.finalized"})
+
+        return ws
+
+
+@pytest.fixture
+async def gateway() -> AsyncIterator[tuple[_FakeGateway, str]]:
+    server = _FakeGateway()
+    app = web.Application()
+    app.router.add_get("/tts", server.handler)
+    app.router.add_get("/stt", server.handler)
+    app.router.add_get("/echo", server.handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    try:
+        yield server, f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+@pytest.fixture
+async def http_session() -> AsyncIterator[aiohttp.ClientSession]:
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+def _multiplexer(
+    session: aiohttp.ClientSession, url: str, **kwargs: Any
+) -> utils.WebSocketMultiplexer:
+    async def _connect(timeout: float) -> aiohttp.ClientWebSocketResponse:
+        return await session.ws_connect(f"{url}/echo", timeout=aiohttp.ClientWSTimeout(timeout))
+
+    return utils.WebSocketMultiplexer(connect_cb=_connect, **kwargs)
+
+
+async def test_contexts_share_a_connection(
+    gateway: tuple[_FakeGateway, str], http_session: aiohttp.ClientSession
+) -> None:
+    server, url = gateway
+    mux = _multiplexer(http_session, url)
+
+    async def _stream() -> list[int]:
+        async with mux.context(timeout=5.0) as ctx:
+            for n in range(5):
+                await ctx.send({"type": "echo", "n": n})
+            return [(await ctx.recv(timeout=5.0))["n"] for _ in range(5)]
+
+    results = await asyncio.gather(*[_stream() for _ in range(20)])
+    assert all(r == list(range(5)) for r in results)
+    assert server.connections == 1
+    assert mux.num_connections == 1 and mux.num_contexts == 0
+    await mux.aclose()
+
+
+async def test_max_contexts_per_connection(
+    gateway: tuple[_FakeGateway, str], http_session: aiohttp.ClientSession
+) -> None:
+    server, url = gateway
+    mux = _multiplexer(http_session, url, max_contexts_per_connection=2)
+
+    contexts = [await mux.open_context(timeout=5.0) for _ in range(3)]
+    assert mux.num_connections == 2 and server.connections == 2
+    assert len({ctx.context_id for ctx in contexts}) == 3
+
+    for ctx in contexts:
+        ctx.close()
+    await asyncio.sleep(0.1)
+    assert mux.num_connections == 1  # only the first idle connection is kept
+    await mux.aclose()
+
+
+async def test_slow_context_doesnt_stall_the_connection(
+    gateway: tuple[_FakeGateway, str], http_session: aiohttp.ClientSession
+) -> None:
+    _, url = gateway
+    mux = _multiplexer(http_session, url, max_buffered_messages=4)
+
+    slow = await mux.open_context(timeout=5.0)
+    fast = await mux.open_context(timeout=5.0)
+    await slow.send({"type": "burst", "count": 50})
+
+    # the socket is still read, only the context that fell behind fails
+    for n in range(10):
+        await fast.send({"type": "echo", "n": n})
+        assert (await fast.recv(timeout=5.0))["n"] == n
+
+    with pytest.raises(APIConnectionError):
+        await slow.recv(timeout=5.0)
+    assert mux.num_contexts == 1
+
+    slow.close()
+    fast.close()
+    await mux.aclose()
+
+
+async def test_reconnect_replays_contexts(
+    gateway: tuple[_FakeGateway, str], http_session: aiohttp.ClientSession
+) -> None:
+    server, url = gateway
+    mux = _multiplexer(http_session, url)
+
+    replayed = await mux.open_context(timeout=5.0)
+    await replayed.send({"type": "create", "n": 0}, replay=True)
+    await replayed.send({"type": "echo", "n": 1})  # not replayed
+
+    failed = await mux.open_context(timeout=5.0)
+    await failed.send({"type": "create", "n": 0}, replay=True)
+    failed.stop_replay()
+
+    assert (await replayed.recv(timeout=5.0))["n"] == 1
+    await failed.send({"type": "drop"})
+
+    with pytest.raises(APIConnectionError):
+        await failed.recv(timeout=5.0)
+
+    await replayed.send({"type": "echo", "n": 2})
+    assert (await replayed.recv(timeout=5.0))["n"] == 2
+
+    assert server.connections == 2
+    assert [(m["context_id"], m["type"]) for m in server.received[1]] == [
+        (replayed.context_id, "create"),
+        (replayed.context_id, "echo"),
+    ]
+
+    replayed.close()
+    failed.close()
+    await mux.aclose()
+
+
+async def test_shared_multiplexer_per_loop(gateway: tuple[_FakeGateway, str]) -> None:
+    server, url = gateway
+    kwargs = {"url": f"{url}/echo", "api_key": "devkey", "api_secret": "secret" * 6}
+
+    async def _job(n: int) -> list[int]:
+        # the streams of a loop share its multiplexer
+        mux = shared_multiplexer(**kwargs)
+        assert shared_multiplexer(**kwargs) is mux
+
+        async def _stream(i: int) -> int:
+            async with mux.context(timeout=5.0) as ctx:
+                await ctx.send({"type": "echo", "n": i})
+                return int((await ctx.recv(timeout=5.0))["n"])
+
+        try:
+            return list(await asyncio.gather(*(_stream(i) for i in range(n))))
+        finally:
+            await close_shared_multiplexers()
+
+    # like the jobs of a thread-executor worker, each one runs its own event loop
+    results = await asyncio.gather(*[asyncio.to_thread(asyncio.run, _job(n)) for n in (3, 5)])
+    assert results == [list(range(3)), list(range(5))]
+    assert server.connections == 2
+
+
+async def test_inference_tts_multiplexed(
+    gateway: tuple[_FakeGateway, str], http_session: aiohttp.ClientSession
+) -> None:
+    server, url = gateway
+    tts = inference.TTS(
+        "cartesia/sonic-2",
+        sample_rate=24000,
+        base_url=url,
+        api_key="devkey",
+        api_secret="secret" * 6,
+        http_session=http_session,
+        multiplexed=True,
+    )
+
+    async def _synthesize(text: str) -> float:
+        async with tts.stream() as stream:
+            stream.push_text(text)
+            stream.end_input()
+            return sum([ev.frame.duration async for ev in stream])
+
+    durations = await asyncio.gather(_synthesize("Hello there."), _synthesize("Hi!"))
+    assert durations == [pytest.approx(0.1), pytest.approx(0.1)]
+    assert server.connections == 1
+
+    created = [m for m in server.received[0] if m["type"] == "session.create"]
+    assert len({m["context_id"] for m in created}) == 2
+    assert sum(m["type"] == "session.close" for m in server.received[0]) == 2
+    await close_shared_multiplexers()
+    await tts.aclose()
+
+
+async def test_inference_stt_multiplexed(
+    gateway: tuple[_FakeGateway, str], http_session: aiohttp.ClientSession
+) -> None:
+    server, url = gateway
+    stt_ = inference.STT(
+        "deepgram/nova-3",
+        base_url=url,
+        api_key="devkey",
+        api_secret="secret" * 6,
+        http_session=http_session,
+        multiplexed=True,
+    )
+
+    async def _recognize(duration: float) -> list[str]:
+        async with stt_.stream() as stream:
+            samples = int(16000 * duration)
+            stream.push_frame(rtc.AudioFrame(b"\0\0" * samples, 16000, 1, samples))
+            stream.end_input()
+            return [
+                ev.alternatives[0].text
+                async for ev in stream
+                if ev.type == stt.SpeechEventType.FINAL_TRANSCRIPT
+            ]
+
+    # 50ms audio messages
+    assert await asyncio.gather(_recognize(0.5), _recognize(0.2)) == [["10"], ["4"]]
+    assert server.connections == 1
+    assert sum(m["type"] == "session.close" for m in server.received[0]) == 2
+    await close_shared_multiplexers()
+    await stt_.aclose()
+
+
+async def test_inference_stt_multiplexed_connection_lost(
+    gateway: tuple[_FakeGateway, str], http_session: aiohttp.ClientSession
+) -> None:
+    server, url = gateway
+    server.drop_on_audio = True
+    stt_ = inference.STT(
+        "deepgram/nova-3",
+        base_url=url,
+        api_key="devkey",
+        api_secret="secret" * 6,
+        http_session=http_session,
+        multiplexed=True,
+    )
+
+    # the audio sent on the lost connection isn't replayed, the transcription must fail
+    stream = stt_.stream(conn_options=APIConnectOptions(max_retry=0))
+    samples = 16000 // 5
+    stream.push_frame(rtc.AudioFrame(b"\0\0" * samples, 16000, 1, samples))
+
+    async def _consume() -> None:
+        async for _ in stream:
+            pass
+
+    with pytest.raises(APIConnectionError):
+        await asyncio.wait_for(_consume(), 5.0)
+
+    await stream.aclose()
+    # the gateway session wasn't created again on the new connection
+    assert server.connections == 2
+    assert [m["type"] for m in server.received[1]] == []
+    await close_shared_multiplexers()
+    await stt_.aclose()